@@ -7,8 +7,10 @@ __version__ = "0.5.3"
 import flake8
 
 from flake8_nb.flake8_integration.formatter import IpynbFormatter
+from flake8_nb.flake8_integration.json_formatter import IpynbJsonLinesFormatter
+from flake8_nb.flake8_integration.json_formatter import IpynbSarifFormatter
 
-__all__ = ["IpynbFormatter"]
+__all__ = ["IpynbFormatter", "IpynbJsonLinesFormatter", "IpynbSarifFormatter"]
 
 
 def save_cast_int(int_str: str) -> int:
@@ -0,0 +1,263 @@
+"""Module containing an asyncio API to lint notebooks, i.e. inside of a Jupyter server.
+
+Notebooks are parsed and checked in memory, so the state of
+:class:`flake8_nb.parsers.notebook_parsers.NotebookParser` isn't used and
+concurrent calls are safe. The CPU bound work runs in an executor,
+so the event loop stays responsive.
+
+This requires ``flake8>=5.0.0``.
+
+Example
+-------
+.. code-block:: python
+
+    from flake8_nb.async_api import AsyncNotebookLinter
+
+    linter = AsyncNotebookLinter(["--max-line-length", "99"])
+    violations = await linter.lint_notebook("notebook.ipynb")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import warnings
+from concurrent.futures import Executor
+
+from flake8_nb.flake8_integration.json_formatter import ViolationRecord
+from flake8_nb.flake8_integration.json_formatter import map_violations_to_records
+from flake8_nb.lsp.server import NotebookLinter
+from flake8_nb.parsers.notebook_budget import NotebookBudget
+from flake8_nb.parsers.notebook_budget import NotebookBudgetWarning
+from flake8_nb.parsers.notebook_budget import NotebookCheckTimeout
+from flake8_nb.parsers.notebook_budget import check_time_limit
+from flake8_nb.parsers.notebook_budget import notebook_to_intermediate_code_within_budget
+from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
+from flake8_nb.parsers.notebook_parsers import map_intermediate_to_input
+from flake8_nb.parsers.text_notebooks import get_text_notebook_format
+from flake8_nb.parsers.text_notebooks import get_text_notebook_formats
+
+DEFAULT_MAX_CONCURRENCY = 4
+"""Default number of notebooks checked at the same time."""
+
+_thread_local = threading.local()
+_linter_lock = threading.Lock()
+
+
+def get_linter(argv: tuple[str, ...] = ()) -> NotebookLinter:
+    """Get the linter for ``argv`` of the current thread, creating it on first use.
+
+    Each thread (and with that each worker process) uses its own linters,
+    since a linter can't check multiple files at the same time.
+
+    Parameters
+    ----------
+    argv : tuple[str, ...]
+        CLI options of ``flake8_nb`` to use, by default ()
+
+    Returns
+    -------
+    NotebookLinter
+        Linter of the current thread.
+    """
+    linters: dict[tuple[str, ...], NotebookLinter] | None = getattr(_thread_local, "linters", None)
+    if linters is None:
+        linters = _thread_local.linters = {}
+    if argv not in linters:
+        with _linter_lock:
+            linters[argv] = NotebookLinter(list(argv))
+    return linters[argv]
+
+
+def lint_notebook_file(notebook_path: str, argv: tuple[str, ...] = ()) -> list[ViolationRecord]:
+    """Parse and check a notebook in memory.
+
+    This is the blocking function, which runs in the executor.
+    The notebook is parsed with the options of the linter like the notebooks of the CLI,
+    i.e. ``--nb-skip-cell-magics``, ``--nb-text-formats`` and the budget of the
+    ``--nb-max-*`` options. The time limit of ``--nb-max-seconds`` covers parsing and
+    checking together and is only enforced in the main thread of a process
+    (i.e. with a ``concurrent.futures.ProcessPoolExecutor``).
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path to a notebook.
+    argv : tuple[str, ...]
+        CLI options of ``flake8_nb`` to use, by default ()
+
+    Returns
+    -------
+    list[ViolationRecord]
+        Violations mapped to the cells of the notebook.
+
+    See Also
+    --------
+    flake8_nb.flake8_integration.json_formatter.map_violations_to_records
+
+    Warns
+    -----
+    InvalidNotebookWarning
+        If the notebook couldn't be parsed or is in a text based format,
+        which isn't enabled via ``--nb-text-formats``.
+    NotebookBudgetWarning
+        If the notebook exceeded the budget.
+
+
+    .. # noqa: DAR402
+    """
+    linter = get_linter(argv)
+    notebook_session = linter.notebook_session
+    text_notebook_format = get_text_notebook_format(notebook_path)
+    if text_notebook_format is not None and text_notebook_format not in (
+        get_text_notebook_formats(linter.options.nb_text_formats)
+    ):
+        warnings.warn(InvalidNotebookWarning(notebook_path))
+        return []
+    budget = notebook_session.budget or NotebookBudget()
+    intermediate_filename = f"{notebook_path}_parsed"
+    try:
+        with check_time_limit(budget.max_seconds):
+            intermediate_code, input_line_mapping = notebook_to_intermediate_code_within_budget(
+                notebook_path, budget, notebook_session.skipped_cell_magics
+            )
+            violations = linter.lint(intermediate_filename, intermediate_code)
+    except NotebookCheckTimeout:
+        warnings.warn(
+            NotebookBudgetWarning(
+                notebook_path, f"checking it took longer than {budget.max_seconds}s"
+            )
+        )
+        return []
+    notebook_locations = {
+        violation.line_number: (
+            notebook_path,
+            *map_intermediate_to_input(input_line_mapping, violation.line_number),
+        )
+        for violation in violations
+    }
+    return map_violations_to_records(
+        intermediate_filename, violations, notebook_locations  # type: ignore[arg-type]
+    )
+
+
+class AsyncNotebookLinter:
+    """Lint notebooks without blocking the event loop.
+
+    * The parsing and checking runs in ``executor``, if it is ``None`` the
+      default executor of the event loop (a thread pool) is used.
+      Since the checks are CPU bound, a ``concurrent.futures.ProcessPoolExecutor``
+      keeps the event loop more responsive.
+    * Requests for a notebook, which is already being checked, wait for
+      the result of the running check, instead of checking it again.
+    * At most ``max_concurrency`` notebooks are handed to the executor at the same time,
+      further requests wait until one of them is done.
+    """
+
+    def __init__(
+        self,
+        argv: list[str] | None = None,
+        executor: Executor | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """Initialize AsyncNotebookLinter.
+
+        Parameters
+        ----------
+        argv : list[str] | None
+            CLI options of ``flake8_nb`` to use, by default None
+        executor : Executor | None
+            Executor running the checks, by default None
+        max_concurrency : int
+            Maximum number of notebooks checked at the same time,
+            by default DEFAULT_MAX_CONCURRENCY
+        """
+        self.argv = tuple(argv or [])
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.in_flight: dict[str, asyncio.Future[list[ViolationRecord]]] = {}
+        self._semaphore: tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore limiting the concurrency for the running event loop.
+
+        Returns
+        -------
+        asyncio.Semaphore
+            Semaphore with ``max_concurrency`` slots.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.max_concurrency))
+        return self._semaphore[1]
+
+    async def lint_notebook(self, notebook_path: str) -> list[ViolationRecord]:
+        """Lint a notebook, sharing the result with concurrent requests for the same notebook.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Path to a notebook.
+
+        Returns
+        -------
+        list[ViolationRecord]
+            Violations mapped to the cells of the notebook.
+        """
+        key = os.path.normcase(os.path.abspath(notebook_path))
+        in_flight = self.in_flight.get(key)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(self.run_in_executor(notebook_path))
+            self.in_flight[key] = in_flight
+
+            def forget(future: asyncio.Future[list[ViolationRecord]]) -> None:
+                """Remove the finished check from the running checks.
+
+                Parameters
+                ----------
+                future : asyncio.Future[list[ViolationRecord]]
+                    Finished check.
+                """
+                if self.in_flight.get(key) is future:
+                    del self.in_flight[key]
+
+            in_flight.add_done_callback(forget)
+        # Cancelling one request mustn't cancel the check other requests wait for
+        return await asyncio.shield(in_flight)
+
+    async def lint_notebooks(self, notebook_paths: list[str]) -> dict[str, list[ViolationRecord]]:
+        """Lint multiple notebooks concurrently.
+
+        Parameters
+        ----------
+        notebook_paths : list[str]
+            Paths to notebooks.
+
+        Returns
+        -------
+        dict[str, list[ViolationRecord]]
+            Violations of each notebook.
+        """
+        results = await asyncio.gather(
+            *(self.lint_notebook(notebook_path) for notebook_path in notebook_paths)
+        )
+        return dict(zip(notebook_paths, results))
+
+    async def run_in_executor(self, notebook_path: str) -> list[ViolationRecord]:
+        """Run the check of a notebook in the executor, once a slot is free.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Path to a notebook.
+
+        Returns
+        -------
+        list[ViolationRecord]
+            Violations mapped to the cells of the notebook.
+        """
+        async with self.get_semaphore():
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, lint_notebook_file, notebook_path, self.argv
+            )
@@ -0,0 +1,184 @@
+"""Module containing the instrumentation events of ``flake8_nb``.
+
+Listeners can be attached to the events of a run (i.e. for tracing or sampling),
+without patching any class. A listener is a callable, which is called with the
+name of the event and a dict with the information of the event.
+
+Listeners are registered programmatically with :func:`add_listener` or by an entry point
+in the ``flake8_nb.listeners`` group, whose object is a listener of all events.
+Entry point listeners are loaded by the ``flake8_nb`` application (see
+:func:`load_entry_point_listeners`).
+
+Emitting an event without listeners only costs a dict lookup, events which are
+emitted per violation or need extra work to collect their information are only
+emitted if :func:`has_listeners` is ``True``.
+
+The events and the keys of their information are:
+
+* ``run_start``
+    ``argv``
+* ``run_end``
+    ``argv``, ``result_count`` and ``total_result_count``
+* ``notebook_discovered``
+    ``notebook_path``
+* ``notebook_parsed``
+    ``notebook_path``, ``notebook_bytes``, ``code_cells``, ``seconds``
+    and ``skip_reason`` (``None``, ``"invalid"``, ``"empty"`` or ``"budget"``)
+* ``intermediate_written``
+    ``notebook_path``, ``intermediate_file_path`` and ``intermediate_bytes``
+* ``violation_mapped``
+    ``code``, ``intermediate_file_path``, ``intermediate_line``, ``notebook_path``,
+    ``cell`` (``CellId``) and ``line``
+* ``cleanup``
+    ``temp_path``
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+EVENT_NAMES = (
+    "run_start",
+    "run_end",
+    "notebook_discovered",
+    "notebook_parsed",
+    "intermediate_written",
+    "violation_mapped",
+    "cleanup",
+)
+ALL_EVENTS = "*"
+"""Name to register a listener for all events."""
+ENTRY_POINT_GROUP = "flake8_nb.listeners"
+
+LOG = logging.getLogger(__name__)
+
+_LISTENERS: dict[str, tuple[Listener, ...]] = {event_name: () for event_name in EVENT_NAMES}
+_ENTRY_POINT_LISTENERS_LOADED = False
+
+
+def get_event_names(event_name: str) -> tuple[str, ...]:
+    """Names of the events a listener of ``event_name`` is registered for.
+
+    Parameters
+    ----------
+    event_name : str
+        Name of an event or ``"*"`` for all events.
+
+    Returns
+    -------
+    tuple[str, ...]
+        Names of the events.
+
+    Raises
+    ------
+    ValueError
+        If ``event_name`` isn't a known event.
+    """
+    if event_name == ALL_EVENTS:
+        return EVENT_NAMES
+    if event_name not in _LISTENERS:
+        raise ValueError(
+            f"Unknown event {event_name!r}, available events are: {', '.join(EVENT_NAMES)}"
+        )
+    return (event_name,)
+
+
+def add_listener(event_name: str, listener: Listener) -> None:
+    """Register a listener, which is called each time the event is emitted.
+
+    Parameters
+    ----------
+    event_name : str
+        Name of the event or ``"*"`` for all events.
+    listener : Listener
+        Callable, which is called with the name and the information of the event.
+    """
+    for name in get_event_names(event_name):
+        if listener not in _LISTENERS[name]:
+            _LISTENERS[name] = (*_LISTENERS[name], listener)
+
+
+def remove_listener(event_name: str, listener: Listener) -> None:
+    """Unregister a listener, which was registered with :func:`add_listener`.
+
+    Parameters
+    ----------
+    event_name : str
+        Name of the event or ``"*"`` for all events.
+    listener : Listener
+        The registered listener.
+    """
+    for name in get_event_names(event_name):
+        _LISTENERS[name] = tuple(
+            registered for registered in _LISTENERS[name] if registered != listener
+        )
+
+
+def has_listeners(event_name: str) -> bool:
+    """Whether there are listeners of an event, to skip collecting its information if not.
+
+    Parameters
+    ----------
+    event_name : str
+        Name of the event.
+
+    Returns
+    -------
+    bool
+        ``True`` if a listener is registered for the event.
+    """
+    return bool(_LISTENERS[event_name])
+
+
+def emit_event(event_name: str, **info: Any) -> None:
+    """Call the listeners of an event with its information.
+
+    Errors of listeners are logged, so instrumentation can't break a run.
+
+    Parameters
+    ----------
+    event_name : str
+        Name of the event.
+    info : Any
+        Information of the event.
+    """
+    listeners = _LISTENERS[event_name]
+    if not listeners:
+        return
+    for listener in listeners:
+        try:
+            listener(event_name, info)
+        except Exception as error:
+            LOG.warning("The listener %r of the event %r failed: %s", listener, event_name, error)
+
+
+def load_entry_point_listeners() -> None:
+    """Register the listeners of the ``flake8_nb.listeners`` entry points for all events.
+
+    The entry points are only loaded once per process.
+    """
+    global _ENTRY_POINT_LISTENERS_LOADED
+    if _ENTRY_POINT_LISTENERS_LOADED:
+        return
+    _ENTRY_POINT_LISTENERS_LOADED = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # pragma: no cover
+        # python 3.7, where flake8 depends on the backport
+        from importlib_metadata import entry_points
+
+    all_entry_points: Any = entry_points()
+    if hasattr(all_entry_points, "select"):
+        listener_entry_points = all_entry_points.select(group=ENTRY_POINT_GROUP)
+    else:  # pragma: no cover
+        listener_entry_points = all_entry_points.get(ENTRY_POINT_GROUP, [])
+    for entry_point in listener_entry_points:
+        try:
+            add_listener(ALL_EVENTS, entry_point.load())
+        except Exception as error:
+            LOG.warning("Could not load the listener %r: %s", entry_point.name, error)
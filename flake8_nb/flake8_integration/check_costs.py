@@ -0,0 +1,195 @@
+"""Module for estimating how long checking a file takes, to schedule large files first.
+
+When ``flake8`` runs with multiple jobs, a few large files at the end of the
+list keep one worker busy while the others are idle. Ordering the files by their
+estimated cost, the most expensive first (longest-processing-time-first),
+shortens that tail.
+
+The cost of a file is its number of lines, which can be refined by the check times
+of previous runs stored in a timings file (``--nb-timings-file``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import Sequence
+from typing import TypeVar
+
+from flake8_nb.parsers.notebook_parsers import read_source_map
+
+if TYPE_CHECKING:
+    from flake8.checker import FileChecker
+
+CheckTimings = Dict[str, Dict[str, float]]
+CheckerType = TypeVar("CheckerType", bound="FileChecker")
+
+CHECK_SECONDS_STATISTIC = "check seconds"
+"""Name of the statistic of a checker, which holds the time it took to check the file."""
+
+LOG = logging.getLogger(__name__)
+
+
+def get_check_key(filename: str) -> str:
+    """Key of a checked file in the timings, which is the same for each run.
+
+    Parsed notebooks are saved in a different temporary folder for each run,
+    so they are identified by the path of their original notebook.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the checked file.
+
+    Returns
+    -------
+    str
+        Path of the file (or original notebook) relative to the current directory.
+    """
+    if filename.lower().endswith(".ipynb_parsed"):
+        source_map = read_source_map(filename)
+        if source_map is not None:
+            filename = source_map[0]
+    try:
+        return os.path.normcase(os.path.relpath(filename))
+    except ValueError:  # pragma: no cover
+        # on windows if the file is on a different drive
+        return os.path.normcase(os.path.abspath(filename))
+
+
+def read_check_timings(timings_path: str) -> CheckTimings:
+    """Read the check times of previous runs.
+
+    Parameters
+    ----------
+    timings_path : str
+        Path of the timings file.
+
+    Returns
+    -------
+    CheckTimings
+        Dict mapping the key of a file (see ``get_check_key``) to its ``seconds``
+        and ``lines``, which is empty if the file doesn't exist or can't be read.
+    """
+    if not os.path.isfile(timings_path):
+        return {}
+    try:
+        with open(timings_path, encoding="utf8") as timings_file:
+            check_timings = json.load(timings_file)
+        return {
+            key: {"seconds": float(timing["seconds"]), "lines": float(timing["lines"])}
+            for key, timing in check_timings.items()
+        }
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as error:
+        LOG.warning("Ignoring the invalid timings file %r: %s", timings_path, error)
+        return {}
+
+
+def write_check_timings(timings_path: str, check_timings: CheckTimings) -> None:
+    """Save the check times, replacing the timings file at once.
+
+    Parameters
+    ----------
+    timings_path : str
+        Path of the timings file.
+    check_timings : CheckTimings
+        Check times of the files, see ``read_check_timings``.
+    """
+    temp_timings_path = f"{timings_path}.{os.getpid()}.tmp"
+    with open(temp_timings_path, "w", encoding="utf8") as timings_file:
+        json.dump(check_timings, timings_file, indent=0, sort_keys=True)
+    os.replace(temp_timings_path, timings_path)
+
+
+def update_check_timings(
+    check_timings: CheckTimings, checkers: Sequence[FileChecker]
+) -> CheckTimings:
+    """Add the check times of ``checkers`` to ``check_timings``.
+
+    Parameters
+    ----------
+    check_timings : CheckTimings
+        Check times of previous runs, which are updated in place.
+    checkers : Sequence[FileChecker]
+        Checkers which checked their file.
+
+    Returns
+    -------
+    CheckTimings
+        The updated ``check_timings``.
+    """
+    for checker in checkers:
+        seconds = checker.statistics.get(CHECK_SECONDS_STATISTIC)
+        if seconds is not None:
+            check_timings[get_check_key(checker.display_name)] = {
+                "seconds": seconds,
+                "lines": checker.statistics["physical lines"],
+            }
+    return check_timings
+
+
+def estimate_check_costs(
+    checkers: Sequence[FileChecker], check_timings: CheckTimings | None = None
+) -> list[float]:
+    """Estimate the cost of checking the file of each checker.
+
+    Without timings the cost is the number of lines of a file. With timings
+    it is the stored time, scaled by how much the number of lines changed since.
+    Files without stored time use the average time per line of all known files.
+
+    Parameters
+    ----------
+    checkers : Sequence[FileChecker]
+        Checkers which have read their file.
+    check_timings : CheckTimings | None
+        Check times of previous runs, by default None
+
+    Returns
+    -------
+    list[float]
+        Estimated cost of each checker.
+    """
+    line_counts = [checker.statistics["physical lines"] for checker in checkers]
+    if not check_timings:
+        return [float(line_count) for line_count in line_counts]
+    timings = [check_timings.get(get_check_key(checker.display_name)) for checker in checkers]
+    known_timings = [timing for timing in timings if timing is not None]
+    known_lines = sum(timing["lines"] for timing in known_timings)
+    average_seconds_per_line = (
+        sum(timing["seconds"] for timing in known_timings) / known_lines if known_lines else 1.0
+    )
+    return [
+        line_count * average_seconds_per_line
+        if timing is None
+        else timing["seconds"] * max(line_count, 1) / max(timing["lines"], 1)
+        for line_count, timing in zip(line_counts, timings)
+    ]
+
+
+def order_checkers_by_cost(
+    checkers: Sequence[CheckerType], check_timings: CheckTimings | None = None
+) -> list[CheckerType]:
+    """Order checkers by their estimated cost, the most expensive first.
+
+    Parameters
+    ----------
+    checkers : Sequence[CheckerType]
+        Checkers which have read their file.
+    check_timings : CheckTimings | None
+        Check times of previous runs, by default None
+
+    Returns
+    -------
+    list[CheckerType]
+        Checkers ordered by cost, checkers with the same cost keep their order.
+
+    See Also
+    --------
+    estimate_check_costs
+    """
+    costs = estimate_check_costs(checkers, check_timings)
+    order = sorted(range(len(checkers)), key=lambda index: -costs[index])
+    return [checkers[index] for index in order]
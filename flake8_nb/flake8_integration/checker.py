@@ -0,0 +1,345 @@
+"""Module containing the hacked checker classes of flake8.
+
+This module is only imported with ``flake8>=5.0.0``, since it uses the file
+discovery of ``flake8>=5.0.0``.
+
+Violations in parsed notebooks are mapped back to the original notebook
+inside of the checker, using the source map saved alongside the parsed notebook.
+When ``flake8`` runs with multiple jobs this happens in the worker processes,
+so the main process only needs to report the results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+import warnings
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from flake8.checker import FileChecker
+from flake8.checker import Manager
+from flake8.discover_files import expand_paths
+from flake8.processor import FileProcessor
+
+from flake8_nb.flake8_integration.check_costs import CHECK_SECONDS_STATISTIC
+from flake8_nb.flake8_integration.check_costs import CheckTimings
+from flake8_nb.flake8_integration.check_costs import order_checkers_by_cost
+from flake8_nb.flake8_integration.check_costs import update_check_timings
+from flake8_nb.flake8_integration.profiles import matches_profile_paths
+from flake8_nb.flake8_integration.run_profiler import initialize_processpool
+from flake8_nb.flake8_integration.run_profiler import initialize_profiled_processpool
+from flake8_nb.parsers.notebook_budget import NotebookBudgetWarning
+from flake8_nb.parsers.notebook_budget import NotebookCheckTimeout
+from flake8_nb.parsers.notebook_budget import check_time_limit
+from flake8_nb.parsers.notebook_parsers import InputLineMapping
+from flake8_nb.parsers.notebook_parsers import NotebookLocation
+from flake8_nb.parsers.notebook_parsers import map_intermediate_to_input
+from flake8_nb.parsers.notebook_parsers import read_source_map
+from flake8_nb.parsers.text_notebooks import get_text_notebook_formats
+from flake8_nb.parsers.text_notebooks import is_text_notebook
+
+if TYPE_CHECKING:
+    from flake8.plugins.finder import Checkers
+    from flake8.style_guide import StyleGuideManager
+
+Result = Tuple[str, int, int, str, Optional[str]]
+NotebookResult = Tuple[str, int, int, str, Optional[str], NotebookLocation]
+StdinNotebook = Tuple[str, str, InputLineMapping]
+
+LOG = logging.getLogger(__name__)
+
+CHECK_TIMEOUT_STATISTIC = "check timeouts"
+"""Name of the statistic of a checker, which is set if checking the notebook took too long."""
+
+
+def map_results_to_notebook(
+    intermediate_filename: str,
+    results: list[Result],
+    source_map: tuple[str, InputLineMapping] | None = None,
+) -> list[Result | NotebookResult]:
+    """Append the notebook location of each result of a parsed notebook to the result.
+
+    Parameters
+    ----------
+    intermediate_filename : str
+        Path of the parsed notebook.
+    results : list[Result]
+        Results of checking the parsed notebook, as created by
+        ``flake8.checker.FileChecker.report``.
+    source_map : tuple[str, InputLineMapping] | None
+        (``original_notebook``, ``input_line_mapping``) of the parsed notebook,
+        by default None which reads the source map saved alongside the parsed notebook.
+
+    Returns
+    -------
+    list[Result | NotebookResult]
+        Results with the ``NotebookLocation`` as additional entry, or the original
+        ``results`` if there is no source map for ``intermediate_filename``.
+
+    See Also
+    --------
+    flake8_nb.parsers.notebook_parsers.read_source_map
+    """
+    if source_map is None:
+        source_map = read_source_map(intermediate_filename)
+    if source_map is None:
+        return list(results)
+    original_notebook, input_line_mapping = source_map
+    mapped_results: list[Result | NotebookResult] = []
+    for result in results:
+        input_id, input_cell_line_number = map_intermediate_to_input(input_line_mapping, result[1])
+        mapped_results.append((*result, (original_notebook, input_id, input_cell_line_number)))
+    return mapped_results
+
+
+def run_checker(
+    checker: NotebookFileChecker,
+) -> tuple[str, list[Result | NotebookResult], dict[str, int]]:
+    """Run the checks of a checker in a worker process.
+
+    Parameters
+    ----------
+    checker : NotebookFileChecker
+        Checker of a file.
+
+    Returns
+    -------
+    tuple[str, list[Result | NotebookResult], dict[str, int]]
+        (``filename``, ``results``, ``statistics``)
+    """
+    return checker.run_checks()
+
+
+class NotebookFileChecker(FileChecker):  # type: ignore[misc]
+    """FileChecker which maps the results of parsed notebooks to the original notebook.
+
+    A notebook passed via stdin (``-``) is checked from the code parsed in memory
+    and reported as ``{stdin_display_name_without_suffix}.ipynb_parsed`` (also for
+    text based notebooks), so the formatters map it like any other parsed notebook.
+    With ``--nb-max-seconds`` the checks of a notebook are stopped after the given time,
+    its results are dropped and the ``CHECK_TIMEOUT_STATISTIC`` is set.
+    """
+
+    def __init__(
+        self,
+        *,
+        filename: str,
+        plugins: Checkers,
+        options: argparse.Namespace,
+        stdin_notebook: StdinNotebook | None = None,
+    ):
+        """Initialize NotebookFileChecker.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file to check.
+        plugins : Checkers
+            The plugins to run.
+        options : argparse.Namespace
+            The options of the run.
+        stdin_notebook : StdinNotebook | None
+            (``display_name``, ``intermediate_code``, ``input_line_mapping``) of
+            a notebook passed via stdin, by default None
+        """
+        self.stdin_notebook = stdin_notebook if filename == "-" else None
+        super().__init__(filename=filename, plugins=plugins, options=options)
+        if self.stdin_notebook is not None and self.processor is not None:
+            self.display_name = f"{os.path.splitext(self.stdin_notebook[0])[0]}.ipynb_parsed"
+
+    def _make_processor(self) -> FileProcessor | None:
+        """Create the processor, using the parsed code of a notebook passed via stdin.
+
+        Returns
+        -------
+        FileProcessor | None
+            Processor of the file or ``None`` if the file couldn't be read.
+        """
+        if self.stdin_notebook is None:
+            return super()._make_processor()
+        return FileProcessor(
+            self.filename, self.options, lines=self.stdin_notebook[1].splitlines(True)
+        )
+
+    def run_checks(self) -> tuple[str, list[Result | NotebookResult], dict[str, int]]:
+        """Run checks against the file and map the results if it is a parsed notebook.
+
+        Returns
+        -------
+        tuple[str, list[Result | NotebookResult], dict[str, int]]
+            (``filename``, ``results``, ``statistics``)
+        """
+        start_time = time.perf_counter()
+        is_notebook = self.stdin_notebook is not None or self.filename.lower().endswith(
+            ".ipynb_parsed"
+        )
+        try:
+            with check_time_limit(self.options.nb_max_seconds if is_notebook else 0):
+                filename, results, statistics = super().run_checks()
+        except NotebookCheckTimeout:
+            filename, results, statistics = self.filename, [], self.statistics
+            self.results = results
+            statistics[CHECK_TIMEOUT_STATISTIC] = 1
+        statistics[CHECK_SECONDS_STATISTIC] = time.perf_counter() - start_time
+        if self.stdin_notebook is not None:
+            display_name, _, input_line_mapping = self.stdin_notebook
+            self.results = results = map_results_to_notebook(
+                filename, results, (display_name, input_line_mapping)
+            )
+        elif filename.lower().endswith(".ipynb_parsed"):
+            self.results = results = map_results_to_notebook(filename, results)
+        return filename, results, statistics
+
+
+class NotebookCheckerManager(Manager):  # type: ignore[misc]
+    """Manager using ``NotebookFileChecker`` and passing the mapped locations to the formatter.
+
+    This is only used with ``flake8>=5.0.0``.
+    """
+
+    def __init__(
+        self,
+        style_guide: StyleGuideManager,
+        plugins: Checkers,
+        stdin_notebook: StdinNotebook | None = None,
+        check_timings: CheckTimings | None = None,
+    ):
+        """Initialize NotebookCheckerManager.
+
+        Parameters
+        ----------
+        style_guide : StyleGuideManager
+            The style guide reporting the results.
+        plugins : Checkers
+            The plugins to run.
+        stdin_notebook : StdinNotebook | None
+            Notebook passed via stdin, see ``NotebookFileChecker``, by default None
+        check_timings : CheckTimings | None
+            Check times of previous runs, which are used to order the files and
+            updated with the check times of this run, by default None
+        """
+        super().__init__(style_guide=style_guide, plugins=plugins)
+        self.stdin_notebook = stdin_notebook
+        self.check_timings = check_timings
+
+    def make_checkers(self, paths: list[str] | None = None) -> None:
+        """Create checkers for each file.
+
+        Parameters
+        ----------
+        paths : list[str] | None
+            Paths of the files to check, by default None
+        """
+        if paths is None:
+            paths = self.options.filenames
+        text_notebook_formats = get_text_notebook_formats(self.options.nb_text_formats)
+
+        self._all_checkers = [
+            NotebookFileChecker(
+                filename=filename,
+                plugins=self.plugins,
+                options=self.options,
+                stdin_notebook=self.stdin_notebook,
+            )
+            for filename in expand_paths(
+                paths=paths,
+                stdin_display_name=self.options.stdin_display_name,
+                filename_patterns=self.options.filename,
+                exclude=self.exclude,
+                is_running_from_diff=self.options.diff,
+            )
+            # text based notebooks (i.e. percent scripts) are checked as parsed notebooks
+            if not is_text_notebook(filename, text_notebook_formats)
+            and matches_profile_paths(filename, self.options.nb_profile_paths)
+        ]
+        self.checkers = [c for c in self._all_checkers if c.should_process]
+        if self.jobs > 1:
+            # the results are still reported in the order of _all_checkers
+            self.checkers = order_checkers_by_cost(self.checkers, self.check_timings)
+        LOG.info("Checking %d files", len(self.checkers))
+
+    def run_parallel(self) -> None:
+        """Run the checkers in parallel, handing them to the workers one by one.
+
+        Contrary to ``flake8`` the checkers aren't sent in chunks, so the
+        workers pick up the checkers ordered by cost and finish at a similar time.
+        With ``--nb-profile-out`` each worker writes its profile when it exits.
+        """
+        final_results: dict[str, list[Result | NotebookResult]] = {}
+        final_statistics: dict[str, dict[str, int]] = {}
+        if self.options.nb_profile_out:
+            pool = initialize_profiled_processpool(self.jobs, self.options.nb_profile_out)
+        else:
+            pool = initialize_processpool(self.jobs)
+        if pool is None:  # pragma: no cover
+            self.run_serial()
+            return
+
+        pool_closed = False
+        try:
+            for filename, results, statistics in pool.imap_unordered(
+                run_checker, self.checkers, chunksize=1
+            ):
+                final_results[filename] = results
+                final_statistics[filename] = statistics
+            pool.close()
+            pool.join()
+            pool_closed = True
+        finally:
+            if not pool_closed:  # pragma: no cover
+                pool.terminate()
+                pool.join()
+
+        for checker in self.checkers:
+            checker.results = final_results.get(checker.display_name, [])
+            checker.statistics = final_statistics.get(checker.display_name, {})
+
+    def stop(self) -> None:
+        """Process the statistics and add the check times to :attr:`check_timings`.
+
+        Notebooks whose checks exceeded ``--nb-max-seconds`` are reported with
+        a ``NotebookBudgetWarning``, since their results were dropped.
+        """
+        super().stop()
+        if self.check_timings is not None:
+            update_check_timings(self.check_timings, self.checkers)
+        for checker in self.checkers:
+            if checker.statistics.get(CHECK_TIMEOUT_STATISTIC):
+                source_map = read_source_map(checker.filename)
+                notebook_path = checker.display_name if source_map is None else source_map[0]
+                warnings.warn(
+                    NotebookBudgetWarning(
+                        notebook_path,
+                        f"checking it took longer than {self.options.nb_max_seconds}s",
+                    )
+                )
+
+    def _handle_results(self, filename: str, results: list[Result | NotebookResult]) -> int:
+        """Pass mapped notebook locations to the formatter and report the results.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the checked file.
+        results : list[Result | NotebookResult]
+            Results of checking the file.
+
+        Returns
+        -------
+        int
+            Number of reported results.
+        """
+        notebook_locations: Dict[int, NotebookLocation] = {
+            result[1]: result[5] for result in results if len(result) > 5  # type: ignore[misc]
+        }
+        set_notebook_locations = getattr(
+            self.style_guide.formatter, "set_notebook_locations", None
+        )
+        if notebook_locations and set_notebook_locations is not None:
+            set_notebook_locations(notebook_locations)
+        return int(super()._handle_results(filename, [result[:5] for result in results]))
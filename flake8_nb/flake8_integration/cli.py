@@ -11,13 +11,20 @@ import configparser
 import logging
 import os
 import sys
+import time
 import types
+from itertools import chain
 from pathlib import Path
 from typing import Any
+from typing import BinaryIO
 from typing import Callable
+from typing import Collection
+from typing import Iterable
+from typing import Iterator
 
 from flake8 import __version__ as flake_version
 from flake8 import defaults
+from flake8 import exceptions
 from flake8 import utils
 from flake8.main.application import Application
 from flake8.options import aggregator
@@ -26,15 +33,344 @@ from flake8.utils import matches_filename
 
 from flake8_nb import FLAKE8_VERSION_TUPLE
 from flake8_nb import __version__
-from flake8_nb.parsers.notebook_parsers import NotebookParser
+from flake8_nb.events import emit_event
+from flake8_nb.events import load_entry_point_listeners
+from flake8_nb.flake8_integration.check_costs import CheckTimings
+from flake8_nb.flake8_integration.check_costs import read_check_timings
+from flake8_nb.flake8_integration.check_costs import write_check_timings
+from flake8_nb.flake8_integration.profiles import OptionProfile
+from flake8_nb.flake8_integration.profiles import aggregate_profile_options
+from flake8_nb.flake8_integration.run_profiler import RunProfiler
+from flake8_nb.parsers.notebook_archives import ARCHIVE_SEPARATOR
+from flake8_nb.parsers.notebook_archives import DEFAULT_JSONL_ID_FIELD
+from flake8_nb.parsers.notebook_archives import ArchiveError
+from flake8_nb.parsers.notebook_archives import get_notebook_mtime
+from flake8_nb.parsers.notebook_archives import is_archive
+from flake8_nb.parsers.notebook_archives import is_compressed_notebook
+from flake8_nb.parsers.notebook_archives import is_jsonl_file
+from flake8_nb.parsers.notebook_archives import iter_archive_notebooks
+from flake8_nb.parsers.notebook_archives import iter_jsonl_notebooks
+from flake8_nb.parsers.notebook_archives import use_jsonl_index
+from flake8_nb.parsers.notebook_budget import NotebookBudget
+from flake8_nb.parsers.notebook_diff import ParsedDiff
+from flake8_nb.parsers.notebook_diff import get_changed_cell_numbers
+from flake8_nb.parsers.notebook_diff import get_changed_intermediate_lines
+from flake8_nb.parsers.notebook_diff import get_git_diff_ranges
+from flake8_nb.parsers.notebook_diff import is_valid_git_ref
+from flake8_nb.parsers.notebook_diff import read_git_notebook_cells
+from flake8_nb.parsers.notebook_memory import MemoryReport
+from flake8_nb.parsers.notebook_metrics import NotebookMetrics
+from flake8_nb.parsers.notebook_metrics import write_metrics_file
+from flake8_nb.parsers.notebook_parsers import NON_PYTHON_CELL_MAGICS
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from flake8_nb.parsers.notebook_parsers import read_notebook_to_cells
+from flake8_nb.parsers.notebook_shards import get_notebook_shard
+from flake8_nb.parsers.notebook_shards import iter_notebook_shard
+from flake8_nb.parsers.notebook_shards import parse_shard
+from flake8_nb.parsers.notebook_stream import JSONL_STREAM_BATCH_SIZE
+from flake8_nb.parsers.notebook_stream import iter_intermediate_py_file_batches
+from flake8_nb.parsers.notebook_stream import remove_intermediate_py_files
+from flake8_nb.parsers.text_notebooks import TextNotebookFormat
+from flake8_nb.parsers.text_notebooks import get_text_notebook_format
+from flake8_nb.parsers.text_notebooks import get_text_notebook_formats
+from flake8_nb.parsers.text_notebooks import is_text_notebook
 
 LOG = logging.getLogger(__name__)
 
+FILES_FROM_CHUNK_SIZE = 64 * 1024
+"""Number of bytes read at once from the file list passed to ``--nb-files-from``."""
+
 defaults.EXCLUDE = (*defaults.EXCLUDE, ".ipynb_checkpoints")
 
 
+def is_notebook_file(
+    file_path: str, text_notebook_formats: Collection[TextNotebookFormat] = ()
+) -> bool:
+    """Check if a file is a notebook or a compressed notebook (i.e. ``*.ipynb.gz``).
+
+    Parameters
+    ----------
+    file_path : str
+        File to check if it is a notebook
+    text_notebook_formats : Collection[TextNotebookFormat]
+        Text based notebook formats, whose files are notebooks as well, by default ()
+
+    Returns
+    -------
+    bool
+        Whether the given file is a notebook
+    """
+    return os.path.isfile(file_path) and (
+        file_path.endswith(".ipynb")
+        or is_compressed_notebook(file_path)
+        or is_text_notebook(file_path, text_notebook_formats)
+    )
+
+
+def is_notebook_archive(file_path: str) -> bool:
+    """Check if a file is a tar or zip archive, which is searched for notebooks.
+
+    Archives are only searched if they are passed explicitly, not if they are found in folders.
+
+    Parameters
+    ----------
+    file_path : str
+        File to check if it is an archive
+
+    Returns
+    -------
+    bool
+        Whether the given file is an archive
+    """
+    return os.path.isfile(file_path) and is_archive(file_path)
+
+
+def iter_archive_notebooks_from_arg(archive_path: str, exclude: list[str]) -> Iterator[str]:
+    """Find the notebooks inside of an archive passed to ``flake8_nb``.
+
+    Parameters
+    ----------
+    archive_path : str
+        Path of the archive.
+    exclude : list[str]
+        File-/Folderpatterns that should be excluded
+
+    Yields
+    ------
+    str
+        Virtual path ``archive_path!member_name`` of a found notebook,
+        with the absolute path of the archive.
+
+    Raises
+    ------
+    exceptions.ExecutionError
+        If the archive can't be read.
+    """
+    archive_path = os.path.normcase(os.path.abspath(archive_path))
+    try:
+        notebook_paths = list(iter_archive_notebooks(archive_path))
+    except ArchiveError as error:
+        raise exceptions.ExecutionError(str(error))
+    for notebook_path in notebook_paths:
+        # like folders on disk, excluded folders inside of the archive exclude their notebooks
+        member_start = len(archive_path) + len(ARCHIVE_SEPARATOR)
+        member_parts = notebook_path[member_start:].split("/")
+        if not any(
+            matches_filename(
+                f"{archive_path}{ARCHIVE_SEPARATOR}{'/'.join(member_parts[:index])}",
+                patterns=exclude,
+                log_message='"%(path)s" has %(whether)sbeen excluded',
+                logger=LOG,
+            )
+            for index in range(1, len(member_parts) + 1)
+        ):
+            yield notebook_path
+
+
+def is_notebook_jsonl(file_path: str) -> bool:
+    """Check if a file is a JSON Lines file, whose lines are checked as notebooks.
+
+    Like archives, JSON Lines files are only read if they are passed explicitly.
+
+    Parameters
+    ----------
+    file_path : str
+        File to check if it is a JSON Lines file
+
+    Returns
+    -------
+    bool
+        Whether the given file is a JSON Lines file
+    """
+    return os.path.isfile(file_path) and is_jsonl_file(file_path)
+
+
+def iter_jsonl_notebooks_from_arg(jsonl_path: str, id_field: str) -> Iterator[str]:
+    """Lazily find the notebooks of a JSON Lines file passed to ``flake8_nb``.
+
+    Parameters
+    ----------
+    jsonl_path : str
+        Path of the JSON Lines file.
+    id_field : str
+        Field of the records with the ID the notebooks are reported as.
+
+    Yields
+    ------
+    str
+        Virtual path ``jsonl_path!<id>`` of a notebook,
+        with the absolute path of the JSON Lines file.
+
+    Raises
+    ------
+    exceptions.ExecutionError
+        If the JSON Lines file can't be read.
+    """
+    try:
+        yield from iter_jsonl_notebooks(os.path.normcase(os.path.abspath(jsonl_path)), id_field)
+    except ArchiveError as error:
+        raise exceptions.ExecutionError(str(error))
+
+
+def iter_notebooks_from_args(
+    args: list[str],
+    exclude: list[str] = ["*.tox/*", "*.ipynb_checkpoints*"],
+    text_notebook_formats: Collection[TextNotebookFormat] = (),
+    jsonl_id_field: str = DEFAULT_JSONL_ID_FIELD,
+) -> Iterator[str]:
+    """Lazily find the absolute paths to notebooks in the passed files/folders.
+
+    Contrary to :func:`get_notebooks_from_args`, folders are walked on demand,
+    so the first notebooks are found without waiting for the whole tree to be searched.
+
+    Parameters
+    ----------
+    args : list[str]
+        Files/folders to search for notebooks.
+    exclude : list[str]
+        File-/Folderpatterns that should be excluded,
+        by default ["*.tox/*", "*.ipynb_checkpoints*"]
+    text_notebook_formats : Collection[TextNotebookFormat]
+        Text based notebook formats, whose files are notebooks as well, by default ()
+    jsonl_id_field : str
+        Field of the records of JSON Lines files with the ID the notebooks are reported as,
+        by default DEFAULT_JSONL_ID_FIELD
+
+    Yields
+    ------
+    str
+        Absolute path of a found notebook.
+    """
+    for arg in args:
+        if is_notebook_file(arg, text_notebook_formats):
+            yield os.path.normcase(os.path.abspath(arg))
+        elif is_notebook_archive(arg):
+            yield from iter_archive_notebooks_from_arg(arg, exclude)
+        elif is_notebook_jsonl(arg):
+            yield from iter_jsonl_notebooks_from_arg(arg, jsonl_id_field)
+        for root, _, filenames in os.walk(arg):
+            if not matches_filename(  # pragma: no branch
+                root,
+                patterns=exclude,
+                log_message='"%(path)s" has %(whether)sbeen excluded',
+                logger=LOG,
+            ):
+                for filename in filenames:
+                    file_path = os.path.join(root, filename)
+                    if is_notebook_file(file_path, text_notebook_formats):
+                        yield os.path.normcase(os.path.abspath(file_path))
+
+
+def iter_paths_from_stream(stream: BinaryIO) -> Iterator[str]:
+    r"""Lazily read a list of paths, separated by newlines or NUL characters.
+
+    The list is NUL separated (i.e. from ``find -print0``), if a NUL character
+    is read before the first newline. Empty entries are skipped.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+        Binary stream of the list, which is read in chunks of ``FILES_FROM_CHUNK_SIZE`` bytes.
+
+    Yields
+    ------
+    str
+        Listed path, decoded with the file system encoding.
+    """
+    separator = b""
+    pending = b""
+    chunk = stream.read(FILES_FROM_CHUNK_SIZE)
+    while chunk or pending:
+        pending += chunk
+        if not separator:
+            if b"\0" in pending:
+                separator = b"\0"
+            elif b"\n" in pending or not chunk:
+                separator = b"\n"
+        if separator and chunk:
+            *listed_paths, pending = pending.split(separator)
+        elif separator:
+            listed_paths, pending = [pending], b""
+        else:
+            listed_paths = []
+        for path in listed_paths:
+            if separator == b"\n":
+                path = path.rstrip(b"\r")
+            if path:
+                yield os.fsdecode(path)
+        chunk = stream.read(FILES_FROM_CHUNK_SIZE) if chunk else b""
+
+
+def iter_paths_from_file(file_path: str) -> Iterator[str]:
+    """Read the paths listed in the file passed to ``--nb-files-from``.
+
+    The file is opened right away, so a missing file is reported before any
+    notebook is parsed, while the paths are read lazily.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file with the list of paths or ``-`` for stdin.
+
+    Returns
+    -------
+    Iterator[str]
+        Listed paths, see ``iter_paths_from_stream``.
+
+    Raises
+    ------
+    exceptions.ExecutionError
+        If the file can't be opened.
+    """
+    if file_path == "-":
+        return iter_paths_from_stream(sys.stdin.buffer)
+    try:
+        stream = open(file_path, "rb")
+    except OSError as error:
+        raise exceptions.ExecutionError(
+            f"Could not read the file list {file_path!r} passed to --nb-files-from: {error}"
+        )
+
+    def iter_and_close() -> Iterator[str]:
+        """Read the paths and close the file afterwards.
+
+        Yields
+        ------
+        str
+            Listed path.
+        """
+        with stream:
+            yield from iter_paths_from_stream(stream)
+
+    return iter_and_close()
+
+
+def sort_notebooks_by_mtime(notebook_paths: Iterable[str]) -> Iterator[str]:
+    """Lazily sort notebooks by their modification time, the most recently modified first.
+
+    The notebooks are only searched and sorted when the first one is requested,
+    i.e. by the thread parsing them (see ``iter_intermediate_py_file_batches``).
+    Since all notebooks have to be found before the first one can be parsed,
+    they aren't discovered incrementally, but only their paths are held in memory.
+
+    Parameters
+    ----------
+    notebook_paths : Iterable[str]
+        Paths of the notebooks.
+
+    Yields
+    ------
+    str
+        Paths of the notebooks, the most recently modified first.
+    """
+    yield from sorted(notebook_paths, key=get_notebook_mtime, reverse=True)
+
+
 def get_notebooks_from_args(
-    args: list[str], exclude: list[str] = ["*.tox/*", "*.ipynb_checkpoints*"]
+    args: list[str],
+    exclude: list[str] = ["*.tox/*", "*.ipynb_checkpoints*"],
+    text_notebook_formats: Collection[TextNotebookFormat] = (),
+    jsonl_id_field: str = DEFAULT_JSONL_ID_FIELD,
 ) -> tuple[list[str], list[str]]:
     """Extract the absolute paths to notebooks.
 
@@ -48,50 +384,30 @@ def get_notebooks_from_args(
     exclude : list[str]
         File-/Folderpatterns that should be excluded,
         by default ["*.tox/*", "*.ipynb_checkpoints*"]
+    text_notebook_formats : Collection[TextNotebookFormat]
+        Text based notebook formats, whose files are notebooks as well, by default ()
+    jsonl_id_field : str
+        Field of the records of JSON Lines files with the ID the notebooks are reported as,
+        by default DEFAULT_JSONL_ID_FIELD
 
     Returns
     -------
     tuple[list[str], list[str]]
         List of found notebooks absolute paths.
     """
-
-    def is_notebook(file_path: str, nb_list: list[str], root: str = ".") -> bool:
-        """Check if a file is a notebook and appends it to nb_list if it is.
-
-        Parameters
-        ----------
-        file_path : str
-            File to check if it is a notebook
-        nb_list : list[str]
-            List of notebooks
-        root : str
-            Root directory, by default "."
-
-        Returns
-        -------
-        bool
-            Whether the given file is a notebook
-        """
-        file_path = os.path.abspath(os.path.join(root, file_path))
-        if os.path.isfile(file_path) and file_path.endswith(".ipynb"):
-            nb_list.append(os.path.normcase(file_path))
-            return True
-        return False
-
     nb_list: list[str] = []
     if not args:
         args = [os.curdir]
     for index, arg in list(enumerate(args))[::-1]:
-        if is_notebook(arg, nb_list):
+        if (
+            is_notebook_file(arg, text_notebook_formats)
+            or is_notebook_archive(arg)
+            or is_notebook_jsonl(arg)
+        ):
             args.pop(index)
-        for root, _, filenames in os.walk(arg):
-            if not matches_filename(  # pragma: no branch
-                root,
-                patterns=exclude,
-                log_message='"%(path)s" has %(whether)sbeen excluded',
-                logger=LOG,
-            ):
-                [is_notebook(filename, nb_list, root) for filename in filenames]
+        nb_list.extend(
+            iter_notebooks_from_args([arg], exclude, text_notebook_formats, jsonl_id_field)
+        )
 
     return args, nb_list
 
@@ -145,10 +461,15 @@ def hack_config_module() -> None:
     with it with ``"flake8_nb"`` to create our own hacked version and replace
     the references to the original module with the hacked one.
 
+    The module is only replaced once per process, so applications in different threads
+    don't replace it, while another one uses it.
+
     See:
         https://github.com/s-weigand/flake8-nb/issues/249
         https://github.com/s-weigand/flake8-nb/issues/254
     """
+    if aggregator.config.__name__ == "hacked_config":
+        return
     hacked_config_source = (
         Path(config.__file__)
         .read_text()
@@ -184,6 +505,17 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
             Application version, by default __version__
         """
         super().__init__()
+        self.notebook_session = NotebookSession()
+        self.listed_py_paths: list[str] = []
+        """Files listed in ``--nb-files-from``, which aren't notebooks"""
+        self.check_timings: CheckTimings | None = None
+        """Check times of the files, if ``--nb-timings-file`` is used"""
+        self.option_profiles: list[OptionProfile] = []
+        """Profiles the files are checked with, if ``--nb-profiles`` is used"""
+        self.run_profiler: RunProfiler | None = None
+        """Profiler of the run, if ``--nb-profile-out`` is used"""
+        self.memory_report: MemoryReport | None = None
+        """Peak memory of the run, if ``--nb-memory-report`` is used"""
         if FLAKE8_VERSION_TUPLE < (5, 0, 0):
             self.apply_hacks()
             self.option_manager.generate_versions = hack_option_manager_generate_versions(
@@ -216,6 +548,203 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
             "Possible variables which will be replaces 'nb_path', 'exec_count',"
             "'code_cell_count' and 'total_cell_count'. (Default: %default)",
         )
+        self.set_flake8_option(
+            "--nb-diff-ref",
+            metavar="ref",
+            default=None,
+            parse_from_config=True,
+            help="Only report violations in lines of '*.py' files and notebook cells, "
+            "which were added or modified compared to the given git reference.",
+        )
+        self.set_flake8_option(
+            "--nb-stream-batch-size",
+            metavar="n",
+            default=0,
+            type=int,
+            parse_from_config=True,
+            help="Discover, parse, check and report notebooks as a stream of batches of "
+            "'n' notebooks, instead of parsing all notebooks before checking them. "
+            "This keeps the memory usage bounded and reports the first violations early. "
+            "(Default: %default, which disables streaming)",
+        )
+        self.set_flake8_option(
+            "--nb-jsonl-id-field",
+            metavar="field",
+            default=DEFAULT_JSONL_ID_FIELD,
+            parse_from_config=True,
+            help="Field of the records of JSON Lines files ('*.jsonl' with one notebook per "
+            "line), whose value the notebooks are reported as ('notebooks.jsonl!<id>'). "
+            "Nested fields are separated by dots, i.e. 'metadata.id'. Records without "
+            "the field are reported by their line number. (Default: %default)",
+        )
+        self.set_flake8_option(
+            "--nb-max-violations",
+            metavar="n",
+            default=0,
+            type=int,
+            parse_from_config=True,
+            help="Stop parsing and checking notebooks as soon as 'n' violations were reported. "
+            "Notebooks are checked in the order of their modification time, "
+            "the most recently modified first. (Default: %default, which checks all files)",
+        )
+        self.set_flake8_option(
+            "--nb-fail-fast",
+            default=False,
+            action="store_true",
+            parse_from_config=True,
+            help="Stop at the first notebook with a violation, same as '--nb-max-violations 1'.",
+        )
+        self.set_flake8_option(
+            "--nb-shard",
+            metavar="K/N",
+            default=None,
+            parse_from_config=True,
+            help="Only check the K-th of N shards of the notebooks, i.e. to split the checks "
+            "across CI nodes. The notebooks are partitioned by the size of their code, "
+            "so all shards take a similar time. '*.py' files are only checked by the "
+            "first shard. The machine readable results of all shards can be combined "
+            "with 'flake8_nb-merge-shards'.",
+        )
+        self.set_flake8_option(
+            "--nb-skip-cell-magics",
+            metavar="magics",
+            default=",".join(NON_PYTHON_CELL_MAGICS),
+            parse_from_config=True,
+            comma_separated_list=True,
+            help="Comma-separated list of cell magics (without '%%'), whose cells "
+            "aren't python code. Only the magic line of those cells is checked and the "
+            "rest of the cell is skipped. (Default: %default)",
+        )
+        self.set_flake8_option(
+            "--nb-text-formats",
+            metavar="formats",
+            default="",
+            parse_from_config=True,
+            comma_separated_list=True,
+            help="Comma-separated list of text based notebook formats, whose files are "
+            "checked as notebooks: 'py:percent' (scripts with '# %%%%' cell markers, "
+            "i.e. paired with jupytext), 'md' (jupytext markdown) and 'qmd' (Quarto). "
+            "(Default: none)",
+        )
+        self.set_flake8_option(
+            "--nb-files-from",
+            metavar="file",
+            default=None,
+            parse_from_config=True,
+            help="Also check the files listed in 'file' ('-' for stdin), separated by "
+            "newlines or NUL characters (i.e. from 'find -print0'). The list is read "
+            "lazily and listed notebooks are parsed without searching any folder, "
+            "which avoids the argument length limit for many files.",
+        )
+        self.set_flake8_option(
+            "--nb-timings-file",
+            metavar="file",
+            default=None,
+            parse_from_config=True,
+            help="With multiple jobs the files are checked in the order of their size, "
+            "the largest first, so no worker checks a large file alone at the end. "
+            "The check times of previous runs stored in 'file' are used to refine the "
+            "order and the check times of this run are saved in it.",
+        )
+        self.set_flake8_option(
+            "--nb-metrics-file",
+            metavar="file",
+            default=None,
+            parse_from_config=True,
+            help="Write metrics of the run (notebooks parsed and skipped, bytes read, "
+            "lines checked, phase durations and violations by code) to 'file' in the "
+            "Prometheus text format, i.e. for the textfile collector of the node_exporter.",
+        )
+        self.set_flake8_option(
+            "--nb-profile-out",
+            metavar="dir",
+            default=None,
+            parse_from_config=True,
+            help="Profile the run with cProfile, including the workers of '--jobs', and "
+            "write the merged profile 'flake8_nb.pstats' and collapsed stacks for flame "
+            "graphs 'flake8_nb.collapsed' to the folder 'dir'.",
+        )
+        self.set_flake8_option(
+            "--nb-memory-report",
+            default=False,
+            action="store_true",
+            parse_from_config=True,
+            help="Print the peak memory (RSS) at the end of each phase of the run "
+            "and of the workers to stderr at exit.",
+        )
+        self.set_flake8_option(
+            "--nb-memory-trace",
+            metavar="n",
+            default=0,
+            type=int,
+            parse_from_config=True,
+            help="Trace the parsing of the notebooks with tracemalloc and add the 'n' "
+            "notebooks with the highest traced memory and the top 'n' allocations after "
+            "parsing the first of them to the memory report, implies '--nb-memory-report'. "
+            "(Default: %default, which doesn't trace)",
+        )
+        self.set_flake8_option(
+            "--nb-chunk-cells",
+            metavar="n",
+            default=0,
+            type=int,
+            parse_from_config=True,
+            help="Split notebooks with more than 'n' code cells into chunks of 'n' cells, "
+            "which are checked in parallel with multiple jobs. Imports and names of the "
+            "other chunks are taken into account, so i.e. F401 and F821 are reported as "
+            "for the whole notebook. (Default: %default, which doesn't split notebooks)",
+        )
+        self.set_flake8_option(
+            "--nb-profiles",
+            metavar="profiles",
+            default="",
+            parse_from_config=True,
+            comma_separated_list=True,
+            help="Comma-separated list of option profiles, which the files are checked with "
+            "in one run. The options of a profile are read from the config section "
+            "'[flake8_nb:profile:<name>]' and override the options of '[flake8_nb]'. "
+            "The notebooks are only parsed once and the violations are tagged with "
+            "the profile. (Default: none)",
+        )
+        self.set_flake8_option(
+            "--nb-profile-paths",
+            metavar="patterns",
+            default="",
+            parse_from_config=True,
+            comma_separated_list=True,
+            help="Comma-separated list of glob patterns or folders relative to the current "
+            "directory (i.e. 'src/*'), which limit the files and notebooks checked. "
+            "Meant to be set in the config section of a profile. (Default: all files)",
+        )
+        self.set_flake8_option(
+            "--nb-max-bytes",
+            metavar="n",
+            default=0,
+            type=int,
+            parse_from_config=True,
+            help="Skip notebooks larger than 'n' bytes with a warning, "
+            "instead of reading them. (Default: %default, which means unlimited)",
+        )
+        self.set_flake8_option(
+            "--nb-max-code-lines",
+            metavar="n",
+            default=0,
+            type=int,
+            parse_from_config=True,
+            help="Skip notebooks with more than 'n' lines in their code cells with a warning. "
+            "(Default: %default, which means unlimited)",
+        )
+        self.set_flake8_option(
+            "--nb-max-seconds",
+            metavar="seconds",
+            default=0,
+            type=float,
+            parse_from_config=True,
+            help="Skip notebooks with a warning, which take longer than 'seconds' to parse "
+            "or to check. The notebooks are parsed in a separate process, which gets killed "
+            "when a notebook exceeds the time, and their checks are interrupted by a timer "
+            "signal (only on POSIX systems). (Default: %default, which means unlimited)",
+        )
 
     def hacked_register_plugin_options(self) -> None:
         """Register options provided by plugins to our option manager."""
@@ -306,13 +835,20 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
             "separated list. (Default: %default)",
         )
 
-    @staticmethod
-    def hack_args(args: list[str], exclude: list[str]) -> list[str]:
+    def hack_args(
+        self,
+        args: list[str],
+        exclude: list[str],
+        shard: tuple[int, int] | None = None,
+        paths: Iterable[str] = (),
+        listed_notebooks: Iterable[str] | None = None,
+    ) -> list[str]:
         r"""Update args with ``*.ipynb`` files.
 
         Checks the passed args if ``*.ipynb`` can be found and
         appends intermediate parsed files to the list of files,
         which should be checked.
+        The notebooks are parsed into the :attr:`notebook_session` of the run.
 
         Parameters
         ----------
@@ -320,15 +856,346 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
             List of commandline arguments provided to ``flake8_nb``
         exclude : list[str]
             File-/Folderpatterns that should be excluded
+        shard : tuple[int, int] | None
+            (``shard_index``, ``shard_count``) of the notebooks to check, by default None
+        paths : Iterable[str]
+            Files/folders passed to ``flake8_nb``, which are removed from ``args``
+            for all but the first ``shard``, by default ()
+        listed_notebooks : Iterable[str] | None
+            Notebooks listed in ``--nb-files-from`` (see :meth:`iter_listed_notebooks`),
+            if given the current directory isn't searched when ``args`` is empty,
+            by default None
 
         Returns
         -------
         list[str]
             The original args + intermediate parsed ``*.ipynb`` files.
         """
-        args, nb_list = get_notebooks_from_args(args, exclude=exclude)
-        notebook_parser = NotebookParser(nb_list)
-        return args + notebook_parser.intermediate_py_file_paths
+        # the records of JSON Lines files are found and sized with the index of the session
+        with use_jsonl_index(self.notebook_session.jsonl_index):
+            if listed_notebooks is not None and not args:
+                nb_list: list[str] = []
+            else:
+                args, nb_list = get_notebooks_from_args(
+                    args,
+                    exclude=exclude,
+                    text_notebook_formats=self.get_text_notebook_formats(),
+                    jsonl_id_field=self.options.nb_jsonl_id_field,
+                )
+            notebook_paths: Iterable[str] = nb_list
+            if listed_notebooks is not None:
+                notebook_paths = chain(nb_list, listed_notebooks)
+            if shard is not None:
+                notebook_paths = get_notebook_shard(list(notebook_paths), *shard)
+                if shard[0] > 1:
+                    python_paths = {*paths, os.curdir}
+                    args = [arg for arg in args if arg not in python_paths]
+            intermediate_py_file_paths = self.notebook_session.add_notebooks(notebook_paths)
+        args = [*args, *self.get_listed_py_paths(shard)]
+        if not intermediate_py_file_paths and (
+            (shard is not None and shard[0] > 1) or (listed_notebooks is not None and not args)
+        ):
+            # flake8 would check the current directory if there was nothing to check
+            return [*args, self.notebook_session.get_temp_path()]
+        return args + intermediate_py_file_paths
+
+    def iter_listed_notebooks(self, paths: list[str]) -> Iterator[str] | None:
+        """Lazily read the notebooks listed in ``--nb-files-from``, without searching folders.
+
+        Listed files which aren't notebooks or don't exist are collected in
+        :attr:`listed_py_paths`, listed archives and JSON Lines files are opened
+        to find the notebooks inside of them.
+
+        Parameters
+        ----------
+        paths : list[str]
+            Files/folders passed to ``flake8_nb``.
+
+        Returns
+        -------
+        Iterator[str] | None
+            Absolute paths of the listed notebooks or ``None`` if ``--nb-files-from``
+            isn't used.
+
+        Raises
+        ------
+        exceptions.ExecutionError
+            If the list is read from stdin, while stdin is also passed as file to check.
+        """
+        files_from = self.options.nb_files_from
+        if not files_from:
+            return None
+        if files_from == "-" and "-" in paths:
+            raise exceptions.ExecutionError(
+                "--nb-files-from - can't be used when stdin (-) is also passed as file to check."
+            )
+        listed_paths = iter_paths_from_file(files_from)
+
+        def iter_notebooks() -> Iterator[str]:
+            """Sort the listed paths into notebooks and other files.
+
+            Yields
+            ------
+            str
+                Absolute path of a listed notebook.
+            """
+            text_notebook_formats = self.get_text_notebook_formats()
+            for path in listed_paths:
+                if not os.path.exists(path) and ARCHIVE_SEPARATOR not in path:
+                    # flake8 reports it (E902) like a missing file passed as argument
+                    self.listed_py_paths.append(path)
+                elif (
+                    path.lower().endswith(".ipynb")
+                    or is_compressed_notebook(path)
+                    or is_text_notebook(path, text_notebook_formats)
+                ):
+                    yield os.path.normcase(os.path.abspath(path))
+                elif is_notebook_archive(path):
+                    yield from iter_archive_notebooks_from_arg(path, self.options.exclude)
+                elif is_notebook_jsonl(path):
+                    yield from iter_jsonl_notebooks_from_arg(path, self.options.nb_jsonl_id_field)
+                else:
+                    self.listed_py_paths.append(path)
+
+        return iter_notebooks()
+
+    def get_listed_py_paths(self, shard: tuple[int, int] | None) -> list[str]:
+        """Files listed in ``--nb-files-from`` which aren't notebooks and are checked.
+
+        This is only complete after the listed notebooks were read.
+
+        Parameters
+        ----------
+        shard : tuple[int, int] | None
+            (``shard_index``, ``shard_count``) of the notebooks to check.
+
+        Returns
+        -------
+        list[str]
+            :attr:`listed_py_paths`, which are only checked by the first ``shard``.
+        """
+        if shard is not None and shard[0] > 1:
+            return []
+        return self.listed_py_paths
+
+    def prepare_notebook_stream(self, args: list[str], paths: list[str]) -> list[str]:
+        r"""Prepare the args for streaming ``*.ipynb`` files in batches.
+
+        Notebooks aren't searched or parsed here, this happens lazily in
+        :meth:`run_streaming`.
+
+        Parameters
+        ----------
+        args : list[str]
+            List of commandline arguments provided to ``flake8_nb``
+        paths : list[str]
+            Files/folders passed to ``flake8_nb``.
+
+        Returns
+        -------
+        list[str]
+            The original args without ``*.ipynb`` files.
+        """
+        if not self.options.nb_files_from:
+            paths = paths or [os.curdir]
+        self.notebook_stream_paths = paths
+        text_notebook_formats = self.get_text_notebook_formats()
+        self.stream_py_paths = [
+            path
+            for path in paths
+            if not (
+                is_notebook_file(path, text_notebook_formats)
+                or is_notebook_archive(path)
+                or is_notebook_jsonl(path)
+            )
+        ]
+        shard = self.get_shard()
+        if shard is not None and shard[0] > 1:
+            self.stream_py_paths = []
+        return [
+            arg
+            for arg in args
+            if not (
+                is_notebook_file(arg, text_notebook_formats)
+                or is_notebook_archive(arg)
+                or is_notebook_jsonl(arg)
+            )
+        ]
+
+    def read_stdin_notebook(self, paths: list[str]) -> None:
+        """Parse the notebook passed via stdin into the :attr:`notebook_session` of the run.
+
+        Stdin (``-``) is read as a notebook, if ``--stdin-display-name`` is the name
+        of a notebook (``*.ipynb`` or an enabled text based format, see ``--nb-text-formats``).
+        The notebook is only parsed in memory.
+
+        Parameters
+        ----------
+        paths : list[str]
+            Files/folders passed to ``flake8_nb``.
+        """
+        display_name = self.options.stdin_display_name
+        text_notebook_format = get_text_notebook_format(display_name)
+        if "-" in paths and (
+            display_name.lower().endswith(".ipynb")
+            or text_notebook_format in self.get_text_notebook_formats()
+        ):
+            self.notebook_session.add_stdin_notebook(
+                display_name, utils.stdin_get_value().encode("utf8")
+            )
+
+    def get_shard(self) -> tuple[int, int] | None:
+        """Shard of the notebooks to check.
+
+        Returns
+        -------
+        tuple[int, int] | None
+            (``shard_index``, ``shard_count``) parsed from ``--nb-shard``
+            or ``None`` if all notebooks are checked.
+
+        Raises
+        ------
+        exceptions.ExecutionError
+            If the value of ``--nb-shard`` isn't of the form ``K/N`` with ``1 <= K <= N``.
+        """
+        if not self.options.nb_shard:
+            return None
+        try:
+            return parse_shard(self.options.nb_shard)
+        except ValueError as error:
+            raise exceptions.ExecutionError(f"--nb-shard: {error}")
+
+    def get_text_notebook_formats(self) -> list[TextNotebookFormat]:
+        """Text based notebook formats, whose files are checked as notebooks.
+
+        Returns
+        -------
+        list[TextNotebookFormat]
+            Formats enabled via ``--nb-text-formats``.
+
+        Raises
+        ------
+        exceptions.ExecutionError
+            If a format passed to ``--nb-text-formats`` isn't known.
+        """
+        try:
+            return get_text_notebook_formats(self.options.nb_text_formats)
+        except ValueError as error:
+            raise exceptions.ExecutionError(f"--nb-text-formats: {error}")
+
+    def get_notebook_budget(self) -> NotebookBudget | None:
+        """Limits for each notebook.
+
+        Returns
+        -------
+        NotebookBudget | None
+            Budget from ``--nb-max-bytes``, ``--nb-max-code-lines`` and
+            ``--nb-max-seconds`` or ``None`` if none of them is used.
+        """
+        budget = NotebookBudget(
+            max_bytes=max(self.options.nb_max_bytes, 0),
+            max_code_lines=max(self.options.nb_max_code_lines, 0),
+            max_seconds=max(self.options.nb_max_seconds, 0),
+        )
+        return budget if any(budget) else None
+
+    def get_max_violations(self) -> int:
+        """Number of reported violations after which checking stops.
+
+        Returns
+        -------
+        int
+            Value of ``--nb-max-violations`` or ``1`` if ``--nb-fail-fast`` is used.
+            ``0`` means that all files are checked.
+        """
+        return 1 if self.options.nb_fail_fast else max(self.options.nb_max_violations, 0)
+
+    def stream_jsonl_notebooks(self, paths: list[str]) -> None:
+        """Stream the notebooks in batches, if JSON Lines files are checked.
+
+        The notebooks of JSON Lines files are read while they are parsed, so only the
+        notebooks of the batches being parsed are held in memory, regardless of the file size.
+        The batch size is ``JSONL_STREAM_BATCH_SIZE``, unless it is set.
+
+        Parameters
+        ----------
+        paths : list[str]
+            Files/folders passed to ``flake8_nb``.
+        """
+        if self.options.nb_stream_batch_size <= 0 and any(
+            is_notebook_jsonl(path) for path in paths
+        ):
+            self.options.nb_stream_batch_size = JSONL_STREAM_BATCH_SIZE
+
+    def is_streaming(self) -> bool:
+        """Whether the notebooks are streamed in batches, instead of being parsed upfront.
+
+        Returns
+        -------
+        bool
+            ``True`` if ``--nb-stream-batch-size``, ``--nb-max-violations``
+            or ``--nb-fail-fast`` are used.
+        """
+        return self.options.nb_stream_batch_size > 0 or self.get_max_violations() > 0
+
+    def check_stream_options(self) -> None:
+        """Check that the streaming mode isn't combined with diff based options.
+
+        Raises
+        ------
+        exceptions.ExecutionError
+            If ``--nb-stream-batch-size``, ``--nb-max-violations`` or ``--nb-fail-fast``
+            is combined with ``--nb-diff-ref`` or ``--diff``.
+        """
+        if self.is_streaming() and (self.options.nb_diff_ref or self.options.diff):
+            raise exceptions.ExecutionError(
+                "--nb-stream-batch-size, --nb-max-violations and --nb-fail-fast "
+                "can't be combined with --nb-diff-ref or --diff."
+            )
+
+    def get_notebook_diff(self, git_ref: str, paths: list[str]) -> ParsedDiff:
+        """Create a diff compatible with flake8's ``--diff`` on a notebook cell level.
+
+        Lines of ``*.py`` files are taken from ``git diff`` and for notebooks
+        all lines of added or modified cells in the parsed notebook are used.
+
+        Parameters
+        ----------
+        git_ref : str
+            Git reference to compare against.
+        paths : list[str]
+            Files/folders passed to ``flake8_nb``.
+
+        Returns
+        -------
+        ParsedDiff
+            Dict mapping file names to sets of changed line numbers.
+
+        Raises
+        ------
+        exceptions.ExecutionError
+            If ``git_ref`` can't be resolved to a commit.
+        """
+        if not is_valid_git_ref(git_ref):
+            raise exceptions.ExecutionError(
+                f"The git reference {git_ref!r} passed to --nb-diff-ref could not be resolved."
+            )
+        parsed_diff = get_git_diff_ranges(git_ref, paths)
+        for original_notebook_path, intermediate_py_file_path, input_line_mapping in zip(
+            self.notebook_session.original_notebook_paths,
+            self.notebook_session.intermediate_py_file_paths,
+            self.notebook_session.input_line_mappings,
+        ):
+            changed_cell_numbers = get_changed_cell_numbers(
+                read_git_notebook_cells(original_notebook_path, git_ref),
+                read_notebook_to_cells(original_notebook_path),
+            )
+            changed_lines = get_changed_intermediate_lines(
+                intermediate_py_file_path, input_line_mapping, changed_cell_numbers
+            )
+            if changed_lines:
+                parsed_diff[intermediate_py_file_path] = changed_lines
+        return parsed_diff
 
     def parse_configuration_and_cli_legacy(
         self, config_finder: config.ConfigFileFinder, argv: list[str]
@@ -348,10 +1215,32 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
             argv,
         )
 
-        self.args = self.hack_args(self.args, self.options.exclude)
+        paths = list(self.args)
+        self.notebook_session.skipped_cell_magics = self.options.nb_skip_cell_magics
+        self.notebook_session.budget = self.get_notebook_budget()
+        self.notebook_session.chunk_cells = max(self.options.nb_chunk_cells, 0)
+        if self.options.nb_metrics_file:
+            self.notebook_session.metrics = NotebookMetrics()
+        self.start_run_profiler()
+        self.start_memory_report()
+        self.stream_jsonl_notebooks(paths)
+        if self.is_streaming():  # pragma: no cover
+            self.args = self.prepare_notebook_stream(self.args, paths)
+        else:
+            self.args = self.hack_args(
+                self.args,
+                self.options.exclude,
+                self.get_shard(),
+                paths,
+                self.iter_listed_notebooks(paths),
+            )
 
         self.running_against_diff = self.options.diff
-        if self.running_against_diff:  # pragma: no cover
+        self.check_stream_options()
+        if self.options.nb_diff_ref:  # pragma: no cover
+            self.options.diff = self.running_against_diff = True
+            self.parsed_diff = self.get_notebook_diff(self.options.nb_diff_ref, paths)
+        elif self.running_against_diff:  # pragma: no cover
             self.parsed_diff = utils.parse_unified_diff()
             if not self.parsed_diff:
                 self.exit()
@@ -396,14 +1285,28 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
             argv,
         )
 
-        argv = self.hack_args(argv, self.options.exclude)
-
-        self.options = aggregator.aggregate_options(
-            self.option_manager,
-            cfg,
-            cfg_dir,
-            argv,
-        )
+        paths = list(self.options.filenames)
+        self.notebook_session.skipped_cell_magics = self.options.nb_skip_cell_magics
+        self.notebook_session.budget = self.get_notebook_budget()
+        self.notebook_session.chunk_cells = max(self.options.nb_chunk_cells, 0)
+        if self.options.nb_metrics_file:
+            self.notebook_session.metrics = NotebookMetrics()
+        self.start_run_profiler()
+        self.start_memory_report()
+        self.stream_jsonl_notebooks(paths)
+        self.read_stdin_notebook(paths)
+        # The filenames are replaced instead of parsing the hacked argv again,
+        # since argparse can't parse files appended after options (i.e. '--output-file')
+        if self.is_streaming():
+            self.options.filenames = self.prepare_notebook_stream(paths, paths)
+        else:
+            self.options.filenames = self.hack_args(
+                paths,
+                self.options.exclude,
+                self.get_shard(),
+                paths,
+                self.iter_listed_notebooks(paths),
+            )
 
         import json
 
@@ -418,12 +1321,22 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
             print(json.dumps(info, indent=2, sort_keys=True))
             raise SystemExit(0)
 
-        if self.options.diff:  # pragma: no cover
+        self.check_stream_options()
+        if self.options.nb_diff_ref:
+            self.options.diff = True
+            self.parsed_diff = self.get_notebook_diff(self.options.nb_diff_ref, paths)
+        elif self.options.diff:  # pragma: no cover
             LOG.warning(
                 "the --diff option is deprecated and will be removed in a " "future version."
             )
             self.parsed_diff = utils.parse_unified_diff()
 
+        self.parse_plugin_options()
+        self.option_profiles = self.get_option_profiles(cfg, cfg_dir, argv)
+
+    def parse_plugin_options(self) -> None:
+        """Pass the options of the run to the plugins, which parse options."""
+        assert self.plugins is not None
         for loaded in self.plugins.all_plugins():
             parse_options = getattr(loaded.obj, "parse_options", None)
             if parse_options is None:
@@ -439,6 +1352,319 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
             except TypeError:
                 parse_options(self.options)
 
+    def get_option_profiles(
+        self,
+        cfg: configparser.RawConfigParser,
+        cfg_dir: str,
+        argv: list[str],
+    ) -> list[OptionProfile]:
+        """Aggregate the options of the profiles passed to ``--nb-profiles``.
+
+        The profiles check the files and parsed notebooks of the run,
+        so their filenames and diff are taken from the options of the run.
+
+        Parameters
+        ----------
+        cfg: configparser.RawConfigParser
+            Config parser instance
+        cfg_dir: str
+            Dir the the config is in.
+        argv: list[str]
+            CLI args
+
+        Returns
+        -------
+        list[OptionProfile]
+            Name and options of each profile, empty if ``--nb-profiles`` isn't used.
+
+        Raises
+        ------
+        exceptions.ExecutionError
+            If a profile isn't defined in the config or ``--nb-profiles``
+            is combined with the streaming mode.
+        """
+        if not self.options.nb_profiles:
+            return []
+        if self.is_streaming():
+            raise exceptions.ExecutionError(
+                "--nb-profiles can't be combined with --nb-stream-batch-size, "
+                "--nb-max-violations or --nb-fail-fast."
+            )
+        try:
+            option_profiles = aggregate_profile_options(
+                self.option_manager, cfg, cfg_dir, argv, self.options.nb_profiles
+            )
+        except ValueError as error:
+            raise exceptions.ExecutionError(f"--nb-profiles: {error}")
+        for option_profile in option_profiles:
+            option_profile.options.filenames = self.options.filenames
+            option_profile.options.diff = self.options.diff
+        return option_profiles
+
+    def _run(self, argv: list[str]) -> None:
+        """Run the checks and report, streaming the notebooks if requested.
+
+        The run is framed by the ``run_start`` and ``run_end`` events (see ``flake8_nb.events``).
+
+        Parameters
+        ----------
+        argv: list[str]
+            CLI args
+        """
+        load_entry_point_listeners()
+        emit_event("run_start", argv=argv)
+        try:
+            phase_start = time.perf_counter()
+            self.initialize(argv)
+            phase_start = self.record_phase("initialize", phase_start)
+            if self.is_streaming():
+                self.run_streaming()
+                self.record_phase("check", phase_start)
+                self.record_check_metrics()
+            elif self.option_profiles:
+                self.run_profiles(phase_start)
+            else:
+                self.run_checks()
+                phase_start = self.record_phase("check", phase_start)
+                self.report()
+                self.record_phase("report", phase_start)
+                self.record_check_metrics()
+            if self.check_timings is not None:
+                write_check_timings(self.options.nb_timings_file, self.check_timings)
+            if self.notebook_session.metrics is not None:
+                write_metrics_file(self.options.nb_metrics_file, self.notebook_session.metrics)
+        finally:
+            if self.run_profiler is not None:
+                self.run_profiler.stop()
+            emit_event(
+                "run_end",
+                argv=argv,
+                result_count=self.result_count,
+                total_result_count=self.total_result_count,
+            )
+
+    def start_run_profiler(self) -> None:
+        """Start profiling the run, if ``--nb-profile-out`` is used.
+
+        The workers of the checks are profiled by ``NotebookCheckerManager``.
+        """
+        if self.options.nb_profile_out and self.run_profiler is None:
+            self.run_profiler = RunProfiler(self.options.nb_profile_out)
+            self.run_profiler.start()
+
+    def start_memory_report(self) -> None:
+        """Start recording the peak memory, if ``--nb-memory-report`` is used."""
+        if (
+            self.options.nb_memory_report or self.options.nb_memory_trace > 0
+        ) and self.memory_report is None:
+            self.memory_report = MemoryReport(self.options.nb_memory_trace)
+            self.memory_report.start()
+
+    def record_phase(self, phase: str, phase_start: float) -> float:
+        """Record the duration and peak memory of a phase of the run, if requested.
+
+        Parameters
+        ----------
+        phase : str
+            Name of the phase.
+        phase_start : float
+            Value of ``time.perf_counter`` when the phase started.
+
+        Returns
+        -------
+        float
+            Value of ``time.perf_counter`` when the phase ended.
+        """
+        phase_end = time.perf_counter()
+        if self.notebook_session.metrics is not None:
+            self.notebook_session.metrics.record_phase(phase, phase_end - phase_start)
+        if self.memory_report is not None:
+            self.memory_report.record_phase(phase)
+        return phase_end
+
+    def record_check_metrics(self) -> None:
+        """Record the statistics of the checks and violations, if ``--nb-metrics-file`` is used."""
+        if self.notebook_session.metrics is not None:
+            assert self.file_checker_manager is not None
+            assert self.guide is not None
+            self.notebook_session.metrics.record_checks(
+                self.file_checker_manager.statistics, self.guide.stats
+            )
+
+    def run_streaming(self) -> None:
+        """Check and report notebooks batch wise, while the next batches are parsed.
+
+        The notebooks are discovered and parsed in a background thread, which stays
+        at most ``flake8_nb.parsers.notebook_stream.STREAM_QUEUE_DEPTH`` batches ahead
+        of the checks. Parsed notebooks are deleted as soon as they were reported,
+        unless ``--keep-parsed-notebooks`` is used.
+        ``*.py`` files are checked together with the first batch.
+
+        If a maximum number of violations is set, the most recently modified notebooks
+        are checked first and parsing as well as checking stops after the batch, which
+        reached the maximum. By default a batch then has as many notebooks as there are jobs.
+        With ``--nb-shard`` all notebooks are searched first, to partition them into shards.
+        The notebooks are partitioned and sorted lazily by the background thread as well,
+        so they are searched, partitioned, sorted and parsed by the same thread.
+        """
+        assert self.formatter is not None
+        assert self.file_checker_manager is not None
+        max_violations = self.get_max_violations()
+        batch_size = self.options.nb_stream_batch_size
+        notebook_paths: Iterable[str] = iter_notebooks_from_args(
+            self.notebook_stream_paths,
+            self.options.exclude,
+            self.get_text_notebook_formats(),
+            self.options.nb_jsonl_id_field,
+        )
+        listed_notebooks = self.iter_listed_notebooks(self.notebook_stream_paths)
+        if listed_notebooks is not None:
+            notebook_paths = chain(notebook_paths, listed_notebooks)
+        shard = self.get_shard()
+        if shard is not None:
+            notebook_paths = iter_notebook_shard(notebook_paths, *shard)
+        if max_violations > 0:
+            notebook_paths = sort_notebooks_by_mtime(notebook_paths)
+            batch_size = batch_size or max(self.file_checker_manager.jobs, 1)
+        batches = iter_intermediate_py_file_batches(
+            notebook_paths,
+            self.notebook_session.get_temp_path(),
+            batch_size,
+            convert_notebook=self.notebook_session.convert_notebook_chunks,
+            jsonl_index=self.notebook_session.jsonl_index,
+        )
+        self.total_result_count = self.result_count = 0
+        self.formatter.start()
+        pending_paths = list(self.stream_py_paths)
+        try:
+            for batch in batches:
+                self.check_and_report_paths(pending_paths + batch)
+                pending_paths = []
+                if not self.options.keep_parsed_notebooks:
+                    remove_intermediate_py_files(batch)
+                if 0 < max_violations <= self.result_count:
+                    LOG.info("Stopping after reaching %d reported violations", max_violations)
+                    break
+            else:
+                # the listed files are known once all listed notebooks were read
+                pending_paths += self.get_listed_py_paths(shard)
+            if pending_paths:
+                self.check_and_report_paths(pending_paths)
+        finally:
+            batches.close()
+            self.notebook_session.close_watchdog()
+        self.end_time = time.time()
+        self.report_statistics()
+        self.report_benchmarks()
+        self.formatter.stop()
+
+    def run_profiles(self, phase_start: float) -> None:
+        """Check and report the files of the run once with the options of each profile.
+
+        The notebooks were parsed once, while the style guide and the checkers
+        are created for each profile. The formatter is shared by all profiles
+        and tags the violations with the profile they were reported by.
+        The ``check`` and ``report`` phases add up the checks and reports of all profiles.
+
+        Parameters
+        ----------
+        phase_start : float
+            Value of ``time.perf_counter`` when the checks started.
+        """
+        assert self.formatter is not None
+        run_options = self.options
+        set_profile = getattr(self.formatter, "set_profile", None)
+        self.total_result_count = self.result_count = 0
+        self.formatter.start()
+        try:
+            for profile_name, profile_options in self.option_profiles:
+                self.options = profile_options
+                if set_profile is not None:
+                    set_profile(profile_name)
+                self.parse_plugin_options()
+                self.make_guide()
+                self.make_file_checker_manager()
+                self.run_checks()
+                phase_start = self.record_phase("check", phase_start)
+                assert self.file_checker_manager is not None
+                total_result_count, result_count = self.file_checker_manager.report()
+                self.total_result_count += total_result_count
+                self.result_count += result_count
+                LOG.info(
+                    "Found %d violations and reported %d with the profile %r",
+                    total_result_count,
+                    result_count,
+                    profile_name,
+                )
+                self.report_statistics()
+                phase_start = self.record_phase("report", phase_start)
+                self.record_check_metrics()
+        finally:
+            self.options = run_options
+        if set_profile is not None:
+            set_profile(None)
+        self.report_benchmarks()
+        self.formatter.stop()
+        self.record_phase("report", phase_start)
+
+    def check_and_report_paths(self, paths: list[str]) -> None:
+        """Run the checks for ``paths`` and report their errors right away.
+
+        Parameters
+        ----------
+        paths : list[str]
+            Files/folders to check.
+        """
+        assert self.file_checker_manager is not None
+        self.file_checker_manager.start(paths)
+        try:
+            self.file_checker_manager.run()
+        except exceptions.PluginExecutionFailed as plugin_failed:  # pragma: no cover
+            print(str(plugin_failed))
+            print("Run flake8 with greater verbosity to see more details")
+            self.catastrophic_failure = True
+        self.file_checker_manager.stop()
+        total_result_count, result_count = self.file_checker_manager.report()
+        self.total_result_count += total_result_count
+        self.result_count += result_count
+        LOG.info(
+            "Found %d violations and reported %d in %d files",
+            total_result_count,
+            result_count,
+            len(paths),
+        )
+
+    def make_formatter(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the formatter and pass it the notebook session of the run.
+
+        Parameters
+        ----------
+        args: Any
+            Arbitrary args, passed to ``Application.make_formatter``
+        kwargs: Any
+            Arbitrary kwargs, passed to ``Application.make_formatter``
+        """
+        super().make_formatter(*args, **kwargs)
+        set_notebook_session = getattr(self.formatter, "set_notebook_session", None)
+        if set_notebook_session is not None:
+            set_notebook_session(self.notebook_session)
+
+    def make_file_checker_manager(self) -> None:
+        """Initialize the FileChecker Manager, mapping notebook violations in the checkers."""
+        if FLAKE8_VERSION_TUPLE < (5, 0, 0):
+            super().make_file_checker_manager()
+        else:
+            from flake8_nb.flake8_integration.checker import NotebookCheckerManager
+
+            if self.options.nb_timings_file and self.check_timings is None:
+                self.check_timings = read_check_timings(self.options.nb_timings_file)
+            self.file_checker_manager = NotebookCheckerManager(
+                style_guide=self.guide,
+                plugins=self.plugins.checkers,
+                stdin_notebook=self.notebook_session.stdin_notebook,
+                check_timings=self.check_timings,
+            )
+
     def exit(self) -> None:
         """Handle finalization and exiting the program.
 
@@ -450,14 +1676,17 @@ class Flake8NbApplication(Application):  # type: ignore[misc]
         SystemExit
             For flake8>=5.0.0
         """
+        if self.memory_report is not None:
+            self.memory_report.stop()
+            print(self.memory_report.format_report(), file=sys.stderr)
         if self.options.keep_parsed_notebooks:
-            temp_path = NotebookParser.temp_path
+            temp_path = self.notebook_session.temp_path
             print(
                 f"The parsed notebooks, are still present at:\n\t{temp_path}",
                 file=sys.stderr,
             )
         else:
-            NotebookParser.clean_up()
+            self.notebook_session.clean_up()
         if FLAKE8_VERSION_TUPLE < (5, 0, 0):
             super().exit()
         else:
@@ -6,14 +6,20 @@ original notebook and the cell the code in.
 
 from __future__ import annotations
 
-import os
+from typing import Dict
 from typing import cast
 
 from flake8.formatting.default import Default
 from flake8.style_guide import Violation
 
-from flake8_nb.parsers.notebook_parsers import NotebookParser
+from flake8_nb.events import emit_event
+from flake8_nb.events import has_listeners
+from flake8_nb.parsers import CellId
+from flake8_nb.parsers.notebook_parsers import InputLineMapping
+from flake8_nb.parsers.notebook_parsers import NotebookLocation
+from flake8_nb.parsers.notebook_parsers import NotebookSession
 from flake8_nb.parsers.notebook_parsers import map_intermediate_to_input
+from flake8_nb.parsers.notebook_parsers import read_source_map
 
 try:
     from flake8.formatting.default import COLORS
@@ -21,8 +27,98 @@ try:
 except ImportError:
     COLORS = COLORS_OFF = {}
 
+NotebookLocations = Dict[int, NotebookLocation]
 
-def map_notebook_error(violation: Violation, format_str: str) -> tuple[str, int] | None:
+
+def get_notebook_mapping(
+    intermediate_filename: str, notebook_session: NotebookSession | None = None
+) -> tuple[str, InputLineMapping] | None:
+    """Find the original notebook and line mapping of a parsed notebook.
+
+    The information is taken from the ``notebook_session`` of the run, or read from
+    the source map saved alongside the parsed notebook.
+
+    Parameters
+    ----------
+    intermediate_filename : str
+        Path of the parsed notebook a violation was reported for.
+    notebook_session : NotebookSession | None
+        Session of the run, which parsed the notebook, by default None
+
+    Returns
+    -------
+    tuple[str, InputLineMapping] | None
+        (original_notebook, input_line_mapping)
+        ``original_notebook`` being the relative path of the original notebook and
+        ``input_line_mapping`` the mapping of its cells to the lines in the parsed notebook.
+        If ``intermediate_filename`` isn't a known parsed notebook ``None``.
+
+    See Also
+    --------
+    flake8_nb.parsers.notebook_parsers.read_source_map
+    """
+    if notebook_session is not None:
+        return notebook_session.get_notebook_mapping(intermediate_filename)
+    return read_source_map(intermediate_filename)
+
+
+def format_notebook_location(original_notebook: str, input_id: CellId, format_str: str) -> str:
+    """Format the notebook path and cell part of an error report.
+
+    Parameters
+    ----------
+    original_notebook : str
+        Path of the original notebook.
+    input_id : CellId
+        Cell the violation was reported for.
+    format_str : str
+        Format string used to format the notebook path and cell reporting.
+
+    Returns
+    -------
+    str
+        Formatted filename.
+    """
+    exec_count, code_cell_count, total_cell_count = input_id
+    return format_str.format(
+        nb_path=original_notebook,
+        exec_count=exec_count,
+        code_cell_count=code_cell_count,
+        total_cell_count=total_cell_count,
+    )
+
+
+def emit_violation_mapped(violation: Violation, notebook_location: NotebookLocation) -> None:
+    """Emit the ``violation_mapped`` event, if it has listeners.
+
+    Parameters
+    ----------
+    violation : Violation
+        Violation reported for a parsed notebook.
+    notebook_location : NotebookLocation
+        (``original_notebook``, ``input_id``, ``input_cell_line_number``)
+        the violation was mapped to.
+
+    See Also
+    --------
+    flake8_nb.events
+    """
+    if has_listeners("violation_mapped"):
+        original_notebook, input_id, input_cell_line_number = notebook_location
+        emit_event(
+            "violation_mapped",
+            code=violation.code,
+            intermediate_file_path=violation.filename,
+            intermediate_line=violation.line_number,
+            notebook_path=original_notebook,
+            cell=input_id,
+            line=input_cell_line_number,
+        )
+
+
+def map_notebook_error(
+    violation: Violation, format_str: str, notebook_session: NotebookSession | None = None
+) -> tuple[str, int] | None:
     """Map the violation caused in an intermediate file back to its cause.
 
     The cause is resolved as the notebook, the input cell and
@@ -34,6 +130,8 @@ def map_notebook_error(violation: Violation, format_str: str) -> tuple[str, int]
         Reported violation from checking the parsed notebook
     format_str: str
         Format string used to format the notebook path and cell reporting.
+    notebook_session : NotebookSession | None
+        Session of the run, which parsed the notebook, by default None
 
     Returns
     -------
@@ -44,24 +142,16 @@ def map_notebook_error(violation: Violation, format_str: str) -> tuple[str, int]
         ``input_cell_line_number`` line number in the input cell
         were the violation was reported.
     """
-    intermediate_filename = os.path.abspath(violation.filename)
-    intermediate_line_number = violation.line_number
-    mappings = NotebookParser.get_mappings()
-    for original_notebook, intermediate_py, input_line_mapping in mappings:
-        if os.path.samefile(intermediate_py, intermediate_filename):
-            input_id, input_cell_line_number = map_intermediate_to_input(
-                input_line_mapping, intermediate_line_number
-            )
-            exec_count, code_cell_count, total_cell_count = input_id
-            filename = format_str.format(
-                nb_path=original_notebook,
-                exec_count=exec_count,
-                code_cell_count=code_cell_count,
-                total_cell_count=total_cell_count,
-            )
-
-            return filename, input_cell_line_number
-    return None
+    notebook_mapping = get_notebook_mapping(violation.filename, notebook_session)
+    if notebook_mapping is None:
+        return None
+    original_notebook, input_line_mapping = notebook_mapping
+    input_id, input_cell_line_number = map_intermediate_to_input(
+        input_line_mapping, violation.line_number
+    )
+    emit_violation_mapped(violation, (original_notebook, input_id, input_cell_line_number))
+    filename = format_notebook_location(original_notebook, input_id, format_str)
+    return filename, input_cell_line_number
 
 
 class IpynbFormatter(Default):  # type: ignore[misc]
@@ -77,6 +167,71 @@ class IpynbFormatter(Default):  # type: ignore[misc]
             self.error_format = self.options.format
         if not hasattr(self, "color"):
             self.color = True
+        self.notebook_locations: NotebookLocations = {}
+        self.notebook_session: NotebookSession | None = None
+        self.profile: str | None = None
+
+    def set_profile(self, profile: str | None) -> None:
+        """Set the option profile the violations are reported by, to tag them.
+
+        Parameters
+        ----------
+        profile : str | None
+            Name of the profile or ``None`` to stop tagging the violations.
+
+        See Also
+        --------
+        flake8_nb.flake8_integration.cli.Flake8NbApplication.run_profiles
+        """
+        self.profile = profile
+
+    def set_notebook_session(self, notebook_session: NotebookSession) -> None:
+        """Set the session of the run, to map violations of its parsed notebooks.
+
+        Parameters
+        ----------
+        notebook_session : NotebookSession
+            Session of the run.
+        """
+        self.notebook_session = notebook_session
+
+    def set_notebook_locations(self, notebook_locations: NotebookLocations) -> None:
+        """Set the notebook locations of the file currently reported, resolved by the checker.
+
+        Parameters
+        ----------
+        notebook_locations : NotebookLocations
+            Notebook location for each line of the parsed notebook a violation was reported for.
+
+        See Also
+        --------
+        flake8_nb.flake8_integration.checker.NotebookCheckerManager
+        """
+        self.notebook_locations = notebook_locations
+
+    def finished(self, filename: str) -> None:
+        """Reset the notebook locations after a file was reported.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file flake8 has finished reporting results from.
+        """
+        self.notebook_locations = {}
+
+    def write(self, line: str | None, source: str | None) -> None:
+        """Write the formatted violation, prefixed with the profile if one is set.
+
+        Parameters
+        ----------
+        line : str | None
+            Formatted violation.
+        source : str | None
+            Source code of the violation, if ``--show-source`` is used.
+        """
+        if line is not None and self.profile is not None:
+            line = f"[{self.profile}] {line}"
+        super().write(line, source)
 
     def format(self, violation: Violation) -> str | None:
         r"""Format the error detected by a flake8 checker.
@@ -97,7 +252,20 @@ class IpynbFormatter(Default):  # type: ignore[misc]
         """
         filename = violation.filename
         if filename.lower().endswith(".ipynb_parsed"):
-            map_result = map_notebook_error(violation, self.options.notebook_cell_format)
+            notebook_location = self.notebook_locations.get(violation.line_number)
+            if notebook_location is None:
+                map_result = map_notebook_error(
+                    violation, self.options.notebook_cell_format, self.notebook_session
+                )
+            else:
+                emit_violation_mapped(violation, notebook_location)
+                original_notebook, input_id, input_cell_line_number = notebook_location
+                map_result = (
+                    format_notebook_location(
+                        original_notebook, input_id, self.options.notebook_cell_format
+                    ),
+                    input_cell_line_number,
+                )
             if map_result:
                 filename, line_number = map_result
                 return cast(
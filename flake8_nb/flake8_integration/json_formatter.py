@@ -0,0 +1,339 @@
+"""Module containing machine readable report formatters.
+
+Contrary to :class:`IpynbFormatter` the violations of a file are collected
+and mapped back to the original notebook in one batch, once all violations
+of that file were reported. Each batch is then written with a single write call.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+from typing import Dict
+
+from flake8.formatting.base import BaseFormatter
+from flake8.statistics import Statistics
+from flake8.style_guide import Violation
+
+from flake8_nb import __version__
+from flake8_nb.flake8_integration.formatter import NotebookLocations
+from flake8_nb.flake8_integration.formatter import emit_violation_mapped
+from flake8_nb.flake8_integration.formatter import get_notebook_mapping
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from flake8_nb.parsers.notebook_parsers import map_intermediate_to_input
+
+ViolationRecord = Dict[str, Any]
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+SARIF_DRIVER = {
+    "name": "flake8_nb",
+    "version": __version__,
+    "informationUri": "https://github.com/s-weigand/flake8-nb",
+}
+
+
+def map_violations_to_records(
+    filename: str,
+    violations: list[Violation],
+    notebook_locations: NotebookLocations | None = None,
+    notebook_session: NotebookSession | None = None,
+) -> list[ViolationRecord]:
+    """Map all violations reported for ``filename`` to violation records.
+
+    The notebook mapping of ``filename`` is only resolved once for all violations,
+    and not at all if the locations were already resolved by the checkers.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the checked file all ``violations`` belong to.
+    violations : list[Violation]
+        Violations reported for ``filename``.
+    notebook_locations : NotebookLocations | None
+        Notebook locations resolved by the checkers, by default None
+    notebook_session : NotebookSession | None
+        Session of the run, which parsed the notebook, by default None
+
+    Returns
+    -------
+    list[ViolationRecord]
+        Dicts with the keys ``path``, ``cell``, ``line``, ``column``, ``code`` and ``text``.
+        For parsed notebooks ``path`` is the path of the original notebook,
+        ``cell`` a dict of the ``CellId`` fields and ``line`` the line in that cell.
+        For other files ``cell`` is ``None``.
+
+    See Also
+    --------
+    flake8_nb.flake8_integration.formatter.get_notebook_mapping
+    """
+    notebook_locations = notebook_locations or {}
+    notebook_mapping = None
+    is_notebook = filename.lower().endswith(".ipynb_parsed")
+    if is_notebook and any(
+        violation.line_number not in notebook_locations for violation in violations
+    ):
+        notebook_mapping = get_notebook_mapping(filename, notebook_session)
+    records = []
+    for violation in violations:
+        record: ViolationRecord = {
+            "path": violation.filename,
+            "cell": None,
+            "line": violation.line_number,
+            "column": violation.column_number,
+            "code": violation.code,
+            "text": violation.text,
+        }
+        notebook_location = notebook_locations.get(violation.line_number)
+        if notebook_location is None and notebook_mapping is not None:
+            original_notebook, input_line_mapping = notebook_mapping
+            notebook_location = (
+                original_notebook,
+                *map_intermediate_to_input(input_line_mapping, violation.line_number),
+            )
+        if notebook_location is not None:
+            emit_violation_mapped(violation, notebook_location)
+            original_notebook, input_id, input_cell_line_number = notebook_location
+            record["path"] = original_notebook
+            record["cell"] = dict(input_id._asdict())
+            record["line"] = input_cell_line_number
+        records.append(record)
+    return records
+
+
+class BatchedNotebookFormatter(BaseFormatter):  # type: ignore[misc]
+    """Base class of formatters, which map and write the violations of a file in one batch."""
+
+    def after_init(self) -> None:
+        """Initialize the violations buffer."""
+        self.file_violations: list[Violation] = []
+        self.notebook_locations: NotebookLocations = {}
+        self.notebook_session: NotebookSession | None = None
+        self.profile: str | None = None
+
+    def set_profile(self, profile: str | None) -> None:
+        """Set the option profile the violations are reported by, to tag the records.
+
+        Parameters
+        ----------
+        profile : str | None
+            Name of the profile or ``None`` to stop tagging the records.
+        """
+        self.profile = profile
+
+    def set_notebook_session(self, notebook_session: NotebookSession) -> None:
+        """Set the session of the run, to map violations of its parsed notebooks.
+
+        Parameters
+        ----------
+        notebook_session : NotebookSession
+            Session of the run.
+        """
+        self.notebook_session = notebook_session
+
+    def set_notebook_locations(self, notebook_locations: NotebookLocations) -> None:
+        """Set the notebook locations of the file currently reported, resolved by the checker.
+
+        Parameters
+        ----------
+        notebook_locations : NotebookLocations
+            Notebook location for each line of the parsed notebook a violation was reported for.
+        """
+        self.notebook_locations = notebook_locations
+
+    def beginning(self, filename: str) -> None:
+        """Reset the violations buffer, when reporting of a new file starts.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file flake8 is beginning to report results from.
+        """
+        self.file_violations = []
+
+    def handle(self, error: Violation) -> None:
+        """Collect a violation, to be mapped and written when the file is finished.
+
+        Parameters
+        ----------
+        error : Violation
+            Error a checker reported.
+        """
+        self.file_violations.append(error)
+
+    def finished(self, filename: str) -> None:
+        """Map and write all collected violations of ``filename``.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file flake8 has finished reporting results from.
+        """
+        if self.file_violations:
+            records = map_violations_to_records(
+                filename, self.file_violations, self.notebook_locations, self.notebook_session
+            )
+            if self.profile is not None:
+                for record in records:
+                    record["profile"] = self.profile
+            self.write_records(records)
+        self.file_violations = []
+        self.notebook_locations = {}
+
+    def format(self, error: Violation) -> str:
+        """Format a single violation.
+
+        Parameters
+        ----------
+        error : Violation
+            Error a checker reported.
+
+        Returns
+        -------
+        str
+            Formatted violation.
+        """
+        return self.format_record(
+            map_violations_to_records(
+                error.filename, [error], notebook_session=self.notebook_session
+            )[0]
+        )
+
+    def format_record(self, record: ViolationRecord) -> str:
+        """Format a single violation record.
+
+        Parameters
+        ----------
+        record : ViolationRecord
+            Mapped violation.
+
+        Returns
+        -------
+        str
+            Formatted violation record.
+        """
+        raise NotImplementedError("Subclass of BatchedNotebookFormatter did not implement.")
+
+    def write_records(self, records: list[ViolationRecord]) -> None:
+        """Write all violation records of a file at once.
+
+        Parameters
+        ----------
+        records : list[ViolationRecord]
+            Mapped violations of a file.
+        """
+        self._write("\n".join(self.format_record(record) for record in records))
+
+    def show_statistics(self, statistics: Statistics) -> None:
+        """Skip statistics, since they would break the machine readable output.
+
+        Parameters
+        ----------
+        statistics : Statistics
+            Statistics of the run.
+        """
+
+    def show_benchmarks(self, benchmarks: list[tuple[str, float]]) -> None:
+        """Skip benchmarks, since they would break the machine readable output.
+
+        Parameters
+        ----------
+        benchmarks : list[tuple[str, float]]
+            Benchmarks of the run.
+        """
+
+
+class IpynbJsonLinesFormatter(BatchedNotebookFormatter):
+    """Formatter writing one JSON object per violation and line (JSON Lines).
+
+    With ``--nb-profiles`` the objects have a ``profile`` key, naming the profile
+    which reported the violation.
+    """
+
+    def format_record(self, record: ViolationRecord) -> str:
+        """Format a violation record as JSON.
+
+        Parameters
+        ----------
+        record : ViolationRecord
+            Mapped violation.
+
+        Returns
+        -------
+        str
+            JSON representation of ``record``.
+        """
+        return json.dumps(record)
+
+
+class IpynbSarifFormatter(BatchedNotebookFormatter):
+    """Formatter writing a SARIF (Static Analysis Results Interchange Format) log.
+
+    The results are streamed, so the log is only valid JSON after :meth:`stop` was called.
+    For notebooks the region is relative to the cell, which is described by the
+    ``cell`` entry of the results ``properties``. With ``--nb-profiles`` the ``profile``
+    entry names the profile, which reported the result.
+    """
+
+    def start(self) -> None:
+        """Write the beginning of the SARIF log."""
+        super().start()
+        self.has_results = False
+        tool = json.dumps({"driver": SARIF_DRIVER})
+        self._write(
+            f'{{"$schema": "{SARIF_SCHEMA}", "version": "{SARIF_VERSION}", '
+            f'"runs": [{{"tool": {tool}, "results": ['
+        )
+
+    def format_record(self, record: ViolationRecord) -> str:
+        """Format a violation record as SARIF result.
+
+        Parameters
+        ----------
+        record : ViolationRecord
+            Mapped violation.
+
+        Returns
+        -------
+        str
+            JSON representation of the SARIF result.
+        """
+        result: dict[str, Any] = {
+            "ruleId": record["code"],
+            "message": {"text": record["text"]},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": Path(record["path"]).as_posix()},
+                        "region": {
+                            "startLine": max(record["line"], 1),
+                            "startColumn": max(record["column"], 1),
+                        },
+                    }
+                }
+            ],
+        }
+        properties = {
+            key: record[key] for key in ("cell", "profile") if record.get(key) is not None
+        }
+        if properties:
+            result["properties"] = properties
+        return json.dumps(result)
+
+    def write_records(self, records: list[ViolationRecord]) -> None:
+        """Write all violation results of a file at once.
+
+        Parameters
+        ----------
+        records : list[ViolationRecord]
+            Mapped violations of a file.
+        """
+        separator = "," if self.has_results else ""
+        self._write(separator + ",\n".join(self.format_record(record) for record in records))
+        self.has_results = True
+
+    def stop(self) -> None:
+        """Write the end of the SARIF log."""
+        self._write("]}]}")
+        super().stop()
@@ -0,0 +1,171 @@
+"""Module for checking the same files with several option profiles in one run.
+
+A profile is a named set of options, defined in a ``[flake8_nb:profile:<name>]``
+section of the config, which overrides the options of the ``[flake8_nb]`` section.
+The files and notebooks are only discovered and parsed once and then checked
+with the options of each profile, i.e. a strict profile for library code and
+a lenient one for exploratory notebooks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import configparser
+import fnmatch
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+from typing import Sequence
+
+from flake8.options import aggregator
+
+from flake8_nb.flake8_integration.check_costs import get_check_key
+
+if TYPE_CHECKING:
+    from flake8.options.manager import OptionManager
+
+CONFIG_SECTION = "flake8_nb"
+PROFILE_SECTION_PREFIX = f"{CONFIG_SECTION}:profile:"
+
+
+class OptionProfile(NamedTuple):
+    """Name and options of a profile."""
+
+    name: str
+    options: argparse.Namespace
+
+
+def get_profile_names(cfg: configparser.RawConfigParser) -> list[str]:
+    """Names of all profiles defined in the config.
+
+    Parameters
+    ----------
+    cfg : configparser.RawConfigParser
+        Config of the run.
+
+    Returns
+    -------
+    list[str]
+        Names of the profiles, in the order of their config sections.
+    """
+    return [
+        section.partition(PROFILE_SECTION_PREFIX)[2]
+        for section in cfg.sections()
+        if section.startswith(PROFILE_SECTION_PREFIX)
+    ]
+
+
+def create_profile_config(
+    cfg: configparser.RawConfigParser, profile_name: str
+) -> configparser.RawConfigParser:
+    """Create a config, whose ``[flake8_nb]`` section is overridden by a profile.
+
+    Parameters
+    ----------
+    cfg : configparser.RawConfigParser
+        Config of the run.
+    profile_name : str
+        Name of the profile.
+
+    Returns
+    -------
+    configparser.RawConfigParser
+        Config with the options of the ``[flake8_nb]`` section, updated
+        with the options of the ``[flake8_nb:profile:<profile_name>]`` section.
+
+    Raises
+    ------
+    ValueError
+        If the profile isn't defined in ``cfg``.
+    """
+    profile_section = f"{PROFILE_SECTION_PREFIX}{profile_name}"
+    if not cfg.has_section(profile_section):
+        raise ValueError(
+            f"Unknown profile {profile_name!r}, profiles are defined in "
+            f"'[{PROFILE_SECTION_PREFIX}<name>]' config sections. "
+            f"Defined profiles are: {', '.join(get_profile_names(cfg)) or 'none'}"
+        )
+    profile_cfg = configparser.RawConfigParser()
+    profile_cfg.add_section(CONFIG_SECTION)
+    for section in (CONFIG_SECTION, profile_section):
+        if cfg.has_section(section):
+            for option_name, value in cfg.items(section):
+                profile_cfg.set(CONFIG_SECTION, option_name, value)
+    return profile_cfg
+
+
+def aggregate_profile_options(
+    option_manager: OptionManager,
+    cfg: configparser.RawConfigParser,
+    cfg_dir: str,
+    argv: Sequence[str],
+    profile_names: Sequence[str],
+) -> list[OptionProfile]:
+    """Aggregate the options of each profile, the same way flake8 aggregates its options.
+
+    Options passed on the command line take precedence over the options
+    of the profiles, so they apply to all profiles.
+
+    Parameters
+    ----------
+    option_manager : OptionManager
+        Option manager of the run.
+    cfg : configparser.RawConfigParser
+        Config of the run.
+    cfg_dir : str
+        Folder of the config, which relative paths in the config are relative to.
+    argv : Sequence[str]
+        Command-line arguments of the run.
+    profile_names : Sequence[str]
+        Names of the profiles.
+
+    Returns
+    -------
+    list[OptionProfile]
+        Name and options of each profile.
+
+    See Also
+    --------
+    create_profile_config
+    """
+    # flake8 sets the parsed options as defaults of the parser, which are reset
+    # after each profile, so the options of a profile don't leak into the next one
+    run_defaults = vars(option_manager.parse_args([]))
+    option_profiles = []
+    for profile_name in profile_names:
+        profile_cfg = create_profile_config(cfg, profile_name)
+        option_profiles.append(
+            OptionProfile(
+                profile_name,
+                aggregator.aggregate_options(option_manager, profile_cfg, cfg_dir, argv),
+            )
+        )
+        option_manager.parser.set_defaults(**run_defaults)
+    return option_profiles
+
+
+def matches_profile_paths(filename: str, patterns: Sequence[str]) -> bool:
+    """Whether a checked file belongs to the paths of a profile.
+
+    Parsed notebooks are matched by the path of their original notebook.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the checked file.
+    patterns : Sequence[str]
+        Glob patterns or folders relative to the current directory (i.e. ``src/*``
+        or ``src``), an empty sequence matches all files.
+
+    Returns
+    -------
+    bool
+        Whether ``filename`` matches one of the ``patterns``.
+    """
+    if not patterns:
+        return True
+    path = get_check_key(filename).replace("\\", "/")
+    for pattern in patterns:
+        pattern = get_check_key(pattern).replace("\\", "/")
+        if fnmatch.fnmatch(path, pattern) or path.startswith(f"{pattern.rstrip('/')}/"):
+            return True
+    return False
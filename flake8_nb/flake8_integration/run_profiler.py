@@ -0,0 +1,272 @@
+"""Module for profiling a run across the main process and the workers of ``--jobs``.
+
+With ``--nb-profile-out`` the main process is profiled with :mod:`cProfile` from the
+parsing of the options on and each worker of the checks profiles itself until it exits.
+Each process writes its own ``pstats`` file, which are merged into a single
+``flake8_nb.pstats`` file (i.e. for ``snakeviz`` or ``python -m pstats``) and
+collapsed stacks ``flake8_nb.collapsed`` (i.e. for ``flamegraph.pl`` or speedscope).
+
+Since ``cProfile`` only records the callers of each function and not whole stacks,
+the time of a function is split between its callers in proportion of the time
+spent in the function from each caller, to build the collapsed stacks.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import glob
+import multiprocessing
+import multiprocessing.pool
+import multiprocessing.util
+import os
+import pstats
+import signal
+from collections import Counter
+from collections import defaultdict
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import Tuple
+
+from flake8.checker import SERIAL_RETRY_ERRNOS
+
+Function = Tuple[str, int, str]
+StatsDict = Dict[Function, Tuple[Any, ...]]
+
+MAIN_PROFILE = "main.pstats"
+WORKER_PROFILE_PATTERN = "worker-{pid}.pstats"
+MERGED_PROFILE = "flake8_nb.pstats"
+COLLAPSED_STACKS = "flake8_nb.collapsed"
+
+MIN_STACK_SHARE = 1e-4
+"""Stacks with a smaller share of the total time are collapsed into their caller,
+which bounds the number of stacks of large profiles."""
+
+_ACTIVE_PROFILER: cProfile.Profile | None = None
+
+
+def format_frame(function: Function) -> str:
+    """Format a function of a profile as frame of collapsed stacks.
+
+    Parameters
+    ----------
+    function : Function
+        ``(filename, line number, function name)`` of the function.
+
+    Returns
+    -------
+    str
+        I.e. ``run_checks (flake8/checker.py:521)`` or the name of builtins.
+    """
+    filename, line_number, function_name = function
+    if filename == "~":
+        frame = function_name
+    else:
+        frame = f"{function_name} ({filename}:{line_number})"
+    return frame.replace(";", ",")
+
+
+def iter_collapsed_stacks(stats: StatsDict, root: str) -> Iterator[tuple[str, int]]:
+    """Create the collapsed stacks of the functions of a profile.
+
+    Parameters
+    ----------
+    stats : StatsDict
+        Stats of a profile (``pstats.Stats.stats``).
+    root : str
+        Frame which all stacks start with, i.e. the kind of process.
+
+    Yields
+    ------
+    tuple[str, int]
+        Stack as frames joined by ``;`` and the time spent in its last frame in microseconds.
+    """
+    callees: defaultdict[Function, list[Function]] = defaultdict(list)
+    root_functions = []
+    for function, (*_, callers) in stats.items():
+        if not callers:
+            root_functions.append(function)
+        for caller in callers:
+            callees[caller].append(function)
+    total_time = sum(stats[function][3] for function in root_functions)
+    min_time = total_time * MIN_STACK_SHARE
+
+    def collapse(
+        function: Function, seconds: float, stack: tuple[Function, ...], frames: str
+    ) -> Iterator[tuple[str, int]]:
+        _, _, inline_time, cumulative_time, _ = stats[function]
+        share = seconds / cumulative_time if cumulative_time else 0
+        self_time = inline_time * share
+        frames = f"{frames};{format_frame(function)}"
+        stack = (*stack, function)
+        for callee in callees[function]:
+            callee_time = stats[callee][4][function][3] * share
+            if callee in stack:
+                # the time of recursive calls is part of the outermost call already
+                continue
+            if callee_time < min_time:
+                self_time += callee_time
+            else:
+                yield from collapse(callee, callee_time, stack, frames)
+        yield frames, round(self_time * 1e6)
+
+    for function in root_functions:
+        yield from collapse(function, stats[function][3], (), root)
+
+
+def write_collapsed_stacks(profile_paths: dict[str, list[str]], collapsed_path: str) -> None:
+    """Write the collapsed stacks of several profiles, summing equal stacks.
+
+    Parameters
+    ----------
+    profile_paths : dict[str, list[str]]
+        Paths of the ``pstats`` files by the frame their stacks start with.
+    collapsed_path : str
+        Path of the collapsed stacks file.
+    """
+    collapsed_stacks: Counter[str] = Counter()
+    for root, paths in profile_paths.items():
+        for path in paths:
+            stats: StatsDict = pstats.Stats(path).stats  # type: ignore[attr-defined]
+            for stack, microseconds in iter_collapsed_stacks(stats, root):
+                collapsed_stacks[stack] += microseconds
+    with open(collapsed_path, "w", encoding="utf8") as collapsed_file:
+        for stack, microseconds in sorted(collapsed_stacks.items()):
+            if microseconds > 0:
+                collapsed_file.write(f"{stack} {microseconds}\n")
+
+
+def _write_worker_profile(profiler: cProfile.Profile, profile_dir: str) -> None:
+    """Stop the profiler of a worker and write its profile, when the worker exits."""
+    profiler.disable()
+    profiler.dump_stats(os.path.join(profile_dir, WORKER_PROFILE_PATTERN.format(pid=os.getpid())))
+
+
+def _pool_init() -> None:
+    """Initialize a worker like ``flake8`` does, so only the main process handles Ctrl+C."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _profiled_pool_init(profile_dir: str) -> None:
+    """Initialize a worker like ``flake8`` does and profile it until it exits."""
+    global _ACTIVE_PROFILER
+    _pool_init()
+    if _ACTIVE_PROFILER is not None:
+        # forked from the profiled main process
+        _ACTIVE_PROFILER.disable()
+    _ACTIVE_PROFILER = profiler = cProfile.Profile()
+    multiprocessing.util.Finalize(
+        None, _write_worker_profile, args=(profiler, profile_dir), exitpriority=10
+    )
+    profiler.enable()
+
+
+def initialize_processpool(job_count: int) -> multiprocessing.pool.Pool | None:
+    """Create a process pool like ``flake8``, without using its private helpers.
+
+    Parameters
+    ----------
+    job_count : int
+        Number of workers.
+
+    Returns
+    -------
+    multiprocessing.pool.Pool | None
+        The pool or None if no pool can be created, so the checks are run serially.
+    """
+    try:
+        return multiprocessing.Pool(job_count, _pool_init)
+    except OSError as err:  # pragma: no cover
+        if err.errno not in SERIAL_RETRY_ERRNOS:
+            raise
+    except ImportError:  # pragma: no cover
+        pass
+    return None
+
+
+def initialize_profiled_processpool(
+    job_count: int, profile_dir: str
+) -> multiprocessing.pool.Pool | None:
+    """Create a process pool like ``flake8``, whose workers write a profile when they exit.
+
+    Parameters
+    ----------
+    job_count : int
+        Number of workers.
+    profile_dir : str
+        Folder the profiles are written to.
+
+    Returns
+    -------
+    multiprocessing.pool.Pool | None
+        The pool or None if no pool can be created, so the checks are run serially.
+    """
+    try:
+        return multiprocessing.Pool(job_count, _profiled_pool_init, (profile_dir,))
+    except OSError as err:  # pragma: no cover
+        if err.errno not in SERIAL_RETRY_ERRNOS:
+            raise
+    except ImportError:  # pragma: no cover
+        pass
+    return None
+
+
+class RunProfiler:
+    """Profiler of the main process, merging its profile with the profiles of the workers."""
+
+    def __init__(self, profile_dir: str) -> None:
+        """Initialize RunProfiler and remove the profiles of previous runs from ``profile_dir``.
+
+        Parameters
+        ----------
+        profile_dir : str
+            Folder the profiles are written to, which is created if needed.
+        """
+        self.profile_dir = profile_dir
+        self.profiler = cProfile.Profile()
+        os.makedirs(profile_dir, exist_ok=True)
+        for worker_profile_path in self.get_worker_profile_paths():
+            os.remove(worker_profile_path)
+
+    def get_worker_profile_paths(self) -> list[str]:
+        """Paths of the profiles written by the workers.
+
+        Returns
+        -------
+        list[str]
+            Paths of the profiles, sorted by name.
+        """
+        return sorted(
+            glob.glob(
+                os.path.join(glob.escape(self.profile_dir), WORKER_PROFILE_PATTERN.format(pid="*"))
+            )
+        )
+
+    def start(self) -> None:
+        """Start profiling the main process."""
+        global _ACTIVE_PROFILER
+        _ACTIVE_PROFILER = self.profiler
+        self.profiler.enable()
+
+    def stop(self) -> str:
+        """Stop profiling and write the merged profile and collapsed stacks.
+
+        Returns
+        -------
+        str
+            Path of the merged profile.
+        """
+        global _ACTIVE_PROFILER
+        self.profiler.disable()
+        _ACTIVE_PROFILER = None
+        main_profile_path = os.path.join(self.profile_dir, MAIN_PROFILE)
+        self.profiler.dump_stats(main_profile_path)
+        worker_profile_paths = self.get_worker_profile_paths()
+
+        merged_profile_path = os.path.join(self.profile_dir, MERGED_PROFILE)
+        pstats.Stats(main_profile_path, *worker_profile_paths).dump_stats(merged_profile_path)
+        write_collapsed_stacks(
+            {"main": [main_profile_path], "worker": worker_profile_paths},
+            os.path.join(self.profile_dir, COLLAPSED_STACKS),
+        )
+        return merged_profile_path
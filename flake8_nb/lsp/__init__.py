@@ -0,0 +1 @@
+"""Package containing the language server for notebooks opened in an editor."""
@@ -0,0 +1,7 @@
+"""Language server implementation of flake8_nb."""
+from __future__ import annotations
+
+from flake8_nb.lsp.server import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+"""Module containing the in-memory representation of notebooks opened in an editor.
+
+Contrary to :func:`flake8_nb.parsers.notebook_parsers.create_intermediate_py_file`,
+the parsed code of each cell is kept in memory, so changing the text of a cell only
+reparses that cell and shifts the start lines of the following cells.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Any
+from typing import Collection
+from typing import Dict
+from typing import List
+
+from flake8_nb.parsers import CellId
+from flake8_nb.parsers import NotebookCell
+from flake8_nb.parsers.cell_parsers import notebook_cell_to_intermediate_dict
+from flake8_nb.parsers.notebook_parsers import NON_PYTHON_CELL_MAGICS
+from flake8_nb.parsers.notebook_parsers import InputLineMapping
+from flake8_nb.parsers.notebook_parsers import convert_cell_source
+
+LspCell = Dict[str, Any]
+"""Notebook cell as described by the ``NotebookCell`` type of the LSP specification."""
+LspTextChange = Dict[str, Any]
+"""Change as described by the ``TextDocumentContentChangeEvent`` type of the LSP specification."""
+
+CODE_CELL_KIND = 2
+"""Value of ``NotebookCellKind.Code`` in the LSP specification."""
+GET_IPYTHON_IMPORT = "from IPython import get_ipython\n\n\n"
+GET_IPYTHON_IMPORT_LINES = 3
+
+
+def apply_text_change(text: str, change: LspTextChange) -> str:
+    """Apply a full or incremental text change of the LSP specification to ``text``.
+
+    Parameters
+    ----------
+    text : str
+        Current text of the document.
+    change : LspTextChange
+        Change with the keys ``text`` and optionally ``range``, where ``range``
+        has ``start`` and ``end`` positions with zero based ``line`` and ``character``.
+
+    Returns
+    -------
+    str
+        Text with the change applied.
+    """
+    if "range" not in change:
+        return str(change["text"])
+    lines = text.splitlines(keepends=True)
+
+    def to_offset(position: dict[str, int]) -> int:
+        """Convert an LSP position to an offset in ``text``.
+
+        Parameters
+        ----------
+        position : dict[str, int]
+            Position with zero based ``line`` and ``character``.
+
+        Returns
+        -------
+        int
+            Offset in ``text``.
+        """
+        line = position["line"]
+        if line >= len(lines):
+            return len(text)
+        return sum(len(previous_line) for previous_line in lines[:line]) + min(
+            position["character"], len(lines[line].rstrip("\r\n"))
+        )
+
+    start = to_offset(change["range"]["start"])
+    end = to_offset(change["range"]["end"])
+    return f"{text[:start]}{change['text']}{text[end:]}"
+
+
+class NotebookDocumentCell:
+    """Cell of an opened notebook, with its cached parsed code."""
+
+    def __init__(
+        self,
+        uri: str,
+        kind: int,
+        text: str = "",
+        execution_count: int | None = None,
+        metadata: dict[str, Any] | None = None,
+    ):
+        """Initialize NotebookDocumentCell.
+
+        Parameters
+        ----------
+        uri : str
+            URI of the cell's text document.
+        kind : int
+            Kind of the cell, ``CODE_CELL_KIND`` for code cells.
+        text : str
+            Source code of the cell, by default ""
+        execution_count : int | None
+            Execution count of the cell, by default None
+        metadata : dict[str, Any] | None
+            Metadata of the cell, which can contain flake8-tags, by default None
+        """
+        self.uri = uri
+        self.kind = kind
+        self.text = text
+        self.execution_count = execution_count
+        self.metadata = metadata or {}
+        self.intermediate_code = ""
+        self.input_id: CellId | None = None
+        self.lines_of_code = 0
+        self.start_line = 0
+        self.uses_get_ipython = False
+        self.token_results: list[tuple[str, int, int, str, str | None]] | None = None
+        """Cached results of the token based checks, relative to the cell's first line."""
+        self.token_context = ""
+        """Code preceding the cell, which was used for the cached token based checks."""
+
+    @classmethod
+    def from_lsp(cls, lsp_cell: LspCell, text: str) -> NotebookDocumentCell:
+        """Create a cell from its representation in the LSP specification.
+
+        Parameters
+        ----------
+        lsp_cell : LspCell
+            Cell with the keys ``document``, ``kind`` and optionally
+            ``metadata`` and ``executionSummary``.
+        text : str
+            Text of the cell's text document.
+
+        Returns
+        -------
+        NotebookDocumentCell
+            Cell which wasn't parsed yet.
+        """
+        return cls(
+            uri=lsp_cell["document"],
+            kind=lsp_cell["kind"],
+            text=text,
+            execution_count=(lsp_cell.get("executionSummary") or {}).get("executionOrder"),
+            metadata=lsp_cell.get("metadata"),
+        )
+
+    @property
+    def is_parsed(self) -> bool:
+        """Whether the cell is part of the parsed notebook.
+
+        Returns
+        -------
+        bool
+            ``False`` for empty and non code cells.
+        """
+        return self.input_id is not None
+
+    def parse(
+        self,
+        code_cell_nr: int,
+        total_cell_nr: int,
+        skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+    ) -> None:
+        """Parse the cell to its intermediate code.
+
+        Parameters
+        ----------
+        code_cell_nr : int
+            Count of the code cell starting at 1.
+        total_cell_nr : int
+            Total count of the cell starting at 1.
+        skipped_cell_magics : Collection[str]
+            Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
+
+        See Also
+        --------
+        flake8_nb.parsers.cell_parsers.notebook_cell_to_intermediate_dict
+        """
+        self.intermediate_code = ""
+        self.input_id = None
+        self.lines_of_code = 0
+        self.uses_get_ipython = False
+        self.token_results = None
+        if self.kind != CODE_CELL_KIND or not self.text:
+            return
+        source = convert_cell_source(self.text.splitlines(keepends=True), skipped_cell_magics)
+        self.uses_get_ipython = any(line.startswith("get_ipython") for line in source)
+        notebook_cell: NotebookCell = {
+            "cell_type": "code",
+            "source": source,
+            "execution_count": self.execution_count,
+            "metadata": self.metadata,
+            "code_cell_nr": code_cell_nr,
+            "total_cell_nr": total_cell_nr,
+        }
+        intermediate_dict = notebook_cell_to_intermediate_dict(notebook_cell)
+        self.intermediate_code = intermediate_dict["code"]  # type: ignore[assignment]
+        self.input_id = intermediate_dict["input_id"]  # type: ignore[assignment]
+        self.lines_of_code = intermediate_dict["lines_of_code"]  # type: ignore[assignment]
+
+
+class NotebookDocument:
+    """Notebook opened in an editor, with the parsed code of its cells kept in memory."""
+
+    def __init__(
+        self,
+        uri: str,
+        cells: list[NotebookDocumentCell],
+        skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+    ):
+        """Initialize NotebookDocument and parse all cells.
+
+        Parameters
+        ----------
+        uri : str
+            URI of the notebook.
+        cells : list[NotebookDocumentCell]
+            Cells of the notebook.
+        skipped_cell_magics : Collection[str]
+            Names of the cell magics whose cells are skipped (``--nb-skip-cell-magics``),
+            by default NON_PYTHON_CELL_MAGICS
+        """
+        self.uri = uri
+        self.skipped_cell_magics = skipped_cell_magics
+        self.cells: List[NotebookDocumentCell] = []
+        self.replace_cells(0, 0, cells)
+
+    @property
+    def uses_get_ipython(self) -> bool:
+        """Whether any cell uses jupyter magic.
+
+        Returns
+        -------
+        bool
+            Whether the parsed notebook needs to import ``get_ipython``.
+        """
+        return any(cell.uses_get_ipython for cell in self.cells)
+
+    def get_cell_index(self, cell_uri: str) -> int:
+        """Index of the cell with ``cell_uri``.
+
+        Parameters
+        ----------
+        cell_uri : str
+            URI of the cell's text document.
+
+        Returns
+        -------
+        int
+            Index of the cell.
+
+        Raises
+        ------
+        KeyError
+            If the notebook has no cell with ``cell_uri``.
+        """
+        for index, cell in enumerate(self.cells):
+            if cell.uri == cell_uri:
+                return index
+        raise KeyError(cell_uri)
+
+    def update_start_lines(self, start_index: int = 0) -> None:
+        """Recalculate the start lines of the parsed cells, starting at ``start_index``.
+
+        Parameters
+        ----------
+        start_index : int
+            Index of the first cell to update, by default 0
+        """
+        if start_index == 0:
+            line = GET_IPYTHON_IMPORT_LINES + 1 if self.uses_get_ipython else 1
+        else:
+            previous_cell = self.cells[start_index - 1]
+            line = previous_cell.start_line + previous_cell.lines_of_code
+        for cell in self.cells[start_index:]:
+            cell.start_line = line
+            line += cell.lines_of_code
+
+    def replace_cells(
+        self, start: int, delete_count: int, new_cells: list[NotebookDocumentCell]
+    ) -> None:
+        """Replace ``delete_count`` cells at ``start`` with ``new_cells``.
+
+        Since the cell numbers change, all cells from ``start`` on are reparsed.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first cell to replace.
+        delete_count : int
+            Number of cells to delete.
+        new_cells : list[NotebookDocumentCell]
+            Cells to insert at ``start``.
+        """
+        end = start + delete_count
+        self.cells[start:end] = new_cells
+        code_cell_nr = sum(cell.kind == CODE_CELL_KIND for cell in self.cells[:start])
+        for index, cell in enumerate(self.cells[start:], start=start):
+            code_cell_nr += cell.kind == CODE_CELL_KIND
+            cell.parse(code_cell_nr, index + 1, self.skipped_cell_magics)
+        self.update_start_lines()
+
+    def update_cell(
+        self,
+        cell_uri: str,
+        changes: list[LspTextChange] | None = None,
+        execution_count: int | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """Update text, execution count or metadata of a single cell.
+
+        Only this cell is reparsed and the following cells are shifted by the
+        difference of its lines of code, unless the jupyter magic import changes.
+
+        Parameters
+        ----------
+        cell_uri : str
+            URI of the cell's text document.
+        changes : list[LspTextChange] | None
+            Text changes to apply in order, by default None
+        execution_count : int | None
+            New execution count, by default None
+        metadata : dict[str, Any] | None
+            New metadata, by default None
+        """
+        index = self.get_cell_index(cell_uri)
+        cell = self.cells[index]
+        for change in changes or []:
+            cell.text = apply_text_change(cell.text, change)
+        if execution_count is not None:
+            cell.execution_count = execution_count
+        if metadata is not None:
+            cell.metadata = metadata
+        uses_get_ipython = self.uses_get_ipython
+        lines_of_code = cell.lines_of_code
+        cell.parse(*self.get_cell_numbers(index), self.skipped_cell_magics)
+        if uses_get_ipython != self.uses_get_ipython:
+            self.update_start_lines()
+            return
+        line_shift = cell.lines_of_code - lines_of_code
+        if line_shift:
+            for following_cell in self.cells[index:][1:]:
+                following_cell.start_line += line_shift
+
+    def get_cell_numbers(self, index: int) -> tuple[int, int]:
+        """Code cell and total cell number of the cell at ``index``.
+
+        Parameters
+        ----------
+        index : int
+            Index of the cell.
+
+        Returns
+        -------
+        tuple[int, int]
+            (``code_cell_nr``, ``total_cell_nr``)
+        """
+        cell = self.cells[index]
+        if cell.input_id is not None:
+            return cell.input_id.code_cell_nr, cell.input_id.total_cell_nr
+        code_cell_nr = sum(cell.kind == CODE_CELL_KIND for cell in self.cells[: index + 1])
+        return code_cell_nr, index + 1
+
+    def get_parsed_cells(self) -> list[NotebookDocumentCell]:
+        """Cells which are part of the parsed notebook.
+
+        Returns
+        -------
+        list[NotebookDocumentCell]
+            Non empty code cells.
+        """
+        return [cell for cell in self.cells if cell.is_parsed]
+
+    def get_intermediate_code(self) -> str:
+        """Code of the parsed notebook.
+
+        Returns
+        -------
+        str
+            Same code as written by
+            :func:`flake8_nb.parsers.notebook_parsers.create_intermediate_py_file`.
+        """
+        intermediate_code = GET_IPYTHON_IMPORT if self.uses_get_ipython else ""
+        intermediate_code += "".join(cell.intermediate_code for cell in self.cells).rstrip("\n")
+        return f"{intermediate_code}\n" if intermediate_code else ""
+
+    def get_input_line_mapping(self) -> InputLineMapping:
+        """Mapping of the cells to their lines in the parsed notebook.
+
+        Returns
+        -------
+        InputLineMapping
+            Same mapping as created by
+            :func:`flake8_nb.parsers.notebook_parsers.create_intermediate_py_file`.
+        """
+        parsed_cells = self.get_parsed_cells()
+        return {
+            "input_ids": [cell.input_id for cell in parsed_cells],  # type: ignore[misc]
+            "code_lines": [cell.start_line for cell in parsed_cells],
+        }
+
+    def map_intermediate_lines(
+        self, line_numbers: list[int]
+    ) -> list[tuple[NotebookDocumentCell, int] | None]:
+        """Map lines of the parsed notebook to the cells and lines in those cells.
+
+        Lines of the cell separator are mapped to the closest line of the cell.
+
+        Parameters
+        ----------
+        line_numbers : list[int]
+            Lines in the parsed notebook.
+
+        Returns
+        -------
+        list[tuple[NotebookDocumentCell, int] | None]
+            (``cell``, ``cell_line_number``) for each line, with ``cell_line_number``
+            starting at 1 or ``None`` if the line is before the first cell.
+        """
+        parsed_cells = self.get_parsed_cells()
+        start_lines = [cell.start_line for cell in parsed_cells]
+        locations: list[tuple[NotebookDocumentCell, int] | None] = []
+        for line_number in line_numbers:
+            index = bisect_right(start_lines, line_number) - 1
+            if index < 0:
+                locations.append(None)
+                continue
+            cell = parsed_cells[index]
+            cell_line_count = max(cell.text.count("\n") + 1, 1)
+            cell_line_number = line_number - cell.start_line - 2
+            locations.append((cell, min(max(cell_line_number, 1), cell_line_count)))
+        return locations
@@ -0,0 +1,740 @@
+"""Module containing a language server, which lints notebooks opened in an editor.
+
+The server speaks the Language Server Protocol (LSP) over stdio and
+uses the notebook document synchronization of LSP 3.17.
+Opened notebooks are kept in memory as :class:`NotebookDocument`, so a change
+of a single cell only reparses that cell, before the parsed notebook is checked
+and the diagnostics are published for each code cell.
+
+This requires ``flake8>=5.0.0``.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import logging
+import os
+import sys
+import tokenize
+from typing import IO
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Dict
+from urllib.parse import unquote
+from urllib.parse import urlparse
+
+from flake8 import processor
+from flake8.checker import FileChecker
+from flake8.formatting.base import BaseFormatter
+from flake8.style_guide import Violation
+
+from flake8_nb import FLAKE8_VERSION_TUPLE
+from flake8_nb import __version__
+from flake8_nb.flake8_integration.cli import Flake8NbApplication
+from flake8_nb.lsp.notebook_document import CODE_CELL_KIND
+from flake8_nb.lsp.notebook_document import GET_IPYTHON_IMPORT
+from flake8_nb.lsp.notebook_document import LspCell
+from flake8_nb.lsp.notebook_document import NotebookDocument
+from flake8_nb.lsp.notebook_document import NotebookDocumentCell
+
+if TYPE_CHECKING:
+    from flake8_nb.flake8_integration.checker import Result
+
+LOG = logging.getLogger(__name__)
+
+JsonRpcMessage = Dict[str, Any]
+Diagnostic = Dict[str, Any]
+
+PARSE_ERROR = -32700
+"""JSON-RPC error code for messages, which aren't valid JSON."""
+METHOD_NOT_FOUND = -32601
+"""JSON-RPC error code for unknown methods."""
+INVALID_REQUEST = -32600
+"""JSON-RPC error code for messages, which aren't a request or notification."""
+INTERNAL_ERROR = -32603
+"""JSON-RPC error code for requests, whose handler failed."""
+DIAGNOSTIC_SEVERITY_ERROR = 1
+DIAGNOSTIC_SEVERITY_WARNING = 2
+CODE_CONTEXT = "pass\n\n\n"
+"""Context for token based checks of cells, which are preceded by code."""
+IMPORT_CONTEXT = "import sys\n\n\n"
+"""Context for token based checks of cells, which are only preceded by imports."""
+
+
+def read_message(stream: IO[bytes]) -> JsonRpcMessage | None:
+    """Read a JSON-RPC message with a ``Content-Length`` header from ``stream``.
+
+    Parameters
+    ----------
+    stream : IO[bytes]
+        Binary input stream, i.e. ``sys.stdin.buffer``.
+
+    Returns
+    -------
+    JsonRpcMessage | None
+        Decoded message or ``None`` if the stream was closed.
+    """
+    content_length = 0
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            break
+        name, _, value = header.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            content_length = int(value)
+    return json.loads(stream.read(content_length))  # type: ignore[no-any-return]
+
+
+def write_message(stream: IO[bytes], message: JsonRpcMessage) -> None:
+    """Write a JSON-RPC message with a ``Content-Length`` header to ``stream``.
+
+    Parameters
+    ----------
+    stream : IO[bytes]
+        Binary output stream, i.e. ``sys.stdout.buffer``.
+    message : JsonRpcMessage
+        Message to send.
+    """
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf8")
+    stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    stream.flush()
+
+
+def uri_to_path(uri: str) -> str:
+    """Convert a ``file://`` URI to a path, other URIs are returned unchanged.
+
+    Parameters
+    ----------
+    uri : str
+        URI of a document.
+
+    Returns
+    -------
+    str
+        Path of the document.
+    """
+    parsed_uri = urlparse(uri)
+    if parsed_uri.scheme != "file":
+        return uri
+    return unquote(parsed_uri.path)
+
+
+def get_first_code_line(tree: ast.Module) -> int:
+    """Line of the first top level statement, after which imports aren't at the top anymore.
+
+    This resembles the statements ``pycodestyle`` allows before imports (E402).
+
+    Parameters
+    ----------
+    tree : ast.Module
+        Parsed module.
+
+    Returns
+    -------
+    int
+        Line number of the first statement or ``sys.maxsize`` if there is none.
+    """
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.If, ast.Try, ast.With)):
+            continue
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            continue
+        if isinstance(node, ast.Assign) and all(
+            isinstance(target, ast.Name)
+            and target.id.startswith("__")
+            and target.id.endswith("__")
+            for target in node.targets
+        ):
+            continue
+        return node.lineno
+    return sys.maxsize
+
+
+class InMemoryFileProcessor(processor.FileProcessor):  # type: ignore[misc]
+    """FileProcessor which parses the AST only once, so it can be reused after the checks."""
+
+    def build_ast(self) -> ast.AST:
+        """Build an abstract syntax tree from the list of lines.
+
+        Returns
+        -------
+        ast.AST
+            Parsed module.
+        """
+        if getattr(self, "_tree", None) is None:
+            self._tree = super().build_ast()
+        return self._tree
+
+
+class InMemoryFileChecker(FileChecker):  # type: ignore[misc]
+    """FileChecker checking lines held in memory instead of reading the file."""
+
+    def __init__(self, *, lines: list[str], **kwargs: Any):
+        """Initialize InMemoryFileChecker.
+
+        Parameters
+        ----------
+        lines : list[str]
+            Lines of the file to check.
+        kwargs : Any
+            Arguments of ``flake8.checker.FileChecker``.
+        """
+        self.lines = lines
+        super().__init__(**kwargs)
+
+    def _make_processor(self) -> InMemoryFileProcessor:
+        """Create the file processor from the lines in memory.
+
+        Returns
+        -------
+        InMemoryFileProcessor
+            Processor of the lines.
+        """
+        return InMemoryFileProcessor(self.filename, self.options, lines=self.lines)
+
+
+class ViolationCollector(BaseFormatter):  # type: ignore[misc]
+    """Formatter collecting the reported violations instead of writing them."""
+
+    def after_init(self) -> None:
+        """Initialize the collected violations."""
+        self.violations: list[Violation] = []
+
+    def start(self) -> None:
+        """Don't open an output file."""
+
+    def handle(self, error: Violation) -> None:
+        """Collect a reported violation.
+
+        Parameters
+        ----------
+        error : Violation
+            Error a checker reported.
+        """
+        self.violations.append(error)
+
+    def stop(self) -> None:
+        """Don't close an output file."""
+
+
+class NotebookLinter:
+    """Checks parsed notebooks in memory, with the options and config of ``flake8_nb``."""
+
+    def __init__(self, argv: list[str] | None = None):
+        """Initialize NotebookLinter, loading plugins, options and config once.
+
+        Parameters
+        ----------
+        argv : list[str] | None
+            CLI options of ``flake8_nb`` to use, by default None
+
+        Raises
+        ------
+        RuntimeError
+            If ``flake8<5.0.0`` is installed.
+        """
+        if FLAKE8_VERSION_TUPLE < (5, 0, 0):
+            raise RuntimeError("The flake8_nb language server requires flake8>=5.0.0.")
+        app = Flake8NbApplication()
+        # Passing a file keeps flake8_nb from searching notebooks in the current directory.
+        # Stdin is the stream of the language server, so neither the file nor a file list
+        # from the config may read it.
+        app.initialize([*(argv or []), "--nb-files-from", "", os.devnull])
+        self.options = app.options
+        self.notebook_session = app.notebook_session
+        self.checkers = app.plugins.checkers
+        self.guide = app.guide
+        self.collector = ViolationCollector(self.options)
+        self.guide.formatter = self.collector
+        for style_guide in self.guide.style_guides:
+            style_guide.formatter = self.collector
+
+    def make_checker(self, filename: str, lines: list[str]) -> InMemoryFileChecker:
+        """Create a checker for ``lines``.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file used for per file options and reporting.
+        lines : list[str]
+            Lines to check.
+
+        Returns
+        -------
+        InMemoryFileChecker
+            Checker for ``lines``.
+        """
+        return InMemoryFileChecker(
+            lines=lines, filename=filename, plugins=self.checkers, options=self.options
+        )
+
+    def lint(self, filename: str, code: str) -> list[Violation]:
+        """Check ``code`` as if it was the content of ``filename``.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file used for per file options and reporting.
+        code : str
+            Code to check.
+
+        Returns
+        -------
+        list[Violation]
+            Selected violations, which aren't ignored by ``noqa`` comments.
+        """
+        if not code:
+            return []
+        checker = self.make_checker(filename, code.splitlines(keepends=True))
+        if not checker.should_process:
+            return []
+        _, results, _ = checker.run_checks()
+        return self.select_violations(filename, results)
+
+    def lint_document(self, filename: str, notebook_document: NotebookDocument) -> list[Violation]:
+        """Check a notebook, only rerunning the token based checks of changed cells.
+
+        Token based checks (i.e. ``pycodestyle``) only depend on the code of a cell,
+        so their results are cached for each cell. AST based checks (i.e. ``pyflakes``)
+        need the whole module and are run for the whole parsed notebook.
+        If the parsed notebook has a syntax error, it is checked as a whole.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file used for per file options and reporting.
+        notebook_document : NotebookDocument
+            Notebook to check.
+
+        Returns
+        -------
+        list[Violation]
+            Selected violations, which aren't ignored by ``noqa`` comments.
+        """
+        code = notebook_document.get_intermediate_code()
+        if not code:
+            return []
+        checker = self.make_checker(filename, code.splitlines(keepends=True))
+        if not checker.should_process:
+            return []
+        try:
+            checker.run_ast_checks()
+        except (SyntaxError, tokenize.TokenError):
+            return self.lint(filename, code)
+        results: list[Result] = list(checker.results)
+        first_code_line = get_first_code_line(checker.processor.build_ast())
+        for index, cell in enumerate(notebook_document.get_parsed_cells()):
+            if index == 0:
+                token_context = GET_IPYTHON_IMPORT if notebook_document.uses_get_ipython else ""
+            elif first_code_line < cell.start_line:
+                token_context = CODE_CONTEXT
+            else:
+                token_context = IMPORT_CONTEXT
+            if cell.token_results is None or cell.token_context != token_context:
+                cell.token_results = self.check_cell_tokens(
+                    filename, cell.intermediate_code, token_context
+                )
+                cell.token_context = token_context
+            results += [
+                (error_code, cell.start_line + line_number - 1, column, text, physical_line)
+                for error_code, line_number, column, text, physical_line in cell.token_results
+            ]
+        return self.select_violations(filename, results)
+
+    def check_cell_tokens(
+        self, filename: str, intermediate_code: str, token_context: str
+    ) -> list[Result]:
+        """Run the token based checks on the parsed code of a single cell.
+
+        ``token_context`` is prepended, so checks depending on the preceding code
+        (i.e. blank lines or imports at the top) behave the same as for the
+        cell in the parsed notebook.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file used for per file options and reporting.
+        intermediate_code : str
+            Parsed code of the cell.
+        token_context : str
+            Code representing the preceding code.
+
+        Returns
+        -------
+        list[Result]
+            Results with line numbers relative to the first line of the parsed cell.
+        """
+        context_lines = token_context.splitlines(keepends=True)
+        lines = [*context_lines, *intermediate_code.splitlines(keepends=True)]
+        checker = self.make_checker(filename, lines)
+        try:
+            checker.process_tokens()
+        except (SyntaxError, tokenize.TokenError):  # pragma: no cover
+            return []
+        return [
+            (error_code, line_number - len(context_lines), column, text, physical_line)
+            for error_code, line_number, column, text, physical_line in checker.results
+            if line_number > len(context_lines) and error_code != "W391"
+        ]
+
+    def select_violations(self, filename: str, results: list[Result]) -> list[Violation]:
+        """Filter the results of the checks by the style guide.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the checked file.
+        results : list[Result]
+            Results of the checks.
+
+        Returns
+        -------
+        list[Violation]
+            Selected violations, which aren't ignored by ``noqa`` comments.
+        """
+        self.collector.violations = []
+        for error_code, line_number, column, text, physical_line in sorted(
+            results, key=lambda result: (result[1], result[2])
+        ):
+            self.guide.handle_error(
+                code=error_code,
+                filename=filename,
+                line_number=line_number,
+                column_number=column,
+                text=text,
+                physical_line=physical_line,
+            )
+        return list(self.collector.violations)
+
+
+def violation_to_diagnostic(violation: Violation, line_number: int) -> Diagnostic:
+    """Convert a violation to a diagnostic of the LSP specification.
+
+    Parameters
+    ----------
+    violation : Violation
+        Violation reported for the parsed notebook.
+    line_number : int
+        Line in the cell starting at 1.
+
+    Returns
+    -------
+    Diagnostic
+        Diagnostic with zero based positions.
+    """
+    line = line_number - 1
+    character = max(violation.column_number - 1, 0)
+    is_error = violation.code.startswith(("E9", "F8"))
+    return {
+        "range": {
+            "start": {"line": line, "character": character},
+            "end": {"line": line, "character": character + 1},
+        },
+        "severity": DIAGNOSTIC_SEVERITY_ERROR if is_error else DIAGNOSTIC_SEVERITY_WARNING,
+        "code": violation.code,
+        "source": "flake8_nb",
+        "message": violation.text,
+    }
+
+
+class NotebookLanguageServer:
+    """Language server publishing flake8 diagnostics for the cells of opened notebooks."""
+
+    def __init__(self, output: IO[bytes], linter: NotebookLinter | None = None):
+        """Initialize NotebookLanguageServer.
+
+        Parameters
+        ----------
+        output : IO[bytes]
+            Stream responses and notifications are written to.
+        linter : NotebookLinter | None
+            Linter to use, by default None which creates a linter without CLI options.
+        """
+        self.output = output
+        self.linter = linter or NotebookLinter()
+        self.documents: dict[str, NotebookDocument] = {}
+        self.is_running = True
+        self.handlers: dict[str, Callable[[Any], Any]] = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown,
+            "exit": self.exit,
+            "notebookDocument/didOpen": self.did_open,
+            "notebookDocument/didChange": self.did_change,
+            "notebookDocument/didClose": self.did_close,
+        }
+
+    def handle_message(self, message: JsonRpcMessage) -> None:
+        """Dispatch a request or notification to its handler and send the response.
+
+        Notifications without a handler are ignored. If a handler fails
+        (i.e. for a change of a notebook which wasn't opened), the error is logged
+        and requests are answered with an error, so the server keeps running.
+
+        Parameters
+        ----------
+        message : JsonRpcMessage
+            Decoded JSON-RPC message.
+        """
+        method = message.get("method")
+        handler = self.handlers.get(method or "")
+        if "id" not in message:
+            if handler is not None:
+                try:
+                    handler(message.get("params"))
+                except Exception:
+                    LOG.exception("Could not handle the notification %r", method)
+            return
+        if handler is None:
+            self.send_error(message["id"], METHOD_NOT_FOUND, f"Method not found: {method}")
+            return
+        try:
+            result = handler(message.get("params"))
+        except Exception as error:
+            LOG.exception("Could not handle the request %r", method)
+            self.send_error(message["id"], INTERNAL_ERROR, f"Could not handle {method}: {error!r}")
+            return
+        write_message(self.output, {"id": message["id"], "result": result})
+
+    def send_error(self, message_id: int | str | None, code: int, error_message: str) -> None:
+        """Answer a request with an error.
+
+        Parameters
+        ----------
+        message_id : int | str | None
+            ID of the request or ``None`` if it couldn't be decoded.
+        code : int
+            JSON-RPC error code.
+        error_message : str
+            Description of the error.
+        """
+        write_message(
+            self.output, {"id": message_id, "error": {"code": code, "message": error_message}}
+        )
+
+    def serve(self, stream: IO[bytes]) -> None:
+        """Handle messages from ``stream`` until the ``exit`` notification or end of stream.
+
+        Messages which can't be decoded are answered with a parse error and skipped.
+
+        Parameters
+        ----------
+        stream : IO[bytes]
+            Stream requests and notifications are read from.
+        """
+        while self.is_running:
+            try:
+                message = read_message(stream)
+            except ValueError as error:
+                LOG.error("Could not decode a message: %s", error)
+                self.send_error(None, PARSE_ERROR, f"Could not decode the message: {error}")
+                continue
+            if message is None:
+                break
+            if not isinstance(message, dict):
+                self.send_error(None, INVALID_REQUEST, "Batches of messages aren't supported.")
+                continue
+            self.handle_message(message)
+
+    def initialize(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Answer the ``initialize`` request with the server capabilities.
+
+        Parameters
+        ----------
+        params : dict[str, Any]
+            ``InitializeParams`` of the client.
+
+        Returns
+        -------
+        dict[str, Any]
+            ``InitializeResult``
+        """
+        return {
+            "capabilities": {
+                "notebookDocumentSync": {
+                    "notebookSelector": [
+                        {
+                            "notebook": {"notebookType": "jupyter-notebook"},
+                            "cells": [{"language": "python"}],
+                        }
+                    ]
+                }
+            },
+            "serverInfo": {"name": "flake8_nb", "version": __version__},
+        }
+
+    def shutdown(self, params: None) -> None:
+        """Answer the ``shutdown`` request by forgetting all documents.
+
+        Parameters
+        ----------
+        params : None
+            No parameters.
+        """
+        self.documents = {}
+
+    def exit(self, params: None) -> None:
+        """Stop serving after the ``exit`` notification.
+
+        Parameters
+        ----------
+        params : None
+            No parameters.
+        """
+        self.is_running = False
+
+    def did_open(self, params: dict[str, Any]) -> None:
+        """Keep an opened notebook in memory and publish its diagnostics.
+
+        Parameters
+        ----------
+        params : dict[str, Any]
+            ``DidOpenNotebookDocumentParams``
+        """
+        notebook = params["notebookDocument"]
+        texts = {document["uri"]: document["text"] for document in params["cellTextDocuments"]}
+        cells = [
+            NotebookDocumentCell.from_lsp(cell, texts.get(cell["document"], ""))
+            for cell in notebook["cells"]
+        ]
+        self.documents[notebook["uri"]] = NotebookDocument(
+            notebook["uri"], cells, self.linter.options.nb_skip_cell_magics
+        )
+        self.publish_diagnostics(notebook["uri"])
+
+    def did_change(self, params: dict[str, Any]) -> None:
+        """Apply changes of structure, cell data or cell text and publish the diagnostics.
+
+        Parameters
+        ----------
+        params : dict[str, Any]
+            ``DidChangeNotebookDocumentParams``
+        """
+        notebook_document = self.documents[params["notebookDocument"]["uri"]]
+        cell_changes = params["change"].get("cells") or {}
+        structure = cell_changes.get("structure")
+        if structure is not None:
+            texts = {
+                document["uri"]: document["text"] for document in structure.get("didOpen") or []
+            }
+            array_change = structure["array"]
+            new_cells = [
+                NotebookDocumentCell.from_lsp(cell, texts.get(cell["document"], ""))
+                for cell in array_change.get("cells") or []
+            ]
+            notebook_document.replace_cells(
+                array_change["start"], array_change["deleteCount"], new_cells
+            )
+        for cell in cell_changes.get("data") or []:
+            self.update_cell_data(notebook_document, cell)
+        for text_change in cell_changes.get("textContent") or []:
+            notebook_document.update_cell(
+                text_change["document"]["uri"], changes=text_change["changes"]
+            )
+        self.publish_diagnostics(notebook_document.uri)
+
+    @staticmethod
+    def update_cell_data(notebook_document: NotebookDocument, cell: LspCell) -> None:
+        """Update execution count and metadata of a cell.
+
+        Parameters
+        ----------
+        notebook_document : NotebookDocument
+            Notebook the cell belongs to.
+        cell : LspCell
+            Cell with the changed data.
+        """
+        notebook_document.update_cell(
+            cell["document"],
+            execution_count=(cell.get("executionSummary") or {}).get("executionOrder"),
+            metadata=cell.get("metadata"),
+        )
+
+    def did_close(self, params: dict[str, Any]) -> None:
+        """Forget a closed notebook and clear its diagnostics.
+
+        Parameters
+        ----------
+        params : dict[str, Any]
+            ``DidCloseNotebookDocumentParams``
+        """
+        notebook_document = self.documents.pop(params["notebookDocument"]["uri"], None)
+        if notebook_document is not None:
+            for cell in notebook_document.cells:
+                self.send_diagnostics(cell.uri, [])
+
+    def get_diagnostics(self, notebook_uri: str) -> dict[str, list[Diagnostic]]:
+        """Check a notebook and map the violations to its cells.
+
+        Parameters
+        ----------
+        notebook_uri : str
+            URI of the notebook.
+
+        Returns
+        -------
+        dict[str, list[Diagnostic]]
+            Diagnostics for each code cell URI.
+        """
+        notebook_document = self.documents[notebook_uri]
+        diagnostics: dict[str, list[Diagnostic]] = {
+            cell.uri: [] for cell in notebook_document.cells if cell.kind == CODE_CELL_KIND
+        }
+        violations = self.linter.lint_document(
+            f"{uri_to_path(notebook_uri)}_parsed", notebook_document
+        )
+        locations = notebook_document.map_intermediate_lines(
+            [violation.line_number for violation in violations]
+        )
+        for violation, location in zip(violations, locations):
+            if location is not None:
+                cell, cell_line_number = location
+                diagnostics[cell.uri].append(violation_to_diagnostic(violation, cell_line_number))
+        return diagnostics
+
+    def publish_diagnostics(self, notebook_uri: str) -> None:
+        """Publish the diagnostics of each code cell of a notebook.
+
+        Parameters
+        ----------
+        notebook_uri : str
+            URI of the notebook.
+        """
+        for cell_uri, diagnostics in self.get_diagnostics(notebook_uri).items():
+            self.send_diagnostics(cell_uri, diagnostics)
+
+    def send_diagnostics(self, cell_uri: str, diagnostics: list[Diagnostic]) -> None:
+        """Send the ``textDocument/publishDiagnostics`` notification for a cell.
+
+        Parameters
+        ----------
+        cell_uri : str
+            URI of the cell's text document.
+        diagnostics : list[Diagnostic]
+            Diagnostics of the cell.
+        """
+        write_message(
+            self.output,
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {"uri": cell_uri, "diagnostics": diagnostics},
+            },
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the language server on stdio.
+
+    Parameters
+    ----------
+    argv : list[str] | None
+        CLI options of ``flake8_nb`` used for linting, by default None
+    """
+    server = NotebookLanguageServer(
+        sys.stdout.buffer, NotebookLinter(sys.argv[1:] if argv is None else argv[1:])
+    )
+    server.serve(sys.stdin.buffer)
@@ -0,0 +1,246 @@
+"""Command to merge the machine readable results of ``flake8_nb --nb-shard K/N`` runs.
+
+The results of all shards have to be written with the same formatter, either
+``jsonl_notebook`` or ``sarif_notebook``. The merged report has the same format,
+with the violations sorted by location and duplicates removed.
+
+.. code-block:: console
+
+    $ flake8_nb-merge-shards --exit-code 0 --exit-code 1 shard-1.jsonl shard-2.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+from flake8_nb.flake8_integration.json_formatter import SARIF_DRIVER
+from flake8_nb.flake8_integration.json_formatter import SARIF_SCHEMA
+from flake8_nb.flake8_integration.json_formatter import SARIF_VERSION
+
+ShardResult = Dict[str, Any]
+ShardResults = Tuple[str, List[ShardResult]]
+
+JSONL_FORMAT = "jsonl"
+SARIF_FORMAT = "sarif"
+
+
+class ShardResultsError(Exception):
+    """Error raised if the results of a shard can't be read or merged."""
+
+
+def read_shard_results(results_path: str) -> ShardResults:
+    """Read the results of a shard written by the ``jsonl_notebook`` or ``sarif_notebook``.
+
+    Parameters
+    ----------
+    results_path : str
+        Path of the results file.
+
+    Returns
+    -------
+    ShardResults
+        (``results_format``, ``results``) Where ``results_format`` is ``"jsonl"``
+        or ``"sarif"`` and ``results`` are the violation records or SARIF results.
+
+    Raises
+    ------
+    ShardResultsError
+        If the file isn't a JSON Lines or SARIF log, e.g. if the shard crashed.
+    """
+    try:
+        content = Path(results_path).read_text(encoding="utf8")
+    except OSError as error:
+        raise ShardResultsError(f"Could not read {results_path!r}: {error}")
+    try:
+        sarif_log = json.loads(content)
+        if isinstance(sarif_log, dict) and "runs" in sarif_log:
+            return SARIF_FORMAT, [result for run in sarif_log["runs"] for result in run["results"]]
+    except json.JSONDecodeError:
+        pass
+    try:
+        return JSONL_FORMAT, [json.loads(line) for line in content.splitlines() if line.strip()]
+    except json.JSONDecodeError:
+        raise ShardResultsError(
+            f"{results_path!r} is neither a JSON Lines file nor a complete SARIF log."
+        )
+
+
+def get_sort_key(result: ShardResult, results_format: str) -> tuple[Any, ...]:
+    """Sort key of a violation, ordering by path, cell, line, column and code.
+
+    Parameters
+    ----------
+    result : ShardResult
+        Violation record or SARIF result.
+    results_format : str
+        ``"jsonl"`` or ``"sarif"``
+
+    Returns
+    -------
+    tuple[Any, ...]
+        Key to sort the violations by.
+    """
+    if results_format == SARIF_FORMAT:
+        location = result["locations"][0]["physicalLocation"]
+        cell = result.get("properties", {}).get("cell")
+        path = location["artifactLocation"]["uri"]
+        line, column = location["region"]["startLine"], location["region"]["startColumn"]
+        code, text = result["ruleId"], result["message"]["text"]
+    else:
+        cell = result["cell"]
+        path, line, column = result["path"], result["line"], result["column"]
+        code, text = result["code"], result["text"]
+    total_cell_nr = cell["total_cell_nr"] if cell else 0
+    return path, total_cell_nr, line, column, code, text
+
+
+def merge_shard_results(shard_results: Iterable[ShardResults]) -> ShardResults:
+    """Merge the results of all shards, sorting them and removing duplicates.
+
+    Parameters
+    ----------
+    shard_results : Iterable[ShardResults]
+        Results of each shard.
+
+    Returns
+    -------
+    ShardResults
+        (``results_format``, ``results``) of the merged results.
+
+    Raises
+    ------
+    ShardResultsError
+        If the shards were written with different formatters.
+    """
+    results_formats = set()
+    unique_results: dict[str, ShardResult] = {}
+    for results_format, results in shard_results:
+        results_formats.add(results_format)
+        for result in results:
+            unique_results.setdefault(json.dumps(result, sort_keys=True), result)
+    if len(results_formats) > 1:
+        raise ShardResultsError(
+            "The results of all shards need to be written by the same formatter."
+        )
+    results_format = results_formats.pop() if results_formats else JSONL_FORMAT
+    return results_format, sorted(
+        unique_results.values(), key=lambda result: get_sort_key(result, results_format)
+    )
+
+
+def format_merged_results(results_format: str, results: list[ShardResult]) -> str:
+    """Format merged results in the format the shards were written in.
+
+    Parameters
+    ----------
+    results_format : str
+        ``"jsonl"`` or ``"sarif"``
+    results : list[ShardResult]
+        Merged violation records or SARIF results.
+
+    Returns
+    -------
+    str
+        Merged report.
+    """
+    if results_format == SARIF_FORMAT:
+        sarif_log = {
+            "$schema": SARIF_SCHEMA,
+            "version": SARIF_VERSION,
+            "runs": [{"tool": {"driver": SARIF_DRIVER}, "results": results}],
+        }
+        return json.dumps(sarif_log)
+    return "".join(f"{json.dumps(result)}\n" for result in results)
+
+
+def get_exit_code(exit_codes: list[int], results: list[ShardResult]) -> int:
+    """Get the exit code of the merged run.
+
+    Parameters
+    ----------
+    exit_codes : list[int]
+        Exit codes of the shards.
+    results : list[ShardResult]
+        Merged results.
+
+    Returns
+    -------
+    int
+        The highest exit code of the shards, so a failed shard fails the merged run.
+        Without exit codes ``1`` if there are violations and otherwise ``0``.
+    """
+    if exit_codes:
+        return max(exit_codes)
+    return int(bool(results))
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the CLI parser of ``flake8_nb-merge-shards``.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        CLI parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="flake8_nb-merge-shards",
+        description="Merge the 'jsonl_notebook' or 'sarif_notebook' results "
+        "of 'flake8_nb --nb-shard K/N' runs into one report.",
+    )
+    parser.add_argument("results", nargs="+", metavar="RESULTS", help="Results of a shard.")
+    parser.add_argument(
+        "--exit-code",
+        action="append",
+        type=int,
+        default=[],
+        dest="exit_codes",
+        help="Exit code of a shard, can be passed multiple times. The merged run exits with "
+        "the highest one, without exit codes it exits with 1 if there are violations.",
+    )
+    parser.add_argument(
+        "--output-file",
+        default=None,
+        help="Write the merged report to this file instead of stdout.",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Merge the results of shards and exit with the merged exit code.
+
+    Parameters
+    ----------
+    argv : list[str] | None
+        The arguments to be passed to the command for parsing, by default None
+
+    Raises
+    ------
+    SystemExit
+        With the merged exit code or ``2`` if the results couldn't be merged.
+    """
+    args = create_parser().parse_args(sys.argv[1:] if argv is None else argv[1:])
+    try:
+        results_format, results = merge_shard_results(
+            read_shard_results(results_path) for results_path in args.results
+        )
+    except ShardResultsError as error:
+        print(f"flake8_nb-merge-shards: error: {error}", file=sys.stderr)
+        raise SystemExit(2)
+    report = format_merged_results(results_format, results)
+    if args.output_file is None:
+        sys.stdout.write(report)
+    else:
+        Path(args.output_file).write_text(report, encoding="utf8")
+    raise SystemExit(get_exit_code(args.exit_codes, results))
+
+
+if __name__ == "__main__":
+    main()
@@ -55,6 +55,7 @@ class InvalidFlake8TagWarning(UserWarning):
         flake8_tag : str
             Used improperly formatted flake8-nb tag
         """
+        self.flake8_tag = flake8_tag
         super().__init__(
             "flake8-noqa-line/cell-tags should be of form "
             "'flake8-noqa-cell-<rule1>-<rule2>'|'flake8-noqa-cell'/"
@@ -62,6 +63,16 @@ class InvalidFlake8TagWarning(UserWarning):
             f"you used: '{flake8_tag}'"
         )
 
+    def __reduce__(self) -> tuple[type[InvalidFlake8TagWarning], tuple[str]]:
+        """Pickle the warning by its arguments, i.e. to send it from a worker process.
+
+        Returns
+        -------
+        tuple[type[InvalidFlake8TagWarning], tuple[str]]
+            Class and arguments to recreate the warning.
+        """
+        return type(self), (self.flake8_tag,)
+
 
 def extract_flake8_tags(notebook_cell: NotebookCell) -> list[str]:
     """Extract all tag that start with 'flake8-noqa-' from a cell.
@@ -287,6 +298,25 @@ def update_inline_flake8_noqa(source_line: str, rules_list: list[str]) -> str:
     return f"{source_line}  # noqa: {noqa_str}\n"
 
 
+def get_cell_separator(input_id: CellId) -> str:
+    """Comment line at the start of a cell in the parsed notebook.
+
+    Parameters
+    ----------
+    input_id : CellId
+        Id of the cell.
+
+    Returns
+    -------
+    str
+        Separator line of the cell, without the line break.
+    """
+    return (
+        "# INTERMEDIATE_CELL_SEPARATOR "
+        f"({input_id.input_nr},{input_id.code_cell_nr},{input_id.total_cell_nr})"
+    )
+
+
 def notebook_cell_to_intermediate_dict(
     notebook_cell: NotebookCell,
 ) -> dict[str, CellId | str | int]:
@@ -321,11 +351,9 @@ def notebook_cell_to_intermediate_dict(
         updated_source_lines.append(updated_source_line)
     if input_nr is None:
         input_nr = " "
+    input_id = CellId(str(input_nr), code_cell_nr, total_cell_nr)
     return {
-        "code": (
-            f"# INTERMEDIATE_CELL_SEPARATOR ({input_nr},{code_cell_nr},{total_cell_nr})\n\n\n"
-            f"{''.join(updated_source_lines)}\n\n"
-        ),
-        "input_id": CellId(str(input_nr), code_cell_nr, total_cell_nr),
+        "code": f"{get_cell_separator(input_id)}\n\n\n{''.join(updated_source_lines)}\n\n",
+        "input_id": input_id,
         "lines_of_code": len(updated_source_lines) + 5,
     }
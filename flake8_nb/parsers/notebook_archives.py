@@ -0,0 +1,1032 @@
+"""Module for reading notebooks directly out of archives and compressed files.
+
+Notebooks inside of tar or zip archives are addressed by a virtual path of the
+form ``archive.tar!inner/path.ipynb``, while compressed notebooks
+(i.e. ``notebook.ipynb.gz``) are addressed by their own path.
+Notebooks are decompressed in memory while they are read, so no extracted
+copies end up on disk.
+
+JSON Lines files (i.e. exports of notebook stores) contain one notebook per line,
+which is addressed by the virtual path ``notebooks.jsonl!<id>``, where ``<id>`` is
+the value of the ID field of the record. These files are read line by line and only
+the location of each record is kept by the session, until it was parsed
+(see :func:`iter_jsonl_notebooks` and :class:`JsonlIndex`).
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import sqlite3
+import tarfile
+import threading
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import IO
+from typing import Any
+from typing import Iterator
+from typing import NamedTuple
+from urllib.parse import quote
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+ARCHIVE_SEPARATOR = "!"
+"""Separator between the path of an archive and the path of a notebook inside of it."""
+
+TAR_SUFFIXES = (
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+    ".tar.zst",
+    ".tzst",
+)
+ZIP_SUFFIXES = (".zip",)
+COMPRESSED_NOTEBOOK_SUFFIXES = (".ipynb.gz", ".ipynb.zst")
+ZSTD_SUFFIXES = (".zst", ".tzst")
+JSONL_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+DEFAULT_JSONL_ID_FIELD = "id"
+MISSING_ID_PREFIX = "line-"
+"""Prefix of the line number, which records without ID are addressed by."""
+
+ARCHIVE_READ_ERRORS: tuple[type[Exception], ...] = (
+    EOFError,
+    OSError,
+    tarfile.TarError,
+    zipfile.BadZipFile,
+)
+"""Exceptions raised if an archive or compressed file is corrupt."""
+if zstandard is not None:
+    ARCHIVE_READ_ERRORS += (zstandard.ZstdError,)
+
+
+class ArchiveError(Exception):
+    """Error raised if an archive or compressed file can't be read."""
+
+
+def is_archive(file_path: str) -> bool:
+    """Check if a file is a tar or zip archive, judging by its suffix.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+
+    Returns
+    -------
+    bool
+        Whether the file is an archive.
+    """
+    return file_path.lower().endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+def is_compressed_notebook(file_path: str) -> bool:
+    """Check if a file is a gzip or zstd compressed notebook, judging by its suffix.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+
+    Returns
+    -------
+    bool
+        Whether the file is a compressed notebook.
+    """
+    return file_path.lower().endswith(COMPRESSED_NOTEBOOK_SUFFIXES)
+
+
+def is_jsonl_file(file_path: str) -> bool:
+    """Check if a file is a JSON Lines file of notebooks, judging by its suffix.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+
+    Returns
+    -------
+    bool
+        Whether the file is a (compressed) JSON Lines file.
+    """
+    return file_path.lower().endswith(JSONL_SUFFIXES)
+
+
+def open_zstd(raw_file: IO[bytes], file_path: str) -> IO[bytes]:
+    """Wrap a zstd compressed file in a stream reader, which decompresses it on the fly.
+
+    Parameters
+    ----------
+    raw_file : IO[bytes]
+        Compressed file opened in binary mode.
+    file_path : str
+        Path of the file, used in the error message.
+
+    Returns
+    -------
+    IO[bytes]
+        Decompressed stream.
+
+    Raises
+    ------
+    ArchiveError
+        If the optional dependency ``zstandard`` isn't installed.
+    """
+    if zstandard is None:  # pragma: no cover
+        raise ArchiveError(
+            f"Reading the zstd compressed file {file_path!r} requires the 'zstandard' "
+            "package, which can be installed with 'pip install flake8-nb[zstd]'."
+        )
+    return zstandard.ZstdDecompressor().stream_reader(raw_file)  # type: ignore[no-any-return]
+
+
+def split_archive_path(notebook_path: str) -> tuple[str, str] | None:
+    """Split a virtual notebook path into the archive path and the name of its member.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path of the form ``archive.tar!inner/path.ipynb`` or a regular path.
+
+    Returns
+    -------
+    tuple[str, str] | None
+        (``archive_path``, ``member_name``) or ``None`` if the path isn't inside of an archive.
+    """
+    separator_index = notebook_path.find(ARCHIVE_SEPARATOR)
+    while separator_index != -1:
+        archive_path = notebook_path[:separator_index]
+        if is_archive(archive_path) and os.path.isfile(archive_path):
+            member_start = separator_index + len(ARCHIVE_SEPARATOR)
+            return archive_path, notebook_path[member_start:].replace(os.sep, "/")
+        separator_index = notebook_path.find(ARCHIVE_SEPARATOR, separator_index + 1)
+    return None
+
+
+class ArchiveReader:
+    """Reader for the notebooks inside of an archive, which keeps the archive open.
+
+    Tar archives are read as a stream, so compressed tar archives are decompressed
+    only once, if their members are read in the order of the archive.
+    Reading an earlier member reopens the archive.
+    """
+
+    def __init__(self, archive_path: str):
+        """Initialize ArchiveReader, the archive is opened on first use.
+
+        Parameters
+        ----------
+        archive_path : str
+            Path of a tar or zip archive.
+        """
+        self.archive_path = archive_path
+        self._raw_file: IO[bytes] | None = None
+        self._tar_file: tarfile.TarFile | None = None
+        self._tar_member: tarfile.TarInfo | None = None
+        self._zip_file: zipfile.ZipFile | None = None
+
+    def __enter__(self) -> ArchiveReader:
+        """Use the reader as context manager, which closes the archive on exit.
+
+        Returns
+        -------
+        ArchiveReader
+            The reader itself.
+        """
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the archive.
+
+        Parameters
+        ----------
+        exc_info : object
+            Exception information, which is ignored.
+        """
+        self.close()
+
+    @property
+    def is_zip(self) -> bool:
+        """Whether the archive is a zip archive.
+
+        Returns
+        -------
+        bool
+            ``True`` for zip and ``False`` for tar archives.
+        """
+        return self.archive_path.lower().endswith(ZIP_SUFFIXES)
+
+    def _open_tar(self) -> tarfile.TarFile:
+        """Open the tar archive as a stream, starting at its first member.
+
+        Returns
+        -------
+        tarfile.TarFile
+            Opened tar archive.
+        """
+        self.close()
+        self._raw_file = open(self.archive_path, "rb")
+        if self.archive_path.lower().endswith(ZSTD_SUFFIXES):
+            self._tar_file = tarfile.open(
+                fileobj=open_zstd(self._raw_file, self.archive_path), mode="r|"
+            )
+        else:
+            self._tar_file = tarfile.open(fileobj=self._raw_file, mode="r|*")
+        return self._tar_file
+
+    def _open_zip(self) -> zipfile.ZipFile:
+        """Open the zip archive, if it isn't open yet.
+
+        Returns
+        -------
+        zipfile.ZipFile
+            Opened zip archive.
+        """
+        if self._zip_file is None:
+            self._zip_file = zipfile.ZipFile(self.archive_path)
+        return self._zip_file
+
+    def _find_tar_member(self, member_name: str) -> tarfile.TarInfo:
+        """Advance the tar stream to a member, reopening the archive if it was passed.
+
+        Parameters
+        ----------
+        member_name : str
+            Name of the member.
+
+        Returns
+        -------
+        tarfile.TarInfo
+            Info of the member, whose content can be read next.
+
+        Raises
+        ------
+        KeyError
+            If there is no such member in the archive.
+        """
+        if self._tar_member is not None and self._tar_member.name == member_name:
+            return self._tar_member
+        if self._tar_file is not None and self._advance_tar(member_name):
+            return self._tar_member  # type: ignore[return-value]
+        self._open_tar()
+        if self._advance_tar(member_name):
+            return self._tar_member  # type: ignore[return-value]
+        raise KeyError(f"There is no member {member_name!r} in {self.archive_path!r}.")
+
+    def _advance_tar(self, member_name: str) -> bool:
+        """Advance the tar stream until it reaches a member or its end.
+
+        Parameters
+        ----------
+        member_name : str
+            Name of the member.
+
+        Returns
+        -------
+        bool
+            Whether the member was found.
+        """
+        assert self._tar_file is not None
+        self._tar_member = self._tar_file.next()
+        while self._tar_member is not None and self._tar_member.name != member_name:
+            self._tar_member = self._tar_file.next()
+        return self._tar_member is not None
+
+    def list_notebooks(self) -> list[str]:
+        """Names of the notebooks in the archive.
+
+        Returns
+        -------
+        list[str]
+            Names of all ``*.ipynb`` files, in the order of the archive.
+
+        Raises
+        ------
+        ArchiveError
+            If the archive can't be read.
+        """
+        try:
+            if self.is_zip:
+                return [
+                    info.filename
+                    for info in self._open_zip().infolist()
+                    if not info.is_dir() and info.filename.endswith(".ipynb")
+                ]
+            member_names = [
+                member.name
+                for member in self._open_tar()
+                if member.isfile() and member.name.endswith(".ipynb")
+            ]
+            self.close()
+            return member_names
+        except ARCHIVE_READ_ERRORS as error:
+            self.close()
+            raise ArchiveError(f"Could not read the archive {self.archive_path!r}: {error}")
+
+    def get_size(self, member_name: str) -> int:
+        """Uncompressed size of a member in bytes.
+
+        Parameters
+        ----------
+        member_name : str
+            Name of the member.
+
+        Returns
+        -------
+        int
+            Size of the member.
+        """
+        if self.is_zip:
+            return self._open_zip().getinfo(member_name).file_size
+        return self._find_tar_member(member_name).size
+
+    def read(self, member_name: str) -> bytes:
+        """Read the content of a member.
+
+        Parameters
+        ----------
+        member_name : str
+            Name of the member.
+
+        Returns
+        -------
+        bytes
+            Decompressed content of the member.
+        """
+        if self.is_zip:
+            return self._open_zip().read(member_name)
+        tar_member = self._find_tar_member(member_name)
+        assert self._tar_file is not None
+        member_file = self._tar_file.extractfile(tar_member)
+        assert member_file is not None
+        self._tar_member = None
+        return member_file.read()
+
+    def close(self) -> None:
+        """Close the archive, if it is open."""
+        for archive_file in (self._tar_file, self._zip_file, self._raw_file):
+            if archive_file is not None:
+                archive_file.close()
+        self._raw_file = self._tar_file = self._tar_member = self._zip_file = None
+
+
+_archive_readers = threading.local()
+
+
+def get_archive_reader(archive_path: str) -> ArchiveReader:
+    """Get the reader of an archive for the current thread.
+
+    Each thread keeps the archive it read last open,
+    so consecutive reads of its members don't reopen it.
+
+    Parameters
+    ----------
+    archive_path : str
+        Path of a tar or zip archive.
+
+    Returns
+    -------
+    ArchiveReader
+        Reader of the archive.
+    """
+    archive_reader: ArchiveReader | None = getattr(_archive_readers, "reader", None)
+    if archive_reader is None or archive_reader.archive_path != archive_path:
+        close_archive_reader()
+        archive_reader = _archive_readers.reader = ArchiveReader(archive_path)
+    return archive_reader
+
+
+def close_archive_reader() -> None:
+    """Close the archive and JSON Lines file kept open by the current thread."""
+    archive_reader: ArchiveReader | None = getattr(_archive_readers, "reader", None)
+    if archive_reader is not None:
+        archive_reader.close()
+        _archive_readers.reader = None
+    jsonl_reader: JsonlReader | None = getattr(_archive_readers, "jsonl_reader", None)
+    if jsonl_reader is not None:
+        jsonl_reader.close()
+        _archive_readers.jsonl_reader = None
+
+
+def iter_archive_notebooks(archive_path: str) -> Iterator[str]:
+    """Find the notebooks inside of an archive.
+
+    Parameters
+    ----------
+    archive_path : str
+        Path of a tar or zip archive.
+
+    Yields
+    ------
+    str
+        Virtual path ``archive_path!member_name`` of each notebook.
+
+    Raises
+    ------
+    ArchiveError
+        If the archive can't be read.
+    """
+    with ArchiveReader(archive_path) as archive_reader:
+        member_names = archive_reader.list_notebooks()
+    for member_name in member_names:
+        yield f"{archive_path}{ARCHIVE_SEPARATOR}{member_name}"
+
+
+def split_jsonl_path(notebook_path: str) -> tuple[str, str] | None:
+    """Split a virtual notebook path into the JSON Lines file and the ID of the record.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path of the form ``notebooks.jsonl!<id>`` or a regular path.
+
+    Returns
+    -------
+    tuple[str, str] | None
+        (``jsonl_path``, ``record_id``) or ``None`` if the path isn't a record
+        of a JSON Lines file.
+    """
+    separator_index = notebook_path.find(ARCHIVE_SEPARATOR)
+    while separator_index != -1:
+        jsonl_path = notebook_path[:separator_index]
+        if is_jsonl_file(jsonl_path) and os.path.isfile(jsonl_path):
+            id_start = separator_index + len(ARCHIVE_SEPARATOR)
+            return jsonl_path, notebook_path[id_start:]
+        separator_index = notebook_path.find(ARCHIVE_SEPARATOR, separator_index + 1)
+    return None
+
+
+def get_record_id(record: Any, id_field: str, line_number: int) -> str:
+    """Get the ID of a record of a JSON Lines file.
+
+    Parameters
+    ----------
+    record : Any
+        Decoded record.
+    id_field : str
+        Name of the field with the ID, nested fields are separated by dots (i.e. ``metadata.id``).
+    line_number : int
+        Line number of the record, used as ID if the record has no ID.
+
+    Returns
+    -------
+    str
+        Value of the ID field or ``line-<line_number>``.
+    """
+    value = record
+    for field_name in id_field.split("."):
+        if not isinstance(value, dict) or field_name not in value:
+            return f"{MISSING_ID_PREFIX}{line_number}"
+        value = value[field_name]
+    if value is None or isinstance(value, (dict, list)) or value == "":
+        return f"{MISSING_ID_PREFIX}{line_number}"
+    return str(value)
+
+
+def get_jsonl_temp_name(notebook_path: str) -> str:
+    """Name of the parsed notebook of a record, which is a single safe path component.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Virtual path ``notebooks.jsonl!<id>`` of a record.
+
+    Returns
+    -------
+    str
+        Path with the quoted ID, i.e. ``notebooks.jsonl!team%2Fanalysis.ipynb``
+        for the ID ``team/analysis``, since IDs can contain anything (i.e. ``../``).
+    """
+    jsonl_record = split_jsonl_path(notebook_path)
+    if jsonl_record is None:
+        return notebook_path
+    jsonl_path, record_id = jsonl_record
+    return f"{jsonl_path}{ARCHIVE_SEPARATOR}{quote(record_id, safe='')}.ipynb"
+
+
+class JsonlRecord(NamedTuple):
+    """Location of a record of a JSON Lines file, found by :func:`iter_jsonl_notebooks`.
+
+    The location is:
+    * ``jsonl_path``
+        Path of the JSON Lines file.
+    * ``offset``
+        Position of the line in the decompressed file.
+    * ``size``
+        Size of the line in bytes.
+    """
+
+    jsonl_path: str
+    offset: int
+    size: int
+
+
+JSONL_DECODED_RECORDS_SIZE = 16
+"""Number of records found last, which are kept decoded until they are read."""
+
+
+class JsonlIndex:
+    """Locations of the records of JSON Lines files found by :func:`iter_jsonl_notebooks`.
+
+    Each ``flake8_nb.parsers.notebook_parsers.NotebookSession`` has its own index,
+    which is used by the thread finding and reading the records (see :func:`use_jsonl_index`).
+    Records are removed once they were parsed, so only the records which were found
+    but not parsed yet are kept.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty JsonlIndex."""
+        self._records: dict[str, JsonlRecord] = {}
+        self._decoded_records: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of records in the index.
+
+        Returns
+        -------
+        int
+            Number of records which were found and not removed yet.
+        """
+        return len(self._records)
+
+    def add(self, notebook_path: str, jsonl_record: JsonlRecord, record: Any) -> None:
+        """Add a record found in a JSON Lines file.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Virtual path ``notebooks.jsonl!<id>`` of the record.
+        jsonl_record : JsonlRecord
+            Location of the record.
+        record : Any
+            Decoded record, which is only kept if it is an object.
+        """
+        with self._lock:
+            self._records[notebook_path] = jsonl_record
+            if isinstance(record, dict):
+                self._decoded_records[notebook_path] = record
+                self._decoded_records.move_to_end(notebook_path)
+                while len(self._decoded_records) > JSONL_DECODED_RECORDS_SIZE:
+                    self._decoded_records.popitem(last=False)
+
+    def get(self, notebook_path: str) -> JsonlRecord | None:
+        """Get the location of a record.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Virtual path ``notebooks.jsonl!<id>`` of a record.
+
+        Returns
+        -------
+        JsonlRecord | None
+            Location of the record or ``None`` if no such record is in the index.
+        """
+        with self._lock:
+            return self._records.get(notebook_path)
+
+    def pop_decoded(self, notebook_path: str) -> dict[str, Any] | None:
+        """Take the decoded record of a notebook, if it was one of the records found last.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Virtual path ``notebooks.jsonl!<id>`` of a record.
+
+        Returns
+        -------
+        dict[str, Any] | None
+            Decoded record or ``None`` if it isn't kept, so it needs to be read.
+        """
+        with self._lock:
+            return self._decoded_records.pop(notebook_path, None)
+
+    def remove(self, notebook_path: str) -> None:
+        """Remove a record, i.e. once it was parsed.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Virtual path ``notebooks.jsonl!<id>`` of a record.
+        """
+        with self._lock:
+            self._records.pop(notebook_path, None)
+            self._decoded_records.pop(notebook_path, None)
+
+    def clear(self) -> None:
+        """Remove all records."""
+        with self._lock:
+            self._records.clear()
+            self._decoded_records.clear()
+
+
+_jsonl_indexes = threading.local()
+
+
+@contextmanager
+def use_jsonl_index(jsonl_index: JsonlIndex) -> Iterator[JsonlIndex]:
+    """Use an index for the records of JSON Lines files found and read by the current thread.
+
+    Parameters
+    ----------
+    jsonl_index : JsonlIndex
+        Index of the session, which finds and reads the records.
+
+    Yields
+    ------
+    JsonlIndex
+        The index, the previously used index is restored on exit.
+    """
+    previous_index: JsonlIndex | None = getattr(_jsonl_indexes, "index", None)
+    _jsonl_indexes.index = jsonl_index
+    try:
+        yield jsonl_index
+    finally:
+        _jsonl_indexes.index = previous_index
+
+
+def get_jsonl_index() -> JsonlIndex | None:
+    """Get the index used by the current thread.
+
+    Returns
+    -------
+    JsonlIndex | None
+        Index set by :func:`use_jsonl_index` or ``None`` if no index is used.
+    """
+    return getattr(_jsonl_indexes, "index", None)
+
+
+def get_jsonl_record(notebook_path: str) -> JsonlRecord | None:
+    """Get the location of a record found by :func:`iter_jsonl_notebooks`.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Virtual path ``notebooks.jsonl!<id>`` of a record.
+
+    Returns
+    -------
+    JsonlRecord | None
+        Location of the record or ``None`` if no such record is in the index
+        used by the current thread.
+    """
+    jsonl_index = get_jsonl_index()
+    return None if jsonl_index is None else jsonl_index.get(notebook_path)
+
+
+def pop_decoded_jsonl_record(notebook_path: str) -> dict[str, Any] | None:
+    """Take the decoded record of a notebook, if it was one of the records found last.
+
+    This saves decoding the records a second time, when they are read right after
+    they were found (i.e. while streaming the notebooks).
+
+    Parameters
+    ----------
+    notebook_path : str
+        Virtual path ``notebooks.jsonl!<id>`` of a record.
+
+    Returns
+    -------
+    dict[str, Any] | None
+        Decoded record or ``None`` if it isn't kept, so it needs to be read.
+    """
+    jsonl_index = get_jsonl_index()
+    return None if jsonl_index is None else jsonl_index.pop_decoded(notebook_path)
+
+
+class JsonlIds:
+    """IDs of the records of a JSON Lines file, to find repeated IDs.
+
+    The IDs are kept in a private temporary database, which is spilled to disk
+    once it outgrows the page cache, so the memory usage doesn't grow
+    with the number of records.
+    """
+
+    def __init__(self) -> None:
+        """Initialize JsonlIds, creating the database."""
+        # an empty name creates a database which is deleted once it is closed
+        self._connection = sqlite3.connect("", check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("CREATE TABLE ids (id TEXT PRIMARY KEY)")
+
+    def __enter__(self) -> JsonlIds:
+        """Use the IDs as context manager, which closes the database on exit.
+
+        Returns
+        -------
+        JsonlIds
+            The IDs themselves.
+        """
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the database.
+
+        Parameters
+        ----------
+        exc_info : object
+            Exception information, which is ignored.
+        """
+        self._connection.close()
+
+    def add(self, record_id: str) -> bool:
+        """Add an ID, if it wasn't added before.
+
+        Parameters
+        ----------
+        record_id : str
+            ID of a record.
+
+        Returns
+        -------
+        bool
+            Whether the ID was added, ``False`` means it is a repeated ID.
+        """
+        cursor = self._connection.execute("INSERT OR IGNORE INTO ids VALUES (?)", (record_id,))
+        return cursor.rowcount == 1
+
+
+def open_jsonl(jsonl_path: str) -> IO[bytes]:
+    """Open a JSON Lines file, decompressing it on the fly.
+
+    Parameters
+    ----------
+    jsonl_path : str
+        Path of a JSON Lines file, which can be compressed.
+
+    Returns
+    -------
+    IO[bytes]
+        Decompressed stream.
+    """
+    if jsonl_path.lower().endswith(".gz"):
+        return gzip.open(jsonl_path, "rb")  # type: ignore[return-value]
+    raw_file = open(jsonl_path, "rb")
+    if jsonl_path.lower().endswith(ZSTD_SUFFIXES):
+        try:
+            # the zstd stream reader can't read lines on its own
+            return io.BufferedReader(open_zstd(raw_file, jsonl_path))  # type: ignore[arg-type]
+        except ArchiveError:  # pragma: no cover
+            raw_file.close()
+            raise
+    return raw_file
+
+
+class JsonlReader:
+    """Reader for the records of a JSON Lines file, which keeps the file open.
+
+    Uncompressed and gzip compressed files are read at the offset of a record,
+    zstd compressed files are read as a stream, so they are decompressed only once,
+    if the records are read in the order of the file.
+    Reading an earlier record of a zstd compressed file reopens it.
+    """
+
+    def __init__(self, jsonl_path: str):
+        """Initialize JsonlReader, the file is opened on first use.
+
+        Parameters
+        ----------
+        jsonl_path : str
+            Path of a JSON Lines file, which can be compressed.
+        """
+        self.jsonl_path = jsonl_path
+        self._jsonl_file: IO[bytes] | None = None
+        self._position = 0
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Read a record of the JSON Lines file.
+
+        Parameters
+        ----------
+        offset : int
+            Position of the record in the decompressed file.
+        size : int
+            Size of the record in bytes.
+
+        Returns
+        -------
+        bytes
+            Raw record.
+
+        Raises
+        ------
+        EOFError
+            If the file ends before the record.
+        """
+        if self._jsonl_file is None or (
+            offset < self._position and not self._jsonl_file.seekable()
+        ):
+            self.close()
+            self._jsonl_file = open_jsonl(self.jsonl_path)
+        if self._jsonl_file.seekable():
+            self._position = self._jsonl_file.seek(offset)
+        while self._position < offset:
+            skipped = len(
+                self._jsonl_file.read(min(offset - self._position, io.DEFAULT_BUFFER_SIZE))
+            )
+            if not skipped:
+                raise EOFError(f"The file ends before the record at {offset}.")
+            self._position += skipped
+        record = self._jsonl_file.read(size)
+        self._position += len(record)
+        if len(record) < size:
+            raise EOFError(f"The file ends before the end of the record at {offset}.")
+        return record
+
+    def close(self) -> None:
+        """Close the file, if it is open."""
+        if self._jsonl_file is not None:
+            self._jsonl_file.close()
+        self._jsonl_file = None
+        self._position = 0
+
+
+def get_jsonl_reader(jsonl_path: str) -> JsonlReader:
+    """Get the reader of a JSON Lines file for the current thread.
+
+    Like archives (see :func:`get_archive_reader`), each thread keeps the
+    JSON Lines file it read last open.
+
+    Parameters
+    ----------
+    jsonl_path : str
+        Path of a JSON Lines file, which can be compressed.
+
+    Returns
+    -------
+    JsonlReader
+        Reader of the JSON Lines file.
+    """
+    jsonl_reader: JsonlReader | None = getattr(_archive_readers, "jsonl_reader", None)
+    if jsonl_reader is None or jsonl_reader.jsonl_path != jsonl_path:
+        if jsonl_reader is not None:
+            jsonl_reader.close()
+        jsonl_reader = _archive_readers.jsonl_reader = JsonlReader(jsonl_path)
+    return jsonl_reader
+
+
+def iter_jsonl_notebooks(jsonl_path: str, id_field: str = DEFAULT_JSONL_ID_FIELD) -> Iterator[str]:
+    """Lazily find the notebooks of a JSON Lines file, with one notebook per line.
+
+    Only the location of each record is kept in the index used by the thread
+    (see :func:`use_jsonl_index`), so :func:`read_notebook_bytes` reads the line again,
+    unless the record is one of the ``JSONL_DECODED_RECORDS_SIZE`` records found last
+    (see :func:`pop_decoded_jsonl_record`). Without an index the records can't be read.
+    Lines which aren't valid JSON are found as well and reported as invalid notebooks.
+    If an ID repeats, the path of the record gets its line number appended
+    (``<id>@line-<n>``), so each record has its own path (see :class:`JsonlIds`).
+
+    Parameters
+    ----------
+    jsonl_path : str
+        Path of a JSON Lines file, which can be compressed.
+    id_field : str
+        Field of the records with the ID, see :func:`get_record_id`,
+        by default DEFAULT_JSONL_ID_FIELD
+
+    Yields
+    ------
+    str
+        Virtual path ``jsonl_path!<id>`` of each notebook.
+
+    Raises
+    ------
+    ArchiveError
+        If the file can't be read.
+    """
+    decode = json.loads if orjson is None else orjson.loads
+    jsonl_index = get_jsonl_index()
+    offset = 0
+    try:
+        with open_jsonl(jsonl_path) as jsonl_file, JsonlIds() as found_ids:
+            for line_number, line in enumerate(jsonl_file, 1):
+                line_offset = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = decode(line)
+                except ValueError:
+                    record = None
+                record_id = get_record_id(record, id_field, line_number)
+                while not found_ids.add(record_id):
+                    record_id = f"{record_id}@{MISSING_ID_PREFIX}{line_number}"
+                notebook_path = f"{jsonl_path}{ARCHIVE_SEPARATOR}{record_id}"
+                if jsonl_index is not None:
+                    jsonl_index.add(
+                        notebook_path, JsonlRecord(jsonl_path, line_offset, len(line)), record
+                    )
+                yield notebook_path
+    except (*ARCHIVE_READ_ERRORS, sqlite3.Error) as error:
+        raise ArchiveError(f"Could not read the JSON Lines file {jsonl_path!r}: {error}")
+
+
+def read_notebook_bytes(notebook_path: str) -> bytes:
+    """Read the raw content of a notebook, which can be compressed or inside of an archive.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path of a notebook, a compressed notebook or virtual path inside of an archive
+        or JSON Lines file.
+
+    Returns
+    -------
+    bytes
+        Decompressed content of the notebook.
+
+    Raises
+    ------
+    ValueError
+        If the archive or compressed file is corrupt or has no such member or
+        the record of a JSON Lines file wasn't found by :func:`iter_jsonl_notebooks`,
+        so it is handled like a notebook with invalid content.
+    """
+    jsonl_record = get_jsonl_record(notebook_path)
+    if jsonl_record is not None:
+        try:
+            return get_jsonl_reader(jsonl_record.jsonl_path).read(
+                jsonl_record.offset, jsonl_record.size
+            )
+        except ARCHIVE_READ_ERRORS as error:
+            close_archive_reader()
+            raise ValueError(f"Could not read {notebook_path!r}: {error}") from error
+    if split_jsonl_path(notebook_path) is not None:
+        raise ValueError(
+            f"Could not read {notebook_path!r}: records of JSON Lines files can only be "
+            "read after they were found."
+        )
+    archive_member = split_archive_path(notebook_path)
+    if archive_member is None and not is_compressed_notebook(notebook_path):
+        with open(notebook_path, "rb") as notebook_file:
+            return notebook_file.read()
+    try:
+        if archive_member is not None:
+            return get_archive_reader(archive_member[0]).read(archive_member[1])
+        with open(notebook_path, "rb") as raw_file:
+            if notebook_path.lower().endswith(ZSTD_SUFFIXES):
+                with open_zstd(raw_file, notebook_path) as notebook_file:
+                    return notebook_file.read()
+            with gzip.GzipFile(fileobj=raw_file) as notebook_file:
+                return notebook_file.read()
+    except (KeyError, *ARCHIVE_READ_ERRORS) as error:
+        if archive_member is not None:
+            close_archive_reader()
+        raise ValueError(f"Could not read {notebook_path!r}: {error}") from error
+
+
+def get_notebook_size(notebook_path: str) -> int:
+    """Size of a notebook in bytes, without reading it.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path of a notebook, a compressed notebook or virtual path inside of an archive
+        or JSON Lines file.
+
+    Returns
+    -------
+    int
+        Uncompressed size for notebooks inside of archives, the size of the record
+        for notebooks of JSON Lines files and the file size otherwise.
+    """
+    jsonl_record = get_jsonl_record(notebook_path)
+    if jsonl_record is not None:
+        return jsonl_record.size
+    archive_member = split_archive_path(notebook_path)
+    if archive_member is None:
+        return os.path.getsize(notebook_path)
+    return get_archive_reader(archive_member[0]).get_size(archive_member[1])
+
+
+def get_notebook_mtime(notebook_path: str) -> float:
+    """Modification time of a notebook, which is the one of the file it is in (i.e. an archive).
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path of a notebook, a compressed notebook or virtual path inside of an archive
+        or JSON Lines file.
+
+    Returns
+    -------
+    float
+        Modification time in seconds since the epoch.
+    """
+    container = split_archive_path(notebook_path) or split_jsonl_path(notebook_path)
+    return os.path.getmtime(notebook_path if container is None else container[0])
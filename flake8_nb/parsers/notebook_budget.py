@@ -0,0 +1,407 @@
+"""Module for limiting the resources a single notebook can use while it is parsed and checked.
+
+One pathological notebook (i.e. with huge outputs, a generated cell with
+thousands of lines or a line that makes a regex backtrack) shouldn't block
+the whole run. Notebooks which exceed the budget are skipped with a
+``NotebookBudgetWarning`` instead.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+import threading
+import warnings
+from contextlib import contextmanager
+from multiprocessing.pool import Pool
+from types import FrameType
+from typing import Any
+from typing import Collection
+from typing import Iterator
+from typing import NamedTuple
+
+from flake8_nb.parsers.notebook_archives import close_archive_reader
+from flake8_nb.parsers.notebook_archives import get_notebook_size
+from flake8_nb.parsers.notebook_parsers import NON_PYTHON_CELL_MAGICS
+from flake8_nb.parsers.notebook_parsers import InputLineMapping
+from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
+from flake8_nb.parsers.notebook_parsers import cells_to_intermediate_code
+from flake8_nb.parsers.notebook_parsers import create_temp_path
+from flake8_nb.parsers.notebook_parsers import get_notebook_code_cells
+from flake8_nb.parsers.notebook_parsers import get_source_map_path
+from flake8_nb.parsers.notebook_parsers import warn_skipped_notebook
+from flake8_nb.parsers.notebook_parsers import write_intermediate_py_file
+
+
+class NotebookBudget(NamedTuple):
+    """Limits for a single notebook, where ``0`` means unlimited.
+
+    The limits are:
+    * ``max_bytes``
+        Size of the notebook file, checked before the notebook is read.
+    * ``max_code_lines``
+        Number of lines of all code cells, checked before the code is parsed.
+    * ``max_seconds``
+        Wall time to parse the notebook, enforced by a ``NotebookWatchdog``,
+        and wall time to check the parsed notebook, enforced by ``check_time_limit``.
+    """
+
+    max_bytes: int = 0
+    max_code_lines: int = 0
+    max_seconds: float = 0
+
+
+class NotebookBudgetWarning(UserWarning):
+    """Warning that is given when a notebook is skipped since it exceeded its budget."""
+
+    skip_reason = "budget"
+    """Reason of the skipped notebook, see ``record_skip_reasons``."""
+
+    def __init__(self, notebook_path: str, reason: str):
+        """Initialize NotebookBudgetWarning.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Path to a notebook
+        reason : str
+            Description of the exceeded limit.
+        """
+        self.notebook_path = notebook_path
+        self.reason = reason
+        super().__init__(f"Skipped notebook at path '{notebook_path}', since {reason}.")
+
+    def __reduce__(self) -> tuple[type[NotebookBudgetWarning], tuple[str, str]]:
+        """Pickle the warning by its arguments, i.e. to send it from a worker process.
+
+        Returns
+        -------
+        tuple[type[NotebookBudgetWarning], tuple[str, str]]
+            Class and arguments to recreate the warning.
+        """
+        return type(self), (self.notebook_path, self.reason)
+
+
+def create_intermediate_py_file_within_budget(
+    notebook_path: str,
+    intermediate_dir_base_path: str,
+    budget: NotebookBudget,
+    skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+) -> tuple[str, InputLineMapping]:
+    """Parse a notebook like ``create_intermediate_py_file``, unless it exceeds the budget.
+
+    The time limit isn't enforced here, see ``NotebookWatchdog``.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path to a notebook.
+    intermediate_dir_base_path : str
+        Path pointing to the position the parsed notebook
+        will be saved to.
+    budget : NotebookBudget
+        Limits of the notebook.
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
+
+    Returns
+    -------
+    tuple[str, InputLineMapping]
+        (``intermediate_file_path``, ``input_line_mapping``) Where
+        ``intermediate_file_path`` is ``""`` if the notebook was skipped.
+
+    See Also
+    --------
+    flake8_nb.parsers.notebook_parsers.create_intermediate_py_file
+
+    Warns
+    -----
+    NotebookBudgetWarning
+        If the notebook exceeded the budget.
+    InvalidNotebookWarning
+        If the notebook couldn't be parsed.
+
+
+    .. # noqa: DAR402
+    """
+    intermediate_code, input_line_mapping = notebook_to_intermediate_code_within_budget(
+        notebook_path, budget, skipped_cell_magics
+    )
+    intermediate_file_path = write_intermediate_py_file(
+        notebook_path, intermediate_dir_base_path, intermediate_code, input_line_mapping
+    )
+    return intermediate_file_path, input_line_mapping
+
+
+def notebook_to_intermediate_code_within_budget(
+    notebook_path: str,
+    budget: NotebookBudget,
+    skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+) -> tuple[str, InputLineMapping]:
+    """Parse a notebook like ``notebook_to_intermediate_code``, unless it exceeds the budget.
+
+    The time limit isn't enforced here, see ``NotebookWatchdog`` and ``check_time_limit``.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path to a notebook.
+    budget : NotebookBudget
+        Limits of the notebook.
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
+
+    Returns
+    -------
+    tuple[str, InputLineMapping]
+        (``intermediate_code``, ``input_line_mapping``) Where
+        ``intermediate_code`` is ``""`` if the notebook was skipped.
+
+    See Also
+    --------
+    flake8_nb.parsers.notebook_parsers.notebook_to_intermediate_code
+
+    Warns
+    -----
+    NotebookBudgetWarning
+        If the notebook exceeded the budget.
+    InvalidNotebookWarning
+        If the notebook couldn't be parsed.
+
+
+    .. # noqa: DAR402
+    """
+    input_line_mapping: InputLineMapping = {"input_ids": [], "code_lines": []}
+    notebook_size = get_notebook_size(notebook_path)
+    if 0 < budget.max_bytes < notebook_size:
+        warn_skipped_notebook(
+            NotebookBudgetWarning(
+                notebook_path, f"it has {notebook_size} bytes (limit {budget.max_bytes})"
+            )
+        )
+        return "", input_line_mapping
+    uses_get_ipython, notebook_cells = get_notebook_code_cells(notebook_path, skipped_cell_magics)
+    code_line_count = sum(len(notebook_cell["source"]) for notebook_cell in notebook_cells)
+    if 0 < budget.max_code_lines < code_line_count:
+        warn_skipped_notebook(
+            NotebookBudgetWarning(
+                notebook_path,
+                f"it has {code_line_count} lines of code (limit {budget.max_code_lines})",
+            )
+        )
+        return "", input_line_mapping
+    return cells_to_intermediate_code(uses_get_ipython, notebook_cells)
+
+
+def _create_intermediate_py_file_in_worker(
+    *args: Any,
+) -> tuple[str, InputLineMapping, list[Warning]]:
+    """Run ``create_intermediate_py_file_within_budget`` and record its warnings.
+
+    Parameters
+    ----------
+    args : Any
+        Arguments passed to ``create_intermediate_py_file_within_budget``.
+
+    Returns
+    -------
+    tuple[str, InputLineMapping, list[Warning]]
+        (``intermediate_file_path``, ``input_line_mapping``, ``warnings``) where ``warnings``
+        are emitted again in the main process.
+    """
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        intermediate_file_path, input_line_mapping = create_intermediate_py_file_within_budget(
+            *args
+        )
+    return (
+        intermediate_file_path,
+        input_line_mapping,
+        [caught_warning.message for caught_warning in caught_warnings],  # type: ignore[misc]
+    )
+
+
+class NotebookWatchdog:
+    """Worker process parsing notebooks, which is killed if a notebook exceeds the time limit.
+
+    A separate process is used since a thread can't be stopped and a backtracking
+    regex doesn't release the GIL, so it would block the whole run anyway.
+    The worker process is reused until it gets killed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize NotebookWatchdog, the worker process is started on first use."""
+        self._pool: Pool | None = None
+
+    def __enter__(self) -> NotebookWatchdog:
+        """Use the watchdog as context manager, which stops the worker process on exit.
+
+        Returns
+        -------
+        NotebookWatchdog
+            The watchdog itself.
+        """
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the worker process.
+
+        Parameters
+        ----------
+        exc_info : object
+            Exception information, which is ignored.
+        """
+        self.close()
+
+    def create_intermediate_py_file(
+        self,
+        notebook_path: str,
+        intermediate_dir_base_path: str,
+        budget: NotebookBudget,
+        skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+    ) -> tuple[str, InputLineMapping]:
+        """Parse a notebook in the worker process, within ``budget.max_seconds``.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Path to a notebook.
+        intermediate_dir_base_path : str
+            Path pointing to the position the parsed notebook
+            will be saved to.
+        budget : NotebookBudget
+            Limits of the notebook.
+        skipped_cell_magics : Collection[str]
+            Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
+
+        Returns
+        -------
+        tuple[str, InputLineMapping]
+            (``intermediate_file_path``, ``input_line_mapping``) Where
+            ``intermediate_file_path`` is ``""`` if the notebook was skipped.
+
+        See Also
+        --------
+        create_intermediate_py_file_within_budget
+
+        Warns
+        -----
+        NotebookBudgetWarning
+            If the notebook exceeded the budget.
+        InvalidNotebookWarning
+            If the notebook couldn't be parsed.
+
+
+        .. # noqa: DAR402
+        """
+        if self._pool is None:
+            # the forked worker would otherwise share the position in an open archive
+            close_archive_reader()
+            self._pool = multiprocessing.Pool(1)
+        async_result = self._pool.apply_async(
+            _create_intermediate_py_file_in_worker,
+            (notebook_path, intermediate_dir_base_path, budget, skipped_cell_magics),
+        )
+        try:
+            intermediate_file_path, input_line_mapping, caught_warnings = async_result.get(
+                budget.max_seconds or None
+            )
+        except multiprocessing.TimeoutError:
+            self.close()
+            intermediate_file_path = create_temp_path(notebook_path, intermediate_dir_base_path)
+            for partial_file_path in (
+                intermediate_file_path,
+                get_source_map_path(intermediate_file_path),
+            ):
+                if os.path.exists(partial_file_path):
+                    os.remove(partial_file_path)
+            warn_skipped_notebook(
+                NotebookBudgetWarning(
+                    notebook_path, f"parsing it took longer than {budget.max_seconds}s"
+                )
+            )
+            return "", {"input_ids": [], "code_lines": []}
+        for caught_warning in caught_warnings:
+            if isinstance(caught_warning, (InvalidNotebookWarning, NotebookBudgetWarning)):
+                warn_skipped_notebook(caught_warning)
+            else:
+                warnings.warn(caught_warning)
+        return intermediate_file_path, input_line_mapping
+
+    def close(self) -> None:
+        """Stop the worker process if it is running."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+class NotebookCheckTimeout(BaseException):
+    """Exception raised in the checks of a notebook, which exceeded its time limit.
+
+    It isn't derived from ``Exception``, so ``flake8`` doesn't wrap it in a
+    ``PluginExecutionFailed`` error, when it is raised inside of a plugin.
+    """
+
+
+def _raise_check_timeout(signal_number: int, frame: FrameType | None) -> None:
+    """Signal handler raising ``NotebookCheckTimeout``.
+
+    Parameters
+    ----------
+    signal_number : int
+        Number of the signal (``SIGALRM``).
+    frame : FrameType | None
+        Frame the signal interrupted.
+
+    Raises
+    ------
+    NotebookCheckTimeout
+        Always.
+    """
+    raise NotebookCheckTimeout()
+
+
+@contextmanager
+def check_time_limit(max_seconds: float) -> Iterator[None]:
+    """Raise ``NotebookCheckTimeout`` in the code of the block, once it ran ``max_seconds``.
+
+    The limit is enforced with a ``SIGALRM`` timer, which also interrupts a backtracking
+    regex, since the regex engine checks for signals. Signals are only available on POSIX
+    systems and handled by the main thread, so this does nothing on other systems and
+    off the main thread (i.e. runs in a thread pool): the block runs without limit.
+    The checks of ``--jobs`` run in the main thread of the worker processes.
+
+    Parameters
+    ----------
+    max_seconds : float
+        Time limit in seconds, ``0`` means unlimited.
+
+    Yields
+    ------
+    None
+        Nothing, the block runs with the time limit.
+
+    Raises
+    ------
+    NotebookCheckTimeout
+        If the block ran longer than ``max_seconds``.
+
+
+    .. # noqa: DAR402
+    """
+    if (
+        max_seconds <= 0
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+    previous_handler = signal.signal(signal.SIGALRM, _raise_check_timeout)
+    signal.setitimer(signal.ITIMER_REAL, max_seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
@@ -0,0 +1,522 @@
+"""Module for splitting parsed notebooks into chunks of cells, which are checked in parallel.
+
+A notebook is checked as a single parsed notebook, so one generated notebook
+with thousands of cells keeps one ``flake8`` job busy while the others are idle.
+Splitting its cells into chunks lets all jobs share the work.
+
+Checks like unused imports (F401) or undefined names (F821) need to know the
+names of the whole notebook. So a cheap pre-pass collects the imported, bound
+and used names of each cell and every chunk gets:
+
+* a prelude, which repeats (and uses) the imports and binds the names of the preceding chunks
+* a postlude, which binds the names of the following chunks (i.e. for functions
+  using them) and uses its imports, which are used by other chunks
+
+Those lines end with ``# noqa`` and the source map of a chunk only maps its own cells.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+import re
+from typing import Iterator
+from typing import NamedTuple
+from typing import Sequence
+
+from flake8_nb.parsers import CellId
+from flake8_nb.parsers.cell_parsers import get_cell_separator
+from flake8_nb.parsers.notebook_parsers import InputLineMapping
+from flake8_nb.parsers.notebook_parsers import write_source_map
+
+SCOPE_NODES = (
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.DictComp,
+    ast.FunctionDef,
+    ast.GeneratorExp,
+    ast.Lambda,
+    ast.ListComp,
+    ast.SetComp,
+)
+"""Nodes which open a new scope, so names bound in them aren't bound at the module level."""
+
+IMPORT_ALLOWED_NODES = tuple(
+    getattr(ast, node_name)
+    for node_name in ("If", "Try", "TryStar", "With")
+    if hasattr(ast, node_name)
+)
+"""Statements after which imports are still considered at the top of the file (E402)."""
+
+DEFERRED_NODES = (ast.AsyncFunctionDef, ast.FunctionDef, ast.Lambda)
+"""Nodes whose bodies ``pyflakes`` only checks at the end of the module."""
+
+DUNDER_PATTERN = re.compile(r"^__\w+__$")
+
+
+class CellNames(NamedTuple):
+    """Names of a parsed notebook cell, collected by ``collect_cell_names``.
+
+    The names are:
+    * ``imports``
+        Code of the import statements at the top level of the cell.
+    * ``imported_names``
+        Names bound by those import statements.
+    * ``bound_names``
+        Other names bound at the module level.
+    * ``used_names``
+        Names which are used anywhere in the cell.
+    * ``undeferred_used_names``
+        Names which are used outside of the bodies of functions, which ``pyflakes``
+        checks when it reaches them instead of at the end of the module.
+    * ``has_non_imports``
+        Whether the cell has statements, after which an import isn't at the top of the file.
+    """
+
+    imports: list[str]
+    imported_names: set[str]
+    bound_names: set[str]
+    used_names: set[str]
+    undeferred_used_names: set[str]
+    has_non_imports: bool
+
+
+def iter_module_scope_nodes(node: ast.AST) -> Iterator[ast.AST]:
+    """Iterate over all nodes below ``node``, without descending into new scopes.
+
+    Parameters
+    ----------
+    node : ast.AST
+        Node to start at, i.e. the module of a cell.
+
+    Yields
+    ------
+    ast.AST
+        Nodes at the same scope as ``node`` and the nodes opening a new scope.
+    """
+    for child_node in ast.iter_child_nodes(node):
+        yield child_node
+        if not isinstance(child_node, SCOPE_NODES):
+            yield from iter_module_scope_nodes(child_node)
+
+
+def iter_undeferred_nodes(node: ast.AST) -> Iterator[ast.AST]:
+    """Iterate over all nodes below ``node``, without descending into the bodies of functions.
+
+    The decorators, defaults and annotations of functions are still included,
+    since they are evaluated when the function is defined.
+
+    Parameters
+    ----------
+    node : ast.AST
+        Node to start at, i.e. the module of a cell.
+
+    Yields
+    ------
+    ast.AST
+        Nodes outside of the bodies of functions.
+    """
+    if isinstance(node, DEFERRED_NODES):
+        body = node.body if isinstance(node.body, list) else [node.body]
+        child_nodes = [
+            child_node
+            for child_node in ast.iter_child_nodes(node)
+            if not any(child_node is statement for statement in body)
+        ]
+    else:
+        child_nodes = list(ast.iter_child_nodes(node))
+    for child_node in child_nodes:
+        yield child_node
+        yield from iter_undeferred_nodes(child_node)
+
+
+def get_alias_name(alias: ast.alias) -> str:
+    """Name an imported alias is bound to.
+
+    Parameters
+    ----------
+    alias : ast.alias
+        Alias of an import statement.
+
+    Returns
+    -------
+    str
+        Name bound by the alias, i.e. ``os`` for ``import os.path``.
+    """
+    return alias.asname or alias.name.split(".")[0]
+
+
+def is_future_import(statement: ast.Import | ast.ImportFrom) -> bool:
+    """Whether ``statement`` is a ``__future__`` import, which doesn't bind a name.
+
+    Parameters
+    ----------
+    statement : ast.Import | ast.ImportFrom
+        Import statement.
+
+    Returns
+    -------
+    bool
+        ``True`` for ``from __future__ import ...``.
+    """
+    return isinstance(statement, ast.ImportFrom) and statement.module == "__future__"
+
+
+def import_to_code(statement: ast.Import | ast.ImportFrom) -> str:
+    """Recreate the code of an import statement on a single line.
+
+    Parameters
+    ----------
+    statement : ast.Import | ast.ImportFrom
+        Import statement.
+
+    Returns
+    -------
+    str
+        Code of the import statement.
+    """
+    aliases = ", ".join(
+        f"{alias.name} as {alias.asname}" if alias.asname else alias.name
+        for alias in statement.names
+    )
+    if isinstance(statement, ast.Import):
+        return f"import {aliases}"
+    return f"from {'.' * statement.level}{statement.module or ''} import {aliases}"
+
+
+def is_non_import(statement: ast.stmt) -> bool:
+    """Whether an import after ``statement`` isn't at the top of the file anymore (E402).
+
+    Parameters
+    ----------
+    statement : ast.stmt
+        Statement at the top level of a cell.
+
+    Returns
+    -------
+    bool
+        ``False`` for imports, docstrings, dunder assignments and
+        statements like ``if`` or ``try``, which may contain imports.
+    """
+    if isinstance(statement, (ast.Import, ast.ImportFrom, *IMPORT_ALLOWED_NODES)):
+        return False
+    if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant):
+        return not isinstance(statement.value.value, str)
+    if isinstance(statement, (ast.Assign, ast.AnnAssign)):
+        targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+        return not all(
+            isinstance(target, ast.Name) and DUNDER_PATTERN.match(target.id) for target in targets
+        )
+    return True
+
+
+def collect_cell_names(cell_code: str) -> CellNames:
+    """Collect the names of a parsed notebook cell.
+
+    Parameters
+    ----------
+    cell_code : str
+        Code of the cell in the parsed notebook.
+
+    Returns
+    -------
+    CellNames
+        Names of the cell, which are empty if the cell has a syntax error.
+    """
+    try:
+        module = ast.parse(cell_code)
+    except (SyntaxError, ValueError):
+        return CellNames([], set(), set(), set(), set(), True)
+    imports: list[str] = []
+    imported_names: set[str] = set()
+    for statement in module.body:
+        if isinstance(statement, (ast.Import, ast.ImportFrom)):
+            if is_future_import(statement):
+                continue
+            imports.append(import_to_code(statement))
+            imported_names.update(
+                get_alias_name(alias) for alias in statement.names if alias.name != "*"
+            )
+    bound_names: set[str] = set()
+    for node in iter_module_scope_nodes(module):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            bound_names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound_names.add(node.name)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound_names.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)) and not is_future_import(node):
+            bound_names.update(get_alias_name(alias) for alias in node.names if alias.name != "*")
+    used_names = {
+        node.id
+        for node in ast.walk(module)
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+    }
+    undeferred_used_names = {
+        node.id
+        for node in iter_undeferred_nodes(module)
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+    }
+    return CellNames(
+        imports,
+        imported_names,
+        bound_names - imported_names,
+        used_names,
+        undeferred_used_names,
+        any(is_non_import(statement) for statement in module.body),
+    )
+
+
+def create_chunk_prelude(preceding_cell_names: Sequence[CellNames]) -> list[str]:
+    """Create the lines at the start of a chunk, which stand in for the preceding chunks.
+
+    Imports which are used after their last import in the preceding chunks are
+    used in the prelude as well, so importing them again in the chunk is only
+    reported as redefinition (F811), if it is reported when checking the whole notebook.
+    Uses inside of functions don't count, since ``pyflakes`` only checks the bodies
+    of functions after the rest of the module.
+
+    Parameters
+    ----------
+    preceding_cell_names : Sequence[CellNames]
+        Names of the cells of all preceding chunks.
+
+    Returns
+    -------
+    list[str]
+        Lines of the prelude, the blank lines before the first cell belong to the cell.
+    """
+    imports = list(dict.fromkeys(code for names in preceding_cell_names for code in names.imports))
+    last_import_indexes = {
+        name: index
+        for index, names in enumerate(preceding_cell_names)
+        for name in names.imported_names
+    }
+    used_imports = {
+        name
+        for name, index in last_import_indexes.items()
+        if any(name in names.undeferred_used_names for names in preceding_cell_names[index:])
+    }
+    bound_names = set().union(*(names.bound_names for names in preceding_cell_names))
+    bound_names -= set(last_import_indexes)
+    prelude_lines = [f"{code}  # noqa\n" for code in imports]
+    # indented lines don't end the imports at the top of the file (E402)
+    if used_imports or bound_names:
+        prelude_lines.append("if True:  # noqa\n")
+        prelude_lines.extend(f"    {name}  # noqa\n" for name in sorted(used_imports))
+        prelude_lines.extend(f"    {name} = None  # noqa\n" for name in sorted(bound_names))
+    if any(names.has_non_imports for names in preceding_cell_names):
+        prelude_lines.append("pass  # noqa\n")
+    return prelude_lines
+
+
+def create_chunk_postlude(
+    chunk_cell_names: Sequence[CellNames],
+    preceding_cell_names: Sequence[CellNames],
+    following_cell_names: Sequence[CellNames],
+) -> list[str]:
+    """Create the lines at the end of a chunk, which stand in for the other chunks.
+
+    Parameters
+    ----------
+    chunk_cell_names : Sequence[CellNames]
+        Names of the cells of the chunk.
+    preceding_cell_names : Sequence[CellNames]
+        Names of the cells of all preceding chunks.
+    following_cell_names : Sequence[CellNames]
+        Names of the cells of all following chunks.
+
+    Returns
+    -------
+    list[str]
+        Lines of the postlude, including the blank lines separating it from the last cell.
+    """
+
+    def get_names(cell_names: Sequence[CellNames], *fields: str) -> set[str]:
+        """Join the names of ``cell_names`` stored in ``fields``.
+
+        Parameters
+        ----------
+        cell_names : Sequence[CellNames]
+            Names of cells.
+        fields : str
+            Names of the ``CellNames`` fields to join.
+
+        Returns
+        -------
+        set[str]
+            Union of the names.
+        """
+        return set().union(*(getattr(names, field) for names in cell_names for field in fields))
+
+    following_names = get_names(following_cell_names, "imported_names", "bound_names")
+    # imports rebound by a following chunk are reported there as redefinition (F811)
+    used_imports = get_names(chunk_cell_names, "imported_names") & (
+        get_names([*preceding_cell_names, *following_cell_names], "used_names") | following_names
+    )
+    following_names -= get_names(
+        [*preceding_cell_names, *chunk_cell_names], "imported_names", "bound_names"
+    )
+    postlude_lines = [
+        *(f"{name}  # noqa\n" for name in sorted(used_imports)),
+        *(f"{name} = None  # noqa\n" for name in sorted(following_names)),
+    ]
+    return ["\n", "\n", *postlude_lines] if postlude_lines else []
+
+
+def find_cell_starts(lines: Sequence[str], input_ids: Sequence[CellId]) -> list[int] | None:
+    """Find the index of the first line of each cell in the lines of a parsed notebook.
+
+    A cell starts with the blank lines before its separator line, so the checks
+    of blank lines (i.e. E303) see the same lines in a chunk as in the whole notebook.
+    The ``code_lines`` of the source map can't be used for this, since they count the
+    source entries of a cell and a source entry can span several lines.
+
+    Parameters
+    ----------
+    lines : Sequence[str]
+        Lines of the parsed notebook.
+    input_ids : Sequence[CellId]
+        Ids of the cells in the parsed notebook.
+
+    Returns
+    -------
+    list[int] | None
+        Index of the first line of each cell or ``None`` if a separator is missing.
+    """
+    cell_starts: list[int] = []
+    line_index = 0
+    for input_id in input_ids:
+        separator = get_cell_separator(input_id)
+        while line_index < len(lines) and lines[line_index].rstrip("\r\n") != separator:
+            line_index += 1
+        if line_index == len(lines):
+            return None
+        cell_start = line_index
+        while (
+            cell_start > (cell_starts[-1] + 1 if cell_starts else 0)
+            and not lines[cell_start - 1].strip()
+        ):
+            cell_start -= 1
+        cell_starts.append(cell_start)
+        line_index += 1
+    return cell_starts
+
+
+def split_intermediate_code(
+    intermediate_code: str, input_line_mapping: InputLineMapping, chunk_cells: int
+) -> list[tuple[str, InputLineMapping]]:
+    """Split the code of a parsed notebook into chunks of ``chunk_cells`` cells.
+
+    Parameters
+    ----------
+    intermediate_code : str
+        Code of the parsed notebook.
+    input_line_mapping : InputLineMapping
+        Mapping of the cells to their lines in the parsed notebook.
+    chunk_cells : int
+        Maximum number of cells per chunk.
+
+    Returns
+    -------
+    list[tuple[str, InputLineMapping]]
+        (``intermediate_code``, ``input_line_mapping``) of each chunk, where the
+        ``code_lines`` are shifted like the lines of the cells, so the lines of
+        a chunk map to the same cell lines as in the whole parsed notebook.
+
+    See Also
+    --------
+    collect_cell_names, create_chunk_prelude, create_chunk_postlude
+    """
+    code_lines: list[int] = input_line_mapping["code_lines"]  # type: ignore[assignment]
+    input_ids: list[CellId] = input_line_mapping["input_ids"]  # type: ignore[assignment]
+    if not code_lines or chunk_cells <= 0:
+        return [(intermediate_code, input_line_mapping)]
+    lines = intermediate_code.splitlines(keepends=True)
+    cell_starts = find_cell_starts(lines, input_ids)
+    if cell_starts is None:
+        return [(intermediate_code, input_line_mapping)]
+    header_lines = lines[: cell_starts[0]]
+    cell_lines = [
+        lines[start:end] for start, end in zip(cell_starts, [*cell_starts[1:], len(lines)])
+    ]
+    cell_names = [collect_cell_names("".join(cell)) for cell in cell_lines]
+    header_names = collect_cell_names("".join(header_lines))
+    chunk_starts = range(0, len(cell_lines), chunk_cells)
+    chunks: list[tuple[str, InputLineMapping]] = []
+    for chunk_start in chunk_starts:
+        chunk_end = chunk_start + chunk_cells
+        preceding_cell_names = [header_names, *cell_names[:chunk_start]]
+        chunk_cell_names = cell_names[chunk_start:chunk_end]
+        if chunk_start == 0:
+            prelude_lines = header_lines
+            chunk_cell_names = [header_names, *chunk_cell_names]
+            preceding_cell_names = []
+        else:
+            prelude_lines = create_chunk_prelude(preceding_cell_names)
+        postlude_lines = create_chunk_postlude(
+            chunk_cell_names, preceding_cell_names, cell_names[chunk_end:]
+        )
+        chunk_code = "".join(
+            line for cell in cell_lines[chunk_start:chunk_end] for line in cell
+        ).rstrip("\n")
+        line_offset = len(prelude_lines) - cell_starts[chunk_start]
+        chunks.append(
+            (
+                f"{''.join(prelude_lines)}{chunk_code}\n{''.join(postlude_lines)}",
+                {
+                    "input_ids": input_ids[chunk_start:chunk_end],
+                    "code_lines": [
+                        code_line + line_offset for code_line in code_lines[chunk_start:chunk_end]
+                    ],
+                },
+            )
+        )
+    return chunks
+
+
+def split_intermediate_py_file(
+    notebook_path: str,
+    intermediate_file_path: str,
+    input_line_mapping: InputLineMapping,
+    chunk_cells: int,
+) -> list[tuple[str, InputLineMapping]]:
+    """Split a parsed notebook into chunk files of ``chunk_cells`` cells with their source maps.
+
+    The first chunk replaces the parsed notebook, the following chunks are saved
+    alongside it as ``{name}.chunk{index}.ipynb_parsed``.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path to the original notebook.
+    intermediate_file_path : str
+        Path of the parsed notebook.
+    input_line_mapping : InputLineMapping
+        Mapping of the cells to their lines in the parsed notebook.
+    chunk_cells : int
+        Maximum number of cells per chunk.
+
+    Returns
+    -------
+    list[tuple[str, InputLineMapping]]
+        (``intermediate_file_path``, ``input_line_mapping``) of each chunk.
+
+    See Also
+    --------
+    split_intermediate_code
+    """
+    with open(intermediate_file_path, encoding="utf8") as intermediate_file:
+        intermediate_code = intermediate_file.read()
+    chunks = split_intermediate_code(intermediate_code, input_line_mapping, chunk_cells)
+    if len(chunks) == 1:
+        return [(intermediate_file_path, input_line_mapping)]
+    root, extension = os.path.splitext(intermediate_file_path)
+    chunk_files: list[tuple[str, InputLineMapping]] = []
+    for index, (chunk_code, chunk_line_mapping) in enumerate(chunks):
+        chunk_file_path = f"{root}.chunk{index}{extension}" if index else intermediate_file_path
+        with open(chunk_file_path, "w", encoding="utf8") as chunk_file:
+            chunk_file.write(chunk_code)
+        write_source_map(chunk_file_path, notebook_path, chunk_line_mapping)
+        chunk_files.append((chunk_file_path, chunk_line_mapping))
+    return chunk_files
@@ -0,0 +1,217 @@
+"""Module for diffing notebooks against a git reference on a cell level.
+
+This is used to only report violations in cells which were added
+or modified compared to the notebook at the git reference.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import cast
+
+from flake8.utils import parse_unified_diff
+
+from flake8_nb.parsers import NotebookCell
+from flake8_nb.parsers.notebook_parsers import NOTEBOOK_DECODE_ERRORS
+from flake8_nb.parsers.notebook_parsers import InputLineMapping
+from flake8_nb.parsers.notebook_parsers import get_json_backend
+from flake8_nb.parsers.notebook_parsers import ignore_cell
+from flake8_nb.parsers.text_notebooks import get_text_notebook_format
+
+ParsedDiff = Dict[str, Set[int]]
+
+
+def is_valid_git_ref(git_ref: str) -> bool:
+    """Check if ``git_ref`` can be resolved to a commit in the current git repository.
+
+    Parameters
+    ----------
+    git_ref : str
+        Git reference (i.e. branch name, tag or commit hash).
+
+    Returns
+    -------
+    bool
+        Whether ``git_ref`` resolves to a commit.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", f"{git_ref}^{{commit}}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return False
+    return result.returncode == 0
+
+
+def read_git_notebook_cells(notebook_path: str, git_ref: str) -> list[NotebookCell]:
+    """Read the cells of the notebook at ``notebook_path`` as it was at ``git_ref``.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path to a notebook.
+    git_ref : str
+        Git reference (i.e. branch name, tag or commit hash).
+
+    Returns
+    -------
+    list[NotebookCell]
+        List of notebook cells at ``git_ref``, or an empty list if the notebook
+        didn't exist or couldn't be parsed at ``git_ref``.
+    """
+    notebook_dir, notebook_name = os.path.split(os.path.abspath(notebook_path))
+    try:
+        result = subprocess.run(
+            ["git", "-C", notebook_dir, "show", f"{git_ref}:./{notebook_name}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return []
+    if result.returncode != 0:
+        return []
+    text_notebook_format = get_text_notebook_format(notebook_path)
+    try:
+        if text_notebook_format is not None:
+            return text_notebook_format.read_cells(result.stdout.decode("utf8"))
+        return get_json_backend()(result.stdout)
+    except NOTEBOOK_DECODE_ERRORS:
+        return []
+
+
+def get_cell_source(notebook_cell: NotebookCell) -> str:
+    """Return the source of ``notebook_cell`` as a single string.
+
+    Parameters
+    ----------
+    notebook_cell : NotebookCell
+        Dict representation of a notebook cell as parsed from JSON.
+
+    Returns
+    -------
+    str
+        Source code of the cell.
+    """
+    source = notebook_cell.get("source", [])
+    if isinstance(source, str):
+        return source
+    return "".join(cast(List[str], source))
+
+
+def get_changed_cell_numbers(
+    old_notebook_cells: list[NotebookCell], new_notebook_cells: list[NotebookCell]
+) -> set[int]:
+    """Determine which code cells were added or modified.
+
+    Cells are matched by their ``id`` if the old notebook has a cell with the same ``id``,
+    otherwise a cell counts as unchanged if a code cell with the same source
+    exists in the old notebook.
+
+    Parameters
+    ----------
+    old_notebook_cells : list[NotebookCell]
+        Cells of the notebook at the git reference.
+    new_notebook_cells : list[NotebookCell]
+        Cells of the current notebook.
+
+    Returns
+    -------
+    set[int]
+        Total cell numbers (starting at 1) of the added or modified code cells,
+        matching ``CellId.total_cell_nr``.
+    """
+    old_sources_by_id = {
+        cell["id"]: get_cell_source(cell) for cell in old_notebook_cells if cell.get("id")
+    }
+    old_code_sources = {
+        get_cell_source(cell) for cell in old_notebook_cells if cell.get("cell_type") == "code"
+    }
+    changed_cell_numbers = set()
+    for index, cell in enumerate(new_notebook_cells):
+        if ignore_cell(cell):
+            continue
+        source = get_cell_source(cell)
+        cell_id = cell.get("id")
+        if cell_id in old_sources_by_id:
+            is_changed = old_sources_by_id[cell_id] != source
+        else:
+            is_changed = source not in old_code_sources
+        if is_changed:
+            changed_cell_numbers.add(index + 1)
+    return changed_cell_numbers
+
+
+def get_changed_intermediate_lines(
+    intermediate_py_file_path: str,
+    input_line_mapping: InputLineMapping,
+    changed_cell_numbers: set[int],
+) -> set[int]:
+    """Map changed cells to the lines they occupy in the intermediate file.
+
+    Parameters
+    ----------
+    intermediate_py_file_path : str
+        Path to the parsed notebook.
+    input_line_mapping : InputLineMapping
+        Mapping of the cells to their lines in the parsed notebook.
+    changed_cell_numbers : set[int]
+        Total cell numbers of the added or modified code cells.
+
+    Returns
+    -------
+    set[int]
+        Line numbers in the intermediate file, which belong to changed cells.
+
+    See Also
+    --------
+    get_changed_cell_numbers, flake8_nb.parsers.notebook_parsers.create_intermediate_py_file
+    """
+    if not changed_cell_numbers:
+        return set()
+    with open(intermediate_py_file_path, encoding="utf8") as intermediate_file:
+        end_line = sum(1 for _ in intermediate_file) + 1
+    code_lines: list[int] = input_line_mapping["code_lines"]  # type: ignore[assignment]
+    changed_lines: set[int] = set()
+    for index, input_id in enumerate(input_line_mapping["input_ids"]):
+        if input_id.total_cell_nr in changed_cell_numbers:  # type: ignore[union-attr]
+            next_start = code_lines[index + 1] if index + 1 < len(code_lines) else end_line
+            changed_lines.update(range(code_lines[index], next_start))
+    return changed_lines
+
+
+def get_git_diff_ranges(git_ref: str, paths: list[str]) -> ParsedDiff:
+    """Get the changed lines of files in ``paths`` compared to ``git_ref``.
+
+    The file names are relative to the current working directory.
+
+    Parameters
+    ----------
+    git_ref : str
+        Git reference (i.e. branch name, tag or commit hash).
+    paths : list[str]
+        Paths to limit the diff to.
+
+    Returns
+    -------
+    ParsedDiff
+        Dict mapping file names to sets of changed line numbers.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "diff", "--relative", "--no-color", "--no-ext-diff", "-U0", git_ref, "--"]
+            + (paths or [os.curdir]),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        )
+    except OSError:
+        return {}
+    if result.returncode != 0:
+        return {}
+    return dict(parse_unified_diff(result.stdout))
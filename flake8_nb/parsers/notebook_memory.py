@@ -0,0 +1,212 @@
+"""Module for reporting the peak memory of a run, to size runners and find memory hogs.
+
+With ``--nb-memory-report`` the peak resident set size (RSS) is recorded after each
+phase of the run and for the worker processes. With ``--nb-memory-trace`` the parsing
+of each notebook is traced with :mod:`tracemalloc`, to find the notebooks which need
+the most memory and the allocations after parsing the most demanding one.
+The notebooks are observed with the ``notebook_discovered`` and ``notebook_parsed``
+events (see ``flake8_nb.events``).
+"""
+
+from __future__ import annotations
+
+import heapq
+import sys
+import tracemalloc
+from typing import Any
+from typing import NamedTuple
+
+from flake8_nb.events import add_listener
+from flake8_nb.events import remove_listener
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # windows
+    resource = None  # type: ignore[assignment]
+
+TRACEMALLOC_FRAMES = 1
+IGNORED_ALLOCATIONS = (
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+)
+"""Allocations of ``tracemalloc`` and the import system, which aren't reported."""
+
+
+class NotebookMemory(NamedTuple):
+    """Memory needed to parse a notebook."""
+
+    traced_peak: int
+    """Peak of the traced memory while parsing, above the traced memory before"""
+    notebook_path: str
+    notebook_bytes: int
+
+
+def get_peak_rss(children: bool = False) -> int | None:
+    """Peak resident set size of this process or its terminated child processes.
+
+    Parameters
+    ----------
+    children : bool
+        Whether to get the peak of the largest terminated child process
+        (i.e. a worker of ``--jobs``, but any other child process as well), by default False
+
+    Returns
+    -------
+    int | None
+        Peak RSS in bytes or None if it isn't available (on windows).
+    """
+    if resource is None:  # pragma: no cover
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    max_rss = resource.getrusage(who).ru_maxrss
+    # linux reports KiB and macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def format_bytes(size: float) -> str:
+    """Format a size in bytes human readable.
+
+    Parameters
+    ----------
+    size : float
+        Size in bytes.
+
+    Returns
+    -------
+    str
+        I.e. ``512 B``, ``1.5 KiB`` or ``20.0 MiB``.
+    """
+    if abs(size) < 1024:
+        return f"{size:.0f} B"
+    for unit in ("KiB", "MiB", "GiB"):
+        size /= 1024
+        if abs(size) < 1024 or unit == "GiB":
+            break
+    return f"{size:.1f} {unit}"
+
+
+class MemoryReport:
+    """Peak memory of a run, which is printed at exit."""
+
+    def __init__(self, trace_count: int = 0) -> None:
+        """Initialize MemoryReport.
+
+        Parameters
+        ----------
+        trace_count : int
+            Number of notebooks and allocations to report by tracing the parsing
+            of the notebooks with ``tracemalloc``, by default 0 which doesn't trace
+        """
+        self.trace_count = trace_count
+        self.phase_peak_rss: dict[str, int | None] = {}
+        """Peak RSS of the run at the end of each phase"""
+        self.notebooks: list[NotebookMemory] = []
+        """Traced notebooks with the highest traced peak"""
+        self.snapshot: tracemalloc.Snapshot | None = None
+        """Allocations after parsing the notebook with the highest traced peak"""
+        self._started_tracemalloc = False
+        self._traced_before = 0
+
+    @property
+    def is_tracing(self) -> bool:
+        """Whether the parsing of the notebooks is traced.
+
+        The traced peak of each notebook needs ``tracemalloc.reset_peak`` (Python>=3.9).
+
+        Returns
+        -------
+        bool
+            ``True`` if notebooks are traced.
+        """
+        return self.trace_count > 0 and hasattr(tracemalloc, "reset_peak")
+
+    def start(self) -> None:
+        """Start tracing the parsing of the notebooks, if requested."""
+        if self.is_tracing:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+                self._started_tracemalloc = True
+            add_listener("notebook_discovered", self.handle_notebook_event)
+            add_listener("notebook_parsed", self.handle_notebook_event)
+
+    def stop(self) -> None:
+        """Stop tracing the parsing of the notebooks."""
+        remove_listener("notebook_discovered", self.handle_notebook_event)
+        remove_listener("notebook_parsed", self.handle_notebook_event)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def handle_notebook_event(self, event_name: str, info: dict[str, Any]) -> None:
+        """Listener tracing the memory of a notebook from its discovery until it's parsed.
+
+        Parameters
+        ----------
+        event_name : str
+            ``notebook_discovered`` or ``notebook_parsed``.
+        info : dict[str, Any]
+            Information of the event.
+        """
+        if event_name == "notebook_discovered":
+            tracemalloc.reset_peak()
+            self._traced_before = tracemalloc.get_traced_memory()[0]
+            return
+        notebook_memory = NotebookMemory(
+            tracemalloc.get_traced_memory()[1] - self._traced_before,
+            info["notebook_path"],
+            info["notebook_bytes"],
+        )
+        if not self.notebooks or notebook_memory.traced_peak > self.notebooks[0].traced_peak:
+            # the snapshot is only taken for a new maximum, since it's expensive
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, pattern) for pattern in IGNORED_ALLOCATIONS]
+            )
+        self.notebooks = heapq.nlargest(self.trace_count, [*self.notebooks, notebook_memory])
+
+    def record_phase(self, phase: str) -> None:
+        """Record the peak RSS of the run at the end of a phase.
+
+        Parameters
+        ----------
+        phase : str
+            Name of the phase (i.e. ``initialize``, ``check`` or ``report``).
+        """
+        self.phase_peak_rss[phase] = get_peak_rss()
+
+    def format_report(self) -> str:
+        """Format the report, which is printed at exit.
+
+        Returns
+        -------
+        str
+            The report.
+        """
+        lines = ["Memory report:", "  Peak RSS at the end of each phase:"]
+        for phase, peak_rss in self.phase_peak_rss.items():
+            lines.append(
+                f"    {phase}: {'unavailable' if peak_rss is None else format_bytes(peak_rss)}"
+            )
+        # besides the workers of --jobs this includes i.e. the watchdog of --nb-max-seconds
+        child_peak_rss = get_peak_rss(children=True)
+        if child_peak_rss:
+            lines.append(
+                f"  Peak RSS of the largest child process: {format_bytes(child_peak_rss)}"
+            )
+        if self.notebooks:
+            lines.append("  Notebooks with the highest traced memory while parsing:")
+            lines.extend(
+                f"    {format_bytes(notebook.traced_peak)}: {notebook.notebook_path} "
+                f"({format_bytes(notebook.notebook_bytes)})"
+                for notebook in self.notebooks
+            )
+        if self.snapshot is not None:
+            lines.append(f"  Top allocations after parsing {self.notebooks[0].notebook_path}:")
+            lines.extend(
+                f"    {format_bytes(statistic.size)}: {statistic.traceback} "
+                f"({statistic.count} blocks)"
+                for statistic in self.snapshot.statistics("lineno")[: self.trace_count]
+            )
+        return "\n".join(lines)
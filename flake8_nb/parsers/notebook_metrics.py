@@ -0,0 +1,249 @@
+"""Module for collecting metrics of a run, to monitor scheduled runs like a service.
+
+The metrics are written in the Prometheus text exposition format (``--nb-metrics-file``),
+so they can be scraped i.e. by the textfile collector of the node_exporter.
+All metrics are gauges describing the last run, since each run replaces the file.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import Counter
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import Iterable
+from typing import Mapping
+from typing import Tuple
+
+if TYPE_CHECKING:
+    from flake8.statistics import Statistics
+
+MetricSamples = Iterable[Tuple[Dict[str, str], float]]
+
+METRIC_PREFIX = "flake8_nb"
+
+SKIP_REASONS = ("invalid", "empty", "budget")
+"""Reasons a notebook is skipped: it isn't a valid notebook, it has no code
+or it exceeded its budget (see ``flake8_nb.parsers.notebook_budget``)."""
+
+
+def escape_label_value(value: str) -> str:
+    """Escape a label value for the Prometheus text format.
+
+    Parameters
+    ----------
+    value : str
+        Value of a label.
+
+    Returns
+    -------
+    str
+        Value with escaped backslashes, double quotes and line feeds.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_metric(name: str, help_text: str, samples: MetricSamples) -> str:
+    """Format the samples of a gauge in the Prometheus text format.
+
+    Parameters
+    ----------
+    name : str
+        Name of the metric, without the ``flake8_nb_`` prefix.
+    help_text : str
+        Description of the metric.
+    samples : MetricSamples
+        (``labels``, ``value``) of each sample.
+
+    Returns
+    -------
+    str
+        ``HELP`` and ``TYPE`` lines, followed by a line for each sample.
+    """
+    metric_name = f"{METRIC_PREFIX}_{name}"
+    lines = [f"# HELP {metric_name} {help_text}", f"# TYPE {metric_name} gauge"]
+    for labels, value in samples:
+        label_str = ",".join(
+            f'{label}="{escape_label_value(label_value)}"' for label, label_value in labels.items()
+        )
+        sample_name = f"{metric_name}{{{label_str}}}" if label_str else metric_name
+        lines.append(f"{sample_name} {value}")
+    return "\n".join(lines)
+
+
+class NotebookMetrics:
+    """Metrics of a run, collected by the notebook session and the application."""
+
+    def __init__(self) -> None:
+        """Initialize NotebookMetrics with all metrics at zero."""
+        self.notebooks_discovered = 0
+        """Number of notebooks found, which were going to be parsed"""
+        self.notebooks_converted = 0
+        """Number of notebooks parsed to a parsed notebook"""
+        self.notebooks_skipped: Counter[str] = Counter({reason: 0 for reason in SKIP_REASONS})
+        """Number of notebooks skipped, by reason (see ``SKIP_REASONS``)"""
+        self.notebook_bytes = 0
+        """Size of all notebook files which were read"""
+        self.code_cells = 0
+        """Number of code cells of all parsed notebooks"""
+        self.conversion_seconds = 0.0
+        """Time it took to parse all notebooks"""
+        self.check_statistics: Counter[str] = Counter()
+        """Statistics of the checkers (``files``, ``physical lines``, ...)"""
+        self.phase_seconds: dict[str, float] = {}
+        """Duration of each phase of the run"""
+        self.violations: Counter[str] = Counter()
+        """Number of reported violations, by code"""
+
+    def record_notebook(
+        self, notebook_bytes: int, code_cells: int, seconds: float, skip_reason: str | None = None
+    ) -> None:
+        """Record a notebook, which was parsed or skipped.
+
+        Parameters
+        ----------
+        notebook_bytes : int
+            Size of the notebook file.
+        code_cells : int
+            Number of code cells of the parsed notebook.
+        seconds : float
+            Time it took to parse the notebook.
+        skip_reason : str | None
+            Reason the notebook was skipped (see ``SKIP_REASONS``),
+            by default None which means the notebook was parsed
+        """
+        self.notebooks_discovered += 1
+        self.notebook_bytes += notebook_bytes
+        self.conversion_seconds += seconds
+        if skip_reason is None:
+            self.notebooks_converted += 1
+            self.code_cells += code_cells
+        else:
+            self.notebooks_skipped[skip_reason] += 1
+
+    def record_phase(self, phase: str, seconds: float) -> None:
+        """Add the duration of a phase of the run.
+
+        Parameters
+        ----------
+        phase : str
+            Name of the phase (i.e. ``initialize``, ``check`` or ``report``).
+        seconds : float
+            Duration of the phase.
+        """
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+
+    def record_checks(self, check_statistics: Mapping[str, int], stats: Statistics) -> None:
+        """Add the statistics of the checkers and the reported violations.
+
+        Parameters
+        ----------
+        check_statistics : Mapping[str, int]
+            Statistics of the file checker manager.
+        stats : Statistics
+            Statistics of the violations reported by the style guide.
+        """
+        self.check_statistics.update(check_statistics)
+        for statistic in stats.statistics_for(""):
+            self.violations[statistic.error_code] += statistic.count
+
+    def to_prometheus(self, timestamp: float | None = None) -> str:
+        """Format the metrics in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        timestamp : float | None
+            Unix time the run finished, by default None which uses the current time
+
+        Returns
+        -------
+        str
+            The metrics, ending with a line feed.
+        """
+        metrics = [
+            format_metric(
+                "notebooks_discovered",
+                "Notebooks found to be parsed.",
+                [({}, self.notebooks_discovered)],
+            ),
+            format_metric(
+                "notebooks_converted",
+                "Notebooks parsed to be checked.",
+                [({}, self.notebooks_converted)],
+            ),
+            format_metric(
+                "notebooks_skipped",
+                "Notebooks skipped, since they are invalid, have no code or exceeded the budget.",
+                [({"reason": reason}, count) for reason, count in self.notebooks_skipped.items()],
+            ),
+            format_metric(
+                "notebook_bytes_read",
+                "Size of the notebook files read.",
+                [({}, self.notebook_bytes)],
+            ),
+            format_metric(
+                "notebook_code_cells",
+                "Code cells of the parsed notebooks.",
+                [({}, self.code_cells)],
+            ),
+            format_metric(
+                "checked_files",
+                "Files and parsed notebooks checked.",
+                [({}, self.check_statistics["files"])],
+            ),
+            format_metric(
+                "checked_lines",
+                "Lines of the checked files and parsed notebooks.",
+                [
+                    ({"kind": kind}, self.check_statistics[f"{kind} lines"])
+                    for kind in ("physical", "logical")
+                ],
+            ),
+            format_metric(
+                "phase_duration_seconds",
+                "Duration of the phases of the run, 'convert' is the time spent parsing "
+                "notebooks during the other phases.",
+                [
+                    ({"phase": phase}, seconds)
+                    for phase, seconds in {
+                        **self.phase_seconds,
+                        "convert": self.conversion_seconds,
+                    }.items()
+                ],
+            ),
+            format_metric(
+                "violations",
+                "Reported violations by code.",
+                [({"code": code}, count) for code, count in sorted(self.violations.items())],
+            ),
+            format_metric(
+                "violations_reported",
+                "Reported violations of all codes.",
+                [({}, sum(self.violations.values()))],
+            ),
+            format_metric(
+                "last_run_timestamp_seconds",
+                "Unix time the run finished.",
+                [({}, time.time() if timestamp is None else timestamp)],
+            ),
+        ]
+        return "\n".join(metrics) + "\n"
+
+
+def write_metrics_file(metrics_path: str, metrics: NotebookMetrics) -> None:
+    """Write the metrics in the Prometheus text format, replacing the metrics file at once.
+
+    The file is replaced at once, so a collector never reads a partially written file.
+
+    Parameters
+    ----------
+    metrics_path : str
+        Path of the metrics file, which should end with ``.prom`` for the textfile collector.
+    metrics : NotebookMetrics
+        Metrics of the run.
+    """
+    temp_metrics_path = f"{metrics_path}.{os.getpid()}.tmp"
+    with open(temp_metrics_path, "w", encoding="utf8") as metrics_file:
+        metrics_file.write(metrics.to_prometheus())
+    os.replace(temp_metrics_path, metrics_path)
@@ -7,21 +7,212 @@ from __future__ import annotations
 
 import json
 import os
+import re
+import tempfile
+import threading
+import time
 import warnings
+from bisect import bisect_left
+from contextlib import contextmanager
 from fnmatch import fnmatch
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Collection
 from typing import Dict
+from typing import Iterable
 from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
 from typing import cast
 
 from nbconvert.filters import ipython2python
 
+from flake8_nb.events import emit_event
+from flake8_nb.events import has_listeners
 from flake8_nb.parsers import CellId
 from flake8_nb.parsers import NotebookCell
 from flake8_nb.parsers.cell_parsers import notebook_cell_to_intermediate_dict
+from flake8_nb.parsers.notebook_archives import ArchiveError
+from flake8_nb.parsers.notebook_archives import JsonlIndex
+from flake8_nb.parsers.notebook_archives import close_archive_reader
+from flake8_nb.parsers.notebook_archives import get_jsonl_temp_name
+from flake8_nb.parsers.notebook_archives import get_notebook_size
+from flake8_nb.parsers.notebook_archives import pop_decoded_jsonl_record
+from flake8_nb.parsers.notebook_archives import read_notebook_bytes
+from flake8_nb.parsers.notebook_archives import split_jsonl_path
+from flake8_nb.parsers.notebook_archives import use_jsonl_index
+from flake8_nb.parsers.text_notebooks import get_text_notebook_format
+
+if TYPE_CHECKING:
+    from flake8_nb.parsers.notebook_budget import NotebookBudget
+    from flake8_nb.parsers.notebook_budget import NotebookBudgetWarning
+    from flake8_nb.parsers.notebook_budget import NotebookWatchdog
+    from flake8_nb.parsers.notebook_metrics import NotebookMetrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
 
 InputLineMapping = Dict[str, List[Union[CellId, int]]]
+NotebookCellsLoader = Callable[[bytes], List[NotebookCell]]
+NotebookLocation = Tuple[str, CellId, int]
+
+TEMP_DIR_PREFIX = "flake8_nb_"
+"""Prefix of the temporary folders the parsed notebooks are saved in."""
+
+NON_PYTHON_CELL_MAGICS = (
+    "bash",
+    "cmd",
+    "file",
+    "html",
+    "javascript",
+    "js",
+    "latex",
+    "markdown",
+    "perl",
+    "powershell",
+    "ruby",
+    "script",
+    "sh",
+    "sql",
+    "svg",
+    "writefile",
+)
+"""Cell magics whose body isn't python code, cells using them are skipped by default."""
+
+CELL_MAGIC_PATTERN = re.compile(r"^%%(?P<cell_magic>\w+)")
+SKIPPED_LINE_PLACEHOLDER = "#"
+"""Replacement of the lines in the body of a skipped cell magic, which keeps the line count."""
+
+JSON_BACKEND_ENV_VAR = "FLAKE8_NB_JSON_BACKEND"
+"""Environment variable to force a specific JSON backend (see ``JSON_BACKENDS``)."""
+
+
+def load_cells_stdlib(notebook_bytes: bytes) -> list[NotebookCell]:
+    """Decode the raw notebook bytes with :mod:`json` and return its cells.
+
+    Parameters
+    ----------
+    notebook_bytes : bytes
+        Raw content of a notebook file.
+
+    Returns
+    -------
+    list[NotebookCell]
+        List of notebook cells.
+    """
+    return cast(List[NotebookCell], json.loads(notebook_bytes.decode("utf8"))["cells"])
+
+
+def load_cells_orjson(notebook_bytes: bytes) -> list[NotebookCell]:
+    """Decode the raw notebook bytes with ``orjson`` and return its cells.
+
+    Parameters
+    ----------
+    notebook_bytes : bytes
+        Raw content of a notebook file.
+
+    Returns
+    -------
+    list[NotebookCell]
+        List of notebook cells.
+    """
+    return cast(List[NotebookCell], orjson.loads(notebook_bytes)["cells"])
+
+
+if msgspec is not None:
+
+    class MsgspecNotebookCell(msgspec.Struct):  # type: ignore[misc]
+        """Typed notebook cell, only containing the fields used by ``flake8_nb``.
+
+        All other fields (e.g. ``outputs``) are skipped while decoding.
+        """
+
+        cell_type: str
+        source: Union[str, List[str]] = []
+        execution_count: Optional[int] = None
+        metadata: Dict[str, Any] = {}
+        id: Optional[str] = None
+
+    class MsgspecNotebook(msgspec.Struct):  # type: ignore[misc]
+        """Typed notebook, only containing the cells."""
+
+        cells: List[MsgspecNotebookCell]
+
+    _msgspec_notebook_decoder = msgspec.json.Decoder(MsgspecNotebook)
+
+
+def load_cells_msgspec(notebook_bytes: bytes) -> list[NotebookCell]:
+    """Decode the raw notebook bytes with ``msgspec`` and return its cells.
+
+    Only the fields defined in ``MsgspecNotebookCell`` get decoded.
+
+    Parameters
+    ----------
+    notebook_bytes : bytes
+        Raw content of a notebook file.
+
+    Returns
+    -------
+    list[NotebookCell]
+        List of notebook cells.
+    """
+    notebook = _msgspec_notebook_decoder.decode(notebook_bytes)
+    return [msgspec.structs.asdict(cell) for cell in notebook.cells]
+
+
+JSON_BACKENDS: dict[str, NotebookCellsLoader] = {}
+"""Available JSON backends to load notebooks, ordered by preference."""
+NOTEBOOK_DECODE_ERRORS: tuple[type[Exception], ...] = (ValueError, KeyError, TypeError)
+"""Exceptions raised by the JSON backends if a notebook is invalid."""
+
+if msgspec is not None:
+    JSON_BACKENDS["msgspec"] = load_cells_msgspec
+    NOTEBOOK_DECODE_ERRORS += (msgspec.DecodeError,)
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = load_cells_orjson
+JSON_BACKENDS["json"] = load_cells_stdlib
+
+
+def get_json_backend(backend_name: str | None = None) -> NotebookCellsLoader:
+    """Return the loader of the JSON backend used to decode notebooks.
+
+    Parameters
+    ----------
+    backend_name : str | None
+        Name of the backend (key of ``JSON_BACKENDS``). If not given the value
+        of the environment variable ``FLAKE8_NB_JSON_BACKEND`` is used and
+        if that isn't set either, the fastest available backend is used,
+        by default None
+
+    Returns
+    -------
+    NotebookCellsLoader
+        Function decoding the raw bytes of a notebook to a list of notebook cells.
+
+    Raises
+    ------
+    ValueError
+        If the requested backend isn't available.
+    """
+    backend_name = backend_name or os.environ.get(JSON_BACKEND_ENV_VAR)
+    if not backend_name:
+        return next(iter(JSON_BACKENDS.values()))
+    if backend_name not in JSON_BACKENDS:
+        raise ValueError(
+            f"JSON backend {backend_name!r} is not available, "
+            f"available backends are: {', '.join(JSON_BACKENDS)}"
+        )
+    return JSON_BACKENDS[backend_name]
 
 
 def ignore_cell(notebook_cell: NotebookCell) -> bool:
@@ -43,6 +234,9 @@ def ignore_cell(notebook_cell: NotebookCell) -> bool:
 class InvalidNotebookWarning(UserWarning):
     """Warning that is given when a jupyter notebook can't be parsed as JSON."""
 
+    skip_reason = "invalid"
+    """Reason of the skipped notebook, see :func:`record_skip_reasons`."""
+
     def __init__(self, notebook_path: str):
         """Initialize InvalidNotebookWarning.
 
@@ -52,39 +246,165 @@ class InvalidNotebookWarning(UserWarning):
             Path to a notebook
 
         """
+        self.notebook_path = notebook_path
         super().__init__(
             f"Error parsing notebook at path '{notebook_path}'. "
             "Make sure this is a valid notebook."
         )
 
+    def __reduce__(self) -> tuple[type[InvalidNotebookWarning], tuple[str]]:
+        """Pickle the warning by its arguments, i.e. to send it from a worker process.
+
+        Returns
+        -------
+        tuple[type[InvalidNotebookWarning], tuple[str]]
+            Class and arguments to recreate the warning.
+        """
+        return type(self), (self.notebook_path,)
+
+
+_skip_reasons = threading.local()
+
+
+def warn_skipped_notebook(warning: InvalidNotebookWarning | NotebookBudgetWarning) -> None:
+    """Give the warning of a skipped notebook and record the reason it was skipped.
+
+    The reason is recorded by :func:`record_skip_reasons` of the current thread.
+
+    Parameters
+    ----------
+    warning : InvalidNotebookWarning | NotebookBudgetWarning
+        Warning telling why the notebook was skipped.
+
+    Warns
+    -----
+    InvalidNotebookWarning
+        If the notebook couldn't be parsed.
+    NotebookBudgetWarning
+        If the notebook exceeded the budget.
+
+
+    .. # noqa: DAR402
+    """
+    skip_reasons: list[str] | None = getattr(_skip_reasons, "reasons", None)
+    if skip_reasons is not None:
+        skip_reasons.append(warning.skip_reason)
+    warnings.warn(warning, stacklevel=2)
+
+
+@contextmanager
+def record_skip_reasons() -> Iterator[list[str]]:
+    """Record the reasons of the notebooks skipped by the current thread inside the block.
+
+    Contrary to ``warnings.catch_warnings`` this doesn't change the global state of
+    the ``warnings`` module, so threads converting notebooks at the same time
+    (i.e. in multiple ``NotebookSession``) only record their own skipped notebooks.
+
+    Yields
+    ------
+    list[str]
+        Reasons of the skipped notebooks (``"invalid"`` or ``"budget"``),
+        in the order they were skipped.
+    """
+    previous_reasons = getattr(_skip_reasons, "reasons", None)
+    skip_reasons: list[str] = []
+    _skip_reasons.reasons = skip_reasons
+    try:
+        yield skip_reasons
+    finally:
+        _skip_reasons.reasons = previous_reasons
+
 
-def read_notebook_to_cells(notebook_path: str) -> list[NotebookCell]:
+def read_notebook_to_cells(
+    notebook_path: str, json_backend: str | None = None
+) -> list[NotebookCell]:
     r"""Parse the notebook at ``notebook_path`` as Json and returns a list of notebook cells.
 
+    The notebook is read as bytes and decoded with the fastest available
+    JSON backend (see ``get_json_backend``), text based notebooks are read
+    by the reader of their format (see ``decode_notebook_cells``).
+    Compressed notebooks and notebooks inside of archives are decompressed in memory
+    (see ``flake8_nb.parsers.notebook_archives.read_notebook_bytes``).
+    Records of JSON Lines files, which are still decoded from finding them,
+    aren't decoded again (see ``flake8_nb.parsers.notebook_archives.pop_decoded_jsonl_record``).
+
     Parameters
     ----------
     notebook_path : str
         Path to a notebook.
+    json_backend : str | None
+        Name of the JSON backend to use, by default None
 
     Returns
     -------
     list[NotebookCell]
         List of notebook cells if the notebook was parsed successfully or
-        an empty list if the \*.ipynb file couldn't be parsed.
+        an empty list if the \*.ipynb file couldn't be read or parsed.
 
     Warns
     -----
     InvalidNotebookWarning
-        If the notebook couldn't be parsed.
+        If the notebook couldn't be read or parsed.
 
 
     .. # noqa: DAR402
     """
+    decoded_record = pop_decoded_jsonl_record(notebook_path)
+    if decoded_record is not None:
+        try:
+            return cast(List[NotebookCell], decoded_record["cells"])
+        except KeyError:
+            warn_skipped_notebook(InvalidNotebookWarning(notebook_path))
+            return []
+    try:
+        notebook_bytes = read_notebook_bytes(notebook_path)
+    except (OSError, ValueError):
+        # i.e. a listed notebook was removed or isn't readable
+        warn_skipped_notebook(InvalidNotebookWarning(notebook_path))
+        return []
+    return decode_notebook_cells(notebook_bytes, notebook_path, json_backend)
+
+
+def decode_notebook_cells(
+    notebook_bytes: bytes, notebook_path: str, json_backend: str | None = None
+) -> list[NotebookCell]:
+    r"""Decode the raw bytes of a notebook to a list of notebook cells.
+
+    Text based notebooks (i.e. ``*.qmd``) are read by the reader of their format
+    (see ``flake8_nb.parsers.text_notebooks``), all other notebooks are decoded as JSON.
+
+    Parameters
+    ----------
+    notebook_bytes : bytes
+        Content of the notebook file.
+    notebook_path : str
+        Path of the notebook, used to find the format and in the warning.
+    json_backend : str | None
+        Name of the JSON backend to use, by default None
+
+    Returns
+    -------
+    list[NotebookCell]
+        List of notebook cells if the notebook was decoded successfully or
+        an empty list if it isn't a valid notebook.
+
+    Warns
+    -----
+    InvalidNotebookWarning
+        If the notebook couldn't be decoded.
+    """
+    text_notebook_format = get_text_notebook_format(notebook_path)
+    if text_notebook_format is not None:
+        try:
+            return text_notebook_format.read_cells(notebook_bytes.decode("utf8"))
+        except ValueError:
+            warn_skipped_notebook(InvalidNotebookWarning(notebook_path))
+            return []
+    load_cells = get_json_backend(json_backend)
     try:
-        with open(notebook_path, encoding="utf8") as notebook_file:
-            return cast(List[NotebookCell], json.load(notebook_file)["cells"])
-    except (json.JSONDecodeError, KeyError):
-        warnings.warn(InvalidNotebookWarning(notebook_path))
+        return load_cells(notebook_bytes)
+    except NOTEBOOK_DECODE_ERRORS:
+        warn_skipped_notebook(InvalidNotebookWarning(notebook_path))
         return []
 
 
@@ -109,7 +429,61 @@ def convert_source_line(source_line: str) -> str:
     return cast(str, ipython2python(source_line))
 
 
-def get_notebook_code_cells(notebook_path: str) -> tuple[bool, list[NotebookCell]]:
+def get_cell_magic(source_line: str) -> str | None:
+    """Return the name of the cell magic (e.g. ``bash`` for ``%%bash``) a line starts with.
+
+    Parameters
+    ----------
+    source_line : str
+        First line of a cell.
+
+    Returns
+    -------
+    str | None
+        Name of the cell magic or ``None`` if the line doesn't start with one.
+    """
+    match = CELL_MAGIC_PATTERN.match(source_line)
+    return match.group("cell_magic") if match is not None else None
+
+
+def convert_cell_source(
+    source_lines: list[str], skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS
+) -> list[str]:
+    """Transform the source lines of a cell to valid python code.
+
+    If the cell starts with one of ``skipped_cell_magics``, only the magic line is
+    converted and the lines of its body are replaced by ``SKIPPED_LINE_PLACEHOLDER``.
+    So the body is neither converted nor checked, while the line numbers stay the same.
+
+    Parameters
+    ----------
+    source_lines : list[str]
+        Source lines of a cell.
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose body isn't python code,
+        by default NON_PYTHON_CELL_MAGICS
+
+    Returns
+    -------
+    list[str]
+        Valid python code lines.
+
+    See Also
+    --------
+    convert_source_line
+    """
+    if source_lines and get_cell_magic(source_lines[0]) in skipped_cell_magics:
+        converted_lines = [convert_source_line(source_lines[0])]
+        for source_line in source_lines[1:]:
+            code_length = len(source_line.rstrip("\r\n"))
+            converted_lines.append(f"{SKIPPED_LINE_PLACEHOLDER}{source_line[code_length:]}")
+        return converted_lines
+    return [convert_source_line(source_line) for source_line in source_lines]
+
+
+def get_notebook_code_cells(
+    notebook_path: str, skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS
+) -> tuple[bool, list[NotebookCell]]:
     """Parse a notebook and returns a Tuple.
 
     The first entry  being a bool which indicates if juypter magic was
@@ -120,6 +494,9 @@ def get_notebook_code_cells(notebook_path: str) -> tuple[bool, list[NotebookCell
     ----------
     notebook_path : str
         Path to a notebook.
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose cells are skipped (see ``convert_cell_source``),
+        by default NON_PYTHON_CELL_MAGICS
 
     Returns
     -------
@@ -140,8 +517,29 @@ def get_notebook_code_cells(notebook_path: str) -> tuple[bool, list[NotebookCell
 
     .. # noqa: DAR402
     """
+    return get_code_cells(read_notebook_to_cells(notebook_path), skipped_cell_magics)
+
+
+def get_code_cells(
+    notebook_cells: list[NotebookCell],
+    skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+) -> tuple[bool, list[NotebookCell]]:
+    """Filter and convert the code cells of a decoded notebook.
+
+    Parameters
+    ----------
+    notebook_cells : list[NotebookCell]
+        All cells of the notebook, which are modified in place.
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose cells are skipped (see ``convert_cell_source``),
+        by default NON_PYTHON_CELL_MAGICS
+
+    Returns
+    -------
+    tuple[bool, list[NotebookCell]]
+        (``uses_get_ipython``, ``notebook_cells``) see ``get_notebook_code_cells``.
+    """
     uses_get_ipython = False
-    notebook_cells = read_notebook_to_cells(notebook_path)
     code_cell_nr = len(list(filter(lambda cell: cell["cell_type"] == "code", notebook_cells)))
     for index, cell in list(enumerate(notebook_cells))[::-1]:
         if ignore_cell(cell):
@@ -151,12 +549,9 @@ def get_notebook_code_cells(notebook_path: str) -> tuple[bool, list[NotebookCell
             cell["code_cell_nr"] = code_cell_nr
             if isinstance(cell["source"], str):
                 cell["source"] = cell["source"].split("\n")
-            cell_source = list(enumerate(cell["source"]))[::-1]
-            for source_index, source_line in cell_source:
-                new_source_line = convert_source_line(source_line)
-                if new_source_line.startswith("get_ipython"):
-                    uses_get_ipython = True
-                cell["source"][source_index] = new_source_line
+            cell["source"] = convert_cell_source(cell["source"], skipped_cell_magics)
+            if any(source_line.startswith("get_ipython") for source_line in cell["source"]):
+                uses_get_ipython = True
 
         if cell["cell_type"] == "code":
             code_cell_nr -= 1
@@ -185,6 +580,21 @@ def is_parent_dir(parent_dir: str, path: str) -> bool:
     return fnmatch(path, f"{parent_dir}*")
 
 
+def create_temp_dir() -> str:
+    """Create a new temporary folder, to save the parsed notebooks of one run in.
+
+    The folder is created atomically with a unique name, so concurrent
+    ``flake8_nb`` processes (i.e. started in parallel by pre-commit) never
+    share parsed notebooks or delete each others files.
+
+    Returns
+    -------
+    str
+        Path of the new temporary folder.
+    """
+    return tempfile.mkdtemp(prefix=f"{TEMP_DIR_PREFIX}{os.getpid()}_")
+
+
 def create_temp_path(notebook_path: str, temp_base_path: str) -> str:
     """Create the path for a parsed jupyter notebook.
 
@@ -206,7 +616,12 @@ def create_temp_path(notebook_path: str, temp_base_path: str) -> str:
     -------
     str
         Path to the temporary file which should be created.
+
+    See Also
+    --------
+    flake8_nb.parsers.notebook_archives.get_jsonl_temp_name
     """
+    notebook_path = get_jsonl_temp_name(notebook_path)
     abs_notebook_path = os.path.abspath(notebook_path)
     if is_parent_dir(os.curdir, abs_notebook_path):
         rel_file_path = os.path.relpath(abs_notebook_path, os.curdir)
@@ -214,34 +629,28 @@ def create_temp_path(notebook_path: str, temp_base_path: str) -> str:
     else:
         temp_file_path = os.path.join(temp_base_path, os.path.split(notebook_path)[1])
     temp_file_path = f"{os.path.splitext(temp_file_path)[0]}.ipynb_parsed"
-    temp_dir_path = os.path.dirname(temp_file_path)
-    if not os.path.isdir(temp_dir_path):
-        os.makedirs(temp_dir_path)
+    os.makedirs(os.path.dirname(temp_file_path), exist_ok=True)
     return temp_file_path
 
 
-def create_intermediate_py_file(
-    notebook_path: str, intermediate_dir_base_path: str
+def notebook_to_intermediate_code(
+    notebook_path: str, skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS
 ) -> tuple[str, InputLineMapping]:
-    r"""Parse a notebook at ``notebook_path`` and saves a parsed version.
-
-    The corresponding position is relative to ``intermediate_dir_base_path``.
+    r"""Parse a notebook at ``notebook_path`` to the code of the parsed notebook.
 
     Parameters
     ----------
     notebook_path : str
         Path to a notebook.
-    intermediate_dir_base_path : str
-        Path pointing to the position the parsed notebook
-        will be saved to.
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
 
     Returns
     -------
     tuple[str, InputLineMapping]
-        (``intermediate_file_path``, ``input_line_mapping``) Where
-        ``intermediate_file_path`` is the path the parsed notebook
-        was written to. If there was an error parsing the file
-        the ``intermediate_file_path`` will be ``""``.
+        (``intermediate_code``, ``input_line_mapping``) Where ``intermediate_code``
+        is the code of the parsed notebook, which is ``""`` if there was an error
+        parsing the notebook or it has no code.
         ``input_line_mapping`` is a dict which has the keys
         'input_names' and 'code_lines'. ``code_lines`` is a List
         of the code cells ``In[\d\*]`` names and ``code_lines``
@@ -249,7 +658,7 @@ def create_intermediate_py_file(
 
     See Also
     --------
-    read_notebook_to_cells, get_notebook_code_cells, create_temp_path
+    read_notebook_to_cells, get_notebook_code_cells
 
     Warns
     -----
@@ -259,8 +668,62 @@ def create_intermediate_py_file(
 
     .. # noqa: DAR402
     """
-    intermediate_file_path = create_temp_path(notebook_path, intermediate_dir_base_path)
-    uses_get_ipython, notebook_cells = get_notebook_code_cells(notebook_path)
+    uses_get_ipython, notebook_cells = get_notebook_code_cells(notebook_path, skipped_cell_magics)
+    return cells_to_intermediate_code(uses_get_ipython, notebook_cells)
+
+
+def notebook_bytes_to_intermediate_code(
+    notebook_bytes: bytes,
+    notebook_path: str,
+    skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+) -> tuple[str, InputLineMapping]:
+    """Parse the raw bytes of a notebook to the code of the parsed notebook in memory.
+
+    Parameters
+    ----------
+    notebook_bytes : bytes
+        Content of the notebook file, i.e. read from stdin.
+    notebook_path : str
+        Path of the notebook, only used in warnings.
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
+
+    Returns
+    -------
+    tuple[str, InputLineMapping]
+        (``intermediate_code``, ``input_line_mapping``) see ``notebook_to_intermediate_code``.
+
+    Warns
+    -----
+    InvalidNotebookWarning
+        If the notebook couldn't be decoded.
+
+
+    .. # noqa: DAR402
+    """
+    uses_get_ipython, notebook_cells = get_code_cells(
+        decode_notebook_cells(notebook_bytes, notebook_path), skipped_cell_magics
+    )
+    return cells_to_intermediate_code(uses_get_ipython, notebook_cells)
+
+
+def cells_to_intermediate_code(
+    uses_get_ipython: bool, notebook_cells: list[NotebookCell]
+) -> tuple[str, InputLineMapping]:
+    """Join the code cells returned by ``get_notebook_code_cells`` to the parsed notebook.
+
+    Parameters
+    ----------
+    uses_get_ipython : bool
+        Whether any cell contained jupyter magic, which needs ``get_ipython``.
+    notebook_cells : list[NotebookCell]
+        Code cells with converted source lines.
+
+    Returns
+    -------
+    tuple[str, InputLineMapping]
+        (``intermediate_code``, ``input_line_mapping``) see ``notebook_to_intermediate_code``.
+    """
     input_line_mapping: InputLineMapping = {
         "input_ids": [],
         "code_lines": [],
@@ -283,12 +746,172 @@ def create_intermediate_py_file(
         lines_of_code += intermediate_dict["lines_of_code"]  # type: ignore[operator]
 
     intermediate_code += "".join(intermediate_py_str_list).rstrip("\n")
-    if intermediate_code:
-        with open(intermediate_file_path, "w+", encoding="utf8") as intermediate_file:
-            intermediate_file.write(f"{intermediate_code}\n")
-        return intermediate_file_path, input_line_mapping
-    else:
-        return "", input_line_mapping
+    return f"{intermediate_code}\n" if intermediate_code else "", input_line_mapping
+
+
+def create_intermediate_py_file(
+    notebook_path: str,
+    intermediate_dir_base_path: str,
+    skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+) -> tuple[str, InputLineMapping]:
+    r"""Parse a notebook at ``notebook_path`` and saves a parsed version.
+
+    The corresponding position is relative to ``intermediate_dir_base_path``.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path to a notebook.
+    intermediate_dir_base_path : str
+        Path pointing to the position the parsed notebook
+        will be saved to.
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
+
+    Returns
+    -------
+    tuple[str, InputLineMapping]
+        (``intermediate_file_path``, ``input_line_mapping``) Where
+        ``intermediate_file_path`` is the path the parsed notebook
+        was written to. If there was an error parsing the file
+        the ``intermediate_file_path`` will be ``""``.
+        ``input_line_mapping`` is a dict which has the keys
+        'input_names' and 'code_lines'. ``code_lines`` is a List
+        of the code cells ``In[\d\*]`` names and ``code_lines``
+        is the corresponding line in the parsed notebook.
+
+    See Also
+    --------
+    notebook_to_intermediate_code, create_temp_path
+
+    Warns
+    -----
+    InvalidNotebookWarning
+        If the notebook couldn't be parsed.
+
+
+    .. # noqa: DAR402
+    """
+    intermediate_code, input_line_mapping = notebook_to_intermediate_code(
+        notebook_path, skipped_cell_magics
+    )
+    intermediate_file_path = write_intermediate_py_file(
+        notebook_path, intermediate_dir_base_path, intermediate_code, input_line_mapping
+    )
+    return intermediate_file_path, input_line_mapping
+
+
+def write_intermediate_py_file(
+    notebook_path: str,
+    intermediate_dir_base_path: str,
+    intermediate_code: str,
+    input_line_mapping: InputLineMapping,
+) -> str:
+    """Save the code of a parsed notebook and its source map.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path to the original notebook.
+    intermediate_dir_base_path : str
+        Path pointing to the position the parsed notebook
+        will be saved to.
+    intermediate_code : str
+        Code of the parsed notebook.
+    input_line_mapping : InputLineMapping
+        Mapping of the cells to their lines in the parsed notebook.
+
+    Returns
+    -------
+    str
+        Path the parsed notebook was written to or ``""`` if there is no code.
+
+    See Also
+    --------
+    create_temp_path, write_source_map
+    """
+    intermediate_file_path = create_temp_path(notebook_path, intermediate_dir_base_path)
+    if not intermediate_code:
+        return ""
+    with open(intermediate_file_path, "w+", encoding="utf8") as intermediate_file:
+        intermediate_file.write(intermediate_code)
+    write_source_map(intermediate_file_path, notebook_path, input_line_mapping)
+    return intermediate_file_path
+
+
+def get_source_map_path(intermediate_file_path: str) -> str:
+    """Return the path of the source map belonging to a parsed notebook.
+
+    Parameters
+    ----------
+    intermediate_file_path : str
+        Path of the parsed notebook.
+
+    Returns
+    -------
+    str
+        Path of the source map, which lies alongside the parsed notebook.
+    """
+    return f"{intermediate_file_path}.map"
+
+
+def write_source_map(
+    intermediate_file_path: str, notebook_path: str, input_line_mapping: InputLineMapping
+) -> None:
+    """Save the information to map a parsed notebook back to its original, alongside it.
+
+    This allows to map violations without knowledge of the ``NotebookParser`` state,
+    i.e. in the worker processes of ``flake8``.
+
+    Parameters
+    ----------
+    intermediate_file_path : str
+        Path of the parsed notebook.
+    notebook_path : str
+        Path of the original notebook.
+    input_line_mapping : InputLineMapping
+        Mapping of the cells to their lines in the parsed notebook.
+
+    See Also
+    --------
+    read_source_map
+    """
+    source_map = {
+        "notebook": get_rel_paths([notebook_path], os.curdir)[0],
+        "input_ids": input_line_mapping["input_ids"],
+        "code_lines": input_line_mapping["code_lines"],
+    }
+    with open(get_source_map_path(intermediate_file_path), "w", encoding="utf8") as map_file:
+        json.dump(source_map, map_file, separators=(",", ":"))
+
+
+def read_source_map(intermediate_file_path: str) -> tuple[str, InputLineMapping] | None:
+    """Read the source map saved alongside a parsed notebook.
+
+    Parameters
+    ----------
+    intermediate_file_path : str
+        Path of the parsed notebook.
+
+    Returns
+    -------
+    tuple[str, InputLineMapping] | None
+        (``original_notebook``, ``input_line_mapping``) or ``None`` if there is no source map.
+
+    See Also
+    --------
+    write_source_map
+    """
+    try:
+        with open(get_source_map_path(intermediate_file_path), encoding="utf8") as map_file:
+            source_map = json.load(map_file)
+    except (OSError, ValueError):
+        return None
+    input_line_mapping: InputLineMapping = {
+        "input_ids": [CellId(*input_id) for input_id in source_map["input_ids"]],
+        "code_lines": source_map["code_lines"],
+    }
+    return source_map["notebook"], input_line_mapping
 
 
 def get_rel_paths(file_paths: list[str], base_path: str) -> list[str]:
@@ -341,8 +964,7 @@ def map_intermediate_to_input(
     create_intermediate_py_file
     """
     code_lines: list[int] = input_line_mapping["code_lines"]  # type: ignore[assignment]
-    line_filter = filter(lambda code_line: code_line < line_number, code_lines)
-    entry_index = len(list(line_filter)) - 1
+    entry_index = bisect_left(code_lines, line_number) - 1
     input_ids = input_line_mapping["input_ids"]
     input_id: CellId = input_ids[entry_index]  # type: ignore[assignment]
     code_starting_line_number: int = code_lines[entry_index] + 2
@@ -350,14 +972,415 @@ def map_intermediate_to_input(
     return input_id, abs(input_cell_line_number)
 
 
+class NotebookSession:
+    """Parsed notebooks of one run and the temporary folder they are saved in.
+
+    The state belongs to the instance, so multiple runs can exist at the same time,
+    i.e. in different threads or tasks of one process.
+    The session is passed explicitly to everything that needs it, like the formatters.
+    """
+
+    def __init__(
+        self,
+        skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+        budget: NotebookBudget | None = None,
+        chunk_cells: int = 0,
+    ) -> None:
+        """Initialize NotebookSession.
+
+        Parameters
+        ----------
+        skipped_cell_magics : Collection[str]
+            Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
+        budget : NotebookBudget | None
+            Limits for each notebook, by default None which means unlimited
+        chunk_cells : int
+            Maximum number of code cells per parsed notebook, by default 0 which means unlimited
+        """
+        self.skipped_cell_magics = skipped_cell_magics
+        """Names of the cell magics whose cells are skipped"""
+        self.budget = budget
+        """Limits for each notebook, notebooks exceeding them are skipped"""
+        self.chunk_cells = chunk_cells
+        """Maximum number of code cells per parsed notebook, larger notebooks are split"""
+        self.metrics: NotebookMetrics | None = None
+        """Metrics of the run, which the parsed and skipped notebooks are recorded in"""
+        self._watchdog: NotebookWatchdog | None = None
+        self.jsonl_index = JsonlIndex()
+        """Records of JSON Lines files which were found and not parsed yet"""
+        self.original_notebook_paths: list[str] = []
+        """List of paths to the original Notebooks"""
+        self.intermediate_py_file_paths: list[str] = []
+        """List of paths to the parsed Notebooks"""
+        self.input_line_mappings: list[InputLineMapping] = []
+        """List of input_line_mapping"""
+        self.temp_path = ""
+        """Path of the temp folder the parsed notebooks were saved in"""
+        self._notebook_mappings: dict[str, tuple[str, InputLineMapping]] = {}
+        self.stdin_notebook: tuple[str, str, InputLineMapping] | None = None
+        """(``display_name``, ``intermediate_code``, ``input_line_mapping``)
+        of the notebook read from stdin"""
+
+    def __enter__(self) -> NotebookSession:
+        """Use the session as context manager, which cleans up on exit.
+
+        Returns
+        -------
+        NotebookSession
+            The session itself.
+        """
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Clean up the session.
+
+        Parameters
+        ----------
+        exc_info : object
+            Exception information, which is ignored.
+        """
+        self.clean_up()
+
+    def get_temp_path(self) -> str:
+        """Get the temporary folder of the session, creating it on first use.
+
+        Returns
+        -------
+        str
+            Path of the temporary folder.
+
+        See Also
+        --------
+        create_temp_dir
+        """
+        if not self.temp_path:
+            self.temp_path = create_temp_dir()
+        return self.temp_path
+
+    def add_notebooks(self, notebook_paths: Iterable[str]) -> list[str]:
+        """Parse notebooks and save the parsed notebooks in the temporary folder.
+
+        Notebooks which can't be parsed are skipped.
+        The records of JSON Lines files are found and read with the
+        :attr:`jsonl_index` of the session.
+
+        Parameters
+        ----------
+        notebook_paths : Iterable[str]
+            Paths of the notebooks.
+
+        Returns
+        -------
+        list[str]
+            Paths of the parsed notebooks, which were added.
+
+        See Also
+        --------
+        convert_notebook_chunks
+
+        Warns
+        -----
+        InvalidNotebookWarning
+            If a notebook couldn't be parsed.
+
+
+        .. # noqa: DAR402
+        """
+        intermediate_py_file_paths = []
+        try:
+            with use_jsonl_index(self.jsonl_index):
+                for notebook_path in notebook_paths:
+                    intermediate_files = self.convert_notebook_chunks(notebook_path)
+                    for intermediate_py_file_path, input_line_mapping in intermediate_files:
+                        self.original_notebook_paths.append(notebook_path)
+                        self.intermediate_py_file_paths.append(intermediate_py_file_path)
+                        self.input_line_mappings.append(input_line_mapping)
+                        self._notebook_mappings[intermediate_py_file_path] = (
+                            get_rel_paths([notebook_path], os.curdir)[0],
+                            input_line_mapping,
+                        )
+                        intermediate_py_file_paths.append(intermediate_py_file_path)
+        finally:
+            self.close_watchdog()
+            close_archive_reader()
+        return intermediate_py_file_paths
+
+    def convert_notebook(self, notebook_path: str) -> tuple[str, InputLineMapping]:
+        """Parse a notebook and save it in the temporary folder, within the budget if set.
+
+        Contrary to :meth:`add_notebooks` the parsed notebook isn't added to the session,
+        so it is only mapped via its source map (i.e. for streamed notebooks).
+        The time limit of the budget isn't enforced for records of JSON Lines files,
+        since they are only held in memory by this process.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Path to a notebook.
+
+        Returns
+        -------
+        tuple[str, InputLineMapping]
+            (``intermediate_file_path``, ``input_line_mapping``) Where
+            ``intermediate_file_path`` is ``""`` if the notebook was skipped.
+
+        See Also
+        --------
+        create_intermediate_py_file,
+        flake8_nb.parsers.notebook_budget.create_intermediate_py_file_within_budget
+
+        Warns
+        -----
+        InvalidNotebookWarning
+            If a notebook couldn't be parsed.
+        NotebookBudgetWarning
+            If a notebook exceeded the budget.
+
+
+        .. # noqa: DAR402
+        """
+        if self.budget is None:
+            return create_intermediate_py_file(
+                notebook_path, self.get_temp_path(), self.skipped_cell_magics
+            )
+        # imported here since the budget module depends on this module
+        from flake8_nb.parsers.notebook_budget import NotebookWatchdog
+        from flake8_nb.parsers.notebook_budget import create_intermediate_py_file_within_budget
+
+        if self.budget.max_seconds <= 0 or split_jsonl_path(notebook_path) is not None:
+            return create_intermediate_py_file_within_budget(
+                notebook_path, self.get_temp_path(), self.budget, self.skipped_cell_magics
+            )
+        if self._watchdog is None:
+            self._watchdog = NotebookWatchdog()
+        return self._watchdog.create_intermediate_py_file(
+            notebook_path, self.get_temp_path(), self.budget, self.skipped_cell_magics
+        )
+
+    def convert_observed_notebook(self, notebook_path: str) -> tuple[str, InputLineMapping]:
+        """Parse a notebook like :meth:`convert_notebook` and record how it went.
+
+        The notebook is recorded in the :attr:`metrics` of the session, if set, and
+        the ``notebook_parsed`` event is emitted. The reason a notebook was skipped
+        is taken from :func:`record_skip_reasons`, so sessions in other threads
+        don't interfere.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Path to a notebook.
+
+        Returns
+        -------
+        tuple[str, InputLineMapping]
+            (``intermediate_file_path``, ``input_line_mapping``) see :meth:`convert_notebook`.
+
+        See Also
+        --------
+        flake8_nb.events
+
+        Warns
+        -----
+        InvalidNotebookWarning
+            If a notebook couldn't be parsed.
+        NotebookBudgetWarning
+            If a notebook exceeded the budget.
+
+
+        .. # noqa: DAR402
+        """
+        # the size is looked up first, since records of JSON Lines files are gone once read
+        try:
+            notebook_bytes = get_notebook_size(notebook_path)
+        except (OSError, KeyError, ArchiveError):
+            notebook_bytes = 0
+        start_time = time.perf_counter()
+        with record_skip_reasons() as skip_reasons:
+            intermediate_file_path, input_line_mapping = self.convert_notebook(notebook_path)
+        seconds = time.perf_counter() - start_time
+        skip_reason = None
+        if not intermediate_file_path:
+            if "budget" in skip_reasons:
+                skip_reason = "budget"
+            elif "invalid" in skip_reasons:
+                skip_reason = "invalid"
+            else:
+                skip_reason = "empty"
+        code_cells = len(input_line_mapping["input_ids"])
+        if self.metrics is not None:
+            self.metrics.record_notebook(notebook_bytes, code_cells, seconds, skip_reason)
+        emit_event(
+            "notebook_parsed",
+            notebook_path=notebook_path,
+            notebook_bytes=notebook_bytes,
+            code_cells=code_cells,
+            seconds=seconds,
+            skip_reason=skip_reason,
+        )
+        return intermediate_file_path, input_line_mapping
+
+    def convert_notebook_chunks(self, notebook_path: str) -> list[tuple[str, InputLineMapping]]:
+        """Parse a notebook like :meth:`convert_notebook`, split into chunks of cells if needed.
+
+        Notebooks with more than ``chunk_cells`` code cells are split into
+        multiple parsed notebooks, which can be checked in parallel.
+
+        Parameters
+        ----------
+        notebook_path : str
+            Path to a notebook.
+
+        Returns
+        -------
+        list[tuple[str, InputLineMapping]]
+            (``intermediate_file_path``, ``input_line_mapping``) of each parsed notebook,
+            which is empty if the notebook was skipped.
+
+        See Also
+        --------
+        flake8_nb.parsers.notebook_chunks.split_intermediate_py_file
+
+        Warns
+        -----
+        InvalidNotebookWarning
+            If a notebook couldn't be parsed.
+        NotebookBudgetWarning
+            If a notebook exceeded the budget.
+
+
+        .. # noqa: DAR402
+        """
+        emit_event("notebook_discovered", notebook_path=notebook_path)
+        if self.metrics is None and not has_listeners("notebook_parsed"):
+            intermediate_file_path, input_line_mapping = self.convert_notebook(notebook_path)
+        else:
+            intermediate_file_path, input_line_mapping = self.convert_observed_notebook(
+                notebook_path
+            )
+        # records of JSON Lines files aren't read again once they are parsed
+        self.jsonl_index.remove(notebook_path)
+        if not intermediate_file_path:
+            return []
+        intermediate_files = [(intermediate_file_path, input_line_mapping)]
+        if 0 < self.chunk_cells < len(input_line_mapping["input_ids"]):
+            # imported here since the chunks module depends on this module
+            from flake8_nb.parsers.notebook_chunks import split_intermediate_py_file
+
+            intermediate_files = split_intermediate_py_file(
+                notebook_path, intermediate_file_path, input_line_mapping, self.chunk_cells
+            )
+        if has_listeners("intermediate_written"):
+            for intermediate_file_path, _ in intermediate_files:
+                emit_event(
+                    "intermediate_written",
+                    notebook_path=notebook_path,
+                    intermediate_file_path=intermediate_file_path,
+                    intermediate_bytes=os.path.getsize(intermediate_file_path),
+                )
+        return intermediate_files
+
+    def add_stdin_notebook(self, display_name: str, notebook_bytes: bytes) -> None:
+        """Parse a notebook passed via stdin, which is kept in memory.
+
+        Parameters
+        ----------
+        display_name : str
+            Name the notebook is reported as (``--stdin-display-name``).
+        notebook_bytes : bytes
+            Content of the notebook.
+
+        See Also
+        --------
+        notebook_bytes_to_intermediate_code
+
+        Warns
+        -----
+        InvalidNotebookWarning
+            If the notebook couldn't be parsed.
+
+
+        .. # noqa: DAR402
+        """
+        intermediate_code, input_line_mapping = notebook_bytes_to_intermediate_code(
+            notebook_bytes, display_name, self.skipped_cell_magics
+        )
+        self.stdin_notebook = (display_name, intermediate_code, input_line_mapping)
+
+    def close_watchdog(self) -> None:
+        """Stop the worker process enforcing the time limit, if it was started."""
+        if self._watchdog is not None:
+            self._watchdog.close()
+            self._watchdog = None
+
+    def get_mappings(self) -> Iterator[tuple[str, str, InputLineMapping]]:
+        """Return the mapping information needed to generate error messages.
+
+        Returns
+        -------
+        Iterator[tuple[str, str, InputLineMapping]]
+            (``original_notebook_paths``, ``intermediate_py_file_paths``,
+            ``input_line_mappings``) see :meth:`NotebookParser.get_mappings`.
+        """
+        return zip(
+            get_rel_paths(self.original_notebook_paths, os.curdir),
+            self.intermediate_py_file_paths,
+            self.input_line_mappings,
+        )
+
+    def get_notebook_mapping(
+        self, intermediate_file_path: str
+    ) -> tuple[str, InputLineMapping] | None:
+        """Find the original notebook and line mapping of a parsed notebook.
+
+        Notebooks which weren't added to the session (i.e. streamed ones),
+        are looked up in the source map saved alongside the parsed notebook.
+
+        Parameters
+        ----------
+        intermediate_file_path : str
+            Path of the parsed notebook.
+
+        Returns
+        -------
+        tuple[str, InputLineMapping] | None
+            (``original_notebook``, ``input_line_mapping``) or ``None``
+            if ``intermediate_file_path`` isn't a known parsed notebook.
+
+        See Also
+        --------
+        read_source_map
+        """
+        notebook_mapping = self._notebook_mappings.get(intermediate_file_path)
+        if notebook_mapping is None:
+            return read_source_map(intermediate_file_path)
+        return notebook_mapping
+
+    def clean_up(self) -> None:
+        """Delete the temporary folder if it exists and reset the session."""
+        import shutil
+
+        self.close_watchdog()
+        self.jsonl_index.clear()
+        if self.temp_path:
+            emit_event("cleanup", temp_path=self.temp_path)
+            shutil.rmtree(self.temp_path, ignore_errors=True)
+
+        self.original_notebook_paths = []
+        self.intermediate_py_file_paths = []
+        self.input_line_mappings = []
+        self.temp_path = ""
+        self._notebook_mappings = {}
+        self.stdin_notebook = None
+
+
 class NotebookParser:
-    """Main parsing class for notebooks.
+    """Parsing class for notebooks, which shares its state across instances.
 
     ``NotebookParser`` utilizes that instance and class attributes
     are separated and class attributes allow sharing of information
-    across instances. This is used to realize the mapping of checked
-    parsed notebooks back to their original files.
-
+    across instances.
+    The state of the last parsed notebooks is kept for backwards compatibility,
+    ``flake8_nb`` itself uses a :class:`NotebookSession` per run.
     """
 
     original_notebook_paths: list[str] = []
@@ -389,9 +1412,6 @@ class NotebookParser:
             self.new_notebooks = True
             NotebookParser.original_notebook_paths = original_notebook_paths
         self.create_intermediate_py_file_paths()
-        # This is needed
-        NotebookParser.intermediate_py_file_paths.reverse()
-        NotebookParser.input_line_mappings.reverse()
 
     def create_intermediate_py_file_paths(self) -> None:
         """Create intermediate files needed for analysis.
@@ -399,26 +1419,16 @@ class NotebookParser:
         Parses all notebooks provided by ``self.original_notebook_paths``
         and saves them to a temporary directory, if ``original_notebook_paths``,
         was provided at initialization.
-
+        The state of a previous parser is replaced, even if no notebooks were provided.
         """
-        if self.original_notebook_paths and self.new_notebooks:
-            import tempfile
-
-            NotebookParser.input_line_mappings = []
-            NotebookParser.intermediate_py_file_paths = []
-
-            NotebookParser.temp_path = tempfile.mkdtemp(prefix="flake8_nb_")
-            index_orig_list = list(enumerate(self.original_notebook_paths))[::-1]
-            for index, original_notebook_path in index_orig_list:
-                (
-                    intermediate_py_file_path,
-                    input_line_mapping,
-                ) = create_intermediate_py_file(original_notebook_path, self.temp_path)
-                if intermediate_py_file_path:
-                    NotebookParser.intermediate_py_file_paths.append(intermediate_py_file_path)
-                    NotebookParser.input_line_mappings.append(input_line_mapping)
-                else:
-                    NotebookParser.original_notebook_paths.pop(index)
+        if self.new_notebooks:
+            session = NotebookSession()
+            if self.original_notebook_paths:
+                session.add_notebooks(self.original_notebook_paths)
+            NotebookParser.original_notebook_paths = session.original_notebook_paths
+            NotebookParser.intermediate_py_file_paths = session.intermediate_py_file_paths
+            NotebookParser.input_line_mappings = session.input_line_mappings
+            NotebookParser.temp_path = session.temp_path
 
     @staticmethod
     def get_mappings() -> Iterator[tuple[str, str, InputLineMapping]]:
@@ -457,6 +1467,7 @@ class NotebookParser:
         import shutil
 
         if NotebookParser.temp_path:
+            emit_event("cleanup", temp_path=NotebookParser.temp_path)
             shutil.rmtree(NotebookParser.temp_path, ignore_errors=True)
 
         NotebookParser.original_notebook_paths = []
@@ -0,0 +1,168 @@
+"""Module for splitting notebooks into shards, which take a similar time to check.
+
+The notebooks are partitioned by their size instead of their count,
+since notebook sizes can vary by orders of magnitude.
+The size is looked up without reading the notebooks (i.e. from the file system or the
+index of an archive), so each shard only parses its own notebooks.
+The partition only depends on the notebooks and their sizes, so each shard
+(i.e. each node of a CI job) computes the same partition independently.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import re
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+
+from flake8_nb.parsers.notebook_archives import ARCHIVE_READ_ERRORS
+from flake8_nb.parsers.notebook_archives import get_notebook_size
+
+NOTEBOOK_BASE_COST = 1000
+"""Cost added to the size of each notebook, for the overhead of parsing and checking it."""
+
+SHARD_PATTERN = re.compile(r"^\s*(?P<index>\d+)\s*/\s*(?P<count>\d+)\s*$")
+
+
+def parse_shard(shard: str) -> tuple[int, int]:
+    """Parse a shard of the form ``K/N`` (the ``K``-th of ``N`` shards, starting at 1).
+
+    Parameters
+    ----------
+    shard : str
+        Shard of the form ``K/N``.
+
+    Returns
+    -------
+    tuple[int, int]
+        (``shard_index``, ``shard_count``)
+
+    Raises
+    ------
+    ValueError
+        If ``shard`` isn't of the form ``K/N`` with ``1 <= K <= N``.
+    """
+    match = SHARD_PATTERN.match(shard)
+    if match is not None:
+        shard_index, shard_count = int(match.group("index")), int(match.group("count"))
+        if 1 <= shard_index <= shard_count:
+            return shard_index, shard_count
+    raise ValueError(f"The shard {shard!r} isn't of the form 'K/N' with 1 <= K <= N.")
+
+
+def get_notebook_file_size(notebook_path: str) -> int:
+    """Get the size of a notebook in bytes, as estimate of the time to check it.
+
+    Notebooks whose size can't be looked up have a size of ``0``, the warning
+    about them is left to the shard parsing them.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path to a notebook.
+
+    Returns
+    -------
+    int
+        Size of the notebook, see ``flake8_nb.parsers.notebook_archives.get_notebook_size``.
+    """
+    try:
+        return get_notebook_size(notebook_path)
+    except (KeyError, *ARCHIVE_READ_ERRORS):
+        return 0
+
+
+def partition_notebooks(
+    notebook_paths: Iterable[str],
+    shard_count: int,
+    get_size: Callable[[str], int] = get_notebook_file_size,
+) -> list[list[str]]:
+    """Partition notebooks into ``shard_count`` shards with a similar total size.
+
+    The notebooks are assigned largest first to the shard with the smallest
+    total size so far. Ties are broken by the path relative to the current directory,
+    so the partition doesn't depend on where the project is checked out.
+
+    Parameters
+    ----------
+    notebook_paths : Iterable[str]
+        Paths of the notebooks.
+    shard_count : int
+        Number of shards.
+    get_size : Callable[[str], int]
+        Function returning the size of a notebook, by default get_notebook_file_size
+
+    Returns
+    -------
+    list[list[str]]
+        Paths of the notebooks of each shard.
+    """
+    costs = {
+        notebook_path: get_size(notebook_path) + NOTEBOOK_BASE_COST
+        for notebook_path in dict.fromkeys(notebook_paths)
+    }
+    shards: list[list[str]] = [[] for _ in range(shard_count)]
+    shard_costs = [(0, shard_index) for shard_index in range(shard_count)]
+    for notebook_path in sorted(
+        costs, key=lambda notebook_path: (-costs[notebook_path], os.path.relpath(notebook_path))
+    ):
+        shard_cost, shard_index = heapq.heappop(shard_costs)
+        shards[shard_index].append(notebook_path)
+        heapq.heappush(shard_costs, (shard_cost + costs[notebook_path], shard_index))
+    return shards
+
+
+def get_notebook_shard(notebook_paths: list[str], shard_index: int, shard_count: int) -> list[str]:
+    """Get the notebooks of the ``shard_index``-th of ``shard_count`` shards.
+
+    Parameters
+    ----------
+    notebook_paths : list[str]
+        Paths of all notebooks.
+    shard_index : int
+        Index of the shard, starting at 1.
+    shard_count : int
+        Number of shards.
+
+    Returns
+    -------
+    list[str]
+        Paths of the notebooks in the shard, in the order of ``notebook_paths``.
+
+    See Also
+    --------
+    partition_notebooks
+    """
+    shard = set(partition_notebooks(notebook_paths, shard_count)[shard_index - 1])
+    return [notebook_path for notebook_path in notebook_paths if notebook_path in shard]
+
+
+def iter_notebook_shard(
+    notebook_paths: Iterable[str], shard_index: int, shard_count: int
+) -> Iterator[str]:
+    """Lazily get the notebooks of the ``shard_index``-th of ``shard_count`` shards.
+
+    The notebooks are only searched and partitioned when the first one is requested,
+    i.e. by the thread parsing them (see ``iter_intermediate_py_file_batches``).
+
+    Parameters
+    ----------
+    notebook_paths : Iterable[str]
+        Paths of all notebooks, this can be a lazy iterator.
+    shard_index : int
+        Index of the shard, starting at 1.
+    shard_count : int
+        Number of shards.
+
+    Yields
+    ------
+    str
+        Paths of the notebooks in the shard, in the order of ``notebook_paths``.
+
+    See Also
+    --------
+    get_notebook_shard
+    """
+    yield from get_notebook_shard(list(notebook_paths), shard_index, shard_count)
@@ -0,0 +1,167 @@
+"""Module for streaming the conversion of notebooks.
+
+The notebooks are converted in a background thread and handed out in batches
+through a bounded queue, so memory usage only depends on the batch size and
+queue depth, and checking of the first batch can start right away.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from typing import Callable
+from typing import Collection
+from typing import Generator
+from typing import Iterable
+from typing import List
+from typing import Union
+
+from flake8_nb.parsers.notebook_archives import JsonlIndex
+from flake8_nb.parsers.notebook_archives import close_archive_reader
+from flake8_nb.parsers.notebook_archives import use_jsonl_index
+from flake8_nb.parsers.notebook_parsers import NON_PYTHON_CELL_MAGICS
+from flake8_nb.parsers.notebook_parsers import InputLineMapping
+from flake8_nb.parsers.notebook_parsers import create_intermediate_py_file
+from flake8_nb.parsers.notebook_parsers import get_source_map_path
+
+STREAM_QUEUE_DEPTH = 2
+"""Maximum number of converted batches waiting to be checked."""
+JSONL_STREAM_BATCH_SIZE = 100
+"""Number of notebooks per batch, if JSON Lines files are checked without a batch size."""
+
+_STREAM_END = object()
+
+QueueItem = Union[List[str], Exception, object]
+
+
+def iter_intermediate_py_file_batches(
+    notebook_paths: Iterable[str],
+    temp_path: str,
+    batch_size: int,
+    queue_depth: int = STREAM_QUEUE_DEPTH,
+    skipped_cell_magics: Collection[str] = NON_PYTHON_CELL_MAGICS,
+    convert_notebook: Callable[[str], list[tuple[str, InputLineMapping]]] | None = None,
+    jsonl_index: JsonlIndex | None = None,
+) -> Generator[list[str], None, None]:
+    """Convert notebooks in a background thread and yield the parsed notebooks in batches.
+
+    Parameters
+    ----------
+    notebook_paths : Iterable[str]
+        Paths of the notebooks to convert, this can be a lazy iterator.
+    temp_path : str
+        Path of the temporary folder the parsed notebooks are saved in.
+    batch_size : int
+        Number of parsed notebooks per batch.
+    queue_depth : int
+        Maximum number of batches which are converted ahead, by default STREAM_QUEUE_DEPTH
+    skipped_cell_magics : Collection[str]
+        Names of the cell magics whose cells are skipped, by default NON_PYTHON_CELL_MAGICS
+    convert_notebook : Callable[[str], list[tuple[str, InputLineMapping]]] | None
+        Function converting a notebook to one or more parsed notebooks, which replaces
+        ``create_intermediate_py_file`` (i.e. ``NotebookSession.convert_notebook_chunks``),
+        by default None
+    jsonl_index : JsonlIndex | None
+        Index the background thread finds and reads the records of JSON Lines files with
+        (i.e. ``NotebookSession.jsonl_index``), by default None which uses a new index
+
+    Yields
+    ------
+    list[str]
+        Batch of paths to parsed notebooks.
+
+    Raises
+    ------
+    Exception
+        Any exception raised while converting the notebooks is re-raised.
+
+    See Also
+    --------
+    flake8_nb.parsers.notebook_parsers.create_intermediate_py_file
+    """
+    batch_queue: queue.Queue[QueueItem] = queue.Queue(maxsize=queue_depth)
+    converter_index = JsonlIndex() if jsonl_index is None else jsonl_index
+    stop_event = threading.Event()
+
+    def put(item: QueueItem) -> bool:
+        """Put ``item`` in the queue, waiting for free space until the stream is closed.
+
+        Parameters
+        ----------
+        item : QueueItem
+            Batch, exception or end marker.
+
+        Returns
+        -------
+        bool
+            Whether the item was put in the queue.
+        """
+        while not stop_event.is_set():
+            try:
+                batch_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def convert() -> None:
+        """Convert the notebooks and put them batch wise in the queue."""
+        # the notebooks are found in this thread as well
+        with use_jsonl_index(converter_index):
+            try:
+                batch: list[str] = []
+                for notebook_path in notebook_paths:
+                    if convert_notebook is not None:
+                        batch.extend(
+                            intermediate_py_file_path
+                            for intermediate_py_file_path, _ in convert_notebook(notebook_path)
+                        )
+                    else:
+                        intermediate_py_file_path, _ = create_intermediate_py_file(
+                            notebook_path, temp_path, skipped_cell_magics
+                        )
+                        converter_index.remove(notebook_path)
+                        if intermediate_py_file_path:
+                            batch.append(intermediate_py_file_path)
+                    if len(batch) >= batch_size:
+                        if not put(batch):
+                            return
+                        batch = []
+                if batch and not put(batch):
+                    return
+                put(_STREAM_END)
+            except Exception as error:
+                put(error)
+            finally:
+                close_archive_reader()
+
+    converter = threading.Thread(target=convert, name="flake8_nb-converter", daemon=True)
+    converter.start()
+    try:
+        while True:
+            item = batch_queue.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item  # type: ignore[misc]
+    finally:
+        stop_event.set()
+        converter.join()
+
+
+def remove_intermediate_py_files(intermediate_py_file_paths: list[str]) -> None:
+    """Delete parsed notebooks and their source maps, which were already checked.
+
+    Parameters
+    ----------
+    intermediate_py_file_paths : list[str]
+        Paths of parsed notebooks.
+    """
+    for intermediate_py_file_path in intermediate_py_file_paths:
+        for path in (intermediate_py_file_path, get_source_map_path(intermediate_py_file_path)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
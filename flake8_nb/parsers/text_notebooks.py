@@ -0,0 +1,451 @@
+"""Module for reading text based notebooks, without converting them to ``*.ipynb`` first.
+
+Notebooks paired with jupytext are often saved as percent format scripts (``*.py``)
+or markdown files (``*.md``) and Quarto documents (``*.qmd``) are plain text as well.
+Their cells are read directly into the same cell dicts as the cells of
+``*.ipynb`` notebooks, so they are parsed and mapped like any other notebook
+(see ``flake8_nb.parsers.notebook_parsers.read_notebook_to_cells``).
+
+Further formats can be added with ``register_text_notebook_format``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from itertools import islice
+from typing import Callable
+from typing import Collection
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Pattern
+
+from flake8_nb.parsers import NotebookCell
+from flake8_nb.parsers.notebook_archives import split_archive_path
+
+TextNotebookReader = Callable[[str], List[NotebookCell]]
+
+PERCENT_CELL_PATTERN = re.compile(r"^#\s*%%(?:\s+(?P<options>.*?))?\s*$")
+"""Line starting a cell in a percent format script, i.e. ``# %% [markdown] tags=["a"]``."""
+MARKDOWN_FENCE_PATTERN = re.compile(
+    r"^(?P<fence>`{3,})\s*(?:python3?|ipython3?|py)(?:\s+(?P<options>.*?))?\s*$"
+)
+"""Opening fence of a python code cell in a jupytext markdown file."""
+QUARTO_FENCE_PATTERN = re.compile(
+    r"^(?P<fence>`{3,})\s*\{(?:python3?|ipython3?)(?:[\s,](?P<options>[^}]*))?\}\s*$"
+)
+"""Opening fence of a python code cell in a Quarto document."""
+QUARTO_TAGS_PATTERN = re.compile(r"^#\|\s*tags\s*:\s*\[(?P<tags>.*)\]\s*$")
+"""Cell option with the tags of a Quarto code cell, i.e. ``#| tags: [a, b]``."""
+JSON_TAGS_PATTERN = re.compile(r"\btags\s*=\s*(?P<tags>\[.*?\])")
+"""Tags in the cell options of jupytext, i.e. ``tags=["a", "b"]``."""
+YAML_HEADER_DELIMITERS = {"---", "# ---"}
+
+
+def is_any_file(file_path: str) -> bool:
+    """Accept every file with the suffix of a format as notebook.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+
+    Returns
+    -------
+    bool
+        Always ``True``.
+    """
+    return True
+
+
+class TextNotebookFormat(NamedTuple):
+    """Text based notebook format, which can be checked like a notebook.
+
+    The format is defined by:
+    * ``suffix``
+        Lower case file suffix of the format, i.e. ``.qmd``.
+    * ``read_cells``
+        Function reading the text of a file to a list of notebook cells.
+    * ``is_notebook``
+        Function deciding if a file with the suffix is a notebook, i.e. for ``*.py``
+        files which could be plain scripts, by default all files are notebooks.
+    """
+
+    suffix: str
+    read_cells: TextNotebookReader
+    is_notebook: Callable[[str], bool] = is_any_file
+
+
+def create_cell(cell_type: str, source_lines: list[str], tags: list[str]) -> NotebookCell:
+    """Create a notebook cell like it is parsed from the JSON of a notebook.
+
+    Leading and trailing blank lines are removed, like the blank lines
+    separating cells in text formats.
+
+    Parameters
+    ----------
+    cell_type : str
+        Type of the cell, i.e. ``code`` or ``markdown``.
+    source_lines : list[str]
+        Lines of the cell including their line endings.
+    tags : list[str]
+        Tags of the cell.
+
+    Returns
+    -------
+    NotebookCell
+        Dict representation of the cell.
+    """
+    while source_lines and not source_lines[0].strip():
+        source_lines = source_lines[1:]
+    while source_lines and not source_lines[-1].strip():
+        source_lines = source_lines[:-1]
+    if source_lines:
+        source_lines = [*source_lines[:-1], source_lines[-1].rstrip("\r\n")]
+    return {
+        "cell_type": cell_type,
+        "execution_count": None,
+        "metadata": {"tags": tags} if tags else {},
+        "source": source_lines,
+    }
+
+
+def get_json_tags(options: str | None) -> list[str]:
+    """Read the tags from jupytext cell options.
+
+    Parameters
+    ----------
+    options : str | None
+        Options after the cell marker or fence.
+
+    Returns
+    -------
+    list[str]
+        Tags of the cell, which is empty if there are no (valid) tags.
+    """
+    match = JSON_TAGS_PATTERN.search(options or "")
+    if match is None:
+        return []
+    try:
+        tags = json.loads(match.group("tags"))
+    except ValueError:
+        return []
+    return [str(tag) for tag in tags]
+
+
+def iter_lines_after_header(text: str) -> Iterator[str]:
+    """Iterate over the lines of a text notebook, skipping its YAML header.
+
+    Parameters
+    ----------
+    text : str
+        Content of the text notebook.
+
+    Yields
+    ------
+    str
+        Lines after the header, including their line endings.
+    """
+    lines = text.splitlines(keepends=True)
+    header_end = 0
+    if lines and lines[0].strip() in YAML_HEADER_DELIMITERS:
+        header_end = next(
+            (
+                index + 1
+                for index, line in enumerate(lines)
+                if index and line.strip() == lines[0].strip()
+            ),
+            0,
+        )
+    yield from islice(lines, header_end, None)
+
+
+def read_percent_cells(text: str) -> list[NotebookCell]:
+    """Read the cells of a percent format script, where each cell starts with ``# %%``.
+
+    Parameters
+    ----------
+    text : str
+        Content of the script.
+
+    Returns
+    -------
+    list[NotebookCell]
+        Cells of the script, lines before the first cell are a code cell if they aren't blank.
+    """
+    notebook_cells: list[NotebookCell] = []
+    cell_type, tags = "code", []
+    source_lines: list[str] = []
+    for line in iter_lines_after_header(text):
+        match = PERCENT_CELL_PATTERN.match(line)
+        if match is None:
+            source_lines.append(line)
+            continue
+        if notebook_cells or any(source_line.strip() for source_line in source_lines):
+            notebook_cells.append(create_cell(cell_type, source_lines, tags))
+        options = match.group("options") or ""
+        cell_type = "code"
+        if re.search(r"\[(markdown|md)\]", options):
+            cell_type = "markdown"
+        elif "[raw]" in options:
+            cell_type = "raw"
+        tags = get_json_tags(options)
+        source_lines = []
+    notebook_cells.append(create_cell(cell_type, source_lines, tags))
+    return notebook_cells
+
+
+def read_fenced_cells(
+    text: str,
+    fence_pattern: Pattern[str],
+    read_code_cell: Callable[[str | None, list[str]], tuple[list[str], list[str]]],
+) -> list[NotebookCell]:
+    """Read the cells of a markdown based format, where code cells are fenced code blocks.
+
+    The text between code cells is a markdown cell.
+
+    Parameters
+    ----------
+    text : str
+        Content of the file.
+    fence_pattern : Pattern[str]
+        Pattern matching the opening fence of a code cell, with the groups
+        ``fence`` (backticks) and ``options``.
+    read_code_cell : Callable[[str | None, list[str]], tuple[list[str], list[str]]]
+        Function reading the (``source_lines``, ``tags``) of a code cell
+        from its options and the lines inside of the fence.
+
+    Returns
+    -------
+    list[NotebookCell]
+        Cells of the file.
+    """
+    notebook_cells: list[NotebookCell] = []
+    source_lines: list[str] = []
+    closing_fence: str | None = None
+    options: str | None = None
+    for line in iter_lines_after_header(text):
+        if closing_fence is None:
+            match = fence_pattern.match(line)
+            if match is None:
+                source_lines.append(line)
+                continue
+            if any(source_line.strip() for source_line in source_lines):
+                notebook_cells.append(create_cell("markdown", source_lines, []))
+            closing_fence, options = match.group("fence"), match.group("options")
+            source_lines = []
+        elif line.strip() == closing_fence:
+            notebook_cells.append(create_cell("code", *read_code_cell(options, source_lines)))
+            closing_fence, source_lines = None, []
+        else:
+            source_lines.append(line)
+    if closing_fence is not None:
+        notebook_cells.append(create_cell("code", *read_code_cell(options, source_lines)))
+    elif any(source_line.strip() for source_line in source_lines):
+        notebook_cells.append(create_cell("markdown", source_lines, []))
+    return notebook_cells
+
+
+def read_markdown_cells(text: str) -> list[NotebookCell]:
+    """Read the cells of a jupytext markdown file, with code cells as ```` ```python ```` blocks.
+
+    Parameters
+    ----------
+    text : str
+        Content of the markdown file.
+
+    Returns
+    -------
+    list[NotebookCell]
+        Cells of the markdown file.
+    """
+    return read_fenced_cells(
+        text,
+        MARKDOWN_FENCE_PATTERN,
+        lambda options, source_lines: (source_lines, get_json_tags(options)),
+    )
+
+
+def get_quarto_tags(option_lines: list[str]) -> list[str]:
+    """Read the tags of a Quarto code cell from its ``#| tags: [...]`` cell option.
+
+    Parameters
+    ----------
+    option_lines : list[str]
+        ``#|`` cell option lines of the cell.
+
+    Returns
+    -------
+    list[str]
+        Tags of the cell.
+    """
+    for option_line in option_lines:
+        match = QUARTO_TAGS_PATTERN.match(option_line)
+        if match is not None:
+            return [
+                tag.strip().strip("'\"")
+                for tag in match.group("tags").split(",")
+                if tag.strip().strip("'\"")
+            ]
+    return []
+
+
+def read_quarto_code_cell(
+    options: str | None, source_lines: list[str]
+) -> tuple[list[str], list[str]]:
+    """Read a Quarto code cell, whose leading ``#|`` cell options aren't part of its code.
+
+    Like jupytext, the cell options are removed from the source of the cell,
+    so they aren't checked as comments (i.e. E265).
+
+    Parameters
+    ----------
+    options : str | None
+        Options inside of the braces of the fence, which are ignored.
+    source_lines : list[str]
+        Lines inside of the fence, starting with the ``#|`` cell options.
+
+    Returns
+    -------
+    tuple[list[str], list[str]]
+        (``source_lines``, ``tags``) of the cell.
+    """
+    option_count = 0
+    while option_count < len(source_lines) and source_lines[option_count].startswith("#|"):
+        option_count += 1
+    return source_lines[option_count:], get_quarto_tags(source_lines[:option_count])
+
+
+def read_quarto_cells(text: str) -> list[NotebookCell]:
+    """Read the cells of a Quarto document, with code cells as ```` ```{python} ```` blocks.
+
+    Parameters
+    ----------
+    text : str
+        Content of the Quarto document.
+
+    Returns
+    -------
+    list[NotebookCell]
+        Cells of the Quarto document.
+    """
+    return read_fenced_cells(text, QUARTO_FENCE_PATTERN, read_quarto_code_cell)
+
+
+def is_percent_script(file_path: str) -> bool:
+    """Check if a python script is a percent format notebook, which has a ``# %%`` cell marker.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the python script.
+
+    Returns
+    -------
+    bool
+        Whether the script has a cell marker.
+    """
+    try:
+        with open(file_path, encoding="utf8", errors="replace") as script_file:
+            return any(PERCENT_CELL_PATTERN.match(line) for line in script_file)
+    except OSError:
+        return False
+
+
+TEXT_NOTEBOOK_FORMATS: dict[str, TextNotebookFormat] = {
+    "py:percent": TextNotebookFormat(".py", read_percent_cells, is_percent_script),
+    "md": TextNotebookFormat(".md", read_markdown_cells),
+    "qmd": TextNotebookFormat(".qmd", read_quarto_cells),
+}
+"""Text based notebook formats by their name, which can be enabled via ``--nb-text-formats``."""
+
+
+def register_text_notebook_format(
+    format_name: str, text_notebook_format: TextNotebookFormat
+) -> None:
+    """Add a text based notebook format, i.e. provided by a plugin.
+
+    Parameters
+    ----------
+    format_name : str
+        Name the format is enabled by, i.e. in ``--nb-text-formats``.
+    text_notebook_format : TextNotebookFormat
+        Suffix and reader of the format.
+    """
+    TEXT_NOTEBOOK_FORMATS[format_name] = text_notebook_format
+
+
+def get_text_notebook_formats(format_names: Collection[str]) -> list[TextNotebookFormat]:
+    """Get the text based notebook formats with the given names.
+
+    Parameters
+    ----------
+    format_names : Collection[str]
+        Names of the formats.
+
+    Returns
+    -------
+    list[TextNotebookFormat]
+        Formats with the given names.
+
+    Raises
+    ------
+    ValueError
+        If a format name isn't known.
+    """
+    unknown_format_names = [name for name in format_names if name not in TEXT_NOTEBOOK_FORMATS]
+    if unknown_format_names:
+        raise ValueError(
+            f"Unknown text notebook format {', '.join(map(repr, unknown_format_names))}, "
+            f"available formats are: {', '.join(TEXT_NOTEBOOK_FORMATS)}"
+        )
+    return [TEXT_NOTEBOOK_FORMATS[name] for name in format_names]
+
+
+def get_text_notebook_format(notebook_path: str) -> TextNotebookFormat | None:
+    """Get the text based notebook format of a file by its suffix.
+
+    Parameters
+    ----------
+    notebook_path : str
+        Path of the notebook.
+
+    Returns
+    -------
+    TextNotebookFormat | None
+        Format of the notebook or ``None`` if it isn't a text based notebook,
+        which includes all files inside of archives.
+    """
+    if split_archive_path(notebook_path) is not None:
+        return None
+    suffix = os.path.splitext(notebook_path)[1].lower()
+    for text_notebook_format in TEXT_NOTEBOOK_FORMATS.values():
+        if text_notebook_format.suffix == suffix:
+            return text_notebook_format
+    return None
+
+
+def is_text_notebook(
+    file_path: str, text_notebook_formats: Collection[TextNotebookFormat]
+) -> bool:
+    """Check if a file is a notebook in one of the given text based formats.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+    text_notebook_formats : Collection[TextNotebookFormat]
+        Enabled text based notebook formats.
+
+    Returns
+    -------
+    bool
+        Whether the file is a text based notebook.
+    """
+    suffix = os.path.splitext(file_path)[1].lower()
+    return any(
+        text_notebook_format.suffix == suffix and text_notebook_format.is_notebook(file_path)
+        for text_notebook_format in text_notebook_formats
+    )
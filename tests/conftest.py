@@ -3,10 +3,16 @@ from typing import Iterator
 
 import pytest
 
+from flake8_nb import FLAKE8_VERSION_TUPLE
 from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
 from flake8_nb.parsers.notebook_parsers import NotebookParser
 from tests.parsers.test_notebook_parsers import TEST_NOTEBOOK_BASE_PATH
 
+collect_ignore = []
+if FLAKE8_VERSION_TUPLE < (5, 0, 0):
+    # the checker is only used with flake8>=5.0.0
+    collect_ignore.append(os.path.join("flake8_integration", "test_checker.py"))
+
 
 @pytest.fixture(scope="function")
 def notebook_parser() -> Iterator[NotebookParser]:
@@ -0,0 +1,88 @@
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from flake8_nb.flake8_integration.check_costs import CHECK_SECONDS_STATISTIC
+from flake8_nb.flake8_integration.check_costs import estimate_check_costs
+from flake8_nb.flake8_integration.check_costs import get_check_key
+from flake8_nb.flake8_integration.check_costs import order_checkers_by_cost
+from flake8_nb.flake8_integration.check_costs import read_check_timings
+from flake8_nb.flake8_integration.check_costs import update_check_timings
+from flake8_nb.flake8_integration.check_costs import write_check_timings
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from tests.flake8_integration.test_formatter import TEST_NOTEBOOK_PATH
+
+
+def get_checker(display_name: str, lines: int, seconds: float = None) -> SimpleNamespace:
+    statistics = {"physical lines": lines}
+    if seconds is not None:
+        statistics[CHECK_SECONDS_STATISTIC] = seconds
+    return SimpleNamespace(display_name=display_name, statistics=statistics)
+
+
+def test_get_check_key():
+    with NotebookSession() as session:
+        (intermediate_path,) = session.add_notebooks([os.path.abspath(TEST_NOTEBOOK_PATH)])
+        assert get_check_key(intermediate_path) == os.path.normcase(TEST_NOTEBOOK_PATH)
+    assert get_check_key(os.path.abspath("setup.py")) == "setup.py"
+    assert get_check_key("./setup.py") == "setup.py"
+
+
+def test_read_write_check_timings(tmp_path: Path):
+    timings_path = str(tmp_path / "timings.json")
+    assert read_check_timings(timings_path) == {}
+
+    check_timings = {"a.py": {"seconds": 0.5, "lines": 10.0}}
+    write_check_timings(timings_path, check_timings)
+    assert read_check_timings(timings_path) == check_timings
+    assert os.listdir(tmp_path) == ["timings.json"]
+
+    for invalid_content in ("{", "[]", '{"a.py": {"seconds": 1}}'):
+        Path(timings_path).write_text(invalid_content)
+        assert read_check_timings(timings_path) == {}
+
+
+def test_update_check_timings():
+    check_timings = {"a.py": {"seconds": 0.5, "lines": 10}, "b.py": {"seconds": 1, "lines": 2}}
+    checkers = [
+        get_checker("./a.py", 20, 0.1),
+        get_checker("c.py", 3, 0.2),
+        get_checker("d.py", 4),
+    ]
+    assert update_check_timings(check_timings, checkers) == {
+        "a.py": {"seconds": 0.1, "lines": 20},
+        "b.py": {"seconds": 1, "lines": 2},
+        "c.py": {"seconds": 0.2, "lines": 3},
+    }
+
+
+@pytest.mark.parametrize(
+    "check_timings,expected_costs,expected_order",
+    [
+        (None, [10, 30, 20], ["b.py", "c.py", "a.py"]),
+        # a.py is stored as much slower than its lines suggest and b.py doubled its lines
+        (
+            {"a.py": {"seconds": 3, "lines": 10}, "b.py": {"seconds": 1, "lines": 15}},
+            [3, 2, 3.2],
+            ["c.py", "a.py", "b.py"],
+        ),
+    ],
+)
+def test_estimate_check_costs_order_checkers_by_cost(
+    check_timings: dict, expected_costs: list, expected_order: list
+):
+    checkers = [get_checker("a.py", 10), get_checker("b.py", 30), get_checker("c.py", 20)]
+    # c.py has no timing, so it uses the average of 4 seconds per 25 lines
+    assert estimate_check_costs(checkers, check_timings) == pytest.approx(expected_costs)
+    assert [
+        checker.display_name for checker in order_checkers_by_cost(checkers, check_timings)
+    ] == expected_order
+
+
+def test_write_check_timings_json(tmp_path: Path):
+    timings_path = tmp_path / "timings.json"
+    write_check_timings(str(timings_path), {"b.py": {"seconds": 1, "lines": 1}, "a.py": {}})
+    assert list(json.loads(timings_path.read_text())) == ["a.py", "b.py"]
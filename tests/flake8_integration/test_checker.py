@@ -0,0 +1,111 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from flake8_nb import FLAKE8_VERSION_TUPLE
+from flake8_nb.flake8_integration.checker import NotebookCheckerManager
+from flake8_nb.flake8_integration.checker import map_results_to_notebook
+from flake8_nb.flake8_integration.cli import Flake8NbApplication
+from flake8_nb.parsers import CellId
+from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
+from flake8_nb.parsers.notebook_parsers import NotebookParser
+from flake8_nb.parsers.notebook_parsers import get_source_map_path
+from tests import TEST_NOTEBOOK_BASE_PATH
+from tests.flake8_integration.test_formatter import TEST_NOTEBOOK_PATH
+from tests.flake8_integration.test_formatter import get_test_intermediate_path
+
+
+def test_map_results_to_notebook(notebook_parser: NotebookParser):
+    intermediate_path = get_test_intermediate_path(notebook_parser.intermediate_py_file_paths)
+    results = [("AB123", 8, 2, "text", None), ("AB123", 30, 2, "text", None)]
+
+    assert map_results_to_notebook(intermediate_path, results) == [
+        ("AB123", 8, 2, "text", None, (TEST_NOTEBOOK_PATH, CellId("1", 1, 4), 2)),
+        ("AB123", 30, 2, "text", None, (TEST_NOTEBOOK_PATH, CellId("4", 4, 11), 3)),
+    ]
+    assert map_results_to_notebook("not_a_parsed_notebook.py", results) == results
+
+
+@pytest.mark.skipif(FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="Only implemented for flake8>=5.0.0")
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_NotebookCheckerManager(capsys, jobs: str):
+    app = Flake8NbApplication()
+    with pytest.warns(InvalidNotebookWarning):
+        app.initialize(["--jobs", jobs, TEST_NOTEBOOK_BASE_PATH])
+    assert isinstance(app.file_checker_manager, NotebookCheckerManager)
+    app.run_checks()
+
+    notebook_results = [
+        result
+        for checker in app.file_checker_manager.checkers
+        if checker.filename.endswith(".ipynb_parsed")
+        for result in checker.results
+    ]
+    assert notebook_results
+    assert all(len(result) == 6 for result in notebook_results)
+
+    # the main process only needs the locations resolved by the checkers
+    for intermediate_path in NotebookParser.intermediate_py_file_paths:
+        os.remove(get_source_map_path(intermediate_path))
+    app.report()
+    NotebookParser.clean_up()
+
+    result_list = capsys.readouterr().out.splitlines()
+    assert len(result_list) == 11
+    assert not any(".ipynb_parsed" in result for result in result_list)
+
+
+@pytest.mark.skipif(FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="Only implemented for flake8>=5.0.0")
+def test_NotebookCheckerManager_order_by_cost(tmp_path: Path):
+    for filename, line_count in (("a_small.py", 1), ("b_large.py", 50), ("c_medium.py", 10)):
+        (tmp_path / filename).write_text("x = 1\n" * line_count)
+    timing_keys = {
+        filename: os.path.normcase(os.path.relpath(tmp_path / filename))
+        for filename in ("a_small.py", "b_large.py", "c_medium.py")
+    }
+    timings_path = tmp_path / "timings.json"
+    timings_path.write_text(
+        json.dumps(
+            {
+                timing_keys["a_small.py"]: {"seconds": 10, "lines": 1},
+                timing_keys["b_large.py"]: {"seconds": 0.1, "lines": 50},
+            }
+        )
+    )
+
+    def get_checked_filenames(argv: list) -> tuple:
+        app = Flake8NbApplication()
+        app.initialize(
+            [
+                *argv,
+                *(str(tmp_path / name) for name in ("a_small.py", "b_large.py", "c_medium.py")),
+            ]
+        )
+        app.run_checks()
+        app.report()
+        app.notebook_session.clean_up()
+        # the results are reported in the original order
+        assert [
+            os.path.basename(checker.display_name)
+            for checker in app.file_checker_manager._all_checkers
+        ] == ["a_small.py", "b_large.py", "c_medium.py"]
+        return app, [
+            os.path.basename(checker.display_name) for checker in app.file_checker_manager.checkers
+        ]
+
+    app, checked_filenames = get_checked_filenames(["--jobs", "2"])
+    assert checked_filenames == ["b_large.py", "c_medium.py", "a_small.py"]
+    assert app.check_timings is None
+
+    app, checked_filenames = get_checked_filenames(
+        ["--jobs", "2", "--nb-timings-file", str(timings_path)]
+    )
+    # a_small.py was slow in the previous run, which makes c_medium.py slow as well
+    assert checked_filenames == ["a_small.py", "c_medium.py", "b_large.py"]
+    assert set(app.check_timings) == set(timing_keys.values())
+    assert app.check_timings[timing_keys["a_small.py"]]["seconds"] < 10
+
+    app, checked_filenames = get_checked_filenames(["--jobs", "1"])
+    assert checked_filenames == ["a_small.py", "b_large.py", "c_medium.py"]
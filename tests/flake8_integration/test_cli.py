@@ -1,15 +1,25 @@
 import contextlib
+import io
 import os
 import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import flake8
 import pytest
 
 from flake8_nb import FLAKE8_VERSION_TUPLE
 from flake8_nb import __version__
+from flake8_nb.flake8_integration import cli
 from flake8_nb.flake8_integration.cli import Flake8NbApplication
 from flake8_nb.flake8_integration.cli import get_notebooks_from_args
 from flake8_nb.flake8_integration.cli import hack_option_manager_generate_versions
+from flake8_nb.flake8_integration.cli import iter_paths_from_stream
+from flake8_nb.flake8_integration.cli import sort_notebooks_by_mtime
+from flake8_nb.parsers.notebook_archives import JsonlIndex
+from flake8_nb.parsers.notebook_archives import read_notebook_bytes
+from flake8_nb.parsers.notebook_archives import use_jsonl_index
 from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
 from flake8_nb.parsers.notebook_parsers import NotebookParser
 from tests.flake8_integration.conftest import TempIpynbArgs
@@ -24,6 +34,70 @@ def test_get_notebooks_from_args(temp_ipynb_args: TempIpynbArgs):
     assert sorted(nb_list) == sorted(expected_nb_list)
 
 
+def test_get_notebooks_from_args_jsonl(tmp_path):
+    jsonl_path = tmp_path / "export.jsonl"
+    jsonl_path.write_text('{"name": "a", "cells": []}\n{"cells": []}\n')
+    with use_jsonl_index(JsonlIndex()):
+        args, nb_list = get_notebooks_from_args([str(jsonl_path)], jsonl_id_field="name")
+        assert read_notebook_bytes(nb_list[1]) == b'{"cells": []}\n'
+    abs_jsonl_path = os.path.normcase(os.path.abspath(jsonl_path))
+
+    assert args == []
+    assert nb_list == [f"{abs_jsonl_path}!a", f"{abs_jsonl_path}!line-2"]
+
+
+def test_sort_notebooks_by_mtime(tmp_path):
+    notebook_paths = []
+    for mtime in (2, 3, 1):
+        notebook_path = tmp_path / f"notebook_{mtime}.ipynb"
+        notebook_path.touch()
+        os.utime(notebook_path, (mtime, mtime))
+        notebook_paths.append(str(notebook_path))
+
+    assert [os.path.basename(path) for path in sort_notebooks_by_mtime(notebook_paths)] == [
+        "notebook_3.ipynb",
+        "notebook_2.ipynb",
+        "notebook_1.ipynb",
+    ]
+
+
+def test_sort_notebooks_by_mtime_is_lazy(tmp_path):
+    notebook_path = tmp_path / "notebook.ipynb"
+    notebook_path.touch()
+    searched = []
+
+    def iter_notebook_paths():
+        searched.append(threading.current_thread().name)
+        yield str(notebook_path)
+
+    sorted_paths = sort_notebooks_by_mtime(iter_notebook_paths())
+    assert searched == []
+    thread = threading.Thread(target=lambda: list(sorted_paths), name="converter")
+    thread.start()
+    thread.join()
+    assert searched == ["converter"]
+
+
+@pytest.mark.parametrize("chunk_size", [3, 64 * 1024])
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"a.ipynb\nsub dir/b.ipynb\r\n\nc.py",
+        b"a.ipynb\nsub dir/b.ipynb\r\n\nc.py\n",
+        b"a.ipynb\0sub dir/b.ipynb\r\n\0\0c.py\0",
+    ],
+)
+def test_iter_paths_from_stream(monkeypatch: pytest.MonkeyPatch, content: bytes, chunk_size: int):
+    monkeypatch.setattr(cli, "FILES_FROM_CHUNK_SIZE", chunk_size)
+    expected_b_path = "sub dir/b.ipynb\r\n" if b"\0" in content else "sub dir/b.ipynb"
+    assert list(iter_paths_from_stream(io.BytesIO(content))) == [
+        "a.ipynb",
+        expected_b_path,
+        "c.py",
+    ]
+    assert list(iter_paths_from_stream(io.BytesIO(b""))) == []
+
+
 def test_hack_option_manager_generate_versions():
     pattern = re.compile(rf"flake8: {flake8.__version__}, original_input")
 
@@ -83,12 +157,13 @@ def test_Flake8NbApplication__option_defaults():
 @pytest.mark.filterwarnings(InvalidNotebookWarning)
 def test_Flake8NbApplication__hack_args(temp_ipynb_args: TempIpynbArgs):
     orig_args, (expected_args, _) = temp_ipynb_args.get_args_and_result()
-    result = Flake8NbApplication.hack_args(
-        orig_args, exclude=["*.tox/*", "*.ipynb_checkpoints*", "*/docs/*"]
-    )
-    expected_parsed_nb_list = NotebookParser.intermediate_py_file_paths
+    app = Flake8NbApplication()
+    result = app.hack_args(orig_args, exclude=["*.tox/*", "*.ipynb_checkpoints*", "*/docs/*"])
+    expected_parsed_nb_list = app.notebook_session.intermediate_py_file_paths
 
     assert result == expected_args + expected_parsed_nb_list
+    assert NotebookParser.intermediate_py_file_paths == []
+    app.notebook_session.clean_up()
 
 
 @pytest.mark.filterwarnings(InvalidNotebookWarning)
@@ -97,9 +172,10 @@ def test_Flake8NbApplication__parse_configuration_and_cli():
     app = Flake8NbApplication()
     # parse_configuration_and_cli is called by initialize
     app.initialize(orig_args)
-    expected_parsed_nb_list = NotebookParser.intermediate_py_file_paths
+    expected_parsed_nb_list = app.notebook_session.intermediate_py_file_paths
 
     assert app.args == orig_args + expected_parsed_nb_list
+    app.notebook_session.clean_up()
 
 
 @pytest.mark.parametrize("keep_parsed_notebooks", [False, True])
@@ -110,8 +186,47 @@ def test_Flake8NbApplication__exit(keep_parsed_notebooks: bool):
             orig_args += ["--keep-parsed-notebooks"]
         app = Flake8NbApplication()
         app.initialize([*orig_args, os.path.join("tests", "data", "notebooks")])
-        temp_path = NotebookParser.temp_path
+        temp_path = app.notebook_session.temp_path
         with contextlib.suppress(SystemExit):
             app.exit()
     assert os.path.exists(temp_path) == keep_parsed_notebooks
-    NotebookParser.clean_up()
+    app.notebook_session.clean_up()
+
+
+@pytest.mark.filterwarnings(InvalidNotebookWarning)
+def test_Flake8NbApplication_concurrent_runs(tmp_path):
+    """Runs in different threads of one process don't share their parsed notebooks."""
+    notebook_names = ["notebook_with_flake8_tags.ipynb", "notebook_with_out_flake8_tags.ipynb"]
+
+    def run(notebook_name: str, output_file: str) -> str:
+        app = Flake8NbApplication()
+        with contextlib.suppress(SystemExit):
+            app.run(
+                [
+                    "--jobs",
+                    "1",
+                    "--keep-parsed-notebooks",
+                    "--output-file",
+                    output_file,
+                    os.path.join("tests", "data", "notebooks", notebook_name),
+                ]
+            )
+        return app.notebook_session.temp_path
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(run, notebook_name, str(tmp_path / f"{notebook_name}.txt"))
+            for notebook_name in notebook_names * 2
+        ]
+        temp_paths = [future.result() for future in futures]
+
+    assert len(set(temp_paths)) == len(temp_paths)
+    for notebook_name in notebook_names:
+        reported_paths = {
+            line.split("#")[0]
+            for line in (tmp_path / f"{notebook_name}.txt").read_text().splitlines()
+        }
+        assert reported_paths == {os.path.join("tests", "data", "notebooks", notebook_name)}
+    for temp_path in temp_paths:
+        shutil.rmtree(temp_path)
+    assert NotebookParser.temp_path == ""
@@ -0,0 +1,125 @@
+import json
+import os
+from optparse import Values
+from pathlib import Path
+
+import pytest
+
+from flake8_nb.flake8_integration.json_formatter import IpynbJsonLinesFormatter
+from flake8_nb.flake8_integration.json_formatter import IpynbSarifFormatter
+from flake8_nb.flake8_integration.json_formatter import map_violations_to_records
+from flake8_nb.parsers.notebook_parsers import NotebookParser
+from tests.flake8_integration.test_formatter import TEST_NOTEBOOK_PATH
+from tests.flake8_integration.test_formatter import get_mocked_violation
+from tests.flake8_integration.test_formatter import get_test_intermediate_path
+
+PYTHON_FILE_PATH = os.path.join("tests", "data", "notebooks", "falsy_python_file.py")
+
+
+def get_mocked_option(output_file: str, formatter: str) -> Values:
+    return Values(
+        {
+            "output_file": output_file,
+            "format": formatter,
+            "color": "never",
+            "tee": False,
+            "show_source": False,
+        }
+    )
+
+
+def run_formatter(formatter, notebook_parser: NotebookParser):
+    intermediate_path = get_test_intermediate_path(notebook_parser.intermediate_py_file_paths)
+    formatter.start()
+    for filename, line_numbers in ((PYTHON_FILE_PATH, [1]), (intermediate_path, [8, 30])):
+        formatter.beginning(filename)
+        for line_number in line_numbers:
+            formatter.handle(get_mocked_violation(filename, line_number))
+        formatter.finished(filename)
+    formatter.stop()
+
+
+def test_map_violations_to_records(notebook_parser: NotebookParser):
+    intermediate_path = get_test_intermediate_path(notebook_parser.intermediate_py_file_paths)
+    violations = [get_mocked_violation(intermediate_path, line) for line in (8, 30)]
+    records = map_violations_to_records(intermediate_path, violations)
+
+    assert records == [
+        {
+            "path": TEST_NOTEBOOK_PATH,
+            "cell": {"input_nr": "1", "code_cell_nr": 1, "total_cell_nr": 4},
+            "line": 2,
+            "column": 2,
+            "code": "AB123",
+            "text": "This is just for the coverage",
+        },
+        {
+            "path": TEST_NOTEBOOK_PATH,
+            "cell": {"input_nr": "4", "code_cell_nr": 4, "total_cell_nr": 11},
+            "line": 3,
+            "column": 2,
+            "code": "AB123",
+            "text": "This is just for the coverage",
+        },
+    ]
+    python_violation = get_mocked_violation(PYTHON_FILE_PATH, 1)
+    (record,) = map_violations_to_records(PYTHON_FILE_PATH, [python_violation])
+    assert record["path"] == PYTHON_FILE_PATH
+    assert record["cell"] is None
+    assert record["line"] == 1
+
+
+def test_IpynbJsonLinesFormatter(tmp_path: Path, notebook_parser: NotebookParser):
+    output_file = tmp_path / "report.jsonl"
+    formatter = IpynbJsonLinesFormatter(get_mocked_option(str(output_file), "jsonl_notebook"))
+    run_formatter(formatter, notebook_parser)
+
+    records = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert [(record["path"], record["line"]) for record in records] == [
+        (PYTHON_FILE_PATH, 1),
+        (TEST_NOTEBOOK_PATH, 2),
+        (TEST_NOTEBOOK_PATH, 3),
+    ]
+    assert records[2]["cell"] == {"input_nr": "4", "code_cell_nr": 4, "total_cell_nr": 11}
+
+    violation = get_mocked_violation(PYTHON_FILE_PATH, 1)
+    assert json.loads(formatter.format(violation))["path"] == PYTHON_FILE_PATH
+
+
+@pytest.mark.parametrize("profile", [None, "strict"])
+@pytest.mark.parametrize("has_violations", [True, False])
+def test_IpynbSarifFormatter(
+    tmp_path: Path, notebook_parser: NotebookParser, has_violations: bool, profile: str
+):
+    output_file = tmp_path / "report.sarif"
+    formatter = IpynbSarifFormatter(get_mocked_option(str(output_file), "sarif_notebook"))
+    formatter.set_profile(profile)
+    if has_violations:
+        run_formatter(formatter, notebook_parser)
+    else:
+        formatter.start()
+        formatter.show_statistics(None)
+        formatter.stop()
+
+    sarif_log = json.loads(output_file.read_text())
+    assert sarif_log["version"] == "2.1.0"
+    (run,) = sarif_log["runs"]
+    assert run["tool"]["driver"]["name"] == "flake8_nb"
+    if not has_violations:
+        assert run["results"] == []
+        return
+    assert len(run["results"]) == 3
+    python_result, _, notebook_result = run["results"]
+    if profile is None:
+        assert "properties" not in python_result
+    else:
+        assert python_result["properties"] == {"profile": profile}
+        assert notebook_result["properties"]["profile"] == profile
+    assert notebook_result["ruleId"] == "AB123"
+    assert notebook_result["properties"]["cell"]["input_nr"] == "4"
+    (location,) = notebook_result["locations"]
+    assert (
+        location["physicalLocation"]["artifactLocation"]["uri"]
+        == Path(TEST_NOTEBOOK_PATH).as_posix()
+    )
+    assert location["physicalLocation"]["region"] == {"startLine": 3, "startColumn": 2}
@@ -0,0 +1,68 @@
+import configparser
+import os
+
+import pytest
+
+from flake8_nb.flake8_integration.profiles import create_profile_config
+from flake8_nb.flake8_integration.profiles import get_profile_names
+from flake8_nb.flake8_integration.profiles import matches_profile_paths
+from flake8_nb.parsers.notebook_parsers import NotebookParser
+from tests.flake8_integration.test_formatter import TEST_NOTEBOOK_PATH
+from tests.flake8_integration.test_formatter import get_test_intermediate_path
+
+
+def get_config() -> configparser.RawConfigParser:
+    cfg = configparser.RawConfigParser()
+    cfg.read_string(
+        "[flake8_nb]\nmax-line-length = 120\nextend-ignore = E231\n"
+        "[flake8_nb:profile:strict]\nmax-line-length = 79\n"
+        "[flake8_nb:profile:lenient]\nnb-profile-paths = exploratory\n"
+        "[isort]\nline_length = 99\n"
+    )
+    return cfg
+
+
+def test_get_profile_names():
+    assert get_profile_names(get_config()) == ["strict", "lenient"]
+    assert get_profile_names(configparser.RawConfigParser()) == []
+
+
+def test_create_profile_config():
+    profile_cfg = create_profile_config(get_config(), "strict")
+    assert profile_cfg.sections() == ["flake8_nb"]
+    assert dict(profile_cfg.items("flake8_nb")) == {
+        "max-line-length": "79",
+        "extend-ignore": "E231",
+    }
+
+    with pytest.raises(ValueError, match="Unknown profile 'preview'.*are: strict, lenient"):
+        create_profile_config(get_config(), "preview")
+    with pytest.raises(ValueError, match="Defined profiles are: none"):
+        create_profile_config(configparser.RawConfigParser(), "strict")
+
+
+@pytest.mark.parametrize(
+    "patterns,expected",
+    [
+        ([], True),
+        (["src"], True),
+        (["./src/"], True),
+        (["src/*.py"], True),
+        (["*/module.py"], True),
+        (["exploratory", "src/pkg"], True),
+        (["exploratory"], False),
+        (["sr"], False),
+        (["src/*.ipynb"], False),
+    ],
+)
+def test_matches_profile_paths(patterns: list, expected: bool):
+    filename = os.path.abspath(os.path.join("src", "pkg", "module.py"))
+    assert matches_profile_paths(filename, patterns) == expected
+
+
+def test_matches_profile_paths_notebook(notebook_parser: NotebookParser):
+    intermediate_path = get_test_intermediate_path(notebook_parser.intermediate_py_file_paths)
+    notebook_folder = os.path.dirname(TEST_NOTEBOOK_PATH)
+    assert matches_profile_paths(intermediate_path, [notebook_folder])
+    assert matches_profile_paths(intermediate_path, [f"{notebook_folder}/*.ipynb"])
+    assert not matches_profile_paths(intermediate_path, ["*.ipynb_parsed"])
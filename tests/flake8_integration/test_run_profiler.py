@@ -0,0 +1,76 @@
+import os
+import pstats
+from pathlib import Path
+
+from flake8_nb.flake8_integration.run_profiler import COLLAPSED_STACKS
+from flake8_nb.flake8_integration.run_profiler import MERGED_PROFILE
+from flake8_nb.flake8_integration.run_profiler import RunProfiler
+from flake8_nb.flake8_integration.run_profiler import format_frame
+from flake8_nb.flake8_integration.run_profiler import iter_collapsed_stacks
+
+MAIN = ("main.py", 1, "main")
+CHECK = ("check.py", 5, "check")
+PARSE = ("parse.py", 9, "parse")
+SLEEP = ("~", 0, "<built-in method time.sleep>")
+
+
+def profiled_function():
+    return sorted(range(1000), key=str)
+
+
+def test_format_frame():
+    assert format_frame(CHECK) == "check (check.py:5)"
+    assert format_frame(SLEEP) == "<built-in method time.sleep>"
+    assert format_frame(("a;b.py", 1, "f")) == "f (a,b.py:1)"
+
+
+def test_iter_collapsed_stacks():
+    # (cc, nc, inline time, cumulative time, callers)
+    stats = {
+        MAIN: (1, 1, 1.0, 9.0, {}),
+        CHECK: (2, 2, 2.0, 6.0, {MAIN: (2, 2, 2.0, 6.0)}),
+        # parse is called by main and check, so its time is split between both stacks
+        PARSE: (2, 2, 3.0, 3.0, {MAIN: (1, 1, 2.0, 2.0), CHECK: (1, 1, 1.0, 1.0)}),
+        SLEEP: (1, 1, 3.0, 3.0, {CHECK: (1, 1, 3.0, 3.0)}),
+    }
+    collapsed_stacks = dict(iter_collapsed_stacks(stats, "main"))
+
+    assert collapsed_stacks == {
+        "main;main (main.py:1)": 1_000_000,
+        "main;main (main.py:1);check (check.py:5)": 2_000_000,
+        "main;main (main.py:1);check (check.py:5);parse (parse.py:9)": 1_000_000,
+        "main;main (main.py:1);check (check.py:5);<built-in method time.sleep>": 3_000_000,
+        "main;main (main.py:1);parse (parse.py:9)": 2_000_000,
+    }
+    assert sum(collapsed_stacks.values()) == 9_000_000
+
+
+def test_iter_collapsed_stacks_recursion():
+    stats = {
+        MAIN: (1, 1, 1.0, 4.0, {}),
+        CHECK: (1, 3, 3.0, 3.0, {MAIN: (1, 1, 1.0, 3.0), CHECK: (2, 2, 2.0, 2.0)}),
+    }
+
+    assert dict(iter_collapsed_stacks(stats, "worker")) == {
+        "worker;main (main.py:1)": 1_000_000,
+        "worker;main (main.py:1);check (check.py:5)": 3_000_000,
+    }
+
+
+def test_run_profiler(tmp_path: Path):
+    profile_dir = tmp_path / "profile"
+    profile_dir.mkdir()
+    (profile_dir / "worker-1.pstats").write_text("stale profile of a previous run")
+    run_profiler = RunProfiler(str(profile_dir))
+    assert run_profiler.get_worker_profile_paths() == []
+
+    run_profiler.start()
+    profiled_function()
+    merged_profile_path = run_profiler.stop()
+
+    assert merged_profile_path == os.path.join(profile_dir, MERGED_PROFILE)
+    function_names = {function[2] for function in pstats.Stats(merged_profile_path).stats}
+    assert "profiled_function" in function_names
+    collapsed_stacks = (profile_dir / COLLAPSED_STACKS).read_text().splitlines()
+    assert any("profiled_function (" in stack for stack in collapsed_stacks)
+    assert all(stack.startswith("main;") for stack in collapsed_stacks)
@@ -0,0 +1,168 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from flake8_nb.lsp.notebook_document import NotebookDocument
+from flake8_nb.lsp.notebook_document import NotebookDocumentCell
+from flake8_nb.lsp.notebook_document import apply_text_change
+from flake8_nb.parsers.notebook_parsers import create_intermediate_py_file
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+TEST_NOTEBOOKS = [
+    "notebook_with_flake8_tags.ipynb",
+    "notebook_with_out_flake8_tags.ipynb",
+    "notebook_with_out_ipython_magic.ipynb",
+]
+
+
+def get_lsp_notebook(notebook_name: str) -> tuple[list, list]:
+    """Notebook cells and cell text documents as sent by an LSP client."""
+    notebook = json.loads((Path(TEST_NOTEBOOK_BASE_PATH) / notebook_name).read_text())
+    cells = []
+    cell_text_documents = []
+    for index, cell in enumerate(notebook["cells"]):
+        uri = f"cell:{notebook_name}#{index}"
+        cells.append(
+            {
+                "kind": 2 if cell["cell_type"] == "code" else 1,
+                "document": uri,
+                "metadata": cell.get("metadata", {}),
+                "executionSummary": {"executionOrder": cell.get("execution_count")},
+            }
+        )
+        cell_text_documents.append({"uri": uri, "text": "".join(cell["source"])})
+    return cells, cell_text_documents
+
+
+def get_notebook_document(notebook_name: str) -> NotebookDocument:
+    cells, cell_text_documents = get_lsp_notebook(notebook_name)
+    return NotebookDocument(
+        notebook_name,
+        [
+            NotebookDocumentCell.from_lsp(cell, document["text"])
+            for cell, document in zip(cells, cell_text_documents)
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "change,expected",
+    [
+        ({"text": "new text"}, "new text"),
+        (
+            {"range": {"start": {"line": 1, "character": 1}, "end": {"line": 1, "character": 2}}},
+            "line0\nl_ne1\nline2",
+        ),
+        (
+            {"range": {"start": {"line": 0, "character": 4}, "end": {"line": 2, "character": 0}}},
+            "line_line2",
+        ),
+        (
+            {"range": {"start": {"line": 3, "character": 0}, "end": {"line": 3, "character": 0}}},
+            "line0\nline1\nline2_",
+        ),
+    ],
+)
+def test_apply_text_change(change: dict, expected: str):
+    change.setdefault("text", "_")
+    assert apply_text_change("line0\nline1\nline2", change) == expected
+
+
+@pytest.mark.parametrize("notebook_name", TEST_NOTEBOOKS)
+def test_NotebookDocument_matches_intermediate_py_file(tmp_path: Path, notebook_name: str):
+    notebook_document = get_notebook_document(notebook_name)
+    intermediate_path, input_line_mapping = create_intermediate_py_file(
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, notebook_name), str(tmp_path)
+    )
+
+    assert notebook_document.get_intermediate_code() == Path(intermediate_path).read_text()
+    assert notebook_document.get_input_line_mapping() == input_line_mapping
+
+
+@pytest.mark.parametrize("notebook_name", TEST_NOTEBOOKS)
+def test_NotebookDocument_update_cell(notebook_name: str):
+    """Updating a cell leads to the same state as parsing the changed notebook."""
+    notebook_document = get_notebook_document(notebook_name)
+    new_texts = ["x = 1\n\n\n\nnew_line = 1\n", "", "%matplotlib inline"]
+    for index, cell in enumerate(notebook_document.cells):
+        if index % 3 == 0:
+            continue
+        new_text = new_texts[index % len(new_texts)]
+        notebook_document.update_cell(cell.uri, changes=[{"text": new_text}])
+        assert cell.text == new_text
+
+    expected_document = NotebookDocument(
+        notebook_name,
+        [
+            NotebookDocumentCell(
+                cell.uri, cell.kind, cell.text, cell.execution_count, cell.metadata
+            )
+            for cell in notebook_document.cells
+        ],
+    )
+    assert notebook_document.get_intermediate_code() == expected_document.get_intermediate_code()
+    assert notebook_document.get_input_line_mapping() == expected_document.get_input_line_mapping()
+
+
+def test_NotebookDocument_update_cell_data():
+    notebook_document = get_notebook_document("notebook_with_out_flake8_tags.ipynb")
+    cell = notebook_document.get_parsed_cells()[0]
+    notebook_document.update_cell(
+        cell.uri, execution_count=42, metadata={"tags": ["flake8-noqa-cell"]}
+    )
+
+    assert cell.input_id is not None
+    assert cell.input_id.input_nr == "42"
+    assert "# noqa" in cell.intermediate_code
+
+
+def test_NotebookDocument_replace_cells():
+    """Inserting and deleting cells renumbers the following cells."""
+    notebook_document = get_notebook_document("notebook_with_out_flake8_tags.ipynb")
+    cell_count = len(notebook_document.cells)
+    new_cells = [NotebookDocumentCell("new#1", 2, "import os"), NotebookDocumentCell("new#2", 1)]
+    notebook_document.replace_cells(1, 2, new_cells)
+
+    assert len(notebook_document.cells) == cell_count
+    assert notebook_document.cells[1].input_id is not None
+    assert notebook_document.cells[1].input_id.total_cell_nr == 2
+    assert notebook_document.get_cell_index("new#2") == 2
+    expected_document = NotebookDocument(
+        "expected",
+        [
+            NotebookDocumentCell(
+                cell.uri, cell.kind, cell.text, cell.execution_count, cell.metadata
+            )
+            for cell in notebook_document.cells
+        ],
+    )
+    assert notebook_document.get_input_line_mapping() == expected_document.get_input_line_mapping()
+    with pytest.raises(KeyError):
+        notebook_document.get_cell_index("not_a_cell")
+
+
+def test_NotebookDocument_map_intermediate_lines():
+    notebook_document = NotebookDocument(
+        "notebook",
+        [
+            NotebookDocumentCell("cell#1", 2, "%matplotlib inline\nimport os"),
+            NotebookDocumentCell("cell#2", 1, "# Markdown"),
+            NotebookDocumentCell("cell#3", 2, "x = 1\ny = 2\n"),
+        ],
+    )
+    assert notebook_document.get_input_line_mapping()["code_lines"] == [4, 11]
+
+    locations = notebook_document.map_intermediate_lines([1, 4, 7, 8, 12, 15, 16])
+    assert [
+        None if location is None else (location[0].uri, location[1]) for location in locations
+    ] == [
+        None,
+        ("cell#1", 1),
+        ("cell#1", 1),
+        ("cell#1", 2),
+        ("cell#3", 1),
+        ("cell#3", 2),
+        ("cell#3", 3),
+    ]
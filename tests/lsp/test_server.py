@@ -0,0 +1,291 @@
+import io
+
+import pytest
+
+from flake8_nb import FLAKE8_VERSION_TUPLE
+from flake8_nb import __version__
+from tests.lsp.test_notebook_document import TEST_NOTEBOOKS
+from tests.lsp.test_notebook_document import get_lsp_notebook
+from tests.lsp.test_notebook_document import get_notebook_document
+
+pytestmark = pytest.mark.skipif(
+    FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="The language server requires flake8>=5.0.0"
+)
+
+if FLAKE8_VERSION_TUPLE >= (5, 0, 0):
+    from flake8_nb.lsp.server import NotebookLanguageServer
+    from flake8_nb.lsp.server import NotebookLinter
+    from flake8_nb.lsp.server import read_message
+    from flake8_nb.lsp.server import uri_to_path
+    from flake8_nb.lsp.server import write_message
+
+NOTEBOOK_URI = "file:///project/notebook.ipynb"
+
+
+@pytest.fixture(scope="module")
+def linter() -> "NotebookLinter":
+    return NotebookLinter()
+
+
+def get_messages(output: io.BytesIO) -> list:
+    output.seek(0)
+    messages = []
+    while True:
+        message = read_message(output)
+        if message is None:
+            break
+        messages.append(message)
+    output.seek(0)
+    output.truncate()
+    return messages
+
+
+def get_published_diagnostics(output: io.BytesIO) -> dict:
+    """Line, column and code of the published diagnostics for each cell."""
+    return {
+        message["params"]["uri"]: [
+            (
+                diagnostic["range"]["start"]["line"] + 1,
+                diagnostic["range"]["start"]["character"] + 1,
+                diagnostic["code"],
+            )
+            for diagnostic in message["params"]["diagnostics"]
+        ]
+        for message in get_messages(output)
+        if message["method"] == "textDocument/publishDiagnostics"
+    }
+
+
+def open_notebook(server: "NotebookLanguageServer", notebook_name: str) -> list:
+    cells, cell_text_documents = get_lsp_notebook(notebook_name)
+    server.handle_message(
+        {
+            "method": "notebookDocument/didOpen",
+            "params": {
+                "notebookDocument": {"uri": NOTEBOOK_URI, "cells": cells},
+                "cellTextDocuments": cell_text_documents,
+            },
+        }
+    )
+    return cells
+
+
+def test_read_write_message():
+    stream = io.BytesIO()
+    write_message(stream, {"id": 1, "result": {"text": "äöü"}})
+    stream.seek(0)
+
+    assert read_message(stream) == {"jsonrpc": "2.0", "id": 1, "result": {"text": "äöü"}}
+    assert read_message(stream) is None
+
+
+def test_uri_to_path():
+    assert uri_to_path("file:///some%20dir/notebook.ipynb") == "/some dir/notebook.ipynb"
+    assert uri_to_path("untitled:notebook.ipynb") == "untitled:notebook.ipynb"
+
+
+def test_NotebookLanguageServer_lifecycle(linter: "NotebookLinter"):
+    output = io.BytesIO()
+    server = NotebookLanguageServer(output, linter)
+    server.handle_message({"id": 1, "method": "initialize", "params": {}})
+    server.handle_message({"method": "initialized", "params": {}})
+    server.handle_message({"id": 2, "method": "textDocument/hover", "params": {}})
+    server.handle_message({"id": 3, "method": "shutdown"})
+    server.handle_message({"method": "exit"})
+
+    initialize_response, unknown_method_response, shutdown_response = get_messages(output)
+    assert initialize_response["id"] == 1
+    assert initialize_response["result"]["serverInfo"]["version"] == __version__
+    assert "notebookDocumentSync" in initialize_response["result"]["capabilities"]
+    assert unknown_method_response["error"]["code"] == -32601
+    assert shutdown_response == {"jsonrpc": "2.0", "id": 3, "result": None}
+    assert server.is_running is False
+
+
+def test_NotebookLanguageServer_serve(linter: "NotebookLinter"):
+    stream = io.BytesIO()
+    write_message(stream, {"id": 1, "method": "shutdown"})
+    write_message(stream, {"method": "exit"})
+    write_message(stream, {"id": 2, "method": "shutdown"})
+    stream.seek(0)
+    output = io.BytesIO()
+    NotebookLanguageServer(output, linter).serve(stream)
+
+    assert [message["id"] for message in get_messages(output)] == [1]
+
+
+def test_NotebookLanguageServer_serve_keeps_running_after_errors(
+    linter: "NotebookLinter", caplog: pytest.LogCaptureFixture
+):
+    """Bad or out-of-order messages are answered or logged and the next message is handled."""
+    cells, cell_text_documents = get_lsp_notebook("notebook_with_out_flake8_tags.ipynb")
+    stream = io.BytesIO()
+    write_message(
+        stream,
+        {
+            "method": "notebookDocument/didChange",
+            "params": {
+                "notebookDocument": {"uri": "file:///project/unopened.ipynb", "version": 2},
+                "change": {"cells": {"data": [cells[2]]}},
+            },
+        },
+    )
+    write_message(stream, {"id": 1, "method": "test/fail", "params": {}})
+    for body in (b"{invalid}", b'[{"id": 2, "method": "shutdown"}]'):
+        stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    write_message(
+        stream,
+        {
+            "method": "notebookDocument/didOpen",
+            "params": {
+                "notebookDocument": {"uri": NOTEBOOK_URI, "cells": cells},
+                "cellTextDocuments": cell_text_documents,
+            },
+        },
+    )
+    write_message(stream, {"id": 3, "method": "shutdown"})
+    stream.seek(0)
+    output = io.BytesIO()
+    server = NotebookLanguageServer(output, linter)
+    server.handlers["test/fail"] = lambda params: params["missing"]
+    server.serve(stream)
+
+    messages = get_messages(output)
+    failed_request, parse_error, invalid_request = messages[:3]
+    assert failed_request["id"] == 1
+    assert failed_request["error"]["code"] == -32603
+    assert "KeyError('missing')" in failed_request["error"]["message"]
+    assert parse_error["id"] is None
+    assert parse_error["error"]["code"] == -32700
+    assert invalid_request["error"]["code"] == -32600
+    assert [message["method"] for message in messages[3:-1]] == [
+        "textDocument/publishDiagnostics"
+    ] * len([cell for cell in cells if cell["kind"] == 2])
+    assert messages[-1] == {"jsonrpc": "2.0", "id": 3, "result": None}
+    assert "Could not handle the notification 'notebookDocument/didChange'" in caplog.text
+
+
+def test_NotebookLanguageServer_did_open(linter: "NotebookLinter"):
+    output = io.BytesIO()
+    server = NotebookLanguageServer(output, linter)
+    cells = open_notebook(server, "notebook_with_out_flake8_tags.ipynb")
+    diagnostics = get_published_diagnostics(output)
+
+    code_cell_uris = [cell["document"] for cell in cells if cell["kind"] == 2]
+    assert list(diagnostics) == code_cell_uris
+    assert {uri: value for uri, value in diagnostics.items() if value} == {
+        cells[2]["document"]: [(1, 1, "F401")],
+        cells[4]["document"]: [(1, 5, "E231")],
+        cells[12]["document"]: [(1, 5, "E231")],
+    }
+
+
+def test_NotebookLanguageServer_did_change(linter: "NotebookLinter"):
+    output = io.BytesIO()
+    server = NotebookLanguageServer(output, linter)
+    cells = open_notebook(server, "notebook_with_out_flake8_tags.ipynb")
+    get_messages(output)
+    fixed_range = {"start": {"line": 0, "character": 5}, "end": {"line": 0, "character": 5}}
+    new_cell = {"kind": 2, "document": "new_cell"}
+    server.handle_message(
+        {
+            "method": "notebookDocument/didChange",
+            "params": {
+                "notebookDocument": {"uri": NOTEBOOK_URI, "version": 2},
+                "change": {
+                    "cells": {
+                        "structure": {
+                            "array": {"start": 0, "deleteCount": 0, "cells": [new_cell]},
+                            "didOpen": [{"uri": "new_cell", "text": "x=1\n"}],
+                        },
+                        "data": [{**cells[2], "metadata": {"tags": ["flake8-noqa-cell"]}}],
+                        "textContent": [
+                            {
+                                "document": {"uri": cells[4]["document"], "version": 2},
+                                "changes": [{"range": fixed_range, "text": " "}],
+                            }
+                        ],
+                    }
+                },
+            },
+        }
+    )
+    diagnostics = get_published_diagnostics(output)
+
+    assert {uri: value for uri, value in diagnostics.items() if value} == {
+        "new_cell": [(1, 2, "E225")],
+        cells[12]["document"]: [(1, 5, "E231")],
+    }
+
+
+def test_NotebookLanguageServer_did_close(linter: "NotebookLinter"):
+    output = io.BytesIO()
+    server = NotebookLanguageServer(output, linter)
+    cells = open_notebook(server, "notebook_with_out_flake8_tags.ipynb")
+    get_messages(output)
+    server.handle_message(
+        {
+            "method": "notebookDocument/didClose",
+            "params": {"notebookDocument": {"uri": NOTEBOOK_URI}},
+        }
+    )
+
+    diagnostics = get_published_diagnostics(output)
+    assert list(diagnostics) == [cell["document"] for cell in cells]
+    assert not any(diagnostics.values())
+    assert server.documents == {}
+
+
+@pytest.mark.parametrize("notebook_name", TEST_NOTEBOOKS)
+def test_NotebookLinter_lint_document(linter: "NotebookLinter", notebook_name: str):
+    """Checking cells separately gives the same results as checking the parsed notebook."""
+    notebook_document = get_notebook_document(notebook_name)
+    filename = f"{notebook_name}_parsed"
+    expected_violations = linter.lint(filename, notebook_document.get_intermediate_code())
+
+    assert linter.lint_document(filename, notebook_document) == expected_violations
+    cell = notebook_document.get_parsed_cells()[-1]
+    notebook_document.update_cell(cell.uri, changes=[{"text": "import os\nos.path=1\n"}])
+    assert linter.lint_document(filename, notebook_document) == linter.lint(
+        filename, notebook_document.get_intermediate_code()
+    )
+
+
+def test_NotebookLinter_lint_document_syntax_error(linter: "NotebookLinter"):
+    notebook_document = get_notebook_document("notebook_with_out_ipython_magic.ipynb")
+    cell = notebook_document.get_parsed_cells()[0]
+    notebook_document.update_cell(cell.uri, changes=[{"text": "def f(:\n"}])
+
+    (violation,) = linter.lint_document("notebook.ipynb_parsed", notebook_document)
+    assert violation.code == "E999"
+
+
+def test_NotebookLinter_options(tmp_path, monkeypatch):
+    """The options of the linter apply to the documents and don't make it read stdin."""
+
+    class UnreadableStdin(io.StringIO):
+        def read(self, *args):
+            raise AssertionError("The language server must not read its stdin.")
+
+    (tmp_path / "setup.cfg").write_text(
+        "[flake8_nb]\nnb-skip-cell-magics = sql\nstdin-display-name = notebook.ipynb\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.stdin", UnreadableStdin())
+    output = io.BytesIO()
+    server = NotebookLanguageServer(output, NotebookLinter())
+    cells = [{"kind": 2, "document": "sql_cell"}, {"kind": 2, "document": "bash_cell"}]
+    server.handle_message(
+        {
+            "method": "notebookDocument/didOpen",
+            "params": {
+                "notebookDocument": {"uri": NOTEBOOK_URI, "cells": cells},
+                "cellTextDocuments": [
+                    {"uri": "sql_cell", "text": "%%sql\nSELECT x=1\n"},
+                    {"uri": "bash_cell", "text": "%%bash\nx=1\n"},
+                ],
+            },
+        }
+    )
+
+    assert get_published_diagnostics(output) == {"sql_cell": [], "bash_cell": [(2, 2, "E225")]}
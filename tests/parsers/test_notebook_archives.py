@@ -0,0 +1,338 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+import threading
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from flake8_nb.parsers.notebook_archives import ArchiveError
+from flake8_nb.parsers.notebook_archives import ArchiveReader
+from flake8_nb.parsers.notebook_archives import JsonlIds
+from flake8_nb.parsers.notebook_archives import JsonlIndex
+from flake8_nb.parsers.notebook_archives import close_archive_reader
+from flake8_nb.parsers.notebook_archives import get_jsonl_temp_name
+from flake8_nb.parsers.notebook_archives import get_notebook_mtime
+from flake8_nb.parsers.notebook_archives import get_notebook_size
+from flake8_nb.parsers.notebook_archives import get_record_id
+from flake8_nb.parsers.notebook_archives import is_archive
+from flake8_nb.parsers.notebook_archives import is_compressed_notebook
+from flake8_nb.parsers.notebook_archives import is_jsonl_file
+from flake8_nb.parsers.notebook_archives import iter_archive_notebooks
+from flake8_nb.parsers.notebook_archives import iter_jsonl_notebooks
+from flake8_nb.parsers.notebook_archives import pop_decoded_jsonl_record
+from flake8_nb.parsers.notebook_archives import read_notebook_bytes
+from flake8_nb.parsers.notebook_archives import split_archive_path
+from flake8_nb.parsers.notebook_archives import split_jsonl_path
+from flake8_nb.parsers.notebook_archives import use_jsonl_index
+from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from flake8_nb.parsers.notebook_parsers import read_notebook_to_cells
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+NOTEBOOK_NAMES = [
+    "notebook_with_flake8_tags.ipynb",
+    "notebook_with_out_flake8_tags.ipynb",
+    "notebook_with_out_ipython_magic.ipynb",
+]
+MEMBER_NAMES = [f"notebooks/{notebook_name}" for notebook_name in NOTEBOOK_NAMES]
+
+
+def read_test_notebook(notebook_name: str) -> bytes:
+    return Path(TEST_NOTEBOOK_BASE_PATH, notebook_name).read_bytes()
+
+
+def create_archive(archive_path: Path) -> str:
+    """Create an archive with the test notebooks in a 'notebooks' folder and a text file."""
+    members = {
+        **{
+            member_name: read_test_notebook(notebook_name)
+            for member_name, notebook_name in zip(MEMBER_NAMES, NOTEBOOK_NAMES)
+        },
+        "README.md": b"# Notebooks",
+    }
+    if archive_path.suffix == ".zip":
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            for member_name, content in members.items():
+                zip_file.writestr(member_name, content)
+        return str(archive_path)
+    tar_bytes = io.BytesIO()
+    with tarfile.open(fileobj=tar_bytes, mode="w") as tar_file:
+        for member_name, content in members.items():
+            tar_info = tarfile.TarInfo(member_name)
+            tar_info.size = len(content)
+            tar_file.addfile(tar_info, io.BytesIO(content))
+    content = tar_bytes.getvalue()
+    if archive_path.name.endswith(".tar.gz"):
+        content = gzip.compress(content)
+    elif archive_path.name.endswith(".tar.zst"):
+        content = pytest.importorskip("zstandard").ZstdCompressor().compress(content)
+    archive_path.write_bytes(content)
+    return str(archive_path)
+
+
+@pytest.fixture(params=["notebooks.tar", "notebooks.tar.gz", "notebooks.tar.zst", "notebooks.zip"])
+def archive_path(request, tmp_path: Path):
+    yield create_archive(tmp_path / request.param)
+    close_archive_reader()
+
+
+@pytest.mark.parametrize(
+    "file_path,expected_is_archive,expected_is_compressed_notebook",
+    [
+        ("a.tar", True, False),
+        ("a.TAR.GZ", True, False),
+        ("a.tzst", True, False),
+        ("a.zip", True, False),
+        ("a.ipynb.gz", False, True),
+        ("a.ipynb.zst", False, True),
+        ("a.ipynb", False, False),
+        ("a.gz", False, False),
+    ],
+)
+def test_is_archive_is_compressed_notebook(
+    file_path: str, expected_is_archive: bool, expected_is_compressed_notebook: bool
+):
+    assert is_archive(file_path) == expected_is_archive
+    assert is_compressed_notebook(file_path) == expected_is_compressed_notebook
+
+
+def test_split_archive_path(tmp_path: Path):
+    archive_path = str(tmp_path / "a!b.zip")
+    Path(archive_path).touch()
+    assert split_archive_path(f"{archive_path}!c!d/e.ipynb") == (archive_path, "c!d/e.ipynb")
+    assert split_archive_path(os.path.join(archive_path, "e.ipynb")) is None
+    assert split_archive_path(str(tmp_path / "missing.zip!e.ipynb")) is None
+    assert split_archive_path("notebook.ipynb") is None
+
+
+def test_iter_archive_notebooks(archive_path: str):
+    assert list(iter_archive_notebooks(archive_path)) == [
+        f"{archive_path}!{member_name}" for member_name in MEMBER_NAMES
+    ]
+
+
+def test_read_notebook_bytes_archive(archive_path: str):
+    # the last notebook is read before the first one, which reopens tar archives
+    notebooks = [*zip(NOTEBOOK_NAMES, MEMBER_NAMES), (NOTEBOOK_NAMES[0], MEMBER_NAMES[0])]
+    for notebook_name, member_name in notebooks:
+        notebook_path = f"{archive_path}!{member_name}"
+        expected_content = read_test_notebook(notebook_name)
+        assert get_notebook_size(notebook_path) == len(expected_content)
+        assert read_notebook_bytes(notebook_path) == expected_content
+        assert get_notebook_mtime(notebook_path) == os.path.getmtime(archive_path)
+
+    with pytest.raises(ValueError, match="Could not read .*missing.ipynb"):
+        read_notebook_bytes(f"{archive_path}!missing.ipynb")
+
+
+def test_read_notebook_to_cells_archive(archive_path: str):
+    notebook_path = f"{archive_path}!{MEMBER_NAMES[0]}"
+    assert read_notebook_to_cells(notebook_path) == read_notebook_to_cells(
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, NOTEBOOK_NAMES[0])
+    )
+    with pytest.warns(InvalidNotebookWarning):
+        assert read_notebook_to_cells(f"{archive_path}!README.md") == []
+
+
+def test_ArchiveReader_invalid_archive(tmp_path: Path):
+    for archive_name in ("broken.tar.gz", "broken.zip"):
+        broken_archive_path = tmp_path / archive_name
+        broken_archive_path.write_bytes(b"not an archive")
+        with ArchiveReader(str(broken_archive_path)) as archive_reader:
+            with pytest.raises(ArchiveError, match="Could not read the archive"):
+                archive_reader.list_notebooks()
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_read_notebook_bytes_compressed(tmp_path: Path, suffix: str):
+    content = read_test_notebook(NOTEBOOK_NAMES[0])
+    notebook_path = tmp_path / f"notebook.ipynb{suffix}"
+    if suffix == ".gz":
+        notebook_path.write_bytes(gzip.compress(content))
+    else:
+        notebook_path.write_bytes(
+            pytest.importorskip("zstandard").ZstdCompressor().compress(content)
+        )
+
+    assert read_notebook_bytes(str(notebook_path)) == content
+    assert get_notebook_size(str(notebook_path)) == notebook_path.stat().st_size
+
+    notebook_path.write_bytes(content)
+    with pytest.warns(InvalidNotebookWarning):
+        assert read_notebook_to_cells(str(notebook_path)) == []
+
+
+def create_jsonl(jsonl_path: Path) -> list[bytes]:
+    """Create a JSON Lines file with the test notebooks, an empty and an invalid line."""
+    records = []
+    for index, notebook_name in enumerate(NOTEBOOK_NAMES):
+        notebook = json.loads(read_test_notebook(notebook_name))
+        notebook["metadata"]["store"] = {"id": f"team/{notebook_name}"} if index else {}
+        records.append(f"{json.dumps(notebook)}\n".encode())
+    records.append(b"not a notebook\n")
+    content = b"".join([*records[:1], b"\n", *records[1:]])
+    if jsonl_path.name.endswith(".gz"):
+        content = gzip.compress(content)
+    elif jsonl_path.name.endswith(".zst"):
+        content = pytest.importorskip("zstandard").ZstdCompressor().compress(content)
+    jsonl_path.write_bytes(content)
+    return records
+
+
+@pytest.mark.parametrize(
+    "file_path,expected", [("a.jsonl", True), ("a.JSONL.GZ", True), ("a.jsonl.zst", True)]
+)
+def test_is_jsonl_file(file_path: str, expected: bool):
+    assert is_jsonl_file(file_path) == expected
+    assert not is_jsonl_file("a.json")
+
+
+@pytest.mark.parametrize(
+    "record,id_field,expected",
+    [
+        ({"id": "a"}, "id", "a"),
+        ({"id": 7}, "id", "7"),
+        ({"metadata": {"store": {"id": "a/b"}}}, "metadata.store.id", "a/b"),
+        ({"metadata": {}}, "metadata.id", "line-3"),
+        ({"id": None}, "id", "line-3"),
+        ({"id": ""}, "id", "line-3"),
+        ({"id": {"nested": 1}}, "id", "line-3"),
+        (None, "id", "line-3"),
+    ],
+)
+def test_get_record_id(record, id_field: str, expected: str):
+    assert get_record_id(record, id_field, 3) == expected
+
+
+def test_split_jsonl_path_get_jsonl_temp_name(tmp_path: Path):
+    jsonl_path = str(tmp_path / "a!b.jsonl")
+    Path(jsonl_path).touch()
+    assert split_jsonl_path(f"{jsonl_path}!../c.d") == (jsonl_path, "../c.d")
+    assert split_jsonl_path(str(tmp_path / "missing.jsonl!c")) is None
+    assert split_jsonl_path("notebook.ipynb") is None
+    assert get_jsonl_temp_name(f"{jsonl_path}!../c.d") == f"{jsonl_path}!..%2Fc.d.ipynb"
+    assert get_jsonl_temp_name("notebook.ipynb") == "notebook.ipynb"
+
+
+@pytest.mark.parametrize(
+    "jsonl_name", ["notebooks.jsonl", "notebooks.jsonl.gz", "notebooks.jsonl.zst"]
+)
+def test_iter_jsonl_notebooks(tmp_path: Path, jsonl_name: str):
+    jsonl_path = str(tmp_path / jsonl_name)
+    records = create_jsonl(tmp_path / jsonl_name)
+    expected_paths = [
+        f"{jsonl_path}!line-1",
+        f"{jsonl_path}!team/{NOTEBOOK_NAMES[1]}",
+        f"{jsonl_path}!team/{NOTEBOOK_NAMES[2]}",
+        f"{jsonl_path}!line-5",
+    ]
+    jsonl_index = JsonlIndex()
+    with use_jsonl_index(jsonl_index):
+        notebook_paths = list(iter_jsonl_notebooks(jsonl_path, "metadata.store.id"))
+    assert notebook_paths == expected_paths
+    assert len(jsonl_index) == len(notebook_paths)
+
+    def read_records_with_index() -> None:
+        with use_jsonl_index(jsonl_index):
+            read_records.extend(map(read_notebook_bytes, reversed(notebook_paths)))
+        close_archive_reader()
+
+    # the records can be read by any thread using the index, in any order and more than once
+    read_records: list[bytes] = []
+    reader_thread = threading.Thread(target=read_records_with_index)
+    reader_thread.start()
+    reader_thread.join()
+    assert read_records == records[::-1]
+    with use_jsonl_index(jsonl_index):
+        for notebook_path, record in zip(notebook_paths, records):
+            assert get_notebook_size(notebook_path) == len(record)
+            assert get_notebook_mtime(notebook_path) == os.path.getmtime(jsonl_path)
+            assert read_notebook_bytes(notebook_path) == record
+        close_archive_reader()
+
+        with pytest.raises(ValueError, match="can only be read after they were found"):
+            read_notebook_bytes(f"{jsonl_path}!missing")
+    # other threads and sessions have their own index
+    with pytest.raises(ValueError, match="can only be read after they were found"):
+        read_notebook_bytes(notebook_paths[0])
+    with use_jsonl_index(JsonlIndex()):
+        with pytest.raises(ValueError, match="can only be read after they were found"):
+            read_notebook_bytes(notebook_paths[0])
+
+
+def test_iter_jsonl_notebooks_duplicate_ids(tmp_path: Path):
+    jsonl_path = tmp_path / "notebooks.jsonl"
+    jsonl_path.write_bytes(
+        b'{"id": "a", "cells": [1]}\n{"id": "a", "cells": [2]}\n{"id": "a@line-2"}\n'
+    )
+    with use_jsonl_index(JsonlIndex()):
+        assert list(iter_jsonl_notebooks(str(jsonl_path))) == [
+            f"{jsonl_path}!a",
+            f"{jsonl_path}!a@line-2",
+            f"{jsonl_path}!a@line-2@line-3",
+        ]
+        assert read_notebook_bytes(f"{jsonl_path}!a@line-2") == b'{"id": "a", "cells": [2]}\n'
+
+
+def test_JsonlIds():
+    with JsonlIds() as found_ids:
+        assert found_ids.add("a")
+        assert found_ids.add("A")
+        assert not found_ids.add("a")
+        assert found_ids.add("a@line-2")
+
+
+def test_read_notebook_to_cells_jsonl(tmp_path: Path):
+    jsonl_path = str(tmp_path / "notebooks.jsonl")
+    create_jsonl(tmp_path / "notebooks.jsonl")
+    notebook_path = os.path.join(TEST_NOTEBOOK_BASE_PATH, NOTEBOOK_NAMES[0])
+    expected_cells = read_notebook_to_cells(notebook_path)
+
+    with use_jsonl_index(JsonlIndex()):
+        notebook_paths = list(iter_jsonl_notebooks(jsonl_path))
+        # the records found last are kept decoded until they are read
+        assert pop_decoded_jsonl_record(notebook_paths[0])["cells"] == read_notebook_to_cells(
+            notebook_path, "json"
+        )
+        assert pop_decoded_jsonl_record(notebook_paths[0]) is None
+        assert pop_decoded_jsonl_record(notebook_paths[-1]) is None
+        assert read_notebook_to_cells(notebook_paths[0]) == expected_cells
+        assert read_notebook_to_cells(notebook_paths[1]) != []
+        assert pop_decoded_jsonl_record(notebook_paths[1]) is None
+        with pytest.warns(InvalidNotebookWarning, match="line-5"):
+            assert read_notebook_to_cells(notebook_paths[-1]) == []
+        close_archive_reader()
+    assert pop_decoded_jsonl_record(notebook_paths[2]) is None
+
+
+def test_NotebookSession_jsonl_index(tmp_path: Path):
+    jsonl_path = str(tmp_path / "notebooks.jsonl")
+    create_jsonl(tmp_path / "notebooks.jsonl")
+    other_session = NotebookSession()
+    with use_jsonl_index(other_session.jsonl_index):
+        other_notebook_paths = iter_jsonl_notebooks(jsonl_path)
+        next(other_notebook_paths)
+    assert len(other_session.jsonl_index) == 1
+
+    with NotebookSession() as session:
+        with pytest.warns(InvalidNotebookWarning):
+            intermediate_py_file_paths = session.add_notebooks(iter_jsonl_notebooks(jsonl_path))
+        assert len(intermediate_py_file_paths) == 3
+        # the records are removed once they are parsed
+        assert len(session.jsonl_index) == 0
+        assert len(other_session.jsonl_index) == 1
+
+    other_session.clean_up()
+    assert len(other_session.jsonl_index) == 0
+    other_notebook_paths.close()
+
+
+def test_iter_jsonl_notebooks_invalid_file(tmp_path: Path):
+    broken_jsonl_path = tmp_path / "broken.jsonl.gz"
+    broken_jsonl_path.write_bytes(b"not compressed")
+    with pytest.raises(ArchiveError, match="Could not read the JSON Lines file"):
+        list(iter_jsonl_notebooks(str(broken_jsonl_path)))
@@ -0,0 +1,148 @@
+import json
+import os
+import pickle
+import re
+import signal
+import threading
+import warnings
+from pathlib import Path
+
+import pytest
+
+from flake8_nb.parsers.cell_parsers import InvalidFlake8TagWarning
+from flake8_nb.parsers.notebook_budget import NotebookBudget
+from flake8_nb.parsers.notebook_budget import NotebookBudgetWarning
+from flake8_nb.parsers.notebook_budget import NotebookCheckTimeout
+from flake8_nb.parsers.notebook_budget import NotebookWatchdog
+from flake8_nb.parsers.notebook_budget import check_time_limit
+from flake8_nb.parsers.notebook_budget import create_intermediate_py_file_within_budget
+from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from flake8_nb.parsers.notebook_parsers import create_intermediate_py_file
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+TEST_NOTEBOOK_PATH = os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_flake8_tags.ipynb")
+# makes the regex matching inline noqa comments backtrack for practically forever
+BACKTRACKING_LINE = f"x = 1  # noqa: {'1' * 60}!"
+
+
+def write_notebook(notebook_path: Path, cell_sources: list) -> str:
+    notebook = {
+        "cells": [
+            {"cell_type": "code", "source": source, "execution_count": index, "metadata": {}}
+            for index, source in enumerate(cell_sources, start=1)
+        ]
+    }
+    notebook_path.write_text(json.dumps(notebook))
+    return str(notebook_path)
+
+
+@pytest.mark.parametrize(
+    "warning",
+    [
+        InvalidNotebookWarning("notebook.ipynb"),
+        InvalidFlake8TagWarning("flake8-noqa-foo"),
+        NotebookBudgetWarning("notebook.ipynb", "it is too large"),
+    ],
+)
+def test_warnings_pickle(warning: Warning):
+    unpickled_warning = pickle.loads(pickle.dumps(warning))
+    assert type(unpickled_warning) is type(warning)
+    assert str(unpickled_warning) == str(warning)
+
+
+def test_create_intermediate_py_file_within_budget(tmp_path: Path):
+    expected_result = create_intermediate_py_file(TEST_NOTEBOOK_PATH, str(tmp_path / "expected"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = create_intermediate_py_file_within_budget(
+            TEST_NOTEBOOK_PATH,
+            str(tmp_path / "budget"),
+            NotebookBudget(max_bytes=os.path.getsize(TEST_NOTEBOOK_PATH), max_code_lines=100),
+        )
+    assert result[1] == expected_result[1]
+    assert Path(result[0]).read_text() == Path(expected_result[0]).read_text()
+
+
+@pytest.mark.parametrize(
+    "budget,expected_reason",
+    [
+        (NotebookBudget(max_bytes=100), r"it has \d+ bytes \(limit 100\)"),
+        (NotebookBudget(max_code_lines=2), r"it has 3 lines of code \(limit 2\)"),
+    ],
+)
+def test_create_intermediate_py_file_within_budget_exceeded(
+    tmp_path: Path, budget: NotebookBudget, expected_reason: str
+):
+    notebook_path = write_notebook(tmp_path / "notebook.ipynb", [["x = 1\n", "y = 2"], ["z = 3"]])
+    with pytest.warns(NotebookBudgetWarning, match=f"notebook.ipynb', since {expected_reason}"):
+        result = create_intermediate_py_file_within_budget(notebook_path, str(tmp_path), budget)
+    assert result == ("", {"input_ids": [], "code_lines": []})
+    assert not (tmp_path / "notebook.ipynb_parsed").exists()
+
+
+def test_NotebookWatchdog(tmp_path: Path):
+    slow_notebook_path = write_notebook(tmp_path / "slow.ipynb", [[BACKTRACKING_LINE]])
+    invalid_notebook_path = str(tmp_path / "invalid.ipynb")
+    Path(invalid_notebook_path).write_text("not a notebook")
+    budget = NotebookBudget(max_seconds=0.5)
+
+    with NotebookWatchdog() as watchdog:
+        with pytest.warns(NotebookBudgetWarning, match="parsing it took longer than 0.5s"):
+            assert watchdog.create_intermediate_py_file(
+                slow_notebook_path, str(tmp_path / "temp"), budget
+            ) == ("", {"input_ids": [], "code_lines": []})
+        assert watchdog._pool is None
+        # the worker process is restarted after it was killed
+        intermediate_file_path, input_line_mapping = watchdog.create_intermediate_py_file(
+            TEST_NOTEBOOK_PATH, str(tmp_path / "temp"), NotebookBudget(max_seconds=30)
+        )
+        assert os.path.isfile(intermediate_file_path)
+        assert len(input_line_mapping["input_ids"]) == 8
+        with pytest.warns(InvalidNotebookWarning):
+            watchdog.create_intermediate_py_file(invalid_notebook_path, str(tmp_path), budget)
+    assert watchdog._pool is None
+    assert not (tmp_path / "temp" / "slow.ipynb_parsed").exists()
+
+
+def test_NotebookSession_budget(tmp_path: Path):
+    notebook_path = write_notebook(tmp_path / "notebook.ipynb", [["x = 1\n", "y = 2"], ["z = 3"]])
+    with NotebookSession(budget=NotebookBudget(max_code_lines=2, max_seconds=30)) as session:
+        with pytest.warns(NotebookBudgetWarning):
+            assert session.add_notebooks([TEST_NOTEBOOK_PATH, notebook_path]) == []
+        assert session._watchdog is None
+
+        session.budget = NotebookBudget(max_code_lines=10)
+        with pytest.warns(NotebookBudgetWarning, match="it has 11 lines of code"):
+            assert len(session.add_notebooks([TEST_NOTEBOOK_PATH, notebook_path])) == 1
+        assert session.original_notebook_paths == [notebook_path]
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="Needs SIGALRM")
+def test_check_time_limit():
+    previous_handler = signal.getsignal(signal.SIGALRM)
+    with pytest.raises(NotebookCheckTimeout):
+        with check_time_limit(0.5):
+            re.match(r"(a+)+$", "a" * 60 + "b")
+    assert signal.getsignal(signal.SIGALRM) == previous_handler
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+    with check_time_limit(30):
+        pass
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+def test_check_time_limit_unlimited():
+    timers = []
+
+    def run_limited():
+        with check_time_limit(0.5):
+            timers.append(signal.getitimer(signal.ITIMER_REAL))
+
+    # signals are only handled by the main thread
+    thread = threading.Thread(target=run_limited)
+    thread.start()
+    thread.join()
+    with check_time_limit(0):
+        timers.append(signal.getitimer(signal.ITIMER_REAL))
+    assert timers == [(0.0, 0.0), (0.0, 0.0)]
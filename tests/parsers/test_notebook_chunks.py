@@ -0,0 +1,167 @@
+import os
+
+import pytest
+
+from flake8_nb.parsers import CellId
+from flake8_nb.parsers.notebook_chunks import CellNames
+from flake8_nb.parsers.notebook_chunks import collect_cell_names
+from flake8_nb.parsers.notebook_chunks import create_chunk_postlude
+from flake8_nb.parsers.notebook_chunks import create_chunk_prelude
+from flake8_nb.parsers.notebook_chunks import find_cell_starts
+from flake8_nb.parsers.notebook_chunks import split_intermediate_code
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from flake8_nb.parsers.notebook_parsers import map_intermediate_to_input
+from flake8_nb.parsers.notebook_parsers import notebook_to_intermediate_code
+from flake8_nb.parsers.notebook_parsers import read_source_map
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+TEST_NOTEBOOK_PATH = os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_flake8_tags.ipynb")
+
+
+def test_collect_cell_names():
+    cell_names = collect_cell_names(
+        '"""Docstring."""\n'
+        "import os.path\n"
+        "from . import a as b\n"
+        "from .c import *\n"
+        "from __future__ import annotations\n"
+        "try:\n"
+        "    import numpy as np\n"
+        "except ImportError as error:\n"
+        "    np = None\n"
+        "for i in range(3):\n"
+        "    x = [j for j in range(i)]\n"
+        "def f(arg=default):\n"
+        "    local = arg + undefined\n"
+        "class A:\n"
+        "    attribute = 1\n"
+    )
+    assert cell_names == CellNames(
+        imports=["import os.path", "from . import a as b", "from .c import *"],
+        imported_names={"os", "b"},
+        bound_names={"np", "error", "i", "x", "f", "A"},
+        used_names={"range", "i", "j", "default", "arg", "undefined", "ImportError"},
+        undeferred_used_names={"range", "i", "j", "default", "ImportError"},
+        has_non_imports=True,
+    )
+
+
+@pytest.mark.parametrize(
+    "cell_code,expected_has_non_imports",
+    [
+        ("import os\n__all__ = ['os']\nif os:\n    pass\n", False),
+        ("import os\nos.getcwd()\n", True),
+        ("def f(:\n", True),
+    ],
+)
+def test_collect_cell_names_has_non_imports(cell_code: str, expected_has_non_imports: bool):
+    assert collect_cell_names(cell_code).has_non_imports == expected_has_non_imports
+
+
+def test_create_chunk_prelude_postlude():
+    preceding = [
+        collect_cell_names("import os\nimport os\nx = os.sep\n"),
+        collect_cell_names("import json\n"),
+    ]
+    chunk = [collect_cell_names("import sys\nimport re\ny = x\n")]
+    following = [collect_cell_names("import re\nsys.exit(z)\nz = 1\n")]
+
+    assert create_chunk_prelude([]) == []
+    # only 'os' is used after it was imported, so importing 'json' again is a redefinition
+    assert create_chunk_prelude(preceding) == [
+        "import os  # noqa\n",
+        "import json  # noqa\n",
+        "if True:  # noqa\n",
+        "    os  # noqa\n",
+        "    x = None  # noqa\n",
+        "pass  # noqa\n",
+    ]
+    # pyflakes checks the body of 'f' at the end, so 'json' is still unused when it is imported
+    assert create_chunk_prelude(
+        [collect_cell_names("import json\n"), collect_cell_names("def f():\n    return json\n")]
+    ) == [
+        "import json  # noqa\n",
+        "if True:  # noqa\n",
+        "    f = None  # noqa\n",
+        "pass  # noqa\n",
+    ]
+    assert create_chunk_postlude([], [], []) == []
+    assert create_chunk_postlude(chunk, preceding, following) == [
+        "\n",
+        "\n",
+        "re  # noqa\n",
+        "sys  # noqa\n",
+        "z = None  # noqa\n",
+    ]
+
+
+def test_split_intermediate_code():
+    intermediate_code, input_line_mapping = notebook_to_intermediate_code(TEST_NOTEBOOK_PATH)
+    assert split_intermediate_code(intermediate_code, input_line_mapping, 0) == [
+        (intermediate_code, input_line_mapping)
+    ]
+    chunks = split_intermediate_code(intermediate_code, input_line_mapping, 2)
+    assert len(chunks) == -(-len(input_line_mapping["input_ids"]) // 2)
+    assert chunks[0][0].startswith("from IPython import get_ipython\n")
+    assert [input_id for _, mapping in chunks for input_id in mapping["input_ids"]] == (
+        input_line_mapping["input_ids"]
+    )
+    intermediate_lines = intermediate_code.splitlines()
+    for chunk_code, chunk_mapping in chunks:
+        chunk_lines = chunk_code.splitlines()
+        for chunk_code_line, input_id in zip(
+            chunk_mapping["code_lines"], chunk_mapping["input_ids"]
+        ):
+            code_line = input_line_mapping["code_lines"][
+                input_line_mapping["input_ids"].index(input_id)
+            ]
+            assert chunk_lines[chunk_code_line - 1] == intermediate_lines[code_line - 1]
+            assert map_intermediate_to_input(chunk_mapping, chunk_code_line + 3) == (
+                map_intermediate_to_input(input_line_mapping, code_line + 3)
+            )
+
+
+def test_find_cell_starts():
+    lines = [
+        "from IPython import get_ipython\n",
+        "\n",
+        "\n",
+        "# INTERMEDIATE_CELL_SEPARATOR (1,1,1)\n",
+        "\n",
+        "\n",
+        "def f():\n",
+        "\n",
+        "    return 1\n",
+        "\n",
+        "\n",
+        "# INTERMEDIATE_CELL_SEPARATOR ( ,2,4)\n",
+    ]
+    input_ids = [CellId("1", 1, 1), CellId(" ", 2, 4)]
+    assert find_cell_starts(lines, input_ids) == [1, 9]
+    assert find_cell_starts(lines[:-1], input_ids) is None
+
+
+def test_NotebookSession_convert_notebook_chunks():
+    with NotebookSession(chunk_cells=2) as session:
+        intermediate_py_file_paths = session.add_notebooks([TEST_NOTEBOOK_PATH])
+        assert len(intermediate_py_file_paths) > 1
+        assert [
+            os.path.basename(intermediate_py_file_path)
+            for intermediate_py_file_path in intermediate_py_file_paths[:2]
+        ] == [
+            "notebook_with_flake8_tags.ipynb_parsed",
+            "notebook_with_flake8_tags.chunk1.ipynb_parsed",
+        ]
+        assert session.original_notebook_paths == [TEST_NOTEBOOK_PATH] * len(
+            intermediate_py_file_paths
+        )
+        for intermediate_py_file_path, input_line_mapping in zip(
+            intermediate_py_file_paths, session.input_line_mappings
+        ):
+            assert read_source_map(intermediate_py_file_path) == (
+                os.path.relpath(TEST_NOTEBOOK_PATH),
+                input_line_mapping,
+            )
+
+    with NotebookSession(chunk_cells=100) as session:
+        assert len(session.add_notebooks([TEST_NOTEBOOK_PATH])) == 1
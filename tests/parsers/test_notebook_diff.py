@@ -0,0 +1,108 @@
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Set
+
+import pytest
+
+from flake8_nb.parsers import CellId
+from flake8_nb.parsers.notebook_diff import get_changed_cell_numbers
+from flake8_nb.parsers.notebook_diff import get_changed_intermediate_lines
+from flake8_nb.parsers.notebook_diff import get_git_diff_ranges
+from flake8_nb.parsers.notebook_diff import is_valid_git_ref
+from flake8_nb.parsers.notebook_diff import read_git_notebook_cells
+from flake8_nb.parsers.notebook_parsers import InputLineMapping
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+
+def code_cell(source: List[str], cell_id: str = "") -> Dict:
+    cell = {"cell_type": "code", "source": source, "metadata": {}}
+    if cell_id:
+        cell["id"] = cell_id
+    return cell
+
+
+def init_git_repo(path: Path):
+    def git(*args: str):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@test.test", *args],
+            cwd=path,
+            check=True,
+            capture_output=True,
+        )
+
+    git("init")
+    git("add", ".")
+    git("commit", "-m", "initial commit")
+
+
+@pytest.mark.parametrize(
+    "old_cells,new_cells,expected_result",
+    [
+        ([], [code_cell(["a = 1"]), code_cell(["b = 1"])], {1, 2}),
+        ([code_cell(["a = 1"])], [code_cell(["a = 1"]), code_cell(["b = 1"])], {2}),
+        (
+            [code_cell(["a = 1"]), code_cell(["b = 1"])],
+            [code_cell(["b = 1"]), code_cell(["a = 1"])],
+            set(),
+        ),
+        ([code_cell(["a = 1"], "id1")], [code_cell(["a = 2"], "id1")], {1}),
+        (
+            [code_cell(["a = 1"], "id1"), code_cell(["a = 2"], "id2")],
+            [code_cell(["a = 2"], "id1")],
+            {1},
+        ),
+        ([code_cell(["a = 1\n", "b = 1"])], [code_cell("a = 1\nb = 1")], set()),
+        (
+            [],
+            [{"cell_type": "markdown", "source": ["# a"], "metadata": {}}, code_cell([])],
+            set(),
+        ),
+    ],
+)
+def test_get_changed_cell_numbers(old_cells: List, new_cells: List, expected_result: Set[int]):
+    assert get_changed_cell_numbers(old_cells, new_cells) == expected_result
+
+
+@pytest.mark.parametrize(
+    "changed_cell_numbers,expected_result",
+    [
+        (set(), set()),
+        ({2}, set(range(4, 11))),
+        ({2, 9}, {*range(4, 11), *range(18, 21)}),
+    ],
+)
+def test_get_changed_intermediate_lines(
+    tmp_path: Path, changed_cell_numbers: Set[int], expected_result: Set[int]
+):
+    intermediate_file = tmp_path / "notebook.ipynb_parsed"
+    intermediate_file.write_text("\n" * 20)
+    input_line_mapping: InputLineMapping = {
+        "input_ids": [CellId("1", 1, 2), CellId("2", 2, 5), CellId("3", 3, 9)],
+        "code_lines": [4, 11, 18],
+    }
+    result = get_changed_intermediate_lines(
+        str(intermediate_file), input_line_mapping, changed_cell_numbers
+    )
+    assert result == expected_result
+
+
+def test_git_functions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    notebook_path = tmp_path / "notebook.ipynb"
+    notebook_path.write_bytes(
+        Path(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb").read_bytes()
+    )
+    python_file = tmp_path / "file.py"
+    python_file.write_text("import os\n")
+    init_git_repo(tmp_path)
+    python_file.write_text("import os\nimport sys\n")
+
+    monkeypatch.chdir(tmp_path)
+    assert is_valid_git_ref("HEAD") is True
+    assert is_valid_git_ref("not_a_ref") is False
+    assert len(read_git_notebook_cells(str(notebook_path), "HEAD")) == 3
+    assert read_git_notebook_cells(os.path.join(tmp_path, "not_a_file.ipynb"), "HEAD") == []
+    assert get_git_diff_ranges("HEAD", []) == {"file.py": {2}}
+    assert get_git_diff_ranges("not_a_ref", []) == {}
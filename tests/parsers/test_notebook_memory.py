@@ -0,0 +1,94 @@
+import os
+import tracemalloc
+
+import pytest
+
+from flake8_nb.events import emit_event
+from flake8_nb.events import has_listeners
+from flake8_nb.parsers.notebook_memory import MemoryReport
+from flake8_nb.parsers.notebook_memory import NotebookMemory
+from flake8_nb.parsers.notebook_memory import format_bytes
+from flake8_nb.parsers.notebook_memory import get_peak_rss
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [
+        (512, "512 B"),
+        (1536, "1.5 KiB"),
+        (20 * 1024**2, "20.0 MiB"),
+        (3 * 1024**4, "3072.0 GiB"),
+    ],
+)
+def test_format_bytes(size: int, expected: str):
+    assert format_bytes(size) == expected
+
+
+def test_get_peak_rss():
+    peak_rss = get_peak_rss()
+    assert peak_rss is None or peak_rss > 1024**2
+
+
+def test_memory_report_phases():
+    memory_report = MemoryReport()
+    memory_report.start()
+    assert not has_listeners("notebook_parsed")
+    memory_report.record_phase("initialize")
+    memory_report.record_phase("check")
+    memory_report.stop()
+
+    assert list(memory_report.phase_peak_rss) == ["initialize", "check"]
+    report_lines = memory_report.format_report().splitlines()
+    assert report_lines[:2] == ["Memory report:", "  Peak RSS at the end of each phase:"]
+    assert report_lines[2].startswith("    initialize: ")
+    assert "traced" not in memory_report.format_report()
+
+
+@pytest.mark.skipif(not hasattr(tracemalloc, "reset_peak"), reason="needs python>=3.9")
+def test_memory_report_trace():
+    memory_report = MemoryReport(trace_count=2)
+    memory_report.start()
+    try:
+        for notebook_path, size in (("small.ipynb", 1024), ("large.ipynb", 1024**2)):
+            emit_event("notebook_discovered", notebook_path=notebook_path)
+            allocation = bytearray(size)
+            del allocation
+            emit_event("notebook_parsed", notebook_path=notebook_path, notebook_bytes=size)
+        emit_event("notebook_discovered", notebook_path="empty.ipynb")
+        emit_event("notebook_parsed", notebook_path="empty.ipynb", notebook_bytes=0)
+    finally:
+        memory_report.stop()
+
+    assert not has_listeners("notebook_parsed")
+    assert not tracemalloc.is_tracing()
+    assert [notebook.notebook_path for notebook in memory_report.notebooks] == [
+        "large.ipynb",
+        "small.ipynb",
+    ]
+    assert memory_report.notebooks[0].traced_peak >= 1024**2
+    assert memory_report.snapshot is not None
+    report = memory_report.format_report()
+    assert "Notebooks with the highest traced memory while parsing:" in report
+    assert ": large.ipynb (1.0 MiB)" in report
+    assert "Top allocations after parsing large.ipynb:" in report
+
+
+@pytest.mark.skipif(not hasattr(tracemalloc, "reset_peak"), reason="needs python>=3.9")
+def test_memory_report_trace_session():
+    memory_report = MemoryReport(trace_count=1)
+    notebook_path = os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_flake8_tags.ipynb")
+    session = NotebookSession()
+    memory_report.start()
+    try:
+        session.convert_notebook_chunks(notebook_path)
+    finally:
+        memory_report.stop()
+        session.clean_up()
+
+    assert memory_report.notebooks == [
+        NotebookMemory(
+            memory_report.notebooks[0].traced_peak, notebook_path, os.path.getsize(notebook_path)
+        )
+    ]
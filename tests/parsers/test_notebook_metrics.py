@@ -0,0 +1,154 @@
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from flake8_nb.parsers.notebook_budget import NotebookBudget
+from flake8_nb.parsers.notebook_budget import NotebookBudgetWarning
+from flake8_nb.parsers.notebook_metrics import NotebookMetrics
+from flake8_nb.parsers.notebook_metrics import escape_label_value
+from flake8_nb.parsers.notebook_metrics import format_metric
+from flake8_nb.parsers.notebook_metrics import write_metrics_file
+from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+
+def get_samples(prometheus_text: str) -> dict:
+    return dict(
+        line.rsplit(" ", 1) for line in prometheus_text.splitlines() if not line.startswith("#")
+    )
+
+
+def test_escape_label_value():
+    assert escape_label_value('a\\b"c\nd') == 'a\\\\b\\"c\\nd'
+
+
+def test_format_metric():
+    assert format_metric("files", "Checked files.", [({}, 2)]) == (
+        "# HELP flake8_nb_files Checked files.\n"
+        "# TYPE flake8_nb_files gauge\n"
+        "flake8_nb_files 2"
+    )
+    assert format_metric(
+        "violations", "Violations.", [({"code": "E1"}, 1), ({"code": "W2", "x": "y"}, 0.5)]
+    ).splitlines()[2:] == [
+        'flake8_nb_violations{code="E1"} 1',
+        'flake8_nb_violations{code="W2",x="y"} 0.5',
+    ]
+
+
+def test_NotebookMetrics():
+    metrics = NotebookMetrics()
+    metrics.record_notebook(100, 3, 0.25)
+    metrics.record_notebook(10, 0, 0.5, "invalid")
+    metrics.record_phase("check", 1.0)
+    metrics.record_phase("check", 0.5)
+    stats = SimpleNamespace(
+        statistics_for=lambda prefix: [
+            SimpleNamespace(error_code="E231", count=2),
+            SimpleNamespace(error_code="F401", count=1),
+            SimpleNamespace(error_code="E231", count=1),
+        ]
+    )
+    metrics.record_checks({"files": 2, "physical lines": 20, "logical lines": 15}, stats)
+
+    samples = get_samples(metrics.to_prometheus(timestamp=1.5))
+    assert samples == {
+        "flake8_nb_notebooks_discovered": "2",
+        "flake8_nb_notebooks_converted": "1",
+        'flake8_nb_notebooks_skipped{reason="invalid"}': "1",
+        'flake8_nb_notebooks_skipped{reason="empty"}': "0",
+        'flake8_nb_notebooks_skipped{reason="budget"}': "0",
+        "flake8_nb_notebook_bytes_read": "110",
+        "flake8_nb_notebook_code_cells": "3",
+        "flake8_nb_checked_files": "2",
+        'flake8_nb_checked_lines{kind="physical"}': "20",
+        'flake8_nb_checked_lines{kind="logical"}': "15",
+        'flake8_nb_phase_duration_seconds{phase="check"}': "1.5",
+        'flake8_nb_phase_duration_seconds{phase="convert"}': "0.75",
+        'flake8_nb_violations{code="E231"}': "3",
+        'flake8_nb_violations{code="F401"}': "1",
+        "flake8_nb_violations_reported": "4",
+        "flake8_nb_last_run_timestamp_seconds": "1.5",
+    }
+
+
+def test_NotebookSession_metrics(tmp_path: Path):
+    empty_notebook = tmp_path / "empty.ipynb"
+    empty_notebook.write_text('{"cells": []}')
+    notebook_paths = [
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb"),
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "not_a_notebook.ipynb"),
+        str(empty_notebook),
+    ]
+    with NotebookSession() as session:
+        session.metrics = metrics = NotebookMetrics()
+        with pytest.warns(InvalidNotebookWarning):
+            assert len(session.add_notebooks(notebook_paths)) == 1
+        session.budget = NotebookBudget(max_bytes=1)
+        with pytest.warns(NotebookBudgetWarning):
+            assert session.add_notebooks(notebook_paths[:1]) == []
+
+    assert metrics.notebooks_discovered == 4
+    assert metrics.notebooks_converted == 1
+    assert metrics.notebooks_skipped == {"invalid": 1, "empty": 1, "budget": 1}
+    assert metrics.notebook_bytes == sum(os.path.getsize(path) for path in notebook_paths) + (
+        os.path.getsize(notebook_paths[0])
+    )
+    assert metrics.code_cells == 1
+    assert metrics.conversion_seconds > 0
+
+
+def test_NotebookSession_metrics_warns_once():
+    with NotebookSession() as session:
+        session.metrics = NotebookMetrics()
+        with warnings.catch_warnings(record=True) as caught_warnings:
+            warnings.simplefilter("always")
+            session.add_notebooks([os.path.join(TEST_NOTEBOOK_BASE_PATH, "not_a_notebook.ipynb")])
+    (caught_warning,) = caught_warnings
+    assert caught_warning.category is InvalidNotebookWarning
+    assert caught_warning.filename.endswith("notebook_parsers.py")
+
+
+def test_NotebookSession_metrics_concurrent_sessions():
+    """Sessions in other threads don't mix up the reasons of their skipped notebooks."""
+    barrier = threading.Barrier(2)
+
+    class SynchronizedSession(NotebookSession):
+        def convert_notebook(self, notebook_path: str):
+            # both sessions convert their notebook at the same time
+            barrier.wait()
+            result = super().convert_notebook(notebook_path)
+            barrier.wait()
+            return result
+
+    def convert(notebook_name: str) -> NotebookMetrics:
+        with SynchronizedSession() as session:
+            session.metrics = metrics = NotebookMetrics()
+            for _ in range(5):
+                session.add_notebooks([os.path.join(TEST_NOTEBOOK_BASE_PATH, notebook_name)])
+        return metrics
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", InvalidNotebookWarning)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            valid_metrics, invalid_metrics = executor.map(
+                convert, ["notebook_with_out_ipython_magic.ipynb", "not_a_notebook.ipynb"]
+            )
+
+    assert valid_metrics.notebooks_converted == 5
+    assert valid_metrics.notebooks_skipped == {"invalid": 0, "empty": 0, "budget": 0}
+    assert invalid_metrics.notebooks_converted == 0
+    assert invalid_metrics.notebooks_skipped == {"invalid": 5, "empty": 0, "budget": 0}
+
+
+def test_write_metrics_file(tmp_path: Path):
+    metrics_path = tmp_path / "flake8_nb.prom"
+    write_metrics_file(str(metrics_path), NotebookMetrics())
+    assert os.listdir(tmp_path) == ["flake8_nb.prom"]
+    assert get_samples(metrics_path.read_text())["flake8_nb_notebooks_discovered"] == "0"
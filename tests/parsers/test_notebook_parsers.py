@@ -1,4 +1,6 @@
+import json
 import os
+import shutil
 import warnings
 from typing import Dict
 from typing import List
@@ -8,17 +10,27 @@ from typing import Union
 import pytest
 
 from flake8_nb.parsers import CellId
+from flake8_nb.parsers.notebook_parsers import JSON_BACKENDS
+from flake8_nb.parsers.notebook_parsers import NON_PYTHON_CELL_MAGICS
+from flake8_nb.parsers.notebook_parsers import TEMP_DIR_PREFIX
 from flake8_nb.parsers.notebook_parsers import InputLineMapping
 from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
 from flake8_nb.parsers.notebook_parsers import NotebookParser
+from flake8_nb.parsers.notebook_parsers import NotebookSession
+from flake8_nb.parsers.notebook_parsers import convert_cell_source
 from flake8_nb.parsers.notebook_parsers import create_intermediate_py_file
+from flake8_nb.parsers.notebook_parsers import create_temp_dir
 from flake8_nb.parsers.notebook_parsers import create_temp_path
+from flake8_nb.parsers.notebook_parsers import get_json_backend
 from flake8_nb.parsers.notebook_parsers import get_notebook_code_cells
 from flake8_nb.parsers.notebook_parsers import get_rel_paths
 from flake8_nb.parsers.notebook_parsers import ignore_cell
 from flake8_nb.parsers.notebook_parsers import is_parent_dir
 from flake8_nb.parsers.notebook_parsers import map_intermediate_to_input
+from flake8_nb.parsers.notebook_parsers import notebook_to_intermediate_code
 from flake8_nb.parsers.notebook_parsers import read_notebook_to_cells
+from flake8_nb.parsers.notebook_parsers import read_source_map
+from flake8_nb.parsers.notebook_parsers import write_source_map
 from tests import TEST_NOTEBOOK_BASE_PATH
 
 INTERMEDIATE_PY_FILE_BASE_PATH = os.path.abspath(
@@ -111,6 +123,19 @@ def test_create_intermediate_py_file(
             assert result_file.read() == expected_result_str
 
 
+def test_create_temp_dir():
+    temp_dirs = [create_temp_dir() for _ in range(3)]
+    try:
+        assert len(set(temp_dirs)) == 3
+        for temp_dir in temp_dirs:
+            assert os.path.isdir(temp_dir)
+            assert os.listdir(temp_dir) == []
+            assert os.path.basename(temp_dir).startswith(f"{TEMP_DIR_PREFIX}{os.getpid()}_")
+    finally:
+        for temp_dir in temp_dirs:
+            os.rmdir(temp_dir)
+
+
 @pytest.mark.parametrize(
     "notebook_path,rel_result_path",
     [
@@ -158,6 +183,66 @@ def test_get_notebook_code_cells(
         assert len(notebook_cells) == number_of_cells
 
 
+@pytest.mark.parametrize(
+    "source_lines,skipped_cell_magics,expected_result",
+    [
+        (
+            ["%%bash\n", "echo $HOME\n", "ls -l"],
+            NON_PYTHON_CELL_MAGICS,
+            ["get_ipython().run_cell_magic('bash', '', '')\n", "#\n", "#"],
+        ),
+        (
+            ["%%sql postgresql://\r\n", "SELECT * FROM table"],
+            ("sql",),
+            ["get_ipython().run_cell_magic('sql', 'postgresql://', '')\n", "#"],
+        ),
+        (
+            ["%%timeit\n", "x = 1\n"],
+            NON_PYTHON_CELL_MAGICS,
+            ["get_ipython().run_cell_magic('timeit', '', '')\n", "x = 1\n"],
+        ),
+        (
+            ["%%bash\n", "!ls\n"],
+            (),
+            ["get_ipython().run_cell_magic('bash', '', '')\n", "get_ipython().system('ls')\n"],
+        ),
+        (
+            ["x = 1\n", "%%bash\n"],
+            NON_PYTHON_CELL_MAGICS,
+            ["x = 1\n", "get_ipython().run_cell_magic('bash', '', '')\n"],
+        ),
+        ([], NON_PYTHON_CELL_MAGICS, []),
+    ],
+)
+def test_convert_cell_source(
+    source_lines: List[str], skipped_cell_magics: Tuple[str, ...], expected_result: List[str]
+):
+    assert convert_cell_source(source_lines, skipped_cell_magics) == expected_result
+
+
+def test_get_notebook_code_cells_skipped_cell_magics(tmp_path):
+    notebook_path = tmp_path / "notebook.ipynb"
+    cell_sources = [["%%sql\n", "SELECT a,b\n", "FROM table"], ["%%bash\n", "echo 1"]]
+    notebook_path.write_text(
+        json.dumps(
+            {
+                "cells": [
+                    {"cell_type": "code", "source": source, "execution_count": 1, "metadata": {}}
+                    for source in cell_sources
+                ]
+            }
+        )
+    )
+    uses_get_ipython, notebook_cells = get_notebook_code_cells(str(notebook_path))
+    assert uses_get_ipython is True
+    assert [len(cell["source"]) for cell in notebook_cells] == [3, 2]
+    assert notebook_cells[0]["source"][1:] == ["#\n", "#"]
+
+    _, notebook_cells = get_notebook_code_cells(str(notebook_path), ["bash"])
+    assert notebook_cells[0]["source"][1:] == ["SELECT a,b\n", "FROM table"]
+    assert notebook_cells[1]["source"][1:] == ["#"]
+
+
 @pytest.mark.parametrize(
     "file_paths,base_path,expected_result",
     [
@@ -206,6 +291,7 @@ def test_is_parent_dir(parent_dir: str, path: str, expected_result):
     "notebook_name,number_of_cells",
     [
         ("not_a_notebook.ipynb", 0),
+        ("not_a_notebook_missing.ipynb", 0),
         ("notebook_with_flake8_tags.ipynb", 24),
         ("notebook_with_out_flake8_tags.ipynb", 19),
         ("notebook_with_out_ipython_magic.ipynb", 3),
@@ -220,6 +306,67 @@ def test_read_notebook_to_cells(notebook_name: str, number_of_cells: int):
         assert len(read_notebook_to_cells(notebook_path)) == number_of_cells
 
 
+@pytest.mark.parametrize("json_backend", list(JSON_BACKENDS))
+@pytest.mark.parametrize(
+    "notebook_name,number_of_cells",
+    [
+        ("not_a_notebook.ipynb", 0),
+        ("notebook_with_flake8_tags.ipynb", 24),
+        ("notebook_with_out_ipython_magic.ipynb", 3),
+    ],
+)
+def test_read_notebook_to_cells_json_backends(
+    json_backend: str, notebook_name: str, number_of_cells: int
+):
+    notebook_path = os.path.join(TEST_NOTEBOOK_BASE_PATH, notebook_name)
+    if notebook_name.startswith("not_a_notebook"):
+        with pytest.warns(InvalidNotebookWarning):
+            cells = read_notebook_to_cells(notebook_path, json_backend)
+    else:
+        cells = read_notebook_to_cells(notebook_path, json_backend)
+        expected_cells = read_notebook_to_cells(notebook_path, "json")
+        for cell, expected_cell in zip(cells, expected_cells):
+            for key in ("cell_type", "source", "metadata"):
+                assert cell[key] == expected_cell[key]
+    assert len(cells) == number_of_cells
+
+
+@pytest.mark.parametrize("json_backend", list(JSON_BACKENDS))
+@pytest.mark.parametrize("notebook_content", ['{"no_cells": []}', "[]", b"\xff\xfe"])
+def test_read_notebook_to_cells_json_backends_invalid(
+    tmp_path, json_backend: str, notebook_content: Union[str, bytes]
+):
+    notebook_path = tmp_path / "invalid.ipynb"
+    if isinstance(notebook_content, str):
+        notebook_path.write_text(notebook_content)
+    else:
+        notebook_path.write_bytes(notebook_content)
+    with pytest.warns(InvalidNotebookWarning):
+        assert read_notebook_to_cells(str(notebook_path), json_backend) == []
+
+
+def test_get_json_backend(monkeypatch):
+    assert get_json_backend() is next(iter(JSON_BACKENDS.values()))
+    assert get_json_backend("json") is JSON_BACKENDS["json"]
+    monkeypatch.setenv("FLAKE8_NB_JSON_BACKEND", "json")
+    assert get_json_backend() is JSON_BACKENDS["json"]
+    with pytest.raises(ValueError, match="JSON backend 'not_a_backend' is not available"):
+        get_json_backend("not_a_backend")
+
+
+def test_source_map(tmp_path):
+    intermediate_path = str(tmp_path / "notebook.ipynb_parsed")
+    input_line_mapping: InputLineMapping = {
+        "input_ids": [CellId("1", 1, 2), CellId(" ", 2, 4)],
+        "code_lines": [4, 11],
+    }
+    assert read_source_map(intermediate_path) is None
+    write_source_map(
+        intermediate_path, os.path.join(os.curdir, "notebook.ipynb"), input_line_mapping
+    )
+    assert read_source_map(intermediate_path) == ("notebook.ipynb", input_line_mapping)
+
+
 def test_InvalidNotebookWarning():
     with pytest.warns(
         InvalidNotebookWarning,
@@ -298,3 +445,83 @@ def test_NotebookParser_clean_up(notebook_parser: NotebookParser):
     assert original_count == 0
     assert intermediate_count == 0
     assert input_line_mapping_count == 0
+
+
+def test_NotebookParser_new_notebooks_reset_state(notebook_parser: NotebookParser):
+    """A run without notebooks doesn't inherit the parsed notebooks of a previous run."""
+    temp_path = notebook_parser.temp_path
+    new_parser_instance = NotebookParser([])
+
+    assert new_parser_instance.original_notebook_paths == []
+    assert new_parser_instance.intermediate_py_file_paths == []
+    assert new_parser_instance.input_line_mappings == []
+    assert new_parser_instance.temp_path == ""
+    new_parser_instance.clean_up()
+    assert os.path.isdir(temp_path)
+    shutil.rmtree(temp_path)
+
+
+#################################
+#     NotebookSession Tests     #
+#################################
+
+
+def test_NotebookSession_add_notebooks():
+    notebook_paths = [
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_flake8_tags.ipynb"),
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "not_a_notebook.ipynb"),
+    ]
+    with NotebookSession() as session:
+        assert session.temp_path == ""
+        with pytest.warns(InvalidNotebookWarning):
+            intermediate_py_file_paths = session.add_notebooks(notebook_paths)
+        other_session = NotebookSession()
+        other_intermediate_py_file_paths = other_session.add_notebooks(notebook_paths[:1])
+
+        assert session.original_notebook_paths == notebook_paths[:1]
+        assert session.intermediate_py_file_paths == intermediate_py_file_paths
+        assert len(intermediate_py_file_paths) == 1
+        assert session.temp_path != other_session.temp_path
+        assert NotebookParser.temp_path == ""
+
+        ((original_notebook, intermediate_py_file, input_line_mapping),) = session.get_mappings()
+        assert original_notebook == os.path.relpath(notebook_paths[0])
+        assert intermediate_py_file == intermediate_py_file_paths[0]
+        assert session.get_notebook_mapping(intermediate_py_file) == (
+            original_notebook,
+            input_line_mapping,
+        )
+        assert session.get_notebook_mapping(other_intermediate_py_file_paths[0]) == (
+            original_notebook,
+            input_line_mapping,
+        )
+        assert session.get_notebook_mapping("not_a_parsed_notebook.py") is None
+        temp_path = session.temp_path
+
+    assert not os.path.exists(temp_path)
+    assert session.temp_path == ""
+    assert session.intermediate_py_file_paths == []
+    assert os.path.isdir(other_session.temp_path)
+    other_session.clean_up()
+
+
+def test_NotebookSession_add_stdin_notebook():
+    notebook_path = os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_flake8_tags.ipynb")
+    with open(notebook_path, "rb") as notebook_file:
+        notebook_bytes = notebook_file.read()
+    with NotebookSession() as session:
+        session.add_stdin_notebook("display.ipynb", notebook_bytes)
+        assert session.stdin_notebook == (
+            "display.ipynb",
+            *notebook_to_intermediate_code(notebook_path),
+        )
+        assert session.temp_path == ""
+
+        with pytest.warns(InvalidNotebookWarning, match="'display.ipynb'"):
+            session.add_stdin_notebook("display.ipynb", b"not a notebook")
+        assert session.stdin_notebook == (
+            "display.ipynb",
+            "",
+            {"input_ids": [], "code_lines": []},
+        )
+    assert session.stdin_notebook is None
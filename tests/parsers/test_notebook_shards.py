@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from flake8_nb.parsers import notebook_parsers
+from flake8_nb.parsers.notebook_shards import NOTEBOOK_BASE_COST
+from flake8_nb.parsers.notebook_shards import get_notebook_file_size
+from flake8_nb.parsers.notebook_shards import get_notebook_shard
+from flake8_nb.parsers.notebook_shards import iter_notebook_shard
+from flake8_nb.parsers.notebook_shards import parse_shard
+from flake8_nb.parsers.notebook_shards import partition_notebooks
+from tests import TEST_NOTEBOOK_BASE_PATH
+from tests.parsers.test_notebook_archives import MEMBER_NAMES
+from tests.parsers.test_notebook_archives import create_archive
+from tests.parsers.test_notebook_stream import get_notebook_paths
+
+
+@pytest.mark.parametrize(
+    "shard,expected_result", [("1/1", (1, 1)), ("2/3", (2, 3)), (" 10 / 12 ", (10, 12))]
+)
+def test_parse_shard(shard: str, expected_result: tuple):
+    assert parse_shard(shard) == expected_result
+
+
+@pytest.mark.parametrize("shard", ["", "1", "0/2", "3/2", "1/0", "a/b", "-1/2", "1/2/3"])
+def test_parse_shard_invalid(shard: str):
+    with pytest.raises(ValueError, match="isn't of the form 'K/N'"):
+        parse_shard(shard)
+
+
+def test_get_notebook_file_size(tmp_path):
+    notebook_path = os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb")
+    assert get_notebook_file_size(notebook_path) == os.path.getsize(notebook_path)
+    archive_path = create_archive(tmp_path / "notebooks.zip")
+    assert get_notebook_file_size(f"{archive_path}!{MEMBER_NAMES[2]}") == os.path.getsize(
+        notebook_path
+    )
+    assert get_notebook_file_size(f"{archive_path}!missing.ipynb") == 0
+    assert get_notebook_file_size(str(tmp_path / "missing.ipynb")) == 0
+
+
+def test_partition_notebooks():
+    sizes = {"a": 10 * NOTEBOOK_BASE_COST, "b": 0, "c": 0, "d": 0, "e": 3 * NOTEBOOK_BASE_COST}
+    shards = partition_notebooks(sizes, 2, get_size=sizes.__getitem__)
+
+    assert shards == [["a"], ["e", "b", "c", "d"]]
+    assert partition_notebooks(reversed(list(sizes)), 2, get_size=sizes.__getitem__) == shards
+    assert partition_notebooks(sizes, 7, get_size=sizes.__getitem__)[5:] == [[], []]
+
+
+def test_get_notebook_shard():
+    notebook_paths = get_notebook_paths()
+    shards = [get_notebook_shard(notebook_paths, shard_index, 3) for shard_index in (1, 2, 3)]
+
+    assert sorted(path for shard in shards for path in shard) == sorted(notebook_paths)
+    assert all(shards)
+    for shard in shards:
+        assert shard == [path for path in notebook_paths if path in shard]
+
+
+def test_get_notebook_shard_does_not_read_notebooks(monkeypatch: pytest.MonkeyPatch):
+    def fail_reading(notebook_path):
+        raise AssertionError(f"{notebook_path} was read")
+
+    monkeypatch.setattr(notebook_parsers, "read_notebook_bytes", fail_reading)
+    notebook_paths = get_notebook_paths()
+    shards = [get_notebook_shard(notebook_paths, shard_index, 2) for shard_index in (1, 2)]
+
+    assert sorted(path for shard in shards for path in shard) == sorted(notebook_paths)
+
+
+def test_iter_notebook_shard():
+    notebook_paths = get_notebook_paths()
+    searched = []
+
+    def iter_notebook_paths():
+        searched.append(True)
+        yield from notebook_paths
+
+    shard = iter_notebook_shard(iter_notebook_paths(), 2, 3)
+    assert searched == []
+    assert list(shard) == get_notebook_shard(notebook_paths, 2, 3)
+    assert searched == [True]
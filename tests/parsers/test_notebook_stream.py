@@ -0,0 +1,73 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
+from flake8_nb.parsers.notebook_parsers import get_source_map_path
+from flake8_nb.parsers.notebook_stream import iter_intermediate_py_file_batches
+from flake8_nb.parsers.notebook_stream import remove_intermediate_py_files
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+NOTEBOOKS = [
+    "cell_with_source_string.ipynb",
+    "notebook_with_flake8_tags.ipynb",
+    "notebook_with_out_flake8_tags.ipynb",
+    "notebook_with_out_ipython_magic.ipynb",
+]
+
+
+def get_notebook_paths():
+    return [os.path.join(TEST_NOTEBOOK_BASE_PATH, notebook) for notebook in NOTEBOOKS]
+
+
+@pytest.mark.parametrize("batch_size,expected_batch_sizes", [(1, [1, 1, 1, 1]), (3, [3, 1])])
+def test_iter_intermediate_py_file_batches(
+    tmp_path: Path, batch_size: int, expected_batch_sizes: list
+):
+    batches = list(
+        iter_intermediate_py_file_batches(iter(get_notebook_paths()), str(tmp_path), batch_size)
+    )
+
+    assert [len(batch) for batch in batches] == expected_batch_sizes
+    intermediate_paths = [path for batch in batches for path in batch]
+    assert [os.path.basename(path) for path in intermediate_paths] == [
+        f"{notebook}_parsed" for notebook in NOTEBOOKS
+    ]
+    assert all(os.path.isfile(get_source_map_path(path)) for path in intermediate_paths)
+
+    remove_intermediate_py_files(intermediate_paths)
+    assert not any(os.path.exists(path) for path in intermediate_paths)
+    assert not any(os.path.exists(get_source_map_path(path)) for path in intermediate_paths)
+
+
+def test_iter_intermediate_py_file_batches_invalid_notebook(tmp_path: Path):
+    notebook_paths = [
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "not_a_notebook.ipynb"),
+        *get_notebook_paths()[:1],
+    ]
+    with pytest.warns(InvalidNotebookWarning):
+        batches = list(iter_intermediate_py_file_batches(notebook_paths, str(tmp_path), 2))
+    assert [len(batch) for batch in batches] == [1]
+
+
+def test_iter_intermediate_py_file_batches_early_close(tmp_path: Path):
+    """Closing the stream stops the conversion of the remaining notebooks."""
+    batches = iter_intermediate_py_file_batches(
+        iter(get_notebook_paths()), str(tmp_path), 1, queue_depth=1
+    )
+    assert len(next(batches)) == 1
+    batches.close()
+
+    assert len(list(tmp_path.rglob("*.ipynb_parsed"))) < len(NOTEBOOKS)
+
+
+def test_iter_intermediate_py_file_batches_error(tmp_path: Path):
+    def notebook_paths():
+        yield get_notebook_paths()[0]
+        raise OSError("Discovery failed")
+
+    batches = iter_intermediate_py_file_batches(notebook_paths(), str(tmp_path), 1)
+    assert len(next(batches)) == 1
+    with pytest.raises(OSError, match="Discovery failed"):
+        next(batches)
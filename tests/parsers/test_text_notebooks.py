@@ -0,0 +1,171 @@
+from pathlib import Path
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from flake8_nb.parsers.notebook_parsers import get_notebook_code_cells
+from flake8_nb.parsers.notebook_parsers import read_notebook_to_cells
+from flake8_nb.parsers.text_notebooks import TEXT_NOTEBOOK_FORMATS
+from flake8_nb.parsers.text_notebooks import TextNotebookFormat
+from flake8_nb.parsers.text_notebooks import get_text_notebook_format
+from flake8_nb.parsers.text_notebooks import get_text_notebook_formats
+from flake8_nb.parsers.text_notebooks import is_text_notebook
+from flake8_nb.parsers.text_notebooks import read_markdown_cells
+from flake8_nb.parsers.text_notebooks import read_percent_cells
+from flake8_nb.parsers.text_notebooks import read_quarto_cells
+from flake8_nb.parsers.text_notebooks import register_text_notebook_format
+
+PERCENT_SCRIPT = """# ---
+# jupyter:
+#   jupytext:
+#     formats: ipynb,py:percent
+# ---
+
+import sys
+
+# %% [markdown]
+# # Title
+
+# %%
+import os
+
+# %% Setup tags=["flake8-noqa-cell-E231"]
+x = [1,2]
+%matplotlib inline
+
+"""
+
+MARKDOWN_NOTEBOOK = """---
+jupyter:
+  kernelspec:
+    name: python3
+---
+
+# Title
+
+```python
+import os
+```
+
+```bash
+ls
+```
+
+````python tags=["flake8-noqa-cell"]
+x=1
+```
+````
+"""
+
+QUARTO_NOTEBOOK = """---
+title: "Report"
+---
+
+```{python}
+#| label: setup
+#| tags: [flake8-noqa-cell-E225, 'other']
+import os
+```
+
+Text
+
+```{python echo=false}
+x=1
+"""
+
+
+def get_cell(cell_type: str, source: list, tags: list = None) -> dict:
+    return {
+        "cell_type": cell_type,
+        "execution_count": None,
+        "metadata": {"tags": tags} if tags else {},
+        "source": source,
+    }
+
+
+def test_read_percent_cells():
+    assert read_percent_cells(PERCENT_SCRIPT) == [
+        get_cell("code", ["import sys"]),
+        get_cell("markdown", ["# # Title"]),
+        get_cell("code", ["import os"]),
+        get_cell("code", ["x = [1,2]\n", "%matplotlib inline"], ["flake8-noqa-cell-E231"]),
+    ]
+    assert read_percent_cells("# %%\nx = 1\n# %% [raw]\nraw\n") == [
+        get_cell("code", ["x = 1"]),
+        get_cell("raw", ["raw"]),
+    ]
+
+
+def test_read_markdown_cells():
+    assert read_markdown_cells(MARKDOWN_NOTEBOOK) == [
+        get_cell("markdown", ["# Title"]),
+        get_cell("code", ["import os"]),
+        get_cell("markdown", ["```bash\n", "ls\n", "```"]),
+        get_cell("code", ["x=1\n", "```"], ["flake8-noqa-cell"]),
+    ]
+
+
+def test_read_quarto_cells():
+    assert read_quarto_cells(QUARTO_NOTEBOOK) == [
+        get_cell("code", ["import os"], ["flake8-noqa-cell-E225", "other"]),
+        get_cell("markdown", ["Text"]),
+        get_cell("code", ["x=1"]),
+    ]
+
+
+@pytest.mark.parametrize(
+    "file_name,content,expected_total_cell_nrs",
+    [
+        ("notebook.py", PERCENT_SCRIPT, [1, 3, 4]),
+        ("notebook.md", MARKDOWN_NOTEBOOK, [2, 4]),
+        ("notebook.QMD", QUARTO_NOTEBOOK, [1, 3]),
+    ],
+)
+def test_get_notebook_code_cells_text_notebooks(
+    tmp_path: Path, file_name: str, content: str, expected_total_cell_nrs: list
+):
+    notebook_path = tmp_path / file_name
+    notebook_path.write_text(content)
+    uses_get_ipython, notebook_cells = get_notebook_code_cells(str(notebook_path))
+    assert uses_get_ipython == file_name.endswith(".py")
+    assert [
+        notebook_cell["total_cell_nr"] for notebook_cell in notebook_cells
+    ] == expected_total_cell_nrs
+
+
+def test_is_text_notebook(tmp_path: Path):
+    percent_script_path = tmp_path / "percent.py"
+    percent_script_path.write_text(PERCENT_SCRIPT)
+    plain_script_path = tmp_path / "plain.py"
+    plain_script_path.write_text("x = 1\n# %%bash is no cell marker\n")
+    text_notebook_formats = get_text_notebook_formats(["py:percent", "md"])
+
+    assert is_text_notebook(str(percent_script_path), text_notebook_formats)
+    assert not is_text_notebook(str(plain_script_path), text_notebook_formats)
+    assert not is_text_notebook(str(tmp_path / "missing.py"), text_notebook_formats)
+    assert is_text_notebook("README.MD", text_notebook_formats)
+    assert not is_text_notebook("report.qmd", text_notebook_formats)
+    assert not is_text_notebook(str(percent_script_path), [])
+
+
+def test_get_text_notebook_formats():
+    assert get_text_notebook_formats([]) == []
+    assert get_text_notebook_formats(["qmd"]) == [TEXT_NOTEBOOK_FORMATS["qmd"]]
+    with pytest.raises(ValueError, match="Unknown text notebook format 'foo'"):
+        get_text_notebook_formats(["md", "foo"])
+
+
+def test_register_text_notebook_format(tmp_path: Path, monkeypatch: MonkeyPatch):
+    monkeypatch.setattr(
+        "flake8_nb.parsers.text_notebooks.TEXT_NOTEBOOK_FORMATS", dict(TEXT_NOTEBOOK_FORMATS)
+    )
+    text_notebook_format = TextNotebookFormat(
+        ".txt", lambda text: [get_cell("code", text.splitlines(True))]
+    )
+    register_text_notebook_format("txt", text_notebook_format)
+    notebook_path = tmp_path / "notebook.txt"
+    notebook_path.write_text("x = 1\n")
+
+    assert get_text_notebook_formats(["txt"]) == [text_notebook_format]
+    assert get_text_notebook_format(str(notebook_path)) == text_notebook_format
+    assert read_notebook_to_cells(str(notebook_path)) == [get_cell("code", ["x = 1\n"])]
@@ -1,21 +1,35 @@
+import gzip
+import io
 import json
 import os
+import pstats
+import re
 import shutil
 import subprocess
 import sys
+import tarfile
+import tempfile
+import tracemalloc
+import warnings
+import zipfile
 from pathlib import Path
 
 import pytest
 from _pytest.capture import CaptureFixture
 from _pytest.monkeypatch import MonkeyPatch
+from _pytest.tmpdir import TempPathFactory
 from flake8 import __version__ as flake_version
+from flake8 import utils as flake8_utils
+from flake8.checker import FileChecker
 
 from flake8_nb import FLAKE8_VERSION_TUPLE
 from flake8_nb import __version__
 from flake8_nb.__main__ import main
+from flake8_nb.parsers import notebook_archives
+from flake8_nb.parsers.notebook_budget import NotebookBudgetWarning
 from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
-from flake8_nb.parsers.notebook_parsers import NotebookParser
 from tests import TEST_NOTEBOOK_BASE_PATH
+from tests.parsers.test_notebook_diff import init_git_repo
 
 
 @pytest.mark.parametrize("keep_intermediate", [True, False])
@@ -52,8 +66,9 @@ def test_run_main(
         assert any(result.endswith(expected_result.rstrip("\n")) for result in result_list)
 
     if keep_intermediate:
-        assert os.path.exists(NotebookParser.temp_path)
-        NotebookParser.clean_up()
+        temp_path = captured.err.rsplit("are still present at:", 1)[1].strip()
+        assert os.path.exists(temp_path)
+        shutil.rmtree(temp_path)
 
 
 def test_run_main_use_config(capsys, tmp_path: Path):
@@ -184,3 +199,805 @@ def test_flake8_nb_bug_report():
     assert info["version"] == __version__
 
     assert not any(plugin["plugin"] == "flake8-nb" for plugin in info["plugins"])
+
+
+def test_run_main_nb_diff_ref(capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch):
+    """Only violations of changed cells and lines are reported."""
+    notebook_path = tmp_path / "notebook.ipynb"
+    notebook_path.write_bytes(
+        (Path(TEST_NOTEBOOK_BASE_PATH) / "notebook_with_out_flake8_tags.ipynb").read_bytes()
+    )
+    python_file = tmp_path / "file.py"
+    python_file.write_text("import os\n")
+    init_git_repo(tmp_path)
+
+    notebook = json.loads(notebook_path.read_text())
+    notebook["cells"][12]["source"] = ['{"2":2}\n', "x=1"]
+    notebook_path.write_text(json.dumps(notebook))
+    python_file.write_text("import os\nimport sys\n")
+
+    with monkeypatch.context() as m:
+        m.chdir(tmp_path)
+        with pytest.raises(SystemExit):
+            main(["flake8_nb", "--nb-diff-ref", "HEAD", "."])
+    result_list = capsys.readouterr().out.replace("\r", "").splitlines()
+
+    assert sorted(result_list) == [
+        "file.py:2:1: F401 'sys' imported but unused",
+        "notebook.ipynb#In[5]:1:5: E231 missing whitespace after ':'",
+        "notebook.ipynb#In[5]:2:2: E225 missing whitespace around operator",
+    ]
+
+
+def test_run_main_nb_diff_ref_invalid(capsys: CaptureFixture):
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-diff-ref", "not_a_valid_ref", TEST_NOTEBOOK_BASE_PATH])
+    assert "'not_a_valid_ref' passed to --nb-diff-ref" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_run_main_nb_stream_batch_size(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, jobs: str
+):
+    """Streaming batches reports the same violations as checking all notebooks at once."""
+    argv = ["flake8_nb", "--exclude", "*.tox/*,*.ipynb_checkpoints*,*/docs/*", "--count"]
+    with pytest.raises(SystemExit):
+        with pytest.warns(InvalidNotebookWarning):
+            main([*argv, TEST_NOTEBOOK_BASE_PATH])
+    expected_result_list = capsys.readouterr().out.replace("\r", "").splitlines()
+
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    with pytest.raises(SystemExit):
+        with pytest.warns(InvalidNotebookWarning):
+            main([*argv, "--nb-stream-batch-size", "2", "--jobs", jobs, TEST_NOTEBOOK_BASE_PATH])
+    result_list = capsys.readouterr().out.replace("\r", "").splitlines()
+
+    assert sorted(result_list) == sorted(expected_result_list)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_main_nb_stream_batch_size_with_diff(capsys: CaptureFixture):
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-stream-batch-size", "2", "--nb-diff-ref", "HEAD", "."])
+    assert "can't be combined with --nb-diff-ref" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "option,expected_notebooks",
+    [
+        (["--nb-fail-fast"], ["newest.ipynb"]),
+        (["--nb-max-violations", "4"], ["newest.ipynb", "middle.ipynb"]),
+        (["--nb-max-violations", "100"], ["newest.ipynb", "middle.ipynb", "oldest.ipynb"]),
+    ],
+)
+def test_run_main_nb_max_violations(
+    capsys: CaptureFixture,
+    tmp_path: Path,
+    tmp_path_factory: TempPathFactory,
+    monkeypatch: MonkeyPatch,
+    option: list,
+    expected_notebooks: list,
+):
+    """Notebooks are checked newest first, until the maximum number of violations is reached."""
+    notebook_source = (
+        Path(TEST_NOTEBOOK_BASE_PATH) / "notebook_with_out_flake8_tags.ipynb"
+    ).read_bytes()
+    for mtime, notebook_name in enumerate(["oldest.ipynb", "middle.ipynb", "newest.ipynb"]):
+        notebook_path = tmp_path / notebook_name
+        notebook_path.write_bytes(notebook_source)
+        os.utime(notebook_path, (mtime * 1000, mtime * 1000))
+
+    temp_base_path = tmp_path_factory.mktemp("temp_base")
+    monkeypatch.setattr(tempfile, "tempdir", str(temp_base_path))
+    with monkeypatch.context() as m:
+        m.chdir(tmp_path)
+        with pytest.raises(SystemExit) as exc_info:
+            main(["flake8_nb", *option, "."])
+    result_list = capsys.readouterr().out.replace("\r", "").splitlines()
+
+    assert exc_info.value.code == 1
+    assert [result.split("#")[0] for result in result_list] == [
+        notebook for notebook in expected_notebooks for _ in range(3)
+    ]
+    assert list(temp_base_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("stream_options", [[], ["--nb-stream-batch-size", "1"]])
+@pytest.mark.parametrize("formatter", ["jsonl_notebook", "sarif_notebook"])
+def test_run_main_nb_shard(tmp_path: Path, formatter: str, stream_options: list):
+    """The merged results of all shards are the same as the results of an unsharded run."""
+    from flake8_nb.merge_shards import main as merge_main
+
+    def run(argv: list) -> int:
+        with pytest.raises(SystemExit) as exc_info:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", InvalidNotebookWarning)
+                main(argv)
+        return exc_info.value.code
+
+    def merge(results: list, output_file: Path) -> int:
+        with pytest.raises(SystemExit) as exc_info:
+            merge_main(["flake8_nb-merge-shards", "--output-file", str(output_file), *results])
+        return exc_info.value.code
+
+    argv = ["flake8_nb", "--format", formatter, TEST_NOTEBOOK_BASE_PATH, "--output-file"]
+    shard_results = [str(tmp_path / f"{index}.out") for index in (1, 2, 3)]
+    exit_codes = [
+        run([*argv, results, "--nb-shard", f"{index}/3", *stream_options])
+        for index, results in enumerate(shard_results, start=1)
+    ]
+    assert run([*argv, str(tmp_path / "unsharded.out")]) == 1
+
+    assert merge([str(tmp_path / "unsharded.out")], tmp_path / "unsharded.merged") == 1
+    assert merge(shard_results, tmp_path / "shards.merged") == 1
+    assert (tmp_path / "shards.merged").read_text() == (tmp_path / "unsharded.merged").read_text()
+    assert 1 in exit_codes and set(exit_codes) <= {0, 1}
+    python_file_paths = [
+        results for results in shard_results if "falsy_python_file.py" in Path(results).read_text()
+    ]
+    assert python_file_paths == shard_results[:1]
+
+
+def test_run_main_nb_shard_invalid(capsys: CaptureFixture):
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-shard", "0/2", TEST_NOTEBOOK_BASE_PATH])
+    assert "--nb-shard: The shard '0/2' isn't of the form 'K/N'" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "option,expected_result",
+    [
+        ([], "notebook.ipynb#In[3]:1:2: E225 missing whitespace around operator"),
+        (["--nb-skip-cell-magics", "sql"], "notebook.ipynb#In[2]:2:"),
+        (["--nb-skip-cell-magics="], "notebook.ipynb#In[1]:2:"),
+    ],
+)
+def test_run_main_nb_skip_cell_magics(
+    capsys: CaptureFixture,
+    tmp_path: Path,
+    monkeypatch: MonkeyPatch,
+    option: list,
+    expected_result: str,
+):
+    cell_sources = [["%%sql\n", "SELECT a,b FROM table"], ["%%bash\n", "ls -l $HOME"], ["x=1"]]
+    notebook = {
+        "cells": [
+            {"cell_type": "code", "source": source, "execution_count": index, "metadata": {}}
+            for index, source in enumerate(cell_sources, start=1)
+        ]
+    }
+    (tmp_path / "notebook.ipynb").write_text(json.dumps(notebook))
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb", *option, "notebook.ipynb"])
+    assert exc_info.value.code == 1
+    (result,) = capsys.readouterr().out.splitlines()
+    assert result.startswith(expected_result)
+
+
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+@pytest.mark.parametrize(
+    "budget_option", [["--nb-max-code-lines", "2"], ["--nb-max-seconds", "0.5"]]
+)
+def test_run_main_nb_budget(
+    capsys: CaptureFixture,
+    tmp_path: Path,
+    monkeypatch: MonkeyPatch,
+    stream_option: list,
+    budget_option: list,
+):
+    for notebook_name, source in (
+        ("huge.ipynb", ["x = 1  # noqa: " + "1" * 60 + "!\n", "y = 2\n", "z=3"]),
+        ("small.ipynb", ["x=1"]),
+    ):
+        notebook = {
+            "cells": [
+                {"cell_type": "code", "source": source, "execution_count": 1, "metadata": {}}
+            ]
+        }
+        (tmp_path / notebook_name).write_text(json.dumps(notebook))
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc_info:
+        with pytest.warns(NotebookBudgetWarning) as warning_records:
+            main(["flake8_nb", *budget_option, *stream_option, "."])
+    assert exc_info.value.code == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "small.ipynb#In[1]:1:2: E225 missing whitespace around operator"
+    ]
+    (warning_record,) = [
+        record for record in warning_records if record.category is NotebookBudgetWarning
+    ]
+    assert str(warning_record.message).endswith(
+        "huge.ipynb', since it has 3 lines of code (limit 2)."
+        if "--nb-max-code-lines" in budget_option
+        else "huge.ipynb', since parsing it took longer than 0.5s."
+    )
+
+
+@pytest.mark.skipif(FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="Only implemented for flake8>=5.0.0")
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_run_main_nb_max_seconds_check(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, jobs: str
+):
+    """A notebook whose checks hang is skipped with a warning, like one whose parsing hangs."""
+    for notebook_name in ("slow.ipynb", "small.ipynb"):
+        notebook = {
+            "cells": [{"cell_type": "code", "source": "x=1", "execution_count": 1, "metadata": {}}]
+        }
+        (tmp_path / notebook_name).write_text(json.dumps(notebook))
+    run_ast_checks = FileChecker.run_ast_checks
+
+    def hanging_run_ast_checks(self):
+        if self.filename.endswith("slow.ipynb_parsed"):
+            re.match(r"(a+)+$", "a" * 60 + "b")
+        run_ast_checks(self)
+
+    monkeypatch.setattr(FileChecker, "run_ast_checks", hanging_run_ast_checks)
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc_info:
+        with pytest.warns(NotebookBudgetWarning) as warning_records:
+            main(["flake8_nb", "--nb-max-seconds", "0.5", "--jobs", jobs, "."])
+    assert exc_info.value.code == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "small.ipynb#In[1]:1:2: E225 missing whitespace around operator"
+    ]
+    (warning_record,) = warning_records
+    assert str(warning_record.message).endswith(
+        "slow.ipynb', since checking it took longer than 0.5s."
+    )
+
+
+def test_run_main_concurrent_processes(tmp_path: Path):
+    """Concurrent processes in the same working tree are independent, like with pre-commit.
+
+    Each process gets its own subset of the files (some files are checked by multiple
+    processes) and has to report the same as when it runs alone, without leaving files behind.
+    """
+    project_path = tmp_path / "project"
+    shutil.copytree(
+        TEST_NOTEBOOK_BASE_PATH,
+        project_path / "notebooks",
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+    temp_base_path = tmp_path / "tmp"
+    temp_base_path.mkdir()
+    env = {**os.environ, "TMPDIR": str(temp_base_path), "TEMP": str(temp_base_path)}
+    files = sorted(path.relative_to(project_path).as_posix() for path in project_path.rglob("*.*"))
+    file_subsets = [files[:3], files[2:], files[1:4]]
+
+    def start(file_subset: list) -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, "-m", "flake8_nb", "--jobs", "1", *file_subset],
+            cwd=project_path,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        )
+
+    expected_outputs = [start(file_subset).communicate()[0] for file_subset in file_subsets]
+    processes = [start(file_subset) for file_subset in file_subsets * 2]
+    outputs = [process.communicate()[0] for process in processes]
+
+    assert outputs == expected_outputs * 2
+    assert all(output for output in outputs)
+    assert list(temp_base_path.iterdir()) == []
+    assert (
+        sorted(path.relative_to(project_path).as_posix() for path in project_path.rglob("*.*"))
+        == files
+    )
+
+
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+def test_run_main_nb_archives(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, stream_option: list
+):
+    notebook = {
+        "cells": [{"cell_type": "code", "source": ["x=1"], "execution_count": 1, "metadata": {}}]
+    }
+    notebook_bytes = json.dumps(notebook).encode()
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w") as zip_file:
+        zip_file.writestr("src/a.ipynb", notebook_bytes)
+        zip_file.writestr("src/skipped/b.ipynb", notebook_bytes)
+    with tarfile.open(tmp_path / "bundle.tar.gz", "w:gz") as tar_file:
+        tar_info = tarfile.TarInfo("c.ipynb")
+        tar_info.size = len(notebook_bytes)
+        tar_file.addfile(tar_info, io.BytesIO(notebook_bytes))
+    (tmp_path / "d.ipynb.gz").write_bytes(gzip.compress(notebook_bytes))
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(
+            [
+                "flake8_nb",
+                "--exclude",
+                "skipped",
+                *stream_option,
+                "bundle.zip",
+                "bundle.tar.gz",
+                ".",
+            ]
+        )
+    assert exc_info.value.code == 1
+    assert sorted(capsys.readouterr().out.splitlines()) == [
+        "bundle.tar.gz!c.ipynb#In[1]:1:2: E225 missing whitespace around operator",
+        "bundle.zip!src/a.ipynb#In[1]:1:2: E225 missing whitespace around operator",
+        "d.ipynb.gz#In[1]:1:2: E225 missing whitespace around operator",
+    ]
+
+    (tmp_path / "broken.zip").write_bytes(b"not an archive")
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb", "broken.zip"])
+    assert exc_info.value.code == 1
+    assert "broken.zip': File is not a zip file" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="Only implemented for flake8>=5.0.0")
+@pytest.mark.parametrize(
+    "stdin_display_name,expected_result",
+    [
+        (
+            "unsaved/notebook.ipynb",
+            [
+                "unsaved/notebook.ipynb#In[1]:1:2: E225 missing whitespace around operator",
+                "unsaved/notebook.ipynb#In[2]:1:1: F401 'os' imported but unused",
+                "unsaved/notebook.ipynb#In[2]:1:1: E402 module level import not at top of file",
+            ],
+        ),
+        ("script.py", ["script.py:1:3: E231 missing whitespace after ':'"]),
+    ],
+)
+def test_run_main_stdin_notebook(
+    capsys: CaptureFixture,
+    tmp_path: Path,
+    monkeypatch: MonkeyPatch,
+    stdin_display_name: str,
+    expected_result: list[str],
+):
+    notebook = {
+        "cells": [
+            {"cell_type": "code", "source": ["x=1"], "execution_count": 1, "metadata": {}},
+            {"cell_type": "markdown", "source": ["# Title"], "metadata": {}},
+            {"cell_type": "code", "source": ["import os"], "execution_count": 2, "metadata": {}},
+        ]
+    }
+    stdin_content = json.dumps(notebook) if stdin_display_name.endswith(".ipynb") else "{1:1}\n"
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(stdin_content.encode())))
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    flake8_utils.stdin_get_value.cache_clear()
+    try:
+        with pytest.raises(SystemExit) as exc_info:
+            main(["flake8_nb", "--stdin-display-name", stdin_display_name, "-"])
+    finally:
+        flake8_utils.stdin_get_value.cache_clear()
+    assert exc_info.value.code == 1
+    assert capsys.readouterr().out.splitlines() == expected_result
+    # the notebook is only parsed in memory
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+@pytest.mark.parametrize("from_stdin", [True, False])
+def test_run_main_nb_files_from(
+    capsys: CaptureFixture,
+    tmp_path: Path,
+    monkeypatch: MonkeyPatch,
+    from_stdin: bool,
+    stream_option: list,
+):
+    notebook = {
+        "cells": [{"cell_type": "code", "source": ["x=1"], "execution_count": 1, "metadata": {}}]
+    }
+    for notebook_path in ("a.ipynb", "sub/b.ipynb", "not_listed.ipynb"):
+        (tmp_path / notebook_path).parent.mkdir(exist_ok=True)
+        (tmp_path / notebook_path).write_text(json.dumps(notebook))
+    for python_path in ("c.py", "not_listed.py"):
+        (tmp_path / python_path).write_text("y=2\n")
+    file_list = b"a.ipynb\0sub/b.ipynb\0c.py\0"
+    if from_stdin:
+        monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(file_list)))
+        files_from = "-"
+    else:
+        (tmp_path / "files.txt").write_bytes(file_list.replace(b"\0", b"\n"))
+        files_from = "files.txt"
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb", "--nb-files-from", files_from, *stream_option])
+    assert exc_info.value.code == 1
+    assert sorted(capsys.readouterr().out.splitlines()) == [
+        "a.ipynb#In[1]:1:2: E225 missing whitespace around operator",
+        "c.py:1:2: E225 missing whitespace around operator",
+        "sub/b.ipynb#In[1]:1:2: E225 missing whitespace around operator",
+    ]
+
+
+def test_run_main_nb_files_from_errors(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch
+):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "not_listed.py").write_text("y=2\n")
+    (tmp_path / "empty.txt").write_text("")
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb", "--nb-files-from", "empty.txt"])
+    assert exc_info.value.code == 0
+    assert capsys.readouterr().out == ""
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb", "--nb-files-from", "missing.txt"])
+    assert exc_info.value.code == 1
+    assert "Could not read the file list 'missing.txt'" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb", "--nb-files-from", "-", "-"])
+    assert exc_info.value.code == 1
+    assert "can't be used when stdin (-) is also passed" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+def test_run_main_nb_files_from_missing_files(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, stream_option: list
+):
+    """Missing listed files are reported like missing files passed as arguments."""
+    notebook = {
+        "cells": [{"cell_type": "code", "source": ["x=1"], "execution_count": 1, "metadata": {}}]
+    }
+    (tmp_path / "a.ipynb").write_text(json.dumps(notebook))
+    monkeypatch.setattr(
+        sys, "stdin", io.TextIOWrapper(io.BytesIO(b"missing.ipynb\na.ipynb\nmissing.py\n"))
+    )
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb", "--nb-files-from", "-", *stream_option])
+    assert exc_info.value.code == 1
+    assert sorted(
+        re.sub(r"E902 \w+Error: .*", "E902", line) for line in capsys.readouterr().out.splitlines()
+    ) == [
+        "a.ipynb#In[1]:1:2: E225 missing whitespace around operator",
+        "missing.ipynb:0:1: E902",
+        "missing.py:0:1: E902",
+    ]
+
+
+@pytest.mark.skipif(FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="Only implemented for flake8>=5.0.0")
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+def test_run_main_nb_timings_file(tmp_path: Path, monkeypatch: MonkeyPatch, stream_option: list):
+    shutil.copy(
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb"),
+        tmp_path / "notebook.ipynb",
+    )
+    (tmp_path / "script.py").write_text("x = 1\n")
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--jobs", "2", "--nb-timings-file", "timings.json", *stream_option])
+    check_timings = json.loads((tmp_path / "timings.json").read_text())
+    assert sorted(check_timings) == ["notebook.ipynb", "script.py"]
+    assert check_timings["script.py"]["lines"] == 1
+
+
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+def test_run_main_nb_chunk_cells(capsys: CaptureFixture, stream_option: list):
+    notebook_paths = [
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, notebook_name)
+        for notebook_name in (
+            "notebook_with_flake8_tags.ipynb",
+            "notebook_with_out_flake8_tags.ipynb",
+            "notebook_with_out_ipython_magic.ipynb",
+        )
+    ]
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", *notebook_paths])
+    expected_output = sorted(capsys.readouterr().out.splitlines())
+    with pytest.raises(SystemExit):
+        main(
+            ["flake8_nb", "--jobs", "2", "--nb-chunk-cells", "1", *stream_option, *notebook_paths]
+        )
+    assert sorted(capsys.readouterr().out.splitlines()) == expected_output
+
+
+@pytest.mark.parametrize("chunk_cells", ["1", "2", "3"])
+def test_run_main_nb_chunk_cells_same_violations(
+    capsys: CaptureFixture, tmp_path: Path, chunk_cells: str
+):
+    def code_cell(source: list) -> dict:
+        return {
+            "cell_type": "code",
+            "execution_count": None,
+            "metadata": {},
+            "outputs": [],
+            "source": source,
+        }
+
+    # source entries spanning several lines, imports repeated after and without use,
+    # uses inside of functions are only checked by pyflakes at the end of the notebook
+    cells = [
+        code_cell(["import os\n", "import sys\n"]),
+        code_cell(["import json\n"]),
+        code_cell(["def f():\n", "    return json.dumps\n"]),
+        {"cell_type": "markdown", "metadata": {}, "source": ["# Title"]},
+        code_cell(["def g():\n    return os.sep\n"]),
+        code_cell(["print(g(), os.getcwd())\n"]),
+        code_cell(["import os\n"]),
+        code_cell(["import sys\n", "\n"]),
+        code_cell(["x = [1,2]\nclass A:\n    pass\n"]),
+        code_cell(["print(x, A, undefined_name)\n"]),
+        code_cell(["import re\n", "print(sys.argv)"]),
+        code_cell(["import json\n", "print(f())\n"]),
+    ]
+    notebook_path = tmp_path / "notebook.ipynb"
+    notebook_path.write_text(
+        json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5})
+    )
+
+    def get_violations() -> list:
+        # the line of the redefined import is a line of the parsed notebook
+        return sorted(
+            re.sub(r" from line \d+", "", line) for line in capsys.readouterr().out.splitlines()
+        )
+
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", str(notebook_path)])
+    expected_violations = get_violations()
+    assert any("F811 redefinition of unused 'sys'" in line for line in expected_violations)
+    assert any("F811 redefinition of unused 'json'" in line for line in expected_violations)
+    assert not any("'os'" in line for line in expected_violations)
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--jobs", "2", "--nb-chunk-cells", chunk_cells, str(notebook_path)])
+    assert get_violations() == expected_violations
+
+
+@pytest.mark.skipif(FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="Only implemented for flake8>=5.0.0")
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+def test_run_main_nb_text_formats(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, stream_option: list
+):
+    (tmp_path / "percent.py").write_text(
+        "# %% [markdown]\n# # Title\n\n# %%\nimport os\n\n# %%\nx = [1,2]\n"
+    )
+    (tmp_path / "script.py").write_text("import sys\n")
+    (tmp_path / "notebook.md").write_text("# Title\n\n```python\nimport os\n```\n")
+    (tmp_path / "report.qmd").write_text(
+        "```{python}\n#| label: setup\n#| echo: false\nx=1\n```\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-text-formats", "py:percent,qmd", *stream_option])
+    assert sorted(capsys.readouterr().out.splitlines()) == [
+        "./script.py:1:1: F401 'sys' imported but unused",
+        "percent.py#In[ ]:1:1: F401 'os' imported but unused",
+        "percent.py#In[ ]:1:7: E231 missing whitespace after ','",
+        "report.qmd#In[ ]:1:2: E225 missing whitespace around operator",
+    ]
+
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-text-formats", "md,rst"])
+    assert "Unknown text notebook format 'rst'" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="Only implemented for flake8>=5.0.0")
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_run_main_nb_profiles(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, jobs: str
+):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "lib.py").write_text("import os\nx = [1,2]\n")
+    (tmp_path / "exploratory").mkdir()
+    shutil.copy(
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb"),
+        tmp_path / "exploratory" / "notebook.ipynb",
+    )
+    (tmp_path / "setup.cfg").write_text(
+        "[flake8_nb]\nnb-profiles = strict,lenient\n"
+        "[flake8_nb:profile:strict]\nnb-profile-paths = src\n"
+        "[flake8_nb:profile:lenient]\nextend-ignore = E222,E231,F401\n"
+        "[flake8_nb:profile:preview]\nselect = F401\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exit_info:
+        main(["flake8_nb", "--jobs", jobs])
+    assert exit_info.value.code == 1
+    # the notebook is only checked by the lenient profile, which ignores all its violations
+    assert capsys.readouterr().out.splitlines() == [
+        "[strict] ./src/lib.py:1:1: F401 'os' imported but unused",
+        "[strict] ./src/lib.py:2:7: E231 missing whitespace after ','",
+    ]
+
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-profiles", "lenient,preview", "--format", "jsonl_notebook"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(record["profile"], record["path"], record["code"]) for record in records] == [
+        ("preview", "./src/lib.py", "F401")
+    ]
+
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-memory-report"])
+    assert [line.split(":")[0].strip() for line in capsys.readouterr().err.splitlines()[2:5]] == [
+        "initialize",
+        "check",
+        "report",
+    ]
+
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-profiles", "strict,missing"])
+    assert "Unknown profile 'missing'" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-fail-fast"])
+    assert "--nb-profiles can't be combined" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+def test_run_main_nb_metrics_file(tmp_path: Path, monkeypatch: MonkeyPatch, stream_option: list):
+    for notebook_name in ("notebook_with_out_ipython_magic.ipynb", "not_a_notebook.ipynb"):
+        shutil.copy(os.path.join(TEST_NOTEBOOK_BASE_PATH, notebook_name), tmp_path)
+    (tmp_path / "script.py").write_text("import os\n")
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        with pytest.warns(InvalidNotebookWarning):
+            main(["flake8_nb", "--nb-metrics-file", "flake8_nb.prom", *stream_option])
+    metrics_lines = (tmp_path / "flake8_nb.prom").read_text().splitlines()
+    for expected_line in (
+        "# TYPE flake8_nb_notebooks_discovered gauge",
+        "flake8_nb_notebooks_discovered 2",
+        "flake8_nb_notebooks_converted 1",
+        'flake8_nb_notebooks_skipped{reason="invalid"} 1',
+        "flake8_nb_checked_files 2",
+        'flake8_nb_violations{code="E222"} 1',
+        'flake8_nb_violations{code="F401"} 1',
+        "flake8_nb_violations_reported 2",
+    ):
+        assert expected_line in metrics_lines
+    phases = {
+        line.split('"')[1]
+        for line in metrics_lines
+        if line.startswith("flake8_nb_phase_duration_seconds{")
+    }
+    assert phases >= {"initialize", "check", "convert"}
+
+
+@pytest.mark.parametrize(
+    "jobs",
+    [
+        "1",
+        pytest.param(
+            "2",
+            marks=pytest.mark.skipif(
+                FLAKE8_VERSION_TUPLE < (5, 0, 0),
+                reason="The workers are only profiled with flake8>=5.0.0",
+            ),
+        ),
+    ],
+)
+def test_run_main_nb_profile_out(tmp_path: Path, monkeypatch: MonkeyPatch, jobs: str):
+    shutil.copy(
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb"), tmp_path
+    )
+    (tmp_path / "script.py").write_text("import os\n")
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--jobs", jobs, "--nb-profile-out", "profile", "."])
+    profile_names = sorted(os.listdir(tmp_path / "profile"))
+    worker_profile_names = [name for name in profile_names if name.startswith("worker-")]
+    assert len(worker_profile_names) == (2 if jobs == "2" else 0)
+    assert "flake8_nb.pstats" in profile_names
+
+    function_names = {
+        function[2]
+        for function in pstats.Stats(str(tmp_path / "profile" / "flake8_nb.pstats")).stats
+    }
+    assert {"run_checks", "report"} <= function_names
+    collapsed_roots = {
+        line.partition(";")[0]
+        for line in (tmp_path / "profile" / "flake8_nb.collapsed").read_text().splitlines()
+    }
+    assert collapsed_roots == ({"main", "worker"} if jobs == "2" else {"main"})
+
+
+def test_run_main_nb_memory_report(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch
+):
+    shutil.copy(
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb"), tmp_path
+    )
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-memory-trace", "2", "."])
+    captured = capsys.readouterr()
+    assert "Memory report" not in captured.out
+    report_lines = captured.err.splitlines()
+    assert report_lines[:2] == ["Memory report:", "  Peak RSS at the end of each phase:"]
+    assert [line.split(":")[0].strip() for line in report_lines[2:5]] == [
+        "initialize",
+        "check",
+        "report",
+    ]
+    if hasattr(tracemalloc, "reset_peak"):
+        assert any(
+            line.endswith("notebook_with_out_ipython_magic.ipynb (1010 B)")
+            for line in report_lines
+        )
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_run_main_jsonl(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, jobs: str
+):
+    notebook = json.loads(
+        Path(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb").read_text()
+    )
+    records = []
+    # record IDs can contain anything, the parsed notebooks stay in the temporary folder
+    for record_id in ("team/analysis", "../outside", None):
+        records.append(json.dumps({**notebook, "metadata": {"store": {"id": record_id}}}))
+    (tmp_path / "export.jsonl").write_text("\n".join(records))
+    (tmp_path / "script.py").write_text("import os\n")
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "flake8_nb",
+                "--jobs",
+                jobs,
+                "--nb-jsonl-id-field",
+                "metadata.store.id",
+                "export.jsonl",
+                "script.py",
+            ]
+        )
+    assert sorted(capsys.readouterr().out.splitlines()) == [
+        "export.jsonl!../outside#In[1]:1:4: E222 multiple spaces after operator",
+        "export.jsonl!line-3#In[1]:1:4: E222 multiple spaces after operator",
+        "export.jsonl!team/analysis#In[1]:1:4: E222 multiple spaces after operator",
+        "script.py:1:1: F401 'os' imported but unused",
+    ]
+    assert sorted(os.listdir(tmp_path)) == ["export.jsonl", "script.py"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        [],
+        ["--nb-shard", "1/1"],
+        ["--nb-fail-fast"],
+        ["--nb-max-violations", "5"],
+        ["--jobs", "2", "--nb-shard", "1/1"],
+    ],
+)
+def test_run_main_jsonl_options(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, options: list
+):
+    notebook = json.loads(
+        Path(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb").read_text()
+    )
+    (tmp_path / "export.jsonl").write_text(
+        "".join(f"{json.dumps({**notebook, 'id': record_id})}\n" for record_id in ("a", "b", "a"))
+    )
+    # the records found before the last one are read again
+    monkeypatch.setattr(notebook_archives, "JSONL_DECODED_RECORDS_SIZE", 1)
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb", *options, "export.jsonl"])
+    assert exc_info.value.code == 1
+    assert sorted(capsys.readouterr().out.splitlines()) == [
+        "export.jsonl!a#In[1]:1:4: E222 multiple spaces after operator",
+        "export.jsonl!a@line-3#In[1]:1:4: E222 multiple spaces after operator",
+        "export.jsonl!b#In[1]:1:4: E222 multiple spaces after operator",
+    ]
+
+
+@pytest.mark.parametrize("stream_option", [[], ["--nb-stream-batch-size", "1"]])
+def test_run_main_jsonl_files_from(
+    capsys: CaptureFixture, tmp_path: Path, monkeypatch: MonkeyPatch, stream_option: list
+):
+    notebook = json.loads(
+        Path(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb").read_text()
+    )
+    (tmp_path / "export.jsonl").write_text(f"{json.dumps({**notebook, 'id': 'a'})}\n")
+    (tmp_path / "files.txt").write_text("export.jsonl\n")
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--nb-files-from", "files.txt", *stream_option])
+    assert capsys.readouterr().out.splitlines() == [
+        "export.jsonl!a#In[1]:1:4: E222 multiple spaces after operator"
+    ]
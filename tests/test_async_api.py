@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from flake8_nb import FLAKE8_VERSION_TUPLE
+from flake8_nb.parsers.notebook_budget import NotebookBudgetWarning
+from flake8_nb.parsers.notebook_parsers import InvalidNotebookWarning
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+pytestmark = pytest.mark.skipif(
+    FLAKE8_VERSION_TUPLE < (5, 0, 0), reason="The async API requires flake8>=5.0.0"
+)
+
+if FLAKE8_VERSION_TUPLE >= (5, 0, 0):
+    from flake8_nb import async_api
+    from flake8_nb.async_api import AsyncNotebookLinter
+    from flake8_nb.async_api import lint_notebook_file
+
+TEST_NOTEBOOK_PATH = os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_flake8_tags.ipynb")
+TEST_NOTEBOOK_PATHS = [
+    os.path.join(TEST_NOTEBOOK_BASE_PATH, notebook_name)
+    for notebook_name in (
+        "notebook_with_out_flake8_tags.ipynb",
+        "notebook_with_flake8_tags.ipynb",
+        "notebook_with_out_ipython_magic.ipynb",
+        "cell_with_source_string.ipynb",
+    )
+]
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool which counts submitted and concurrently running checks."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+
+        def counted():
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            try:
+                time.sleep(0.05)
+                return fn(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.running -= 1
+
+        return super().submit(counted)
+
+
+def test_lint_notebook_file():
+    records = lint_notebook_file(TEST_NOTEBOOK_PATH)
+    assert [
+        (record["cell"]["input_nr"], record["line"], record["column"], record["code"])
+        for record in records
+    ] == [("1", 1, 1, "F401"), ("2", 1, 5, "E231"), ("5", 1, 5, "E231")]
+    assert {record["path"] for record in records} == {TEST_NOTEBOOK_PATH}
+
+    (record,) = lint_notebook_file(TEST_NOTEBOOK_PATH, ("--select", "F"))
+    assert record["code"] == "F401"
+
+
+def test_lint_notebook_file_invalid_notebook():
+    with pytest.warns(InvalidNotebookWarning):
+        assert (
+            lint_notebook_file(os.path.join(TEST_NOTEBOOK_BASE_PATH, "not_a_notebook.ipynb")) == []
+        )
+
+
+def test_lint_notebook_file_options(tmp_path):
+    """The notebook is parsed with the options of the linter like in the CLI."""
+    notebook_path = str(tmp_path / "notebook.ipynb")
+    with open(notebook_path, "w") as notebook_file:
+        json.dump(
+            {
+                "cells": [
+                    {
+                        "cell_type": "code",
+                        "execution_count": 1,
+                        "metadata": {},
+                        "outputs": [],
+                        "source": ["%%custom_magic\n", "x=1\n"],
+                    }
+                ],
+                "metadata": {},
+                "nbformat": 4,
+                "nbformat_minor": 4,
+            },
+            notebook_file,
+        )
+
+    assert [record["code"] for record in lint_notebook_file(notebook_path)] == ["E225"]
+    assert lint_notebook_file(notebook_path, ("--nb-skip-cell-magics", "custom_magic")) == []
+    with pytest.warns(NotebookBudgetWarning):
+        assert lint_notebook_file(notebook_path, ("--nb-max-code-lines", "1")) == []
+
+
+def test_lint_notebook_file_text_formats(tmp_path):
+    notebook_path = str(tmp_path / "notebook.py")
+    with open(notebook_path, "w") as notebook_file:
+        notebook_file.write("# %%\nx=1\n")
+
+    with pytest.warns(InvalidNotebookWarning):
+        assert lint_notebook_file(notebook_path) == []
+    (record,) = lint_notebook_file(notebook_path, ("--nb-text-formats", "py:percent"))
+    assert (record["path"], record["line"], record["code"]) == (notebook_path, 1, "E225")
+
+
+def test_AsyncNotebookLinter_lint_notebooks():
+    with CountingExecutor(max_workers=4) as executor:
+        linter = AsyncNotebookLinter(executor=executor, max_concurrency=2)
+        results = asyncio.run(linter.lint_notebooks(TEST_NOTEBOOK_PATHS))
+
+    assert list(results) == TEST_NOTEBOOK_PATHS
+    for notebook_path, records in results.items():
+        assert records == lint_notebook_file(notebook_path)
+    assert executor.submitted == len(TEST_NOTEBOOK_PATHS)
+    assert executor.max_running <= 2
+    assert linter.in_flight == {}
+
+
+def test_AsyncNotebookLinter_coalesces_requests():
+    async def lint_concurrently(linter: AsyncNotebookLinter):
+        relative_path = os.path.relpath(TEST_NOTEBOOK_PATH)
+        return await asyncio.gather(
+            linter.lint_notebook(TEST_NOTEBOOK_PATH),
+            linter.lint_notebook(os.path.abspath(TEST_NOTEBOOK_PATH)),
+            linter.lint_notebook(relative_path),
+        )
+
+    with CountingExecutor(max_workers=2) as executor:
+        linter = AsyncNotebookLinter(executor=executor)
+        first, *others = asyncio.run(lint_concurrently(linter))
+        assert executor.submitted == 1
+        assert all(records is first for records in others)
+        # finished checks aren't cached
+        asyncio.run(linter.lint_notebook(TEST_NOTEBOOK_PATH))
+        assert executor.submitted == 2
+
+
+def test_AsyncNotebookLinter_cancel_request():
+    async def cancel_one_request(linter: AsyncNotebookLinter):
+        cancelled = asyncio.ensure_future(linter.lint_notebook(TEST_NOTEBOOK_PATH))
+        waiting = asyncio.ensure_future(linter.lint_notebook(TEST_NOTEBOOK_PATH))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await waiting
+
+    with CountingExecutor(max_workers=1) as executor:
+        linter = AsyncNotebookLinter(executor=executor)
+        assert len(asyncio.run(cancel_one_request(linter))) == 3
+        assert executor.submitted == 1
+
+
+def test_get_linter_per_thread():
+    linter = async_api.get_linter()
+    assert async_api.get_linter() is linter
+    assert async_api.get_linter(("--select", "F")) is not linter
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(async_api.get_linter).result() is not linter
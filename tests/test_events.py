@@ -0,0 +1,148 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from _pytest.logging import LogCaptureFixture
+from _pytest.monkeypatch import MonkeyPatch
+
+from flake8_nb import events
+from flake8_nb.__main__ import main
+from flake8_nb.events import add_listener
+from flake8_nb.events import emit_event
+from flake8_nb.events import has_listeners
+from flake8_nb.events import load_entry_point_listeners
+from flake8_nb.events import remove_listener
+from flake8_nb.parsers import CellId
+from tests import TEST_NOTEBOOK_BASE_PATH
+
+
+@pytest.fixture
+def recorded_events():
+    recorded: list = []
+
+    def listener(event_name: str, info: dict):
+        recorded.append((event_name, info))
+
+    add_listener("*", listener)
+    yield recorded
+    remove_listener("*", listener)
+    assert not any(has_listeners(event_name) for event_name in events.EVENT_NAMES)
+
+
+def test_add_remove_listener():
+    calls = []
+
+    def listener(event_name: str, info: dict):
+        calls.append((event_name, info))
+
+    assert not has_listeners("cleanup")
+    emit_event("cleanup", temp_path="a")
+    add_listener("cleanup", listener)
+    add_listener("cleanup", listener)
+    assert has_listeners("cleanup")
+    assert not has_listeners("run_start")
+    emit_event("cleanup", temp_path="b")
+    emit_event("run_start", argv=[])
+    remove_listener("cleanup", listener)
+    emit_event("cleanup", temp_path="c")
+    assert calls == [("cleanup", {"temp_path": "b"})]
+
+    with pytest.raises(ValueError, match="Unknown event 'missing', available events are: run_"):
+        add_listener("missing", listener)
+
+
+def test_emit_event_failing_listener(caplog: LogCaptureFixture, recorded_events: list):
+    def failing_listener(event_name: str, info: dict):
+        raise RuntimeError("broken")
+
+    add_listener("run_start", failing_listener)
+    with caplog.at_level(logging.WARNING):
+        emit_event("run_start", argv=["a"])
+    remove_listener("run_start", failing_listener)
+    assert "failed: broken" in caplog.text
+    assert recorded_events == [("run_start", {"argv": ["a"]})]
+
+
+def test_load_entry_point_listeners(monkeypatch: MonkeyPatch):
+    import importlib.metadata
+
+    calls = []
+
+    def listener(event_name: str, info: dict):
+        calls.append(event_name)
+
+    def broken_load():
+        raise ImportError("missing module")
+
+    entry_points = [
+        SimpleNamespace(name="tracing", load=lambda: listener),
+        SimpleNamespace(name="broken", load=broken_load),
+    ]
+
+    def fake_entry_points():
+        return SimpleNamespace(
+            select=lambda group: entry_points if group == "flake8_nb.listeners" else []
+        )
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", fake_entry_points)
+    monkeypatch.setattr(events, "_ENTRY_POINT_LISTENERS_LOADED", False)
+    load_entry_point_listeners()
+    load_entry_point_listeners()
+    try:
+        emit_event("run_start", argv=[])
+        emit_event("cleanup", temp_path="")
+    finally:
+        remove_listener("*", listener)
+    assert calls == ["run_start", "cleanup"]
+
+
+@pytest.mark.parametrize("formatter", ["default_notebook", "jsonl_notebook"])
+def test_run_events(
+    tmp_path: Path, monkeypatch: MonkeyPatch, recorded_events: list, capsys, formatter: str
+):
+    shutil.copy(
+        os.path.join(TEST_NOTEBOOK_BASE_PATH, "notebook_with_out_ipython_magic.ipynb"),
+        tmp_path / "notebook.ipynb",
+    )
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        main(["flake8_nb", "--format", formatter])
+    capsys.readouterr()
+
+    assert [event_name for event_name, _ in recorded_events] == [
+        "run_start",
+        "notebook_discovered",
+        "notebook_parsed",
+        "intermediate_written",
+        "violation_mapped",
+        "run_end",
+        "cleanup",
+    ]
+    event_infos = dict(recorded_events)
+    notebook_path = os.path.abspath("notebook.ipynb")
+    assert event_infos["notebook_discovered"] == {"notebook_path": notebook_path}
+    parsed_info = event_infos["notebook_parsed"]
+    assert parsed_info["notebook_bytes"] == os.path.getsize("notebook.ipynb")
+    assert parsed_info["code_cells"] == 1
+    assert parsed_info["skip_reason"] is None
+    assert parsed_info["seconds"] >= 0
+    intermediate_info = event_infos["intermediate_written"]
+    assert intermediate_info["notebook_path"] == notebook_path
+    assert intermediate_info["intermediate_bytes"] > 0
+    assert event_infos["violation_mapped"] == {
+        "code": "E222",
+        "intermediate_file_path": intermediate_info["intermediate_file_path"],
+        "intermediate_line": 4,
+        "notebook_path": "notebook.ipynb",
+        "cell": CellId("1", 1, 3),
+        "line": 1,
+    }
+    assert event_infos["run_end"] == {
+        "argv": ["--format", formatter],
+        "result_count": 1,
+        "total_result_count": 1,
+    }
+    assert event_infos["cleanup"]["temp_path"] in intermediate_info["intermediate_file_path"]
@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+
+from flake8_nb.merge_shards import ShardResultsError
+from flake8_nb.merge_shards import get_exit_code
+from flake8_nb.merge_shards import main
+from flake8_nb.merge_shards import merge_shard_results
+from flake8_nb.merge_shards import read_shard_results
+
+
+def get_record(path: str, line: int, code: str = "E231", cell: dict = None) -> dict:
+    return {
+        "path": path,
+        "cell": cell,
+        "line": line,
+        "column": 5,
+        "code": code,
+        "text": "missing whitespace after ':'",
+    }
+
+
+def get_sarif_result(path: str, line: int, cell: dict = None) -> dict:
+    result = {
+        "ruleId": "E231",
+        "message": {"text": "missing whitespace after ':'"},
+        "locations": [
+            {
+                "physicalLocation": {
+                    "artifactLocation": {"uri": path},
+                    "region": {"startLine": line, "startColumn": 5},
+                }
+            }
+        ],
+    }
+    if cell is not None:
+        result["properties"] = {"cell": cell}
+    return result
+
+
+def write_jsonl(path: Path, records: list) -> str:
+    path.write_text("".join(f"{json.dumps(record)}\n" for record in records))
+    return str(path)
+
+
+def write_sarif(path: Path, results: list) -> str:
+    path.write_text(json.dumps({"version": "2.1.0", "runs": [{"results": results}]}))
+    return str(path)
+
+
+CELL_1 = {"input_nr": "1", "code_cell_nr": 1, "total_cell_nr": 2}
+CELL_2 = {"input_nr": "2", "code_cell_nr": 2, "total_cell_nr": 4}
+
+
+def test_read_shard_results(tmp_path: Path):
+    record = get_record("a.ipynb", 1, cell=CELL_1)
+    assert read_shard_results(write_jsonl(tmp_path / "a.jsonl", [record])) == ("jsonl", [record])
+    assert read_shard_results(write_jsonl(tmp_path / "empty.jsonl", [])) == ("jsonl", [])
+    result = get_sarif_result("a.ipynb", 1)
+    assert read_shard_results(write_sarif(tmp_path / "a.sarif", [result])) == ("sarif", [result])
+
+    (tmp_path / "broken.sarif").write_text('{"runs": [{"results": [')
+    with pytest.raises(ShardResultsError, match="neither a JSON Lines file"):
+        read_shard_results(str(tmp_path / "broken.sarif"))
+    with pytest.raises(ShardResultsError, match="Could not read"):
+        read_shard_results(str(tmp_path / "missing.jsonl"))
+
+
+def test_merge_shard_results():
+    shard_1 = [get_record("b.py", 1), get_record("a.ipynb", 1, cell=CELL_2)]
+    shard_2 = [get_record("a.ipynb", 3, cell=CELL_1), get_record("b.py", 1)]
+
+    assert merge_shard_results([("jsonl", shard_1), ("jsonl", shard_2)]) == (
+        "jsonl",
+        [shard_2[0], shard_1[1], shard_1[0]],
+    )
+    sarif_results = [
+        get_sarif_result("a.ipynb", 1, CELL_2),
+        get_sarif_result("a.ipynb", 3, CELL_1),
+    ]
+    assert merge_shard_results([("sarif", sarif_results)]) == ("sarif", sarif_results[::-1])
+    assert merge_shard_results([]) == ("jsonl", [])
+    with pytest.raises(ShardResultsError, match="same formatter"):
+        merge_shard_results([("jsonl", shard_1), ("sarif", sarif_results)])
+
+
+@pytest.mark.parametrize(
+    "exit_codes,has_results,expected_exit_code",
+    [([], False, 0), ([], True, 1), ([0, 0], True, 0), ([0, 1], True, 1), ([1, 2, 0], True, 2)],
+)
+def test_get_exit_code(exit_codes: list, has_results: bool, expected_exit_code: int):
+    results = [get_record("a.py", 1)] if has_results else []
+    assert get_exit_code(exit_codes, results) == expected_exit_code
+
+
+def test_main(tmp_path: Path, capsys: CaptureFixture):
+    record = get_record("a.ipynb", 1, cell=CELL_1)
+    shard_1 = write_jsonl(tmp_path / "1.jsonl", [record])
+    shard_2 = write_jsonl(tmp_path / "2.jsonl", [])
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb-merge-shards", "--exit-code", "1", "--exit-code", "0", shard_1, shard_2])
+    assert exc_info.value.code == 1
+    assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == [record]
+
+    sarif_shard = write_sarif(tmp_path / "1.sarif", [get_sarif_result("a.ipynb", 1)])
+    output_file = tmp_path / "merged.sarif"
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb-merge-shards", "--output-file", str(output_file), sarif_shard])
+    assert exc_info.value.code == 1
+    sarif_log = json.loads(output_file.read_text())
+    assert sarif_log["runs"][0]["tool"]["driver"]["name"] == "flake8_nb"
+    assert len(sarif_log["runs"][0]["results"]) == 1
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["flake8_nb-merge-shards", shard_1, sarif_shard])
+    assert exc_info.value.code == 2
+    assert "same formatter" in capsys.readouterr().err